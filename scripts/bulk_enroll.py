@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Concurrency-safe bulk cohort enrollment with seat-cap enforcement.
+
+The cohort row is locked once per call (SELECT ... FOR UPDATE), the remaining
+seats are computed against Cohort.seat_cap, and the admitted users are inserted
+with INSERT ... ON CONFLICT DO NOTHING RETURNING user_id, so only rows this call
+actually created are reported as admitted. Parallel callers on the same cohort
+serialize on the row lock, so the cap holds no matter how many enrollment
+requests arrive at once.
+
+Usage:
+    python scripts/bulk_enroll.py --cohort <cohort_id> --users-file user_ids.txt
+    python scripts/bulk_enroll.py --cohort <cohort_id> --benchmark --workers 16 --batch 500
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+
+import django
+
+# Add Django app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from programs.models import Cohort, Enrollment
+
+User = get_user_model()
+
+# Enrollment statuses that do not hold a seat
+NON_SEAT_STATUSES = ('withdrawn', 'cancelled', 'rejected', 'waitlisted')
+
+DEFAULT_ENROLLMENT = {
+    'enrollment_type': 'director',
+    'seat_type': 'scholarship',
+    'payment_status': 'waived',
+    'status': 'active',
+}
+INSERT_CHUNK = 1000
+
+
+@dataclass
+class BulkEnrollmentResult:
+    cohort_id: object
+    seat_cap: object
+    admitted: list = field(default_factory=list)
+    waitlisted: list = field(default_factory=list)
+    already_enrolled: list = field(default_factory=list)
+    seats_remaining: object = None
+
+
+def _dedupe(user_ids):
+    seen = set()
+    ordered = []
+    for user_id in user_ids:
+        if user_id not in seen:
+            seen.add(user_id)
+            ordered.append(user_id)
+    return ordered
+
+
+def _insert_enrollments(enrollments):
+    """Insert Enrollment objects, skipping conflicts; returns the user ids whose rows were created."""
+    meta = Enrollment._meta
+    fields = [f for f in meta.concrete_fields if not (f.primary_key and getattr(f, 'db_returning', False))]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(f.column) for f in fields)
+    row_sql = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    inserted = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(enrollments), INSERT_CHUNK):
+            chunk = enrollments[start:start + INSERT_CHUNK]
+            params = [f.get_db_prep_save(f.pre_save(obj, True), connection) for obj in chunk for f in fields]
+            cursor.execute(
+                f"INSERT INTO {quote(meta.db_table)} ({columns}) VALUES {', '.join([row_sql] * len(chunk))} "
+                f"ON CONFLICT DO NOTHING RETURNING {quote(meta.get_field('user').column)}",
+                params,
+            )
+            inserted.update(row[0] for row in cursor.fetchall())
+    return inserted
+
+
+def bulk_enroll(cohort_id, user_ids, **enrollment_fields):
+    """
+    Enroll many users in a cohort in one transaction.
+
+    Users are admitted in the order given until the cohort's seat_cap is reached;
+    the rest are returned as waitlisted. Users already enrolled, including rows
+    another writer inserted concurrently without the lock, are reported separately
+    and never consume a seat twice. A null seat_cap means unlimited.
+    """
+    to_pk = User._meta.pk.to_python
+    user_ids = _dedupe(to_pk(user_id) for user_id in user_ids)
+    defaults = {**DEFAULT_ENROLLMENT, **enrollment_fields}
+
+    with transaction.atomic():
+        # Lock the cohort row once; concurrent callers for this cohort queue here
+        cohort = Cohort.objects.select_for_update().only('id', 'seat_cap').get(pk=cohort_id)
+        enrollments = Enrollment.objects.filter(cohort_id=cohort.pk)
+
+        already = set(enrollments.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        candidates = [user_id for user_id in user_ids if user_id not in already]
+
+        if cohort.seat_cap is None:
+            remaining = len(candidates)
+        else:
+            held = enrollments.exclude(status__in=NON_SEAT_STATUSES).count()
+            remaining = max(cohort.seat_cap - held, 0)
+
+        offered = candidates[:remaining]
+        waitlisted = candidates[remaining:]
+
+        # ON CONFLICT DO NOTHING guards against writers that bypass the lock; RETURNING
+        # tells us which rows were really ours, so conflicts are not reported as admitted
+        inserted = _insert_enrollments(
+            [Enrollment(user_id=user_id, cohort_id=cohort.pk, **defaults) for user_id in offered]
+        ) if offered else set()
+        admitted = [user_id for user_id in offered if user_id in inserted]
+        already |= set(offered) - inserted
+        seats_remaining = None
+        if cohort.seat_cap is not None:
+            held = enrollments.exclude(status__in=NON_SEAT_STATUSES).count()
+            seats_remaining = max(cohort.seat_cap - held, 0)
+
+    return BulkEnrollmentResult(
+        cohort_id=cohort.pk,
+        seat_cap=cohort.seat_cap,
+        admitted=admitted,
+        waitlisted=waitlisted,
+        already_enrolled=[user_id for user_id in user_ids if user_id in already],
+        seats_remaining=seats_remaining,
+    )
+
+
+def run_contention_benchmark(cohort_id, workers, batch):
+    """
+    Fire `workers` parallel bulk_enroll calls with overlapping user sets at one
+    cohort, then verify the seat cap held and no user was enrolled twice.
+    Enrollments created by the benchmark are removed afterwards.
+    """
+    pool = list(User.objects.filter(is_active=True).values_list('id', flat=True)[: batch * 4])
+    if len(pool) < batch:
+        print(f"❌ Need at least {batch} active users for the benchmark, found {len(pool)}")
+        return 1
+
+    preexisting = set(Enrollment.objects.filter(cohort_id=cohort_id).values_list('user_id', flat=True))
+    results = []
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(workers)
+
+    def worker(seed):
+        ids = random.Random(seed).sample(pool, batch)
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            result = bulk_enroll(cohort_id, ids)
+        finally:
+            connection.close()
+        with lock:
+            latencies.append(time.perf_counter() - start)
+            results.append(result)
+
+    print(f"🏁 {workers} parallel callers x {batch} users against cohort {cohort_id}")
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(workers)]
+    wall = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall
+
+    cohort = Cohort.objects.get(pk=cohort_id)
+    enrolled = list(Enrollment.objects.filter(cohort_id=cohort_id).values_list('user_id', flat=True))
+    held = Enrollment.objects.filter(cohort_id=cohort_id).exclude(status__in=NON_SEAT_STATUSES).count()
+    admitted = [user_id for result in results for user_id in result.admitted]
+    latencies.sort()
+
+    print(f"  Wall time:        {wall * 1000:.1f} ms")
+    print(f"  Calls/sec:        {workers / wall:.1f}")
+    print(f"  Users offered/s:  {workers * batch / wall:.0f}")
+    print(f"  p50 / max call:   {latencies[len(latencies) // 2] * 1000:.1f} / {latencies[-1] * 1000:.1f} ms")
+    print(f"  Admitted:         {len(admitted)} (seat_cap {cohort.seat_cap}, seats held {held})")
+
+    ok = True
+    if len(enrolled) != len(set(enrolled)):
+        print("  ❌ Duplicate enrollments found")
+        ok = False
+    if len(admitted) != len(set(admitted)):
+        print("  ❌ A user was admitted by more than one caller")
+        ok = False
+    if cohort.seat_cap is not None and held > cohort.seat_cap:
+        print(f"  ❌ Seat cap exceeded: {held} > {cohort.seat_cap}")
+        ok = False
+    if ok:
+        print("  ✅ Seat cap and uniqueness held under contention")
+
+    created = set(admitted) - preexisting
+    Enrollment.objects.filter(cohort_id=cohort_id, user_id__in=created).delete()
+    print(f"  🧹 Removed {len(created)} benchmark enrollments")
+    return 0 if ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cohort', required=True, help='Cohort primary key')
+    parser.add_argument('--users-file', help='File with one user id per line')
+    parser.add_argument('--benchmark', action='store_true', help='Run the contention benchmark')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        return run_contention_benchmark(args.cohort, args.workers, args.batch)
+
+    if not args.users_file:
+        parser.error('--users-file is required unless --benchmark is given')
+    with open(args.users_file) as f:
+        user_ids = [line.strip() for line in f if line.strip()]
+
+    result = bulk_enroll(args.cohort, user_ids)
+    print(f"✅ Admitted:         {len(result.admitted)}")
+    print(f"⏳ Waitlisted:       {len(result.waitlisted)}")
+    print(f"⚠️  Already enrolled: {len(result.already_enrolled)}")
+    if result.seats_remaining is not None:
+        print(f"   Seats remaining:  {result.seats_remaining} of {result.seat_cap}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Signal receivers that keep the RBAC cache and the dashboard materializer fresh.
+
+This module does not call django.setup(), so it can be imported while Django
+loads its apps. Wire it up by adding the app config to INSTALLED_APPS (with
+scripts/ on the path):
+
+    INSTALLED_APPS += ['cache_signals.CacheSignalsConfig']
+
+or by calling connect_cache_signals() from an existing AppConfig.ready().
+
+Receivers:
+    UserRole / OrganizationMember save+delete   -> invalidate that user's RBAC entry
+    Role save+delete                            -> invalidate every RBAC entry
+    Goal / Enrollment / ProfilerSession changes -> mark the user's dashboard dirty
+    Habit check-in created/deleted              -> +1/-1 on the goal_rollup change log
+
+The habit check-in model defaults to coaching.HabitLog; point the
+COACHING_HABIT_COMPLETION_MODEL setting at another 'app_label.Model' if the
+check-ins live elsewhere. Rows need a goal_id (and optionally habit_id).
+
+All of them act on commit, once the change is visible to other connections.
+Bulk queryset.update()/delete() calls bypass signals; call invalidate_user()
+or mark_dirty() yourself after those.
+"""
+import logging
+import time
+
+from django.apps import AppConfig, apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from redis_client import get_redis
+
+# RBAC cache keys. The generation counters let a cache fill detect an
+# invalidation that happened while it was reading the database.
+RBAC_KEY_PREFIX = 'rbac:v2:user:'
+RBAC_GENERATION_PREFIX = 'rbac:v2:gen:'
+RBAC_GLOBAL_GENERATION = 'rbac:v2:gen:*'
+RBAC_INVALIDATION_CHANNEL = 'rbac:invalidate'
+RBAC_FLUSH_ALL = '*'
+
+DASHBOARD_DIRTY_KEY = 'dashboard:dirty'
+HABIT_LOG_STREAM = 'coaching:habit_completions'
+
+# (app label, model) pairs the receivers are attached to
+RBAC_MEMBERSHIP_MODELS = (('users', 'UserRole'), ('organizations', 'OrganizationMember'))
+RBAC_ROLE_MODEL = ('users', 'Role')
+DASHBOARD_MODELS = (('coaching', 'Goal'), ('programs', 'Enrollment'), ('profiler', 'ProfilerSession'))
+HABIT_COMPLETION_MODEL = 'coaching.HabitLog'
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# RBAC invalidation
+# ---------------------------------------------------------------------------
+
+def invalidate_user(user_id):
+    """Drop a user's cached roles everywhere; an in-flight cache fill for them will not be stored."""
+    user_key = str(user_id)
+    redis_conn = get_redis()
+    pipe = redis_conn.pipeline(transaction=True)
+    pipe.incr(RBAC_GENERATION_PREFIX + user_key)
+    pipe.delete(RBAC_KEY_PREFIX + user_key)
+    pipe.execute()
+    redis_conn.publish(RBAC_INVALIDATION_CHANNEL, user_key)
+
+
+def invalidate_all():
+    redis_conn = get_redis()
+    redis_conn.incr(RBAC_GLOBAL_GENERATION)
+    keys = list(redis_conn.scan_iter(match=RBAC_KEY_PREFIX + '*', count=1000))
+    for i in range(0, len(keys), 1000):
+        redis_conn.delete(*keys[i:i + 1000])
+    redis_conn.publish(RBAC_INVALIDATION_CHANNEL, RBAC_FLUSH_ALL)
+
+
+def _on_membership_change(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+def _on_role_change(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_all)
+
+
+# ---------------------------------------------------------------------------
+# Dashboard dirty tracking
+# ---------------------------------------------------------------------------
+
+def mark_dirty(user_ids):
+    """Queue users for recomputation. Keeps the earliest dirty time so lag is measured honestly."""
+    user_ids = [str(user_id) for user_id in user_ids if user_id is not None]
+    if user_ids:
+        now = time.time()
+        get_redis().zadd(DASHBOARD_DIRTY_KEY, {user_id: now for user_id in user_ids}, nx=True)
+
+
+def _mark_instance_user(sender, instance, **kwargs):
+    user_id = getattr(instance, 'user_id', None)
+    if user_id is not None:
+        # Only queue once the write is visible to the worker's connection
+        transaction.on_commit(lambda: mark_dirty([user_id]))
+
+
+# ---------------------------------------------------------------------------
+# Habit completion change log (consumed by goal_rollup.apply_habit_completions)
+# ---------------------------------------------------------------------------
+
+def record_habit_completion(goal_id, habit_id=None, delta=1):
+    """Append a habit completion to the change log."""
+    get_redis().xadd(
+        HABIT_LOG_STREAM,
+        {'goal_id': str(goal_id), 'habit_id': str(habit_id or ''), 'delta': str(delta)},
+    )
+
+
+def _record_instance_completion(instance, delta):
+    goal_id = getattr(instance, 'goal_id', None)
+    if goal_id is not None:
+        habit_id = getattr(instance, 'habit_id', None)
+        transaction.on_commit(lambda: record_habit_completion(goal_id, habit_id, delta))
+
+
+def _on_habit_logged(sender, instance, created=False, **kwargs):
+    if created:
+        _record_instance_completion(instance, 1)
+
+
+def _on_habit_log_deleted(sender, instance, **kwargs):
+    _record_instance_completion(instance, -1)
+
+
+# ---------------------------------------------------------------------------
+# Wiring
+# ---------------------------------------------------------------------------
+
+def connect_cache_signals():
+    """Connect every receiver; safe to call more than once. Needs the app registry to be ready."""
+    for label in RBAC_MEMBERSHIP_MODELS:
+        model = apps.get_model(*label)
+        uid = f'rbac-cache-{model._meta.label_lower}'
+        post_save.connect(_on_membership_change, sender=model, dispatch_uid=f'{uid}-save')
+        post_delete.connect(_on_membership_change, sender=model, dispatch_uid=f'{uid}-delete')
+    role = apps.get_model(*RBAC_ROLE_MODEL)
+    post_save.connect(_on_role_change, sender=role, dispatch_uid='rbac-cache-role-save')
+    post_delete.connect(_on_role_change, sender=role, dispatch_uid='rbac-cache-role-delete')
+    for label in DASHBOARD_MODELS:
+        model = apps.get_model(*label)
+        uid = f'dashboard-dirty-{model._meta.label_lower}'
+        post_save.connect(_mark_instance_user, sender=model, dispatch_uid=f'{uid}-save')
+        post_delete.connect(_mark_instance_user, sender=model, dispatch_uid=f'{uid}-delete')
+    habit_label = getattr(settings, 'COACHING_HABIT_COMPLETION_MODEL', HABIT_COMPLETION_MODEL)
+    try:
+        habit_log = apps.get_model(habit_label)
+    except (LookupError, ValueError):
+        logger.warning('Habit completion model %r not found; goal rollup will not see check-ins', habit_label)
+    else:
+        post_save.connect(_on_habit_logged, sender=habit_log, dispatch_uid='goal-rollup-habit-save')
+        post_delete.connect(_on_habit_log_deleted, sender=habit_log, dispatch_uid='goal-rollup-habit-delete')
+
+
+class CacheSignalsConfig(AppConfig):
+    name = 'cache_signals'
+    label = 'cache_signals'
+    verbose_name = 'Cache invalidation signals'
+
+    def ready(self):
+        connect_cache_signals()
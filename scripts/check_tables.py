@@ -11,6 +11,9 @@ sys.path.insert(0, '/home/fidel-ochieng-ogola/FIDEL OGOLA PERSONAL FOLDER/Ongoza
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
 django.setup()
 
+from query_instrumentation import install_at_exit
+install_at_exit()
+
 from django.db import connection
 
 def check_tables():
@@ -0,0 +1,7 @@
+"""
+State tables for the batch goal rollup (scripts/goal_rollup.py) and the skill
+profile pipeline (scripts/skill_profile_pipeline.py).
+
+Add 'coaching_rollup' to INSTALLED_APPS (with scripts/ on the path) and run
+migrate before the first --apply-habits run or pipeline start.
+"""
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class CoachingRollupConfig(AppConfig):
+    name = 'coaching_rollup'
+    label = 'coaching_rollup'
+    verbose_name = 'Coaching goal rollup'
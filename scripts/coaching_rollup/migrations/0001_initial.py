@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+# Earlier versions of goal_rollup.py created this table on the fly, so the
+# database side tolerates it already existing.
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS coaching_rollup_offsets (
+    name TEXT PRIMARY KEY,
+    last_id TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+)
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_SQL, reverse_sql='DROP TABLE IF EXISTS coaching_rollup_offsets'),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='RollupOffset',
+                    fields=[
+                        ('name', models.TextField(primary_key=True, serialize=False)),
+                        ('last_id', models.TextField()),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                    ],
+                    options={
+                        'db_table': 'coaching_rollup_offsets',
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.db import migrations, models
+
+# Earlier versions of skill_profile_pipeline.py created these tables on the
+# fly, so the database side tolerates them already existing. The profile
+# user_id column takes the user model's primary key type.
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS learner_skill_profiles (
+    user_id {user_type} NOT NULL,
+    skill TEXT NOT NULL,
+    score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    completions INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, skill)
+);
+CREATE TABLE IF NOT EXISTS learner_skill_events (
+    event_id TEXT PRIMARY KEY,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE TABLE IF NOT EXISTS learner_skill_parked_events (
+    event_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    mission_id TEXT NOT NULL,
+    parked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+ALTER TABLE learner_skill_parked_events ADD COLUMN IF NOT EXISTS error TEXT;
+"""
+
+DROP_SQL = """
+DROP TABLE IF EXISTS learner_skill_parked_events;
+DROP TABLE IF EXISTS learner_skill_events;
+DROP TABLE IF EXISTS learner_skill_profiles;
+"""
+
+
+def create_tables(apps, schema_editor):
+    user_model = apps.get_model(settings.AUTH_USER_MODEL)
+    user_type = user_model._meta.pk.db_type(schema_editor.connection)
+    schema_editor.execute(CREATE_SQL.format(user_type=user_type))
+
+
+def drop_tables(apps, schema_editor):
+    schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching_rollup', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_tables, drop_tables),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='LearnerSkillProfile',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('user', 'skill', blank=True, editable=False,
+                                                          primary_key=True, serialize=False)),
+                        ('user', models.ForeignKey(db_constraint=False, on_delete=models.DO_NOTHING,
+                                                   related_name='+', to=settings.AUTH_USER_MODEL)),
+                        ('skill', models.TextField()),
+                        ('score', models.FloatField(default=0)),
+                        ('completions', models.IntegerField(default=0)),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                    ],
+                    options={
+                        'db_table': 'learner_skill_profiles',
+                    },
+                ),
+                migrations.CreateModel(
+                    name='LearnerSkillEvent',
+                    fields=[
+                        ('event_id', models.TextField(primary_key=True, serialize=False)),
+                        ('applied_at', models.DateTimeField(auto_now_add=True)),
+                    ],
+                    options={
+                        'db_table': 'learner_skill_events',
+                    },
+                ),
+                migrations.CreateModel(
+                    name='LearnerSkillParkedEvent',
+                    fields=[
+                        ('event_id', models.TextField(primary_key=True, serialize=False)),
+                        ('user_id', models.TextField()),
+                        ('mission_id', models.TextField()),
+                        ('error', models.TextField(blank=True, null=True)),
+                        ('parked_at', models.DateTimeField(auto_now_add=True)),
+                    ],
+                    options={
+                        'db_table': 'learner_skill_parked_events',
+                    },
+                ),
+            ],
+        ),
+    ]
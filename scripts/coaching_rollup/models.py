@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import models
+
+
+class RollupOffset(models.Model):
+    """Last change-log entry a rollup consumer has applied, committed with the goal updates."""
+
+    name = models.TextField(primary_key=True)
+    last_id = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'coaching_rollup_offsets'
+
+    def __str__(self):
+        return f'{self.name} @ {self.last_id}'
+
+
+class LearnerSkillProfile(models.Model):
+    """Per-(user, skill) totals maintained by scripts/skill_profile_pipeline.py."""
+
+    pk = models.CompositePrimaryKey('user', 'skill')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING,
+                             db_constraint=False, related_name='+')
+    skill = models.TextField()
+    score = models.FloatField(default=0)
+    completions = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'learner_skill_profiles'
+
+    def __str__(self):
+        return f'{self.user_id} {self.skill}: {self.score}'
+
+
+class LearnerSkillEvent(models.Model):
+    """Completion event ids the skill pipeline has applied, so replays are ignored."""
+
+    event_id = models.TextField(primary_key=True)
+    applied_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'learner_skill_events'
+
+
+class LearnerSkillParkedEvent(models.Model):
+    """
+    Completions the skill pipeline could not apply: missions the catalog did not
+    know yet (error is empty) or events that failed on their own (error says why).
+    """
+
+    event_id = models.TextField(primary_key=True)
+    user_id = models.TextField()
+    mission_id = models.TextField()
+    error = models.TextField(null=True, blank=True)
+    parked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'learner_skill_parked_events'
@@ -21,6 +21,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_ap
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
 django.setup()
 
+from query_instrumentation import install_at_exit
+install_at_exit()
+
 from django.contrib.auth import get_user_model
 from users.models import UserRole, Role
 from programs.models import Program, Track, Cohort, Enrollment
@@ -28,6 +31,7 @@ from organizations.models import Organization
 from django.db import transaction
 from django.db.models import Q
 from datetime import datetime, timedelta
+from bulk_enroll import bulk_enroll
 
 User = get_user_model()
 
@@ -300,19 +304,21 @@ def create_programs_and_cohorts(director_user):
 
 def enroll_students(students, cohort):
     """Enroll students in cohort via director/admin workflow"""
-    for student in students:
-        if not cohort.enrollments.filter(user=student).exists():
-            Enrollment.objects.create(
-                user=student,
-                cohort=cohort,
-                enrollment_type='director',
-                seat_type='scholarship',
-                payment_status='waived',
-                status='active',
-            )
-            print(f"    ✅ Enrolled {student.email} in {cohort.name}")
-        else:
-            print(f"    ⚠️  {student.email} already enrolled in {cohort.name}")
+    by_id = {student.pk: student for student in students}
+    result = bulk_enroll(
+        cohort.pk,
+        list(by_id),
+        enrollment_type='director',
+        seat_type='scholarship',
+        payment_status='waived',
+        status='active',
+    )
+    for user_id in result.admitted:
+        print(f"    ✅ Enrolled {by_id[user_id].email} in {cohort.name}")
+    for user_id in result.already_enrolled:
+        print(f"    ⚠️  {by_id[user_id].email} already enrolled in {cohort.name}")
+    for user_id in result.waitlisted:
+        print(f"    ⏳ {by_id[user_id].email} waitlisted, {cohort.name} is full")
 
 
 @transaction.atomic
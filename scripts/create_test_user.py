@@ -12,6 +12,9 @@ sys.path.insert(0, '/home/fidel-ochieng-ogola/FIDEL OGOLA PERSONAL FOLDER/Ongoza
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
 django.setup()
 
+from query_instrumentation import install_at_exit
+install_at_exit()
+
 User = get_user_model()
 
 def create_test_user():
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Incremental StudentDashboardCache materializer.
+
+Writes to goals, enrollments and profiler sessions mark their user dirty in a
+Redis sorted set (scored by the time the user first became dirty). A background
+pass pops the oldest dirty users, recomputes only their dashboard cache rows in
+batches on a worker pool, and records lag metrics.
+
+The save/delete receivers that mark users dirty live in cache_signals.py, which
+can be imported during app loading; install cache_signals.CacheSignalsConfig to
+connect them.
+
+Usage:
+    python scripts/dashboard_materializer.py                     # run forever
+    python scripts/dashboard_materializer.py --once --batch-size 200 --workers 8
+    python scripts/dashboard_materializer.py --mark-all --once   # full rebuild
+    python scripts/dashboard_materializer.py --metrics
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+# Add Django app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Q
+
+from coaching.models import Goal
+from profiler.models import ProfilerSession
+from programs.models import Enrollment
+from cache_signals import DASHBOARD_DIRTY_KEY, mark_dirty
+from redis_client import get_redis
+from student_dashboard.models import StudentDashboardCache
+
+User = get_user_model()
+
+DIRTY_KEY = DASHBOARD_DIRTY_KEY
+METRICS_KEY = 'dashboard:materializer:metrics'
+
+# ProfilerSession -> StudentDashboardCache.recommended_track value (the CurriculumTrack code)
+PROFILER_TRACK_LOOKUP = 'recommended_track__code'
+
+DEFAULT_BATCH_SIZE = int(os.environ.get('DASHBOARD_BATCH_SIZE', '500'))
+DEFAULT_WORKERS = int(os.environ.get('DASHBOARD_WORKERS', '4'))
+
+
+# ---------------------------------------------------------------------------
+# Recomputation
+# ---------------------------------------------------------------------------
+
+def _recommended_tracks(user_ids):
+    """Latest profiler recommendation per user, one DISTINCT ON query."""
+    rows = (
+        ProfilerSession.objects.filter(user_id__in=user_ids)
+        .order_by('user_id', '-created_at')
+        .distinct('user_id')
+        .values_list('user_id', PROFILER_TRACK_LOOKUP)
+    )
+    return {'recommended_track': dict(rows)}
+
+
+def _goal_stats(user_ids):
+    rows = (
+        Goal.objects.filter(user_id__in=user_ids)
+        .values('user_id')
+        .annotate(
+            active=Count('id', filter=Q(status='active')),
+            completed=Count('id', filter=Q(status='completed')),
+            avg_progress=Avg('progress', filter=Q(status='active')),
+        )
+    )
+    stats = {'active_goals_count': {}, 'completed_goals_count': {}, 'goals_progress': {}}
+    for row in rows:
+        stats['active_goals_count'][row['user_id']] = row['active']
+        stats['completed_goals_count'][row['user_id']] = row['completed']
+        stats['goals_progress'][row['user_id']] = row['avg_progress'] or 0
+    return stats
+
+
+def _enrollment_stats(user_ids):
+    rows = (
+        Enrollment.objects.filter(user_id__in=user_ids, status='active')
+        .values('user_id')
+        .annotate(n=Count('id'))
+    )
+    return {'active_enrollments_count': {row['user_id']: row['n'] for row in rows}}
+
+
+# Each computer returns {cache_field: {user_id: value}}; fields the model lacks are skipped
+FIELD_COMPUTERS = [_recommended_tracks, _goal_stats, _enrollment_stats]
+
+# Aggregates where "no row" means zero. Any other field a computer has no value
+# for is left as it is: e.g. a recommended_track set by set_user_leadership_track.py
+# for a user without a profiler session.
+_FIELD_DEFAULTS = {
+    'active_goals_count': 0,
+    'completed_goals_count': 0,
+    'goals_progress': 0,
+    'active_enrollments_count': 0,
+}
+
+
+def _cache_fields():
+    return {f.name for f in StudentDashboardCache._meta.concrete_fields}
+
+
+def recompute_users(user_ids):
+    """Rebuild the dashboard cache rows for a batch of users with a fixed number of queries."""
+    to_pk = User._meta.pk.to_python
+    user_ids = [to_pk(user_id) for user_id in user_ids]
+    model_fields = _cache_fields()
+
+    values = {}
+    for computer in FIELD_COMPUTERS:
+        for field_name, per_user in computer(user_ids).items():
+            if field_name in model_fields:
+                values[field_name] = per_user
+    fields = sorted(values)
+
+    with transaction.atomic():
+        existing = {
+            row.user_id: row
+            for row in StudentDashboardCache.objects.select_for_update().filter(user_id__in=user_ids)
+        }
+        to_update, to_create = [], []
+        for user_id in user_ids:
+            row = existing.get(user_id) or StudentDashboardCache(user_id=user_id)
+            for field_name in fields:
+                value = values[field_name].get(user_id, _FIELD_DEFAULTS.get(field_name))
+                if value is not None:
+                    setattr(row, field_name, value)
+            (to_update if user_id in existing else to_create).append(row)
+
+        if to_update and fields:
+            StudentDashboardCache.objects.bulk_update(to_update, fields, batch_size=500)
+        if to_create:
+            StudentDashboardCache.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+    return len(user_ids)
+
+
+# ---------------------------------------------------------------------------
+# Background passes
+# ---------------------------------------------------------------------------
+
+class DashboardMaterializer:
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS, max_users_per_pass=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_users_per_pass = max_users_per_pass or batch_size * workers * 4
+        self.redis = get_redis()
+
+    def lag_seconds(self):
+        oldest = self.redis.zrange(DIRTY_KEY, 0, 0, withscores=True)
+        return time.time() - oldest[0][1] if oldest else 0.0
+
+    def _recompute_batch(self, batch):
+        try:
+            return recompute_users([user_id for user_id, _ in batch])
+        except Exception:
+            # Put the batch back with its original dirty times so it is retried next pass
+            self.redis.zadd(DIRTY_KEY, dict(batch), nx=True)
+            raise
+        finally:
+            connection.close()
+
+    def run_once(self):
+        """Drain up to max_users_per_pass dirty users, oldest first. Returns the pass metrics."""
+        start = time.perf_counter()
+        lag_before = self.lag_seconds()
+        popped = [
+            (member.decode() if isinstance(member, bytes) else member, score)
+            for member, score in self.redis.zpopmin(DIRTY_KEY, self.max_users_per_pass)
+        ]
+        batches = [popped[i:i + self.batch_size] for i in range(0, len(popped), self.batch_size)]
+
+        recomputed, failed = 0, 0
+        if batches:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for future in [pool.submit(self._recompute_batch, batch) for batch in batches]:
+                    try:
+                        recomputed += future.result()
+                    except Exception as e:
+                        failed += 1
+                        print(f"  ❌ Batch failed, requeued: {e}")
+
+        elapsed = time.perf_counter() - start
+        metrics = {
+            'recomputed': recomputed,
+            'failed_batches': failed,
+            'batches': len(batches),
+            'pass_seconds': round(elapsed, 3),
+            'users_per_second': round(recomputed / elapsed, 1) if elapsed else 0,
+            'lag_before_seconds': round(lag_before, 3),
+            'lag_after_seconds': round(self.lag_seconds(), 3),
+            'queue_depth': self.redis.zcard(DIRTY_KEY),
+            'finished_at': time.time(),
+        }
+        self.redis.hset(METRICS_KEY, mapping=metrics)
+        return metrics
+
+    def run_forever(self, interval=5.0):
+        print(f"🔁 Materializer running (batch_size={self.batch_size}, workers={self.workers})")
+        while True:
+            metrics = self.run_once()
+            if metrics['recomputed'] or metrics['failed_batches']:
+                print(
+                    f"  ✅ {metrics['recomputed']} users in {metrics['pass_seconds']}s "
+                    f"({metrics['users_per_second']}/s), lag {metrics['lag_before_seconds']}s -> "
+                    f"{metrics['lag_after_seconds']}s, {metrics['queue_depth']} still queued"
+                )
+            # Keep draining while there is a backlog; otherwise wait for new dirty users
+            if not metrics['queue_depth']:
+                time.sleep(interval)
+
+
+def mark_all_users_dirty(chunk=5000):
+    """Queue every user, e.g. after changing how dashboard fields are computed."""
+    total = 0
+    last_pk = None
+    while True:
+        qs = User.objects.order_by('pk')
+        if last_pk is not None:
+            qs = qs.filter(pk__gt=last_pk)
+        ids = list(qs.values_list('pk', flat=True)[:chunk])
+        if not ids:
+            return total
+        mark_dirty(ids)
+        total += len(ids)
+        last_pk = ids[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--interval', type=float, default=5.0, help='Idle sleep between passes (seconds)')
+    parser.add_argument('--once', action='store_true', help='Run a single pass and exit')
+    parser.add_argument('--mark-all', action='store_true', help='Queue every user before running')
+    parser.add_argument('--metrics', action='store_true', help='Print the last pass metrics and exit')
+    args = parser.parse_args()
+
+    redis_conn = get_redis()
+    if args.metrics:
+        metrics = {k.decode(): v.decode() for k, v in redis_conn.hgetall(METRICS_KEY).items()}
+        print(f"Queue depth: {redis_conn.zcard(DIRTY_KEY)}")
+        for key, value in sorted(metrics.items()):
+            print(f"  {key}: {value}")
+        return 0
+
+    if args.mark_all:
+        print(f"📝 Queued {mark_all_users_dirty()} users")
+
+    materializer = DashboardMaterializer(batch_size=args.batch_size, workers=args.workers)
+    if args.once:
+        metrics = materializer.run_once()
+        print(f"✅ Recomputed {metrics['recomputed']} users in {metrics['pass_seconds']}s")
+        print(f"   Lag: {metrics['lag_before_seconds']}s -> {metrics['lag_after_seconds']}s, "
+              f"{metrics['queue_depth']} still queued")
+        return 1 if metrics['failed_batches'] else 0
+
+    materializer.run_forever(args.interval)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
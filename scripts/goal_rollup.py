@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Batch goal-progress rollup engine for coaching Goals and Habits.
+
+- recompute_goals(): recomputes progress/status for many goals with one
+  set-based UPDATE per chunk instead of per-row saves.
+  Only active goals are touched; completed goals (including ones a mentor
+  closed by hand) are final. Affected users are queued for the dashboard
+  materializer, since set-based updates bypass post_save.
+- Habit check-ins are appended to a Redis stream change log by the receiver in
+  cache_signals.py (record_habit_completion). apply_habit_completions() folds
+  new entries into goal `current` with a single UPDATE ... FROM (VALUES ...)
+  and stores the consumed stream offset in the same transaction, so replays
+  never double count. The offset lives in coaching_rollup.RollupOffset; add
+  'coaching_rollup' (and 'cache_signals.CacheSignalsConfig') to INSTALLED_APPS
+  and migrate first.
+- cohort_progress_summary(): one aggregate query that returns per-cohort goal
+  progress for mentor and director dashboards.
+
+Usage:
+    python scripts/goal_rollup.py --recompute
+    python scripts/goal_rollup.py --apply-habits
+    python scripts/goal_rollup.py --cohort-summary
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+import django
+
+# Add Django app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+django.setup()
+
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Coalesce, Least, NullIf
+
+from cache_signals import HABIT_LOG_STREAM, mark_dirty, record_habit_completion  # noqa: F401
+from coaching.models import Goal
+from coaching_rollup.models import RollupOffset
+from programs.models import Cohort, Enrollment
+from redis_client import get_redis
+
+OFFSET_NAME = 'habit_completions'
+
+# Statuses the engine may change; completed goals are final and anything else
+# (paused, cancelled, ...) is left alone
+ROLLUP_STATUSES = ('active',)
+
+
+# ---------------------------------------------------------------------------
+# Set-based progress / status recompute
+# ---------------------------------------------------------------------------
+
+def _progress_expression():
+    # progress = min(100, current * 100 / target); targets of 0 count as 0%
+    return Coalesce(
+        Least(Value(100), F('current') * 100 / NullIf(F('target'), 0)),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _status_expression():
+    return Case(
+        When(target__gt=0, current__gte=F('target'), then=Value('completed')),
+        default=Value('active'),
+    )
+
+
+def recompute_goals(queryset=None, chunk_size=5000):
+    """Recompute progress/status for every goal in `queryset` with chunked set-based UPDATEs."""
+    queryset = (queryset if queryset is not None else Goal.objects.all()).filter(
+        status__in=ROLLUP_STATUSES
+    )
+    updated = 0
+    user_ids = set()
+    last_pk = None
+    while True:
+        chunk = queryset.order_by('pk')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list('pk', 'user_id')[:chunk_size])
+        if not rows:
+            break
+        pks = [pk for pk, _ in rows]
+        updated += Goal.objects.filter(pk__in=pks, status__in=ROLLUP_STATUSES).update(
+            progress=_progress_expression(),
+            status=_status_expression(),
+        )
+        user_ids.update(user_id for _, user_id in rows)
+        last_pk = pks[-1]
+
+    # .update() skips post_save, so queue the dashboards ourselves (after commit, if in one)
+    transaction.on_commit(lambda: mark_dirty(user_ids))
+    return updated
+
+
+# ---------------------------------------------------------------------------
+# Habit completion change log
+# ---------------------------------------------------------------------------
+
+def _lock_offset():
+    # Seed the row first: on the very first run SELECT ... FOR UPDATE would
+    # otherwise lock nothing and concurrent runs could apply the same entries.
+    RollupOffset.objects.bulk_create([RollupOffset(name=OFFSET_NAME, last_id='0-0')], ignore_conflicts=True)
+    return RollupOffset.objects.select_for_update().get(name=OFFSET_NAME)
+
+
+def apply_habit_completions(max_entries=10000):
+    """
+    Fold new change-log entries into goal progress. Returns (entries, goals) applied.
+
+    The offset row is seeded, then locked for the whole transaction, so concurrent runs
+    serialize and each entry is applied exactly once.
+    """
+    redis_conn = get_redis()
+    goals_table = Goal._meta.db_table
+    pk_column = Goal._meta.pk.column
+    pk_cast = Goal._meta.pk.db_type(connection)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        offset = _lock_offset()
+        entries = redis_conn.xrange(HABIT_LOG_STREAM, min=f'({offset.last_id}', count=max_entries)
+        if not entries:
+            return 0, 0
+
+        deltas = defaultdict(int)
+        for _, fields in entries:
+            deltas[fields[b'goal_id'].decode()] += int(fields[b'delta'])
+
+        values_sql = ', '.join(['(%s::' + pk_cast + ', %s::integer)'] * len(deltas))
+        params = [value for goal_id, delta in deltas.items() for value in (goal_id, delta)]
+        cursor.execute(f"""
+            UPDATE {goals_table} AS g
+            SET current = GREATEST(g.current + v.delta, 0)
+            FROM (VALUES {values_sql}) AS v(goal_id, delta)
+            WHERE g.{pk_column} = v.goal_id AND g.status = ANY(%s)
+        """, params + [list(ROLLUP_STATUSES)])
+
+        recompute_goals(Goal.objects.filter(pk__in=list(deltas)))
+        new_offset = entries[-1][0].decode()
+        offset.last_id = new_offset
+        offset.save(update_fields=['last_id', 'updated_at'])
+
+    # Entries up to the committed offset are no longer needed
+    redis_conn.xtrim(HABIT_LOG_STREAM, minid=new_offset, approximate=True)
+    return len(entries), len(deltas)
+
+
+# ---------------------------------------------------------------------------
+# Per-cohort summaries
+# ---------------------------------------------------------------------------
+
+def cohort_progress_summary(status='active'):
+    """Per-cohort goal progress for every cohort in one aggregate query."""
+    goal_user = Goal._meta.get_field('user').column
+    enrollment_user = Enrollment._meta.get_field('user').column
+    enrollment_cohort = Enrollment._meta.get_field('cohort').column
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT c.{Cohort._meta.pk.column}, c.name,
+                   COUNT(DISTINCT e.{enrollment_user}) AS learners,
+                   COUNT(g.{Goal._meta.pk.column}) AS goals,
+                   COUNT(g.{Goal._meta.pk.column}) FILTER (WHERE g.status = 'completed') AS completed,
+                   COALESCE(AVG(g.progress), 0) AS avg_progress,
+                   COUNT(DISTINCT e.{enrollment_user}) FILTER (WHERE g.{Goal._meta.pk.column} IS NULL) AS no_goals
+            FROM {Cohort._meta.db_table} c
+            JOIN {Enrollment._meta.db_table} e
+              ON e.{enrollment_cohort} = c.{Cohort._meta.pk.column} AND e.status = %s
+            LEFT JOIN {Goal._meta.db_table} g ON g.{goal_user} = e.{enrollment_user}
+            GROUP BY c.{Cohort._meta.pk.column}, c.name
+            ORDER BY c.name
+        """, [status])
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recompute', action='store_true', help='Recompute progress/status for all goals')
+    parser.add_argument('--apply-habits', action='store_true', help='Apply pending habit completions')
+    parser.add_argument('--cohort-summary', action='store_true', help='Print per-cohort progress')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    if not (args.recompute or args.apply_habits or args.cohort_summary):
+        parser.error('choose at least one of --recompute, --apply-habits, --cohort-summary')
+
+    if args.apply_habits:
+        start = time.perf_counter()
+        entries, goals = apply_habit_completions()
+        print(f"✅ Applied {entries} habit completions to {goals} goals in {time.perf_counter() - start:.2f}s")
+
+    if args.recompute:
+        start = time.perf_counter()
+        updated = recompute_goals(chunk_size=args.chunk_size)
+        print(f"✅ Recomputed {updated} goals in {time.perf_counter() - start:.2f}s")
+
+    if args.cohort_summary:
+        rows = cohort_progress_summary()
+        print(f"{'cohort':<32} {'learners':>8} {'goals':>6} {'done':>6} {'avg %':>6} {'no goals':>8}")
+        for row in rows:
+            print(
+                f"{row['name'][:32]:<32} {row['learners']:>8} {row['goals']:>6} {row['completed']:>6} "
+                f"{float(row['avg_progress']):>6.1f} {row['no_goals']:>8}"
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
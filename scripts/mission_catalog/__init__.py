@@ -0,0 +1,6 @@
+"""
+Mission catalog tables filled by scripts/sync_mission_catalog.py from mission_hall.
+
+Add 'mission_catalog' to INSTALLED_APPS (with scripts/ on the path) and run
+migrate before the first sync.
+"""
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class MissionCatalogConfig(AppConfig):
+    name = 'mission_catalog'
+    label = 'mission_catalog'
+    verbose_name = 'Mission catalog'
@@ -0,0 +1,140 @@
+from django.db import migrations, models
+
+# Earlier versions of sync_mission_catalog.py created these tables on the fly,
+# so the database side tolerates them already existing.
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS mission_catalog (
+    mission_id TEXT PRIMARY KEY,
+    version TEXT NOT NULL DEFAULT '',
+    content_hash TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    slug TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    track TEXT NOT NULL DEFAULT '',
+    tier INTEGER,
+    difficulty TEXT NOT NULL DEFAULT '',
+    estimated_duration TEXT NOT NULL DEFAULT '',
+    last_updated TIMESTAMPTZ,
+    source_path TEXT NOT NULL DEFAULT '',
+    definition JSONB NOT NULL,
+    synced_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE TABLE IF NOT EXISTS mission_catalog_subtasks (
+    mission_id TEXT NOT NULL,
+    subtask_id TEXT NOT NULL,
+    position INTEGER,
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    type TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (mission_id, subtask_id)
+);
+CREATE TABLE IF NOT EXISTS mission_catalog_deliverables (
+    mission_id TEXT NOT NULL,
+    deliverable_id TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    format TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (mission_id, deliverable_id)
+);
+CREATE TABLE IF NOT EXISTS mission_catalog_frameworks (
+    mission_id TEXT NOT NULL,
+    framework TEXT NOT NULL,
+    code TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (mission_id, framework, code)
+);
+"""
+
+DROP_SQL = """
+DROP TABLE IF EXISTS mission_catalog_frameworks;
+DROP TABLE IF EXISTS mission_catalog_deliverables;
+DROP TABLE IF EXISTS mission_catalog_subtasks;
+DROP TABLE IF EXISTS mission_catalog;
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_SQL, reverse_sql=DROP_SQL),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='CatalogMission',
+                    fields=[
+                        ('mission_id', models.TextField(primary_key=True, serialize=False)),
+                        ('version', models.TextField(blank=True, default='')),
+                        ('content_hash', models.TextField()),
+                        ('title', models.TextField(blank=True, default='')),
+                        ('slug', models.TextField(blank=True, default='')),
+                        ('status', models.TextField(blank=True, default='')),
+                        ('track', models.TextField(blank=True, default='')),
+                        ('tier', models.IntegerField(blank=True, null=True)),
+                        ('difficulty', models.TextField(blank=True, default='')),
+                        ('estimated_duration', models.TextField(blank=True, default='')),
+                        ('last_updated', models.DateTimeField(blank=True, null=True)),
+                        ('source_path', models.TextField(blank=True, default='')),
+                        ('definition', models.JSONField()),
+                        ('synced_at', models.DateTimeField(auto_now=True)),
+                    ],
+                    options={
+                        'db_table': 'mission_catalog',
+                    },
+                ),
+                migrations.CreateModel(
+                    name='CatalogFramework',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('mission', 'framework', 'code', blank=True, editable=False,
+                                                          primary_key=True, serialize=False)),
+                        ('framework', models.TextField()),
+                        ('code', models.TextField()),
+                        ('name', models.TextField(blank=True, default='')),
+                        ('mission', models.ForeignKey(db_constraint=False, on_delete=models.DO_NOTHING,
+                                                     related_name='frameworks', to='mission_catalog.catalogmission')),
+                    ],
+                    options={
+                        'db_table': 'mission_catalog_frameworks',
+                    },
+                ),
+                migrations.CreateModel(
+                    name='CatalogDeliverable',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('mission', 'deliverable_id', blank=True, editable=False,
+                                                          primary_key=True, serialize=False)),
+                        ('deliverable_id', models.TextField()),
+                        ('title', models.TextField(blank=True, default='')),
+                        ('format', models.TextField(blank=True, default='')),
+                        ('description', models.TextField(blank=True, default='')),
+                        ('mission', models.ForeignKey(db_constraint=False, on_delete=models.DO_NOTHING,
+                                                     related_name='deliverables', to='mission_catalog.catalogmission')),
+                    ],
+                    options={
+                        'db_table': 'mission_catalog_deliverables',
+                    },
+                ),
+                migrations.CreateModel(
+                    name='CatalogSubtask',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('mission', 'subtask_id', blank=True, editable=False,
+                                                          primary_key=True, serialize=False)),
+                        ('subtask_id', models.TextField()),
+                        ('position', models.IntegerField(blank=True, null=True)),
+                        ('title', models.TextField(blank=True, default='')),
+                        ('description', models.TextField(blank=True, default='')),
+                        ('type', models.TextField(blank=True, default='')),
+                        ('mission', models.ForeignKey(db_constraint=False, on_delete=models.DO_NOTHING,
+                                                     related_name='subtasks', to='mission_catalog.catalogmission')),
+                    ],
+                    options={
+                        'db_table': 'mission_catalog_subtasks',
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import models
+
+
+class CatalogMission(models.Model):
+    """One mission_hall file as last synced; definition holds the whole parsed YAML."""
+
+    mission_id = models.TextField(primary_key=True)
+    version = models.TextField(default='', blank=True)
+    content_hash = models.TextField()
+    title = models.TextField(default='', blank=True)
+    slug = models.TextField(default='', blank=True)
+    status = models.TextField(default='', blank=True)
+    track = models.TextField(default='', blank=True)
+    tier = models.IntegerField(null=True, blank=True)
+    difficulty = models.TextField(default='', blank=True)
+    estimated_duration = models.TextField(default='', blank=True)
+    last_updated = models.DateTimeField(null=True, blank=True)
+    source_path = models.TextField(default='', blank=True)
+    definition = models.JSONField()
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'mission_catalog'
+
+    def __str__(self):
+        return f'{self.mission_id} v{self.version}'
+
+
+class CatalogSubtask(models.Model):
+
+    pk = models.CompositePrimaryKey('mission', 'subtask_id')
+    mission = models.ForeignKey(CatalogMission, on_delete=models.DO_NOTHING, db_constraint=False,
+                                related_name='subtasks')
+    subtask_id = models.TextField()
+    position = models.IntegerField(null=True, blank=True)
+    title = models.TextField(default='', blank=True)
+    description = models.TextField(default='', blank=True)
+    type = models.TextField(default='', blank=True)
+
+    class Meta:
+        db_table = 'mission_catalog_subtasks'
+
+
+class CatalogDeliverable(models.Model):
+
+    pk = models.CompositePrimaryKey('mission', 'deliverable_id')
+    mission = models.ForeignKey(CatalogMission, on_delete=models.DO_NOTHING, db_constraint=False,
+                                related_name='deliverables')
+    deliverable_id = models.TextField()
+    title = models.TextField(default='', blank=True)
+    format = models.TextField(default='', blank=True)
+    description = models.TextField(default='', blank=True)
+
+    class Meta:
+        db_table = 'mission_catalog_deliverables'
+
+
+class CatalogFramework(models.Model):
+    """A framework mapping (e.g. MITRE ATT&CK technique) of a mission."""
+
+    pk = models.CompositePrimaryKey('mission', 'framework', 'code')
+    mission = models.ForeignKey(CatalogMission, on_delete=models.DO_NOTHING, db_constraint=False,
+                                related_name='frameworks')
+    framework = models.TextField()
+    code = models.TextField()
+    name = models.TextField(default='', blank=True)
+
+    class Meta:
+        db_table = 'mission_catalog_frameworks'
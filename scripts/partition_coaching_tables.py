@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Time-partitioning and archival tool for high-growth coaching tables.
+
+--convert   Rebuilds each table as a RANGE-partitioned table on its time column
+            (one partition per year plus a DEFAULT partition). Columns, defaults,
+            identity/serial sequences, check and foreign-key constraints and
+            indexes are carried over; the original table is kept as
+            <table>__unpartitioned unless --drop-old is given. Runs in one
+            transaction and refuses to touch tables other tables reference.
+            A partitioned table can only enforce uniqueness on column sets
+            that include the partition key, so tables whose primary key or
+            unique indexes lack it are refused unless --allow-drop-unique is
+            given (the affected constraints are listed either way).
+--archive   Moves completed rows of inactive users (is_active = false or no login
+            for --inactive-days) into <table>_archive, itself partitioned by year,
+            in throttled batches of DELETE ... RETURNING -> INSERT.
+--report    Prints live/archive sizes and the latency of a typical active-user
+            query. --convert and --archive print it before and after.
+
+Everything runs against the database configured for Django (DB_HOST, DB_NAME,
+...), so it can be exercised on a local PostgreSQL first. --dry-run prints the
+DDL/DML instead of executing it.
+
+Usage:
+    python scripts/partition_coaching_tables.py --convert --dry-run
+    python scripts/partition_coaching_tables.py --convert --archive --inactive-days 365
+    python scripts/partition_coaching_tables.py --report --tables coaching_goals
+"""
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+import django
+
+# Add Django app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+User = get_user_model()
+
+# Per-table partition key and "completed row" predicate used for archival
+TABLES = {
+    'coaching_goals': {'key': 'created_at', 'archivable': "status IN ('completed', 'cancelled')"},
+    'coaching_habits': {'key': 'created_at', 'archivable': 'TRUE'},
+}
+
+MAX_IDENT = 63
+
+
+def _ident(name):
+    if len(name.encode()) > MAX_IDENT:
+        # PostgreSQL would silently truncate it, possibly onto another object's name
+        raise ValueError(f'identifier longer than {MAX_IDENT} bytes: {name}')
+    return connection.ops.quote_name(name)
+
+
+def _derived_name(base, suffix):
+    """`base + suffix`, shortened with a hash of `base` when it would exceed MAX_IDENT."""
+    name = base + suffix
+    if len(name.encode()) <= MAX_IDENT:
+        return name
+    digest = hashlib.md5(base.encode()).hexdigest()[:8]
+    head = base
+    while len(f'{head}_{digest}{suffix}'.encode()) > MAX_IDENT:
+        head = head[:-1]
+    return f'{head}_{digest}{suffix}'
+
+
+class Runner:
+    """Runs planning queries always, and DDL/DML only when not in dry-run mode."""
+
+    def __init__(self, cursor, dry_run=False):
+        self.cursor = cursor
+        self.dry_run = dry_run
+
+    def query(self, sql, params=None):
+        self.cursor.execute(sql, params)
+        return self.cursor.fetchall()
+
+    def scalar(self, sql, params=None):
+        rows = self.query(sql, params)
+        return rows[0][0] if rows else None
+
+    def execute(self, sql, params=None):
+        if self.dry_run:
+            statement = self.cursor.mogrify(sql, params) if params else sql
+            if isinstance(statement, bytes):
+                statement = statement.decode()
+            print(f"    {' '.join(statement.split())};")
+            return 0
+        self.cursor.execute(sql, params)
+        return self.cursor.rowcount
+
+
+# ---------------------------------------------------------------------------
+# Catalog helpers
+# ---------------------------------------------------------------------------
+
+def table_exists(run, table):
+    return run.scalar('SELECT to_regclass(%s) IS NOT NULL', [table])
+
+
+def is_partitioned(run, table):
+    return run.scalar('SELECT relkind = %s FROM pg_class WHERE oid = to_regclass(%s)', ['p', table])
+
+
+def total_size(run, table):
+    """Bytes used by a table and all of its partitions, indexes and TOAST."""
+    if not table_exists(run, table):
+        return 0
+    return run.scalar(
+        'SELECT COALESCE(SUM(pg_total_relation_size(relid)), 0) FROM pg_partition_tree(%s)', [table]
+    )
+
+
+def primary_key(run, table):
+    rows = run.query("""
+        SELECT c.conname, a.attname
+        FROM pg_constraint c
+        JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord) ON TRUE
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+        WHERE c.conrelid = to_regclass(%s) AND c.contype = 'p'
+        ORDER BY k.ord
+    """, [table])
+    return (rows[0][0] if rows else None), [row[1] for row in rows]
+
+
+def referencing_foreign_keys(run, table):
+    return run.query("""
+        SELECT conname, conrelid::regclass::text FROM pg_constraint
+        WHERE confrelid = to_regclass(%s) AND contype = 'f'
+    """, [table])
+
+
+def outgoing_foreign_keys(run, table):
+    return run.query("""
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype = 'f'
+    """, [table])
+
+
+def secondary_indexes(run, table):
+    """(name, definition, is_unique, columns) for every non-primary index."""
+    return run.query("""
+        SELECT i.relname, pg_get_indexdef(x.indexrelid), x.indisunique,
+               ARRAY(SELECT a.attname FROM unnest(x.indkey) AS k(attnum)
+                     JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = k.attnum)
+        FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = to_regclass(%s) AND NOT x.indisprimary
+    """, [table])
+
+
+def owned_sequences(run, table):
+    """(column, sequence, is_identity) for serial and identity columns."""
+    return run.query("""
+        SELECT a.attname, pg_get_serial_sequence(%s, a.attname), a.attidentity <> ''
+        FROM pg_attribute a
+        WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped
+          AND pg_get_serial_sequence(%s, a.attname) IS NOT NULL
+    """, [table, table, table])
+
+
+def year_bounds(run, table, key, where='TRUE', params=None):
+    row = run.query(
+        f'SELECT EXTRACT(YEAR FROM MIN({_ident(key)}))::int, EXTRACT(YEAR FROM MAX({_ident(key)}))::int '
+        f'FROM {_ident(table)} t WHERE {where}',
+        params,
+    )[0]
+    return row if row[0] is not None else (date.today().year, date.today().year)
+
+
+# ---------------------------------------------------------------------------
+# Partition management
+# ---------------------------------------------------------------------------
+
+def ensure_year_partition(run, parent, key, year):
+    """
+    Create the partition for `year` if missing. Rows for that year already sitting
+    in the DEFAULT partition are moved into the new partition before it is attached.
+    """
+    name = _derived_name(parent, f'_y{year}')
+    if table_exists(run, name):
+        return
+    start, end = f'{year}-01-01', f'{year + 1}-01-01'
+    default = _derived_name(parent, '_default')
+    if table_exists(run, default):
+        run.execute(f'CREATE TABLE {_ident(name)} (LIKE {_ident(parent)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        run.execute(f"""
+            WITH moved AS (
+                DELETE FROM {_ident(default)} WHERE {_ident(key)} >= %s AND {_ident(key)} < %s RETURNING *
+            )
+            INSERT INTO {_ident(name)} SELECT * FROM moved
+        """, [start, end])
+        run.execute(f"ALTER TABLE {_ident(parent)} ATTACH PARTITION {_ident(name)} FOR VALUES FROM ('{start}') TO ('{end}')")
+    else:
+        run.execute(f"CREATE TABLE {_ident(name)} PARTITION OF {_ident(parent)} FOR VALUES FROM ('{start}') TO ('{end}')")
+
+
+def create_partitioned_copy(run, source, target, key, pk_name, pk_columns, first_year, last_year, prefix):
+    """Create `target` shaped like `source`, partitioned by year on `key` (partitions named <prefix>_y<year>)."""
+    including = ('INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED INCLUDING IDENTITY '
+                 'INCLUDING STORAGE INCLUDING COMMENTS')
+    run.execute(f'CREATE TABLE {_ident(target)} (LIKE {_ident(source)} {including}) PARTITION BY RANGE ({_ident(key)})')
+    if pk_columns:
+        # A partitioned table's primary key must contain the partition key
+        columns = pk_columns + ([key] if key not in pk_columns else [])
+        run.execute(
+            f'ALTER TABLE {_ident(target)} ADD CONSTRAINT {_ident(pk_name)} '
+            f'PRIMARY KEY ({", ".join(_ident(c) for c in columns)})'
+        )
+    for year in range(first_year, last_year + 1):
+        run.execute(
+            f"CREATE TABLE {_ident(_derived_name(prefix, f'_y{year}'))} PARTITION OF {_ident(target)} "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+    run.execute(f'CREATE TABLE {_ident(_derived_name(prefix, "_default"))} PARTITION OF {_ident(target)} DEFAULT')
+
+
+def lost_uniqueness(key, pk_name, pk_columns, indexes):
+    """Descriptions of the constraints that stop being unique on their own columns once partitioned on `key`."""
+    lost = []
+    if pk_columns and key not in pk_columns:
+        lost.append(f'primary key {pk_name} ({", ".join(pk_columns)}) widened to include {key}')
+    for index_name, _, unique, columns in indexes:
+        if unique and key not in columns:
+            lost.append(f'unique index {index_name} ({", ".join(columns)}) recreated as non-unique')
+    return lost
+
+
+def convert_table(run, table, key, future_years=2, drop_old=False, allow_drop_unique=False):
+    if is_partitioned(run, table):
+        print(f"  ⚠️  {table} is already partitioned, ensuring upcoming partitions")
+        for year in range(date.today().year, date.today().year + future_years + 1):
+            ensure_year_partition(run, table, key, year)
+        return False
+
+    referencing = referencing_foreign_keys(run, table)
+    if referencing:
+        names = ', '.join(f'{rel}.{con}' for con, rel in referencing)
+        raise RuntimeError(f'{table} is referenced by foreign keys ({names}); drop or repoint them first')
+
+    staging = _derived_name(table, '__partitioned')
+    old = _derived_name(table, '__unpartitioned')
+    pk_name, pk_columns = primary_key(run, table)
+    pk_name = pk_name or _derived_name(table, '_pkey')
+    first_year, last_year = year_bounds(run, table, key)
+    last_year = max(last_year, date.today().year) + future_years
+    sequences = owned_sequences(run, table)
+    indexes = secondary_indexes(run, table)
+    foreign_keys = outgoing_foreign_keys(run, table)
+
+    lost = lost_uniqueness(key, pk_name, pk_columns, indexes)
+    if lost and not allow_drop_unique:
+        listed = ''.join(f'\n    - {item}' for item in lost)
+        raise RuntimeError(
+            f'{table} would lose uniqueness when partitioned on {key}:{listed}\n'
+            f'  enforce it elsewhere and re-run with --allow-drop-unique'
+        )
+    for item in lost:
+        print(f"  ⚠️  {item}")
+
+    print(f"  🧱 {table}: {len(pk_columns)} pk column(s), {len(indexes)} indexes, "
+          f"partitions {first_year}..{last_year} + default")
+
+    run.execute(f'LOCK TABLE {_ident(table)} IN ACCESS EXCLUSIVE MODE')
+
+    # Free the original index/constraint names so the partitioned table can reuse them
+    if pk_columns:
+        run.execute(
+            f'ALTER TABLE {_ident(table)} RENAME CONSTRAINT {_ident(pk_name)} TO {_ident(_derived_name(pk_name, "__old"))}'
+        )
+    for index_name, _, _, _ in indexes:
+        run.execute(f'ALTER INDEX {_ident(index_name)} RENAME TO {_ident(_derived_name(index_name, "__old"))}')
+
+    create_partitioned_copy(run, table, staging, key, pk_name, pk_columns, first_year, last_year, prefix=table)
+    run.execute(f'INSERT INTO {_ident(staging)} OVERRIDING SYSTEM VALUE SELECT * FROM {_ident(table)}')
+
+    for index_name, definition, unique, columns in indexes:
+        definition = definition.replace(f' ON public.{table} ', f' ON public.{staging} ').replace(
+            f' ON {table} ', f' ON {staging} '
+        )
+        if unique and key not in columns:
+            definition = definition.replace('CREATE UNIQUE INDEX', 'CREATE INDEX', 1)
+        run.execute(definition)
+    for constraint_name, definition in foreign_keys:
+        run.execute(f'ALTER TABLE {_ident(staging)} ADD CONSTRAINT {_ident(constraint_name)} {definition}')
+
+    for column, sequence, identity in sequences:
+        if identity:
+            # LIKE ... INCLUDING IDENTITY creates a fresh sequence; move it past the copied values
+            run.execute(
+                f'SELECT setval(pg_get_serial_sequence(%s, %s), '
+                f'COALESCE((SELECT MAX({_ident(column)}) FROM {_ident(staging)}), 0) + 1, false)',
+                [staging, column],
+            )
+        else:
+            # serial: the copied default still calls the old sequence, so it must follow the new table
+            run.execute(f'ALTER SEQUENCE {sequence} OWNED BY {_ident(staging)}.{_ident(column)}')
+
+    run.execute(f'ALTER TABLE {_ident(table)} RENAME TO {_ident(old)}')
+    run.execute(f'ALTER TABLE {_ident(staging)} RENAME TO {_ident(table)}')
+    if drop_old:
+        run.execute(f'DROP TABLE {_ident(old)}')
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Archival
+# ---------------------------------------------------------------------------
+
+def _inactive_user_predicate(alias, user_column):
+    users = User._meta.db_table
+    return (
+        f'{alias}.{_ident(user_column)} IN (SELECT u.{_ident(User._meta.pk.column)} FROM {_ident(users)} u '
+        f"WHERE NOT u.is_active OR COALESCE(u.last_login, u.date_joined) < NOW() - %s * INTERVAL '1 day')"
+    )
+
+
+def archive_table(cursor, table, key, archivable, inactive_days, batch_size=5000, sleep=0.1,
+                  user_column='user_id', dry_run=False):
+    run = Runner(cursor, dry_run)
+    archive = _derived_name(table, '_archive')
+    _, pk_columns = primary_key(run, table)
+    if not pk_columns:
+        raise RuntimeError(f'{table} has no primary key; cannot archive in batches')
+    pk = ', '.join(f't.{_ident(c)}' for c in pk_columns)
+    # The predicate is spliced into parameterised SQL, so literal % must be doubled
+    predicate = f'({archivable.replace("%", "%%")}) AND {_inactive_user_predicate("t", user_column)}'
+
+    with transaction.atomic():
+        if not table_exists(run, archive):
+            run.execute(
+                f'CREATE TABLE {_ident(archive)} (LIKE {_ident(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+                f'PARTITION BY RANGE ({_ident(key)})'
+            )
+            run.execute(f'CREATE TABLE {_ident(_derived_name(archive, "_default"))} PARTITION OF {_ident(archive)} DEFAULT')
+            run.execute(f'CREATE INDEX ON {_ident(archive)} ({_ident(user_column)})')
+        first_year, last_year = year_bounds(run, table, key, where=predicate, params=[inactive_days])
+        for year in range(first_year, last_year + 1):
+            ensure_year_partition(run, archive, key, year)
+
+    moved_total = 0
+    started = time.perf_counter()
+    while True:
+        with transaction.atomic():
+            moved = run.execute(f"""
+                WITH batch AS (
+                    SELECT {pk} FROM {_ident(table)} t WHERE {predicate} LIMIT %s
+                ), moved AS (
+                    DELETE FROM {_ident(table)} t USING batch b
+                    WHERE {' AND '.join(f't.{_ident(c)} = b.{_ident(c)}' for c in pk_columns)}
+                    RETURNING t.*
+                )
+                INSERT INTO {_ident(archive)} SELECT * FROM moved
+            """, [inactive_days, batch_size])
+        moved_total += moved
+        if dry_run or moved < batch_size:
+            break
+        print(f"    moved {moved_total} rows ({moved_total / (time.perf_counter() - started):.0f} rows/s)")
+        time.sleep(sleep)
+
+    if not dry_run and moved_total:
+        cursor.execute(f'VACUUM ANALYZE {_ident(table)}')
+    return moved_total
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def active_query_latency(cursor, table, user_column='user_id', samples=20, users=50):
+    """Median latency (ms) of counting the rows that belong to a sample of active users."""
+    users_table = User._meta.db_table
+    pk_column = User._meta.pk.column
+    cursor.execute(
+        f'SELECT {_ident(pk_column)} FROM {_ident(users_table)} WHERE is_active ORDER BY last_login DESC NULLS LAST LIMIT %s',
+        [users],
+    )
+    user_ids = [row[0] for row in cursor.fetchall()]
+    if not user_ids:
+        return None
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        cursor.execute(f'SELECT COUNT(*) FROM {_ident(table)} WHERE {_ident(user_column)} = ANY(%s)', [user_ids])
+        cursor.fetchone()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def snapshot(cursor, tables, user_column='user_id'):
+    run = Runner(cursor)
+    return {
+        table: {
+            'live_bytes': total_size(run, table),
+            'archive_bytes': total_size(run, _derived_name(table, '_archive')),
+            'latency_ms': active_query_latency(cursor, table, user_column),
+        }
+        for table in tables
+        if table_exists(run, table)
+    }
+
+
+def print_report(before, after=None):
+    def mb(value):
+        return f'{value / 1024 / 1024:,.1f} MB'
+
+    def ms(value):
+        return '-' if value is None else f'{value:.2f} ms'
+
+    for table, stats in before.items():
+        print(f"  {table}")
+        if after is None:
+            print(f"    live {mb(stats['live_bytes'])}, archive {mb(stats['archive_bytes'])}, "
+                  f"active-user query {ms(stats['latency_ms'])}")
+            continue
+        new = after.get(table, stats)
+        print(f"    live:    {mb(stats['live_bytes'])} -> {mb(new['live_bytes'])}")
+        print(f"    archive: {mb(stats['archive_bytes'])} -> {mb(new['archive_bytes'])}")
+        print(f"    active-user query: {ms(stats['latency_ms'])} -> {ms(new['latency_ms'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tables', nargs='+', default=list(TABLES))
+    parser.add_argument('--convert', action='store_true', help='Convert tables to yearly range partitions')
+    parser.add_argument('--archive', action='store_true', help="Move inactive users' completed rows to archive")
+    parser.add_argument('--report', action='store_true', help='Print sizes and query latency')
+    parser.add_argument('--key', help='Partition column (default per table, usually created_at)')
+    parser.add_argument('--future-years', type=int, default=2)
+    parser.add_argument('--drop-old', action='store_true', help='Drop the unpartitioned original after converting')
+    parser.add_argument('--allow-drop-unique', action='store_true',
+                        help='Convert even if the primary key or unique indexes lack the partition key')
+    parser.add_argument('--inactive-days', type=int, default=365)
+    parser.add_argument('--where', help='Override the archivable-row predicate')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--sleep', type=float, default=0.1, help='Pause between archive batches (seconds)')
+    parser.add_argument('--user-column', default='user_id')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    if not (args.convert or args.archive or args.report):
+        parser.error('choose at least one of --convert, --archive, --report')
+
+    with connection.cursor() as cursor:
+        before = snapshot(cursor, args.tables, args.user_column)
+        if args.report and not (args.convert or args.archive):
+            print("📊 Coaching table report")
+            print_report(before)
+            return 0
+
+        for table in args.tables:
+            config = TABLES.get(table, {'key': 'created_at', 'archivable': 'TRUE'})
+            key = args.key or config['key']
+            if not table_exists(Runner(cursor), table):
+                print(f"❌ {table} does not exist, skipping")
+                continue
+
+            if args.convert:
+                print(f"🔀 Converting {table} (partition key {key})")
+                with transaction.atomic():
+                    converted = convert_table(
+                        Runner(cursor, args.dry_run), table, key, args.future_years, args.drop_old,
+                        args.allow_drop_unique,
+                    )
+                if converted:
+                    print(f"  ✅ {table} converted")
+
+            if args.archive:
+                print(f"📦 Archiving {table} (inactive for {args.inactive_days} days)")
+                moved = archive_table(
+                    cursor, table, key, args.where or config['archivable'], args.inactive_days,
+                    batch_size=args.batch_size, sleep=args.sleep, user_column=args.user_column,
+                    dry_run=args.dry_run,
+                )
+                print(f"  ✅ Moved {moved} rows to {_derived_name(table, '_archive')}")
+
+        if not args.dry_run:
+            print("📊 Before -> after")
+            print_report(before, snapshot(cursor, args.tables, args.user_column))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
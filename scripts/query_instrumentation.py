@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+SQL query instrumentation for ops scripts and API smoke tests.
+
+Hooks Django's connection execute wrappers to record every statement with its
+timing, a normalized fingerprint (literals stripped) and duplicate detection.
+
+Usage (after django.setup()):
+
+    from query_instrumentation import install_at_exit, query_budget
+
+    install_at_exit()                      # summary table printed when the script exits
+
+    with query_budget(10, label='POST /api/v1/coaching/goals'):
+        client.post(...)                   # raises QueryBudgetExceeded above 10 queries
+
+Set QUERY_STATS=0 to silence the exit summary.
+"""
+import atexit
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Literal / list patterns used to build fingerprints
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?|\$\d+')
+_IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_VALUES_RE = re.compile(r'\bvalues\s*\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalize a SQL statement so that queries differing only in literals compare equal."""
+    normalized = _STRING_RE.sub('?', sql)
+    normalized = _NUMBER_RE.sub('?', normalized)
+    normalized = _PLACEHOLDER_RE.sub('?', normalized)
+    normalized = _IN_LIST_RE.sub('in (?+)', normalized)
+    normalized = _VALUES_RE.sub('values (?+)', normalized)
+    return _WHITESPACE_RE.sub(' ', normalized).strip().lower()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block issues more queries than its budget allows."""
+
+
+class QueryRecord:
+    __slots__ = ('alias', 'sql', 'params', 'many', 'duration', 'fingerprint')
+
+    def __init__(self, alias, sql, params, many, duration):
+        self.alias = alias
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.duration = duration
+        self.fingerprint = fingerprint(sql)
+
+
+class QueryRecorder:
+    """Execute wrapper that records each statement run through a Django connection."""
+
+    def __init__(self):
+        self.records = []
+
+    def wrapper_for(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.records.append(
+                    QueryRecord(alias, sql, params, many, time.perf_counter() - start)
+                )
+        wrapper.recorder = self
+        return wrapper
+
+    def attach(self, connection):
+        """Add this recorder's wrapper to a connection for good (once)."""
+        if not any(getattr(w, 'recorder', None) is self for w in connection.execute_wrappers):
+            connection.execute_wrappers.append(self.wrapper_for(connection.alias))
+
+    @property
+    def count(self):
+        return len(self.records)
+
+    @property
+    def total_time(self):
+        return sum(r.duration for r in self.records)
+
+    def by_fingerprint(self):
+        """Group records by fingerprint, slowest groups first."""
+        groups = defaultdict(list)
+        for record in self.records:
+            groups[record.fingerprint].append(record)
+        return sorted(
+            groups.items(),
+            key=lambda item: sum(r.duration for r in item[1]),
+            reverse=True,
+        )
+
+    def duplicates(self):
+        """Statements executed more than once with identical SQL and parameters."""
+        seen = defaultdict(int)
+        for record in self.records:
+            seen[(record.alias, record.sql, repr(record.params))] += 1
+        return {key: n for key, n in seen.items() if n > 1}
+
+    def repeated_fingerprints(self, threshold=3):
+        """Fingerprints executed at least `threshold` times - the usual N+1 signature."""
+        return [(fp, records) for fp, records in self.by_fingerprint() if len(records) >= threshold]
+
+    def summary(self, label='Queries', top=15):
+        lines = []
+        lines.append('=' * 100)
+        lines.append(
+            f'📊 {label}: {self.count} queries, {self.total_time * 1000:.1f} ms total, '
+            f'{len(self.duplicates())} duplicated statements'
+        )
+        lines.append('=' * 100)
+        if not self.records:
+            return '\n'.join(lines)
+
+        lines.append(f"{'count':>6} {'total ms':>10} {'avg ms':>8} {'max ms':>8}  fingerprint")
+        lines.append('-' * 100)
+        for fp, records in self.by_fingerprint()[:top]:
+            durations = [r.duration * 1000 for r in records]
+            text = fp if len(fp) <= 62 else fp[:59] + '...'
+            lines.append(
+                f'{len(records):>6} {sum(durations):>10.2f} {sum(durations) / len(durations):>8.2f} '
+                f'{max(durations):>8.2f}  {text}'
+            )
+
+        suspects = self.repeated_fingerprints()
+        if suspects:
+            lines.append('-' * 100)
+            lines.append('⚠️  Possible N+1 patterns (same statement shape executed repeatedly):')
+            for fp, records in suspects:
+                text = fp if len(fp) <= 80 else fp[:77] + '...'
+                lines.append(f'  {len(records):>5}x  {text}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def instrument(aliases=None, recorder=None):
+    """Record every query run on the given connection aliases (default: all) inside the block."""
+    recorder = recorder or QueryRecorder()
+    aliases = aliases or list(connections)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(recorder.wrapper_for(alias)))
+        yield recorder
+
+
+@contextmanager
+def query_budget(max_queries, label='block', aliases=None, verbose=False):
+    """Fail with QueryBudgetExceeded if the block runs more than `max_queries` statements."""
+    with instrument(aliases) as recorder:
+        yield recorder
+    if verbose:
+        print(recorder.summary(label))
+    if recorder.count > max_queries:
+        raise QueryBudgetExceeded(
+            f'{label} ran {recorder.count} queries (budget {max_queries})\n'
+            + recorder.summary(label)
+        )
+
+
+def install_at_exit(label=None, aliases=None):
+    """
+    Instrument the current thread's connections for the rest of the process and
+    print the summary table at exit. Returns the recorder so callers can inspect it.
+
+    Without `aliases`, connections opened later are instrumented too, so
+    aliases registered after this call (e.g. the replica added by
+    replica_routing.use_replica_for_script()) show up in the summary.
+    """
+    recorder = QueryRecorder()
+    for alias in aliases or list(connections):
+        recorder.attach(connections[alias])
+    if aliases is None:
+        def attach_new(sender, connection, **kwargs):
+            recorder.attach(connection)
+        connection_created.connect(attach_new, weak=False)
+
+    if os.environ.get('QUERY_STATS', '1') != '0':
+        script = label or os.path.basename(sys.argv[0] or 'script')
+        atexit.register(lambda: print('\n' + recorder.summary(f'SQL for {script}')))
+    return recorder
@@ -11,6 +11,12 @@ os.chdir(django_path)
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
 django.setup()
 
+from query_instrumentation import install_at_exit
+install_at_exit()
+
+from replica_routing import use_replica_for_script
+use_replica_for_script()
+
 from django.db import models
 from curriculum.models import CurriculumTrack
 from users.models import User
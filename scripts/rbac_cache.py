@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Cached RBAC resolution for UserRole / Role / OrganizationMember lookups.
+
+Each user's effective roles are resolved once into a compact, JSON-friendly
+structure:
+
+    {'roles': [['admin', 'global', None], ['mentor', 'cohort', '<cohort_id>']],
+     'orgs': {'<org_id>': 'admin'}}
+
+and cached in Redis, with a per-process LRU in front. Writes to UserRole or
+OrganizationMember bump that user's generation counter, delete their Redis
+entry and broadcast the user id on a pub/sub channel so every process evicts
+its local copy; Role changes flush everything. A cache fill only stores its
+database read if no invalidation happened in between (compare-and-set on the
+generation counters), so a revoked role cannot be written back by a slow
+reader. Local entries also expire after a short TTL as a safety net for missed
+messages. Bulk queryset.update()/delete() calls bypass signals - call
+invalidate_user() yourself after those.
+
+The signal receivers live in cache_signals.py (no django.setup() side effects);
+install cache_signals.CacheSignalsConfig to connect them.
+
+Usage:
+    python scripts/rbac_cache.py --user admin@och.test
+    python scripts/rbac_cache.py --benchmark --users 200 --iterations 20
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import django
+
+# Add Django app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+django.setup()
+
+from django.contrib.auth import get_user_model
+
+import cache_signals
+from cache_signals import (
+    RBAC_FLUSH_ALL as FLUSH_ALL,
+    RBAC_GENERATION_PREFIX as GENERATION_PREFIX,
+    RBAC_GLOBAL_GENERATION as GLOBAL_GENERATION,
+    RBAC_INVALIDATION_CHANNEL as INVALIDATION_CHANNEL,
+    RBAC_KEY_PREFIX as KEY_PREFIX,
+)
+from organizations.models import OrganizationMember
+from query_instrumentation import instrument
+from redis_client import get_redis
+from users.models import UserRole
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+REDIS_TTL = int(os.environ.get('RBAC_REDIS_TTL', '3600'))
+LISTENER_MAX_BACKOFF = 30.0
+LOCAL_TTL = float(os.environ.get('RBAC_LOCAL_TTL', '30'))
+LOCAL_MAXSIZE = int(os.environ.get('RBAC_LOCAL_MAXSIZE', '10000'))
+
+
+# SET the entry only if neither generation counter moved since the fill began.
+# KEYS: entry, user generation, global generation
+# ARGV: user generation seen, global generation seen, value, ttl
+_CAS_SET = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then return 0 end
+if (redis.call('GET', KEYS[3]) or '') ~= ARGV[2] then return 0 end
+redis.call('SET', KEYS[1], ARGV[3], 'EX', ARGV[4])
+return 1
+"""
+
+
+class LocalLRU:
+    """Thread-safe LRU with per-entry TTL.
+
+    epoch counts evictions; set_if_current() refuses to store a value read
+    before an eviction that happened since.
+    """
+
+    def __init__(self, maxsize=LOCAL_MAXSIZE, ttl=LOCAL_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.epoch = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set_if_current(self, key, value, epoch):
+        with self._lock:
+            if epoch != self.epoch:
+                return False
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def pop(self, key):
+        with self._lock:
+            self.epoch += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.epoch += 1
+            self._data.clear()
+
+
+_local = LocalLRU()
+_listener_started = False
+_listener_lock = threading.Lock()
+
+
+def resolve_from_db(user_id):
+    """Resolve effective roles straight from the database (two queries)."""
+    roles = sorted(
+        (
+            [name, scope, None if scope_id is None else str(scope_id)]
+            for name, scope, scope_id in UserRole.objects.filter(user_id=user_id, is_active=True)
+            .values_list('role__name', 'scope', 'scope_id')
+        ),
+        key=lambda role: (role[0], role[1], role[2] or ''),
+    )
+    orgs = {
+        str(org_id): role
+        for org_id, role in OrganizationMember.objects.filter(user_id=user_id)
+        .values_list('organization_id', 'role')
+    }
+    return {'roles': roles, 'orgs': orgs}
+
+
+def _listen_for_invalidations():
+    """Evict local entries on broadcast; reconnects forever, flushing whatever may have been missed."""
+    backoff = 1.0
+    while True:
+        pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            _local.clear()
+            backoff = 1.0
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                user_key = message['data'].decode()
+                if user_key == FLUSH_ALL:
+                    _local.clear()
+                else:
+                    _local.pop(user_key)
+        except Exception:
+            logger.exception('RBAC invalidation listener failed; reconnecting in %.0fs', backoff)
+            _local.clear()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, LISTENER_MAX_BACKOFF)
+        finally:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+
+def _ensure_listener():
+    global _listener_started
+    if _listener_started:
+        return
+    with _listener_lock:
+        if not _listener_started:
+            threading.Thread(target=_listen_for_invalidations, name='rbac-invalidation', daemon=True).start()
+            _listener_started = True
+
+
+@lru_cache(maxsize=1)
+def _cas_set():
+    return get_redis().register_script(_CAS_SET)
+
+
+def get_effective_roles(user_id):
+    """Effective roles for a user: local LRU, then Redis, then the database."""
+    _ensure_listener()
+    user_key = str(user_id)
+    cached = _local.get(user_key)
+    if cached is not None:
+        return cached
+
+    epoch = _local.epoch
+    entry_key = KEY_PREFIX + user_key
+    generation_key = GENERATION_PREFIX + user_key
+    raw, user_gen, global_gen = get_redis().mget(entry_key, generation_key, GLOBAL_GENERATION)
+    if raw is not None:
+        value = json.loads(raw)
+    else:
+        value = resolve_from_db(user_id)
+        _cas_set()(
+            keys=[entry_key, generation_key, GLOBAL_GENERATION],
+            args=[user_gen or b'', global_gen or b'', json.dumps(value, separators=(',', ':')), REDIS_TTL],
+        )
+    _local.set_if_current(user_key, value, epoch)
+    return value
+
+
+def has_role(user_id, role_name, scope='global', scope_id=None):
+    scope_id = None if scope_id is None else str(scope_id)
+    return [role_name, scope, scope_id] in get_effective_roles(user_id)['roles']
+
+
+def org_role(user_id, organization_id):
+    return get_effective_roles(user_id)['orgs'].get(str(organization_id))
+
+
+def invalidate_user(user_id):
+    cache_signals.invalidate_user(user_id)
+    _local.pop(str(user_id))
+
+
+def invalidate_all():
+    cache_signals.invalidate_all()
+    _local.clear()
+
+
+def _time_per_lookup(func, user_ids, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for user_id in user_ids:
+            func(user_id)
+    return (time.perf_counter() - start) / (iterations * len(user_ids))
+
+
+def run_benchmark(users, iterations):
+    user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True)[:users])
+    if not user_ids:
+        print("❌ No users found")
+        return 1
+
+    with instrument() as queries:
+        db_time = _time_per_lookup(resolve_from_db, user_ids, iterations)
+    db_queries = queries.count / (iterations * len(user_ids))
+
+    def redis_only(user_id):
+        _local.clear()
+        return get_effective_roles(user_id)
+
+    for user_id in user_ids:
+        invalidate_user(user_id)
+    get_effective_roles(user_ids[0])  # start the listener outside the timed section
+    redis_time = _time_per_lookup(redis_only, user_ids, iterations)
+    lru_time = _time_per_lookup(get_effective_roles, user_ids, iterations)
+
+    print(f"📊 RBAC resolution, {len(user_ids)} users x {iterations} iterations")
+    print(f"  {'path':<18} {'us/lookup':>10} {'queries':>8}")
+    print(f"  {'database':<18} {db_time * 1e6:>10.1f} {db_queries:>8.1f}")
+    print(f"  {'redis':<18} {redis_time * 1e6:>10.1f} {0:>8.1f}")
+    print(f"  {'local LRU':<18} {lru_time * 1e6:>10.1f} {0:>8.1f}")
+    print(f"  Saved per request: {(db_time - lru_time) * 1e3:.3f} ms and {db_queries:.1f} queries "
+          f"({db_time / lru_time:.0f}x faster on LRU hits)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--user', help='Email of a user to resolve')
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        return run_benchmark(args.users, args.iterations)
+    if not args.user:
+        parser.error('--user or --benchmark is required')
+
+    user = User.objects.get(email=args.user)
+    roles = get_effective_roles(user.pk)
+    print(f"{user.email}:")
+    for name, scope, scope_id in roles['roles']:
+        print(f"  role: {name} ({scope}{f' {scope_id}' if scope_id else ''})")
+    for org_id, role in roles['orgs'].items():
+        print(f"  org:  {org_id} as {role}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
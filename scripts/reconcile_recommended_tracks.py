@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Reconcile ProfilerSession.recommended_track with StudentDashboardCache.recommended_track.
+
+Walks users in keyset-paginated chunks (pk > last_pk), streams the matching
+profiler sessions and dashboard cache rows for each chunk through server-side
+cursors, joins them in memory and emits every mismatch as a JSON line. Progress
+is checkpointed after each chunk so an interrupted scan resumes where it stopped;
+memory stays bounded by the chunk size regardless of table size.
+
+The latest profiler session is treated as the source of truth. With --fix,
+mismatched users are rebuilt through the dashboard materializer.
+
+Usage:
+    python scripts/reconcile_recommended_tracks.py --output mismatches.jsonl
+    python scripts/reconcile_recommended_tracks.py --fix --resume
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import django
+
+# Add Django app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+django.setup()
+
+from django.contrib.auth import get_user_model
+
+from dashboard_materializer import PROFILER_TRACK_LOOKUP, recompute_users
+from profiler.models import ProfilerSession
+from student_dashboard.models import StudentDashboardCache
+
+User = get_user_model()
+
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(__file__), '.reconcile_recommended_tracks.json')
+CURSOR_ITERSIZE = 2000
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {'last_pk': None, 'scanned': 0, 'mismatches': 0, 'fixed': 0}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _user_chunk(last_pk, chunk_size):
+    qs = User.objects.order_by('pk')
+    if last_pk is not None:
+        qs = qs.filter(pk__gt=last_pk)
+    return list(qs.values_list('pk', flat=True)[:chunk_size])
+
+
+def _latest_profiler_tracks(first_pk, last_pk):
+    rows = (
+        ProfilerSession.objects.filter(user_id__gte=first_pk, user_id__lte=last_pk)
+        .order_by('user_id', '-created_at')
+        .distinct('user_id')
+        .values_list('user_id', PROFILER_TRACK_LOOKUP)
+    )
+    return dict(rows.iterator(chunk_size=CURSOR_ITERSIZE))
+
+
+def _cached_tracks(first_pk, last_pk):
+    rows = StudentDashboardCache.objects.filter(
+        user_id__gte=first_pk, user_id__lte=last_pk
+    ).values_list('user_id', 'recommended_track')
+    return dict(rows.iterator(chunk_size=CURSOR_ITERSIZE))
+
+
+def find_mismatches(user_ids):
+    """Compare one keyset chunk of users; returns a list of mismatch dicts."""
+    profiler = _latest_profiler_tracks(user_ids[0], user_ids[-1])
+    cached = _cached_tracks(user_ids[0], user_ids[-1])
+
+    mismatches = []
+    for user_id in user_ids:
+        expected = profiler.get(user_id)
+        has_cache = user_id in cached
+        actual = cached.get(user_id)
+        if expected is None and (not has_cache or actual is None):
+            continue
+        if not has_cache:
+            kind = 'missing_cache'
+        elif expected is None:
+            kind = 'no_profiler_session'
+        elif expected != actual:
+            kind = 'different'
+        else:
+            continue
+        mismatches.append({
+            'user_id': str(user_id),
+            'kind': kind,
+            'profiler_track': expected,
+            'cache_track': actual,
+        })
+    return mismatches
+
+
+def reconcile(chunk_size=1000, fix=False, checkpoint_path=DEFAULT_CHECKPOINT, resume=False,
+              output=sys.stdout, sleep=0.0, limit=None):
+    state = load_checkpoint(checkpoint_path) if resume else {
+        'last_pk': None, 'scanned': 0, 'mismatches': 0, 'fixed': 0,
+    }
+    to_pk = User._meta.pk.to_python
+    last_pk = to_pk(state['last_pk']) if state['last_pk'] is not None else None
+    started = time.perf_counter()
+    scanned_this_run = 0
+
+    if last_pk is not None:
+        print(f"⏩ Resuming after user {last_pk} ({state['scanned']} already scanned)", file=sys.stderr)
+
+    while limit is None or scanned_this_run < limit:
+        user_ids = _user_chunk(last_pk, chunk_size)
+        if not user_ids:
+            break
+
+        mismatches = find_mismatches(user_ids)
+        for mismatch in mismatches:
+            output.write(json.dumps(mismatch) + '\n')
+
+        # Users with no profiler session keep their cache as-is; only sessions are authoritative
+        fixable = [m['user_id'] for m in mismatches if m['kind'] != 'no_profiler_session']
+        if fix and fixable:
+            state['fixed'] += recompute_users(fixable)
+
+        last_pk = user_ids[-1]
+        scanned_this_run += len(user_ids)
+        state.update(
+            last_pk=str(last_pk),
+            scanned=state['scanned'] + len(user_ids),
+            mismatches=state['mismatches'] + len(mismatches),
+        )
+        save_checkpoint(checkpoint_path, state)
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"  {state['scanned']} scanned, {state['mismatches']} mismatches, {state['fixed']} fixed "
+            f"({scanned_this_run / elapsed:.0f} users/s)",
+            file=sys.stderr,
+        )
+        if sleep:
+            time.sleep(sleep)
+
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--fix', action='store_true', help='Rebuild mismatched dashboard cache rows')
+    parser.add_argument('--resume', action='store_true', help='Continue from the last checkpoint')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    parser.add_argument('--output', help='Write mismatches to this JSONL file (default: stdout)')
+    parser.add_argument('--sleep', type=float, default=0.0, help='Pause between chunks (seconds)')
+    parser.add_argument('--limit', type=int, help='Stop after scanning this many users')
+    args = parser.parse_args()
+
+    output = open(args.output, 'a' if args.resume else 'w') if args.output else sys.stdout
+    try:
+        state = reconcile(
+            chunk_size=args.chunk_size,
+            fix=args.fix,
+            checkpoint_path=args.checkpoint,
+            resume=args.resume,
+            output=output,
+            sleep=args.sleep,
+            limit=args.limit,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(
+        f"✅ Done: {state['scanned']} users scanned, {state['mismatches']} mismatches, "
+        f"{state['fixed']} fixed",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
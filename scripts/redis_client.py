@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Shared Redis connection for ops scripts and background workers.
+
+Reads REDIS_HOST / REDIS_PORT the same way the Django container is configured
+in docker-compose.yml.
+"""
+import os
+from functools import lru_cache
+
+import redis
+
+
+@lru_cache(maxsize=1)
+def get_redis():
+    """Return a process-wide Redis client (the client itself pools connections)."""
+    return redis.Redis(
+        host=os.environ.get('REDIS_HOST', 'localhost'),
+        port=int(os.environ.get('REDIS_PORT', '6379')),
+        db=int(os.environ.get('REDIS_DB', '0')),
+        socket_timeout=float(os.environ.get('REDIS_SOCKET_TIMEOUT', '2')),
+    )
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Read-replica routing for reporting and analytics scripts.
+
+ReplicaRouter sends ORM reads to the replica alias only inside a reporting
+context, so request traffic is unaffected. Before routing it checks the
+replica's replication lag (cached for a few seconds) and falls back to the
+primary when the replica is unreachable or lagging more than allowed. Writes,
+and migrations, always go to the primary.
+
+The replica alias comes from settings.DATABASES['replica'] if present, otherwise
+it is derived from the default database with DB_REPLICA_HOST / DB_REPLICA_PORT
+(/ DB_REPLICA_NAME / DB_REPLICA_USER / DB_REPLICA_PASSWORD) overrides.
+
+Usage in a script (after django.setup()):
+
+    from replica_routing import use_replica_for_script
+    use_replica_for_script()                 # every ORM read in this script
+
+or for a block:
+
+    with reporting_reads(max_lag=10):
+        rows = list(User.objects.values('id', 'email'))
+
+To route in the Django app as well, add 'replica_routing.ReplicaRouter' to
+DATABASE_ROUTERS; outside a reporting context it is a no-op.
+
+Check both databases: python scripts/replica_routing.py
+"""
+import contextvars
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, router
+
+REPLICA_ALIAS = os.environ.get('DB_REPLICA_ALIAS', 'replica')
+DEFAULT_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', '30'))
+HEALTH_CHECK_INTERVAL = float(os.environ.get('DB_REPLICA_CHECK_INTERVAL', '5'))
+
+# 0 on a primary or a caught-up standby, otherwise seconds since the last replayed transaction
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_reporting = contextvars.ContextVar('reporting_reads', default=None)
+_health_lock = threading.Lock()
+_health = {'checked_at': 0.0, 'lag': None, 'error': None}
+
+
+def ensure_replica_alias():
+    """Register the replica alias from DB_REPLICA_* if settings do not define it. Returns False if unavailable."""
+    if REPLICA_ALIAS in connections.settings:
+        return True
+    host = os.environ.get('DB_REPLICA_HOST')
+    if not host:
+        return False
+    config = dict(connections.settings[DEFAULT_DB_ALIAS])
+    config.update({
+        'HOST': host,
+        'PORT': os.environ.get('DB_REPLICA_PORT', config.get('PORT', '')),
+        'NAME': os.environ.get('DB_REPLICA_NAME', config['NAME']),
+        'USER': os.environ.get('DB_REPLICA_USER', config.get('USER', '')),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', config.get('PASSWORD', '')),
+        'TEST': {**config.get('TEST', {}), 'MIRROR': DEFAULT_DB_ALIAS},
+    })
+    connections.settings[REPLICA_ALIAS] = config
+    return True
+
+
+def replica_lag(force=False):
+    """Replication lag in seconds, or None if the replica cannot be reached. Cached briefly."""
+    now = time.monotonic()
+    with _health_lock:
+        if not force and now - _health['checked_at'] < HEALTH_CHECK_INTERVAL:
+            return _health['lag']
+        try:
+            with connections[REPLICA_ALIAS].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+            error = None
+        except OperationalError as e:
+            lag, error = None, e
+            connections[REPLICA_ALIAS].close()
+        if error and not _health['error']:
+            print(f"⚠️  Replica '{REPLICA_ALIAS}' unavailable, reading from primary: {error}", file=sys.stderr)
+        _health.update(checked_at=now, lag=lag, error=error)
+        return lag
+
+
+def replica_usable(max_lag):
+    if not ensure_replica_alias():
+        return False
+    lag = replica_lag()
+    return lag is not None and lag <= max_lag
+
+
+class ReplicaRouter:
+    """Route reads to the replica inside reporting_reads(); everything else goes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        max_lag = _reporting.get()
+        if max_lag is None:
+            return None
+        return REPLICA_ALIAS if replica_usable(max_lag) else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS if _reporting.get() is not None else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == REPLICA_ALIAS else None
+
+
+def _install_router():
+    if not any(isinstance(r, ReplicaRouter) for r in router.routers):
+        router.routers.insert(0, ReplicaRouter())
+
+
+@contextmanager
+def reporting_reads(max_lag=DEFAULT_MAX_LAG):
+    """Send ORM reads inside the block to the replica while its lag is within `max_lag` seconds."""
+    _install_router()
+    token = _reporting.set(max_lag)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+def use_replica_for_script(max_lag=DEFAULT_MAX_LAG):
+    """Route every read for the rest of this script to the replica (with primary fallback)."""
+    _install_router()
+    _reporting.set(max_lag)
+    target = REPLICA_ALIAS if replica_usable(max_lag) else DEFAULT_DB_ALIAS
+    print(f"📖 Reporting reads -> {target}", file=sys.stderr)
+    return target
+
+
+def main():
+    import django
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+    django.setup()
+
+    if not ensure_replica_alias():
+        print(f"❌ No '{REPLICA_ALIAS}' database configured (set DB_REPLICA_HOST)")
+        return 1
+    for alias in (DEFAULT_DB_ALIAS, REPLICA_ALIAS):
+        settings = connections[alias].settings_dict
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT pg_is_in_recovery()')
+                standby = cursor.fetchone()[0]
+            print(f"✅ {alias}: {settings['HOST']}:{settings['PORT']} ({'standby' if standby else 'primary'})")
+        except OperationalError as e:
+            print(f"❌ {alias}: {settings['HOST']}:{settings['PORT']} unreachable: {e}")
+    lag = replica_lag(force=True)
+    print(f"   Replication lag: {'unknown' if lag is None else f'{lag:.1f}s'} (max {DEFAULT_MAX_LAG}s)")
+    return 0 if lag is not None else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
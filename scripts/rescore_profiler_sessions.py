@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Re-score every ProfilerSession after WEIGHTS change, in vectorized batches.
+
+Sessions are read in keyset chunks, their responses packed into NumPy matrices
+(track_scoring.ResponseBatch) and scored with one matrix operation per chunk.
+Results go back with one UPDATE ... FROM (VALUES ...) per chunk, and users
+whose primary track changed are queued for the dashboard materializer.
+Responses are always read fresh, so in-progress sessions are scored from
+what they hold now.
+
+Only the result fields the model actually has are written:
+    track_scores (JSON {track: score}), confidence, recommended_track (CurriculumTrack by code)
+
+Usage:
+    python scripts/rescore_profiler_sessions.py --dry-run
+    python scripts/rescore_profiler_sessions.py --weights '{"work_style": 1.0}'
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import django
+
+# Add Django app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+django.setup()
+
+from query_instrumentation import install_at_exit
+install_at_exit()
+
+from django.db import connection, transaction
+
+from curriculum.models import CurriculumTrack
+from dashboard_materializer import mark_dirty
+from profiler.models import ProfilerSession
+from track_scoring import TRACKS, WEIGHTS, ResponseBatch, score_batch
+
+# ProfilerSession field holding the answered questions: [{"category": ..., "scores": {track: score}}, ...]
+RESPONSES_FIELD = 'responses'
+SCORES_FIELD = 'track_scores'
+CONFIDENCE_FIELD = 'confidence'
+TRACK_FIELD = 'recommended_track'
+
+# Scoring track -> CurriculumTrack.code
+TRACK_CODES = {track: track for track in TRACKS}
+
+
+def _session_fields():
+    return {f.name: f for f in ProfilerSession._meta.concrete_fields}
+
+
+def _track_ids():
+    by_code = dict(CurriculumTrack.objects.filter(code__in=TRACK_CODES.values()).values_list('code', 'pk'))
+    missing = sorted(set(TRACK_CODES.values()) - set(by_code))
+    if missing:
+        print(f"⚠️  No CurriculumTrack for codes {missing}; recommended_track left unchanged for those",
+              file=sys.stderr)
+    return [by_code.get(TRACK_CODES[track]) for track in TRACKS]
+
+
+def _parse_responses(raw):
+    return json.loads(raw) if isinstance(raw, str) else (raw or [])
+
+
+def iter_session_chunks(chunk_size):
+    """Yield (session_ids, user_ids, current_track_ids, responses) per keyset chunk."""
+    has_track = TRACK_FIELD in _session_fields()
+    columns = ['pk', 'user_id', f'{TRACK_FIELD}_id' if has_track else 'pk', RESPONSES_FIELD]
+    last_pk = None
+    while True:
+        qs = ProfilerSession.objects.filter(**{f'{RESPONSES_FIELD}__isnull': False}).order_by('pk')
+        if last_pk is not None:
+            qs = qs.filter(pk__gt=last_pk)
+        rows = list(qs.values_list(*columns)[:chunk_size])
+        if not rows:
+            return
+        session_ids = [row[0] for row in rows]
+        yield (
+            session_ids,
+            [row[1] for row in rows],
+            [row[2] for row in rows] if has_track else [None] * len(rows),
+            [_parse_responses(row[3]) for row in rows],
+        )
+        last_pk = session_ids[-1]
+
+
+def write_back(session_ids, totals, primary, confidence, track_ids):
+    """One UPDATE ... FROM (VALUES ...) for the whole chunk, for whichever result fields exist."""
+    fields = _session_fields()
+    # (column, SQL cast, value for row i, keep the current value when NULL)
+    outputs = []
+    if SCORES_FIELD in fields:
+        outputs.append((fields[SCORES_FIELD].column, 'jsonb',
+                        lambda i: json.dumps(dict(zip(TRACKS, (round(float(v), 4) for v in totals[i])))), False))
+    if CONFIDENCE_FIELD in fields:
+        outputs.append((fields[CONFIDENCE_FIELD].column, fields[CONFIDENCE_FIELD].db_type(connection),
+                        lambda i: float(confidence[i]), False))
+    if TRACK_FIELD in fields:
+        # NULL when the winning track has no CurriculumTrack row
+        outputs.append((fields[TRACK_FIELD].column, fields[TRACK_FIELD].target_field.db_type(connection),
+                        lambda i: track_ids[primary[i]], True))
+    if not outputs:
+        return 0
+
+    pk = ProfilerSession._meta.pk
+    placeholders = '(' + ', '.join([f'%s::{pk.db_type(connection)}'] + [f'%s::{o[1]}' for o in outputs]) + ')'
+    params = []
+    for i, session_id in enumerate(session_ids):
+        params.append(session_id)
+        params.extend(value(i) for _, _, value, _ in outputs)
+    assignments = ', '.join(
+        f'{column} = COALESCE(v.c{n}, s.{column})' if keep_current else f'{column} = v.c{n}'
+        for n, (column, _, _, keep_current) in enumerate(outputs)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE {ProfilerSession._meta.db_table} AS s
+            SET {assignments}
+            FROM (VALUES {', '.join([placeholders] * len(session_ids))})
+                 AS v(session_id, {', '.join(f'c{n}' for n in range(len(outputs)))})
+            WHERE s.{pk.column} = v.session_id
+        """, params)
+        return cursor.rowcount
+
+
+def rescore(chunk_size=20000, weights=WEIGHTS, dry_run=False):
+    fields = _session_fields()
+    if RESPONSES_FIELD not in fields:
+        print(f"❌ ProfilerSession has no '{RESPONSES_FIELD}' field; set RESPONSES_FIELD", file=sys.stderr)
+        return None
+    track_ids = _track_ids()
+    stats = Counter()
+    started = time.perf_counter()
+
+    for n, (session_ids, user_ids, current, responses) in enumerate(iter_session_chunks(chunk_size)):
+        pack_start = time.perf_counter()
+        batch = ResponseBatch.from_responses(responses)
+        stats['pack_seconds'] += time.perf_counter() - pack_start
+
+        score_start = time.perf_counter()
+        totals, primary, confidence = score_batch(batch, weights)
+        stats['score_seconds'] += time.perf_counter() - score_start
+
+        changed_users = [
+            user_id for user_id, old, new in zip(user_ids, current, primary)
+            if track_ids[new] is not None and old != track_ids[new]
+        ] if TRACK_FIELD in fields else []
+        stats['sessions'] += len(session_ids)
+        stats['track_changed'] += len(changed_users)
+        stats.update(f'primary:{TRACKS[t]}' for t in primary)
+
+        if not dry_run:
+            write_start = time.perf_counter()
+            with transaction.atomic():
+                stats['updated'] += write_back(session_ids, totals, primary, confidence, track_ids)
+            stats['write_seconds'] += time.perf_counter() - write_start
+            mark_dirty(changed_users)
+
+        print(f"  chunk {n}: {stats['sessions']} sessions, {stats['track_changed']} track changes "
+              f"({time.perf_counter() - started:.1f}s)", file=sys.stderr)
+
+    stats['elapsed'] = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunk-size', type=int, default=20000)
+    parser.add_argument('--weights', help='JSON object overriding category weights')
+    parser.add_argument('--dry-run', action='store_true', help='Score and report without writing')
+    args = parser.parse_args()
+
+    weights = {**WEIGHTS, **json.loads(args.weights)} if args.weights else WEIGHTS
+    stats = rescore(args.chunk_size, weights, args.dry_run)
+    if stats is None:
+        return 1
+
+    print(f"{'🔎 Dry run:' if args.dry_run else '✅'} scored {stats['sessions']} sessions in {stats['elapsed']:.1f}s "
+          f"(pack {stats['pack_seconds']:.1f}s, score {stats['score_seconds']:.2f}s, "
+          f"write {stats['write_seconds']:.1f}s)")
+    print(f"   Primary track changed for {stats['track_changed']} sessions; weights: {json.dumps(weights)}")
+    for track in TRACKS:
+        print(f"   {track:<14} {stats[f'primary:{track}']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,6 +11,9 @@ sys.path.insert(0, '/home/caleb/kiptoo/och/ongozaCyberHub/backend/django_app')
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
 django.setup()
 
+from query_instrumentation import install_at_exit
+install_at_exit()
+
 from django.contrib.auth import get_user_model
 from student_dashboard.models import StudentDashboardCache
 
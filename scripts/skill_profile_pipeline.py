@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Batched skill-profile updates from mission completions.
+
+Completing a mission appends an event to a Redis stream
+(record_mission_completion). The worker buffers events and, when the buffer
+reaches --batch-size events or the oldest buffered event is --max-wait seconds
+old, flushes them in one transaction:
+
+- event ids are claimed in learner_skill_events (INSERT ... ON CONFLICT DO
+  NOTHING RETURNING), so a replayed or re-published completion is applied once;
+- the mission's scoring.skills_update entries are mapped to deltas
+  (low 1, medium 2, high 3) and summed per (user, skill) in memory;
+- the sums are applied with multi-row INSERT ... ON CONFLICT DO UPDATE upserts
+  into learner_skill_profiles, and the consumed stream offset is stored.
+
+Completions of missions that are not in the loaded catalog (e.g. published
+after the worker started) are not claimed; they are parked in
+learner_skill_parked_events and requeued when a worker starts with a catalog
+that knows them (or with --retry-parked).
+
+When a flush fails on the data (e.g. a user_id that is not a valid user key),
+the batch is split in halves under savepoints until the failing events are
+isolated; those are parked with their error and the rest is applied, so one
+bad event cannot stall the stream. --retry-parked retries them too. Any other
+failure (lost connection, ...) keeps the events buffered and the flush is
+retried with backoff.
+
+The tables and the stream offset (coaching_rollup.RollupOffset, shared with
+goal_rollup) are coaching_rollup models; add 'coaching_rollup' to
+INSTALLED_APPS and migrate first.
+
+Usage:
+    python scripts/skill_profile_pipeline.py                      # run forever
+    python scripts/skill_profile_pipeline.py --once
+    python scripts/skill_profile_pipeline.py --metrics
+    python scripts/skill_profile_pipeline.py --benchmark 20000    # batched vs per-row, rolled back
+    python scripts/skill_profile_pipeline.py --prune-events 30
+    python scripts/skill_profile_pipeline.py --retry-parked
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+import django
+
+# Add Django app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+django.setup()
+
+from query_instrumentation import install_at_exit
+install_at_exit()
+
+from django.contrib.auth import get_user_model
+from django.db import DataError, IntegrityError, connection, transaction
+
+from coaching_rollup.models import LearnerSkillEvent, LearnerSkillParkedEvent, LearnerSkillProfile, RollupOffset
+from redis_client import get_redis
+from shared.missions import IMPACT_WEIGHTS, load_catalog
+
+User = get_user_model()
+
+COMPLETIONS_STREAM = 'missions:completions'
+METRICS_KEY = 'skills:pipeline:metrics'
+PROFILES_TABLE = LearnerSkillProfile._meta.db_table
+EVENTS_TABLE = LearnerSkillEvent._meta.db_table
+PARKED_TABLE = LearnerSkillParkedEvent._meta.db_table
+OFFSETS_TABLE = RollupOffset._meta.db_table   # shared with goal_rollup
+OFFSET_NAME = 'mission_completions'
+
+DEFAULT_BATCH_SIZE = int(os.environ.get('SKILL_PIPELINE_BATCH_SIZE', '2000'))
+DEFAULT_MAX_WAIT = float(os.environ.get('SKILL_PIPELINE_MAX_WAIT', '2.0'))
+# Rows per INSERT statement; keeps statements well under the parameter limit
+UPSERT_CHUNK = 1000
+# Seconds to wait after a failed read/flush, doubling up to the maximum
+RETRY_BACKOFF = 1.0
+MAX_RETRY_BACKOFF = 60.0
+# Errors caused by the events themselves rather than the database being unavailable
+EVENT_ERRORS = (DataError, IntegrityError)
+
+
+# ---------------------------------------------------------------------------
+# Producer side
+# ---------------------------------------------------------------------------
+
+def record_mission_completion(user_id, mission_id, event_id=None):
+    """
+    Append a completion to the stream. Call from the mission submission path once it is graded.
+
+    event_id should identify the completion (e.g. the submission id); replays with
+    the same id are ignored. Without one, a user completing a mission counts once.
+    """
+    get_redis().xadd(COMPLETIONS_STREAM, {
+        'event_id': str(event_id or f'{user_id}:{mission_id}'),
+        'user_id': str(user_id),
+        'mission_id': str(mission_id),
+    })
+
+
+@lru_cache(maxsize=1)
+def mission_deltas():
+    """{mission id: [(skill, delta), ...]} from mission_hall, loaded once per process."""
+    return {
+        mission_id: [(skill, IMPACT_WEIGHTS.get(impact, IMPACT_WEIGHTS['medium']))
+                     for skill, impact in mission.skills]
+        for mission_id, mission in load_catalog().items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tables (coaching_rollup models)
+# ---------------------------------------------------------------------------
+
+def _read_offset(cursor):
+    cursor.execute(f"SELECT last_id FROM {OFFSETS_TABLE} WHERE name = %s", [OFFSET_NAME])
+    row = cursor.fetchone()
+    return row[0] if row else '0-0'
+
+
+def _write_offset(cursor, last_id):
+    cursor.execute(f"""
+        INSERT INTO {OFFSETS_TABLE} (name, last_id) VALUES (%s, %s)
+        ON CONFLICT (name) DO UPDATE SET last_id = EXCLUDED.last_id, updated_at = NOW()
+    """, [OFFSET_NAME, last_id])
+
+
+def _claim_events(cursor, event_ids):
+    """Record event ids as applied; returns the ones that were not applied before."""
+    claimed = set()
+    for start in range(0, len(event_ids), UPSERT_CHUNK):
+        chunk = event_ids[start:start + UPSERT_CHUNK]
+        cursor.execute(f"""
+            INSERT INTO {EVENTS_TABLE} (event_id) VALUES {', '.join(['(%s)'] * len(chunk))}
+            ON CONFLICT (event_id) DO NOTHING
+            RETURNING event_id
+        """, chunk)
+        claimed.update(row[0] for row in cursor.fetchall())
+    return claimed
+
+
+def _park_events(cursor, events):
+    """
+    Keep (event_id, user_id, mission_id, error) rows for events that cannot be applied now:
+    missions the catalog does not know yet (error None) or events that failed on their own.
+    """
+    for start in range(0, len(events), UPSERT_CHUNK):
+        chunk = events[start:start + UPSERT_CHUNK]
+        cursor.execute(f"""
+            INSERT INTO {PARKED_TABLE} (event_id, user_id, mission_id, error)
+            VALUES {', '.join(['(%s, %s, %s, %s)'] * len(chunk))}
+            ON CONFLICT (event_id) DO UPDATE SET error = EXCLUDED.error
+        """, [value for row in chunk for value in row])
+    return len(events)
+
+
+def _unpark_events(cursor, event_ids):
+    if event_ids:
+        cursor.execute(f"DELETE FROM {PARKED_TABLE} WHERE event_id = ANY(%s)", [list(event_ids)])
+
+
+def requeue_parked(buffer, include_failed=False):
+    """
+    Add parked events whose mission the catalog now knows to `buffer`; returns how many.
+    Events parked because they failed are only retried with include_failed.
+    """
+    known = list(mission_deltas())
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT event_id, user_id, mission_id FROM {PARKED_TABLE}
+            WHERE mission_id = ANY(%s) AND (%s OR error IS NULL)
+        """, [known, include_failed])
+        rows = cursor.fetchall()
+    for event_id, user_id, mission_id in rows:
+        buffer.add(event_id, user_id, mission_id, parked=True)
+    return len(rows)
+
+
+def _upsert_deltas(cursor, deltas):
+    user_cast = User._meta.pk.db_type(connection)
+    rows = [(user_id, skill, score, count) for (user_id, skill), (score, count) in deltas.items()]
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[start:start + UPSERT_CHUNK]
+        values_sql = ', '.join([f'(%s::{user_cast}, %s, %s, %s)'] * len(chunk))
+        cursor.execute(f"""
+            INSERT INTO {PROFILES_TABLE} AS p (user_id, skill, score, completions)
+            VALUES {values_sql}
+            ON CONFLICT (user_id, skill) DO UPDATE
+            SET score = p.score + EXCLUDED.score,
+                completions = p.completions + EXCLUDED.completions,
+                updated_at = NOW()
+        """, [value for row in chunk for value in row])
+    return len(rows)
+
+
+# ---------------------------------------------------------------------------
+# Buffer + flush
+# ---------------------------------------------------------------------------
+
+class SkillDeltaBuffer:
+    """
+    Completion events waiting for the next flush, deduplicated by event id.
+
+    Deltas are aggregated at flush time, after the already-applied events have
+    been filtered out, so a replay never contributes to the sums.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.events = {}
+        self.requeued = set()
+        self.first_at = None
+        self.last_stream_id = None
+
+    def __len__(self):
+        return len(self.events)
+
+    def add(self, event_id, user_id, mission_id, stream_id=None, parked=False):
+        if self.first_at is None:
+            self.first_at = time.monotonic()
+        self.events.setdefault(event_id, (user_id, mission_id))
+        if parked:
+            self.requeued.add(event_id)
+        if stream_id is not None:
+            self.last_stream_id = stream_id
+
+    def seconds_until_due(self):
+        if self.first_at is None:
+            return self.max_wait
+        return max(0.0, self.first_at + self.max_wait - time.monotonic())
+
+    def should_flush(self):
+        return len(self.events) >= self.batch_size or (self.events and self.seconds_until_due() == 0)
+
+    def flush(self):
+        """
+        Apply buffered events in one transaction. Returns {'events', 'applied', 'rows', 'unknown_missions', 'failed'}.
+
+        Events for missions missing from the catalog are parked unclaimed
+        (unknown_missions) so they can be applied once the catalog has them.
+        Events that fail on their own (failed) are parked with their error.
+        On any other error nothing is committed and the buffer is left as it was.
+        """
+        if not self.events and self.last_stream_id is None:
+            return {'events': 0, 'applied': 0, 'rows': 0, 'unknown_missions': 0, 'failed': 0}
+        catalog = mission_deltas()
+        failed = []
+        with transaction.atomic(), connection.cursor() as cursor:
+            applied, rows, unknown = self._apply_isolating(cursor, list(self.events.items()), catalog, failed)
+            _park_events(cursor, failed)
+            if self.last_stream_id is not None:
+                _write_offset(cursor, self.last_stream_id)
+        result = {'events': len(self.events), 'applied': applied, 'rows': rows, 'unknown_missions': unknown,
+                  'failed': len(failed)}
+        self.events = {}
+        self.requeued = set()
+        self.first_at = None
+        self.last_stream_id = None
+        return result
+
+    def _apply_isolating(self, cursor, events, catalog, failed):
+        """
+        Apply `events` under a savepoint. If that fails because of the data, apply each
+        half separately, down to single events, which are added to `failed` with the error.
+        """
+        try:
+            with transaction.atomic():
+                return self._apply(cursor, events, catalog)
+        except EVENT_ERRORS as e:
+            if len(events) == 1:
+                event_id, (user_id, mission_id) = events[0]
+                error = str(e).strip().partition('\n')[0]
+                failed.append((event_id, user_id, mission_id, f'{type(e).__name__}: {error}'))
+                return 0, 0, 0
+        middle = len(events) // 2
+        first = self._apply_isolating(cursor, events[:middle], catalog, failed)
+        second = self._apply_isolating(cursor, events[middle:], catalog, failed)
+        return tuple(a + b for a, b in zip(first, second))
+
+    def _apply(self, cursor, events, catalog):
+        """Claim and apply [(event_id, (user_id, mission_id)), ...]; returns (applied, rows, unknown missions)."""
+        known = [event_id for event_id, (_, mission_id) in events if mission_id in catalog]
+        unknown = [(event_id, user_id, mission_id, None)
+                   for event_id, (user_id, mission_id) in events if mission_id not in catalog]
+        claimed = _claim_events(cursor, known)
+        deltas = defaultdict(lambda: [0.0, 0])
+        for event_id in claimed:
+            user_id, mission_id = self.events[event_id]
+            for skill, delta in catalog[mission_id]:
+                entry = deltas[(user_id, skill)]
+                entry[0] += delta
+                entry[1] += 1
+        rows = _upsert_deltas(cursor, deltas)
+        # Requeued events that are still unknown stay parked
+        _park_events(cursor, [row for row in unknown if row[0] not in self.requeued])
+        _unpark_events(cursor, self.requeued.intersection(known))
+        return len(claimed), rows, len(unknown)
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+class SkillProfileWorker:
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT):
+        self.redis = get_redis()
+        self.buffer = SkillDeltaBuffer(batch_size, max_wait)
+        self.read_id = None
+
+    def _read(self, block_ms):
+        if self.read_id is None:
+            with connection.cursor() as cursor:
+                self.read_id = _read_offset(cursor)
+        count = self.buffer.batch_size - len(self.buffer)
+        response = self.redis.xread({COMPLETIONS_STREAM: self.read_id}, count=max(count, 1),
+                                    block=block_ms or None)
+        for _, entries in response or []:
+            for stream_id, fields in entries:
+                self.read_id = stream_id.decode()
+                self.buffer.add(fields[b'event_id'].decode(), fields[b'user_id'].decode(),
+                                fields[b'mission_id'].decode(), self.read_id)
+
+    def flush(self):
+        start = time.perf_counter()
+        result = self.buffer.flush()
+        elapsed = time.perf_counter() - start
+        if result['events']:
+            metrics = {**result, 'flush_seconds': round(elapsed, 4),
+                       'events_per_second': round(result['events'] / elapsed, 1) if elapsed else 0,
+                       'flushed_at': int(time.time())}
+            self.redis.hset(METRICS_KEY, mapping=metrics)
+            self.redis.hincrby(METRICS_KEY, 'total_applied', result['applied'])
+            # Entries up to the committed offset are no longer needed
+            self.redis.xtrim(COMPLETIONS_STREAM, minid=self.read_id, approximate=True)
+        return result, elapsed
+
+    def run_once(self):
+        """Drain whatever is on the stream now (plus any requeued parked events), flushing every batch_size events."""
+        totals = defaultdict(int)
+        start = time.perf_counter()
+        requeue_parked(self.buffer)
+        while True:
+            before = self.read_id
+            self._read(block_ms=0)
+            if len(self.buffer) >= self.buffer.batch_size or self.read_id == before:
+                result, _ = self.flush()
+                for key, value in result.items():
+                    totals[key] += value
+                if self.read_id == before:
+                    break
+        totals['seconds'] = time.perf_counter() - start
+        return totals
+
+    def run_forever(self):
+        print(f"🔁 Skill pipeline running (batch_size={self.buffer.batch_size}, max_wait={self.buffer.max_wait}s)")
+        requeued = requeue_parked(self.buffer)
+        if requeued:
+            print(f"  ♻️  Requeued {requeued} parked completions")
+        backoff = RETRY_BACKOFF
+        while True:
+            try:
+                # Stay under the client's socket timeout while blocking
+                self._read(block_ms=max(1, min(1000, int(self.buffer.seconds_until_due() * 1000))))
+                if self.buffer.should_flush():
+                    result, elapsed = self.flush()
+                    print(f"  ✅ {result['applied']}/{result['events']} events -> {result['rows']} skill rows "
+                          f"in {elapsed * 1000:.0f} ms ({result['events'] / max(elapsed, 1e-9):.0f} events/s)")
+                    if result['unknown_missions']:
+                        print(f"  ⚠️  Parked {result['unknown_missions']} completions for missions not in mission_hall")
+                    if result['failed']:
+                        print(f"  ⚠️  Parked {result['failed']} completions that failed to apply (see {PARKED_TABLE}.error)")
+                backoff = RETRY_BACKOFF
+            except Exception as e:
+                # Not caused by the events (those are parked): the flush rolled back and the
+                # buffer still holds its events; retry them after a pause
+                print(f"  ❌ Skill pipeline error, retrying in {backoff:.0f}s ({len(self.buffer)} events buffered): "
+                      f"{type(e).__name__}: {e}", file=sys.stderr)
+                connection.close()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_RETRY_BACKOFF)
+
+
+# ---------------------------------------------------------------------------
+# Maintenance / benchmark
+# ---------------------------------------------------------------------------
+
+def prune_applied_events(days):
+    """Forget event ids older than `days`; replays older than that would be applied again."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {EVENTS_TABLE} WHERE applied_at < NOW() - %s * INTERVAL '1 day'", [days])
+        return cursor.rowcount
+
+
+def _synthetic_events(n, users):
+    user_ids = list(User.objects.values_list('pk', flat=True)[:users])
+    if not user_ids:
+        raise SystemExit('❌ No users to attach synthetic completions to')
+    mission_ids = list(mission_deltas())
+    rng = random.Random(0)
+    return [(f'bench-{i}', str(rng.choice(user_ids)), rng.choice(mission_ids)) for i in range(n)]
+
+
+def run_benchmark(n, users, batch_size):
+    """Time the per-row path against the batched pipeline; both run in rolled-back transactions."""
+    events = _synthetic_events(n, users)
+    catalog = mission_deltas()
+    user_cast = User._meta.pk.db_type(connection)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        start = time.perf_counter()
+        for event_id, user_id, mission_id in events:
+            cursor.execute(f"INSERT INTO {EVENTS_TABLE} (event_id) VALUES (%s) ON CONFLICT DO NOTHING RETURNING event_id",
+                           [event_id])
+            if cursor.fetchone() is None:
+                continue
+            for skill, delta in catalog[mission_id]:
+                cursor.execute(f"""
+                    INSERT INTO {PROFILES_TABLE} AS p (user_id, skill, score, completions)
+                    VALUES (%s::{user_cast}, %s, %s, 1)
+                    ON CONFLICT (user_id, skill) DO UPDATE
+                    SET score = p.score + EXCLUDED.score, completions = p.completions + 1, updated_at = NOW()
+                """, [user_id, skill, delta])
+        per_row = time.perf_counter() - start
+        transaction.set_rollback(True)
+
+    with transaction.atomic():
+        buffer = SkillDeltaBuffer(batch_size=batch_size)
+        rows = 0
+        start = time.perf_counter()
+        for event_id, user_id, mission_id in events:
+            buffer.add(event_id, user_id, mission_id)
+            if len(buffer) >= batch_size:
+                rows += buffer.flush()['rows']
+        rows += buffer.flush()['rows']
+        batched = time.perf_counter() - start
+
+        # Replaying the same events must not change anything
+        for event_id, user_id, mission_id in events:
+            buffer.add(event_id, user_id, mission_id)
+        replay = buffer.flush()
+        transaction.set_rollback(True)
+
+    print(f"{n} completions over {users} users, batch size {batch_size}")
+    print(f"  {'per-row upserts':<18} {per_row:7.2f} s  {n / per_row:9.0f} events/s")
+    print(f"  {'batched pipeline':<18} {batched:7.2f} s  {n / batched:9.0f} events/s  ({rows} upserted rows)")
+    print(f"  replay: {replay['applied']} of {replay['events']} events applied again")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--once', action='store_true', help='Drain the stream once and exit')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--max-wait', type=float, default=DEFAULT_MAX_WAIT, help='Seconds before a partial batch is flushed')
+    parser.add_argument('--metrics', action='store_true', help='Print the last flush metrics')
+    parser.add_argument('--benchmark', type=int, metavar='EVENTS', help='Compare per-row and batched updates')
+    parser.add_argument('--users', type=int, default=500, help='Users for --benchmark')
+    parser.add_argument('--prune-events', type=int, metavar='DAYS', help='Drop applied event ids older than DAYS')
+    parser.add_argument('--retry-parked', action='store_true',
+                        help='Apply parked completions whose missions are now in the catalog, and retry failed ones')
+    args = parser.parse_args()
+
+    if args.metrics:
+        redis_conn = get_redis()
+        metrics = {k.decode(): v.decode() for k, v in redis_conn.hgetall(METRICS_KEY).items()}
+        print(f"Stream length: {redis_conn.xlen(COMPLETIONS_STREAM)}")
+        for key, value in sorted(metrics.items()):
+            print(f"  {key}: {value}")
+        return 0
+
+    if args.prune_events is not None:
+        print(f"🧹 Pruned {prune_applied_events(args.prune_events)} applied event ids")
+        return 0
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.users, args.batch_size)
+        return 0
+
+    if args.retry_parked:
+        buffer = SkillDeltaBuffer(args.batch_size, args.max_wait)
+        requeued = requeue_parked(buffer, include_failed=True)
+        result = buffer.flush()
+        print(f"♻️  Applied {result['applied']} of {requeued} parked completions -> {result['rows']} skill rows")
+        if result['failed']:
+            print(f"   ⚠️ {result['failed']} still fail; see {PARKED_TABLE}.error")
+        return 0
+
+    worker = SkillProfileWorker(args.batch_size, args.max_wait)
+    if args.once:
+        totals = worker.run_once()
+        rate = totals['events'] / totals['seconds'] if totals['seconds'] else 0
+        print(f"✅ Applied {totals['applied']}/{totals['events']} completions -> {totals['rows']} skill rows "
+              f"in {totals['seconds']:.2f}s ({rate:.0f} events/s)")
+        if totals['unknown_missions']:
+            print(f"   ⚠️ {totals['unknown_missions']} completions referenced missions not in mission_hall (parked)")
+        if totals['failed']:
+            print(f"   ⚠️ {totals['failed']} completions failed to apply (parked, see {PARKED_TABLE}.error)")
+        return 0
+
+    worker.run_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
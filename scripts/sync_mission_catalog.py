@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Diff-based sync of mission_hall/*.yaml into the mission catalog tables.
+
+Every file is hashed (sha256 of its bytes) and compared with the content_hash
+stored for its mission; files whose hash is already in the catalog are not
+even parsed. Only new and changed missions are written, in one transaction:
+
+- mission rows are upserted with multi-row INSERT ... ON CONFLICT DO UPDATE;
+- subtask, deliverable and framework-mapping rows of changed missions are
+  replaced with bulk inserts (delete by mission id, then multi-row INSERT);
+- missions whose file disappeared are reported, and removed with --prune.
+
+A file that cannot be read, parsed or mapped to rows is reported and skipped;
+the catalog keeps whatever it had for that mission (matched by source path or
+file-name id), and --prune removes nothing while any file has errors.
+
+A sync with nothing to do runs one SELECT and no writes. Changes without a
+mission_meta.version bump are applied but listed, since graded submissions
+refer to a mission version.
+
+The tables are mission_catalog models; add 'mission_catalog' to
+INSTALLED_APPS and migrate first.
+
+Usage:
+    python scripts/sync_mission_catalog.py
+    python scripts/sync_mission_catalog.py --dry-run
+    python scripts/sync_mission_catalog.py --dir /path/to/mission_hall --prune
+    python scripts/sync_mission_catalog.py --benchmark 3000      # per-object vs diff sync, rolled back
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import django
+import yaml
+
+# Add Django app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend/django_app'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+django.setup()
+
+from query_instrumentation import install_at_exit, instrument
+install_at_exit()
+
+from django.db import connection, transaction
+
+from mission_catalog.models import CatalogDeliverable, CatalogFramework, CatalogMission, CatalogSubtask
+from shared.missions import loads_mission
+from shared.missions.catalog import MISSION_HALL_DIR
+
+MISSIONS_TABLE = CatalogMission._meta.db_table
+SUBTASKS_TABLE = CatalogSubtask._meta.db_table
+DELIVERABLES_TABLE = CatalogDeliverable._meta.db_table
+FRAMEWORKS_TABLE = CatalogFramework._meta.db_table
+CHILD_TABLES = (SUBTASKS_TABLE, DELIVERABLES_TABLE, FRAMEWORKS_TABLE)
+
+MISSION_COLUMNS = ('mission_id', 'version', 'content_hash', 'title', 'slug', 'status', 'track', 'tier',
+                   'difficulty', 'estimated_duration', 'last_updated', 'source_path', 'definition')
+MISSION_PLACEHOLDERS = '(' + ', '.join(['%s'] * 10 + ['%s::timestamptz', '%s', '%s::jsonb']) + ')'
+SUBTASK_COLUMNS = ('mission_id', 'subtask_id', 'position', 'title', 'description', 'type')
+DELIVERABLE_COLUMNS = ('mission_id', 'deliverable_id', 'title', 'format', 'description')
+FRAMEWORK_COLUMNS = ('mission_id', 'framework', 'code', 'name')
+
+# What a malformed mission file can raise while being parsed or turned into rows
+PARSE_ERRORS = (OSError, yaml.YAMLError, ValueError, TypeError, AttributeError, KeyError)
+
+# Rows per INSERT statement; keeps statements well under the parameter limit
+UPSERT_CHUNK = 1000
+
+
+# ---------------------------------------------------------------------------
+# Tables (mission_catalog models)
+# ---------------------------------------------------------------------------
+
+def _insert_rows(cursor, table, columns, rows, placeholders=None, conflict_sql='ON CONFLICT DO NOTHING'):
+    placeholders = placeholders or '(' + ', '.join(['%s'] * len(columns)) + ')'
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[start:start + UPSERT_CHUNK]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholders] * len(chunk))} "
+            f"{conflict_sql}",
+            [value for row in chunk for value in row],
+        )
+
+
+def _upsert_missions(cursor, rows):
+    updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in MISSION_COLUMNS[1:])
+    _insert_rows(cursor, MISSIONS_TABLE, MISSION_COLUMNS, rows, MISSION_PLACEHOLDERS,
+                 f'ON CONFLICT (mission_id) DO UPDATE SET {updates}, synced_at = NOW()')
+
+
+# ---------------------------------------------------------------------------
+# Rows from a mission file
+# ---------------------------------------------------------------------------
+
+def _text(value):
+    return str(value).strip() if value is not None else ''
+
+
+def mission_rows(mission, content_hash):
+    """(mission row, subtask rows, deliverable rows, framework rows) for one parsed mission."""
+    raw = mission.raw
+    meta = raw.get('mission_meta') or {}
+    header = raw.get('header') or {}
+    mission_row = (
+        mission.id, mission.version, content_hash, _text(mission.title), _text(header.get('slug')),
+        _text(meta.get('status')), mission.track, mission.tier, _text(mission.difficulty),
+        _text(header.get('estimated_duration')), meta.get('last_updated') or None,
+        str(mission.path or ''), json.dumps(raw, default=str),
+    )
+    # Authoring-tool placeholders (missing or repeated ids) would break the keys; first one wins
+    subtasks, deliverables, frameworks = {}, {}, {}
+    for position, entry in enumerate(raw.get('subtasks') or [], 1):
+        if entry:
+            subtask_id = _text(entry.get('id')) or str(position)
+            subtasks.setdefault(subtask_id, (
+                mission.id, subtask_id, entry.get('order') if isinstance(entry.get('order'), int) else position,
+                _text(entry.get('title')), _text(entry.get('description')), _text(entry.get('type')),
+            ))
+    for position, entry in enumerate(raw.get('deliverables') or [], 1):
+        if entry:
+            deliverable_id = _text(entry.get('id')) or f'del_{position:02d}'
+            deliverables.setdefault(deliverable_id, (
+                mission.id, deliverable_id, _text(entry.get('title')), _text(entry.get('format')),
+                _text(entry.get('description')),
+            ))
+    for framework, entries in (raw.get('framework_mappings') or {}).items():
+        for entry in entries or []:
+            if entry and _text(entry.get('code')):
+                frameworks.setdefault((framework, _text(entry['code'])),
+                                      (mission.id, framework, _text(entry['code']), _text(entry.get('name'))))
+    return mission_row, list(subtasks.values()), list(deliverables.values()), list(frameworks.values())
+
+
+# ---------------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------------
+
+def plan_sync(cursor, directory):
+    """Compare mission files with the catalog; returns the plan without writing anything."""
+    cursor.execute(f"SELECT mission_id, version, content_hash, source_path FROM {MISSIONS_TABLE}")
+    existing, by_path = {}, {}
+    for mission_id, version, content_hash, source_path in cursor.fetchall():
+        existing[mission_id] = (version, content_hash)
+        by_path.setdefault(source_path, mission_id)
+    known_hashes = {content_hash: mission_id for mission_id, (_, content_hash) in existing.items()}
+
+    plan = {'unchanged': [], 'new': [], 'changed': [], 'unbumped': [], 'stale': [], 'rows': [], 'errors': [],
+            'errored': []}
+    seen = {}
+
+    def failed(path, message):
+        # Whatever the catalog holds for this file stays put: it is not stale, just unreadable for now
+        plan['errors'].append(f'{path.name}: {message}')
+        for mission_id in (by_path.get(str(path)), path.stem.upper()):
+            if mission_id in existing and mission_id not in plan['errored']:
+                plan['errored'].append(mission_id)
+
+    for path in sorted(Path(directory).glob('*.y*ml')):
+        try:
+            source = path.read_bytes()
+        except OSError as e:
+            failed(path, e)
+            continue
+        content_hash = hashlib.sha256(source).hexdigest()
+        if content_hash in known_hashes:
+            seen[known_hashes[content_hash]] = path
+            plan['unchanged'].append(known_hashes[content_hash])
+            continue
+        try:
+            mission = loads_mission(source, path)
+            rows = mission_rows(mission, content_hash) if mission.id else None
+        except PARSE_ERRORS as e:
+            failed(path, f'{type(e).__name__}: {e}')
+            continue
+        if not mission.id:
+            failed(path, 'no mission_meta.id')
+            continue
+        if mission.id in seen:
+            plan['errors'].append(f'{path.name}: duplicate mission id {mission.id} (also in {seen[mission.id].name})')
+            continue
+        seen[mission.id] = path
+        if mission.id not in existing:
+            plan['new'].append(mission.id)
+        else:
+            plan['changed'].append(mission.id)
+            if existing[mission.id][0] == mission.version:
+                plan['unbumped'].append(mission.id)
+        plan['rows'].append(rows)
+    plan['stale'] = sorted(set(existing) - set(seen) - set(plan['errored']))
+    return plan
+
+
+def apply_plan(cursor, plan, prune=False):
+    """
+    Write the plan's rows; returns the number of missions written or removed.
+
+    Nothing is pruned if any file had errors: a file we could not read says nothing about its mission.
+    """
+    prune = prune and not plan['errors']
+    replaced = plan['changed'] + (plan['stale'] if prune else [])
+    if replaced:
+        for table in CHILD_TABLES:
+            cursor.execute(f"DELETE FROM {table} WHERE mission_id = ANY(%s)", [replaced])
+    if prune and plan['stale']:
+        cursor.execute(f"DELETE FROM {MISSIONS_TABLE} WHERE mission_id = ANY(%s)", [plan['stale']])
+    if plan['rows']:
+        _upsert_missions(cursor, [rows[0] for rows in plan['rows']])
+        _insert_rows(cursor, SUBTASKS_TABLE, SUBTASK_COLUMNS, [row for rows in plan['rows'] for row in rows[1]])
+        _insert_rows(cursor, DELIVERABLES_TABLE, DELIVERABLE_COLUMNS,
+                     [row for rows in plan['rows'] for row in rows[2]])
+        _insert_rows(cursor, FRAMEWORKS_TABLE, FRAMEWORK_COLUMNS, [row for rows in plan['rows'] for row in rows[3]])
+    return len(plan['rows']) + (len(plan['stale']) if prune else 0)
+
+
+def sync_catalog(directory=MISSION_HALL_DIR, prune=False, dry_run=False):
+    """Plan and apply a sync in one transaction. Returns the plan (without rows) plus timings."""
+    start = time.perf_counter()
+    with transaction.atomic(), connection.cursor() as cursor:
+        plan = plan_sync(cursor, directory)
+        written = 0 if dry_run else apply_plan(cursor, plan, prune)
+        if dry_run:
+            transaction.set_rollback(True)
+    plan.pop('rows')
+    plan['written'] = written
+    plan['seconds'] = time.perf_counter() - start
+    return plan
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _write_synthetic_catalog(directory, count):
+    """`count` mission files cloned from mission_hall with new ids."""
+    templates = [yaml.safe_load(path.read_text()) for path in sorted(MISSION_HALL_DIR.glob('*.y*ml'))]
+    if not templates:
+        raise SystemExit(f'❌ No mission files in {MISSION_HALL_DIR} to clone')
+    dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+    for i in range(count):
+        data = copy.deepcopy(templates[i % len(templates)])
+        data.setdefault('mission_meta', {})['id'] = f'BENCH-M{i:05d}'
+        data.setdefault('header', {})['title'] = f"{(data['header'].get('title') or 'Mission')} #{i}"
+        with open(os.path.join(directory, f'bench-m{i:05d}.yaml'), 'w') as f:
+            yaml.dump(data, f, Dumper=dumper, sort_keys=False)
+
+
+def _per_object_sync(cursor, directory):
+    """What a straightforward loader does: parse every file, one statement per object."""
+    for path in sorted(Path(directory).glob('*.y*ml')):
+        source = path.read_bytes()
+        mission = loads_mission(source, path)
+        mission_row, subtasks, deliverables, frameworks = mission_rows(mission, hashlib.sha256(source).hexdigest())
+        cursor.execute(f"SELECT 1 FROM {MISSIONS_TABLE} WHERE mission_id = %s", [mission.id])
+        if cursor.fetchone():
+            assignments = ', '.join(f'{column} = %s' for column in MISSION_COLUMNS[1:])
+            cursor.execute(f"UPDATE {MISSIONS_TABLE} SET {assignments} WHERE mission_id = %s",
+                           list(mission_row[1:]) + [mission.id])
+        else:
+            _insert_rows(cursor, MISSIONS_TABLE, MISSION_COLUMNS, [mission_row], MISSION_PLACEHOLDERS, '')
+        for table in CHILD_TABLES:
+            cursor.execute(f"DELETE FROM {table} WHERE mission_id = %s", [mission.id])
+        for table, columns, rows in ((SUBTASKS_TABLE, SUBTASK_COLUMNS, subtasks),
+                                     (DELIVERABLES_TABLE, DELIVERABLE_COLUMNS, deliverables),
+                                     (FRAMEWORKS_TABLE, FRAMEWORK_COLUMNS, frameworks)):
+            for row in rows:
+                _insert_rows(cursor, table, columns, [row], conflict_sql='')
+
+
+def _timed(label, fn, *args):
+    with instrument() as recorder:
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+    writes = sum(not record.sql.lstrip().upper().startswith('SELECT') for record in recorder.records)
+    print(f"  {label:<34} {elapsed:7.2f} s  {recorder.count:6d} statements  {writes:6d} writes")
+    return result
+
+
+def run_benchmark(count):
+    with tempfile.TemporaryDirectory() as directory:
+        _write_synthetic_catalog(directory, count)
+        print(f"{count} mission files")
+
+        def fresh_diff_sync():
+            with connection.cursor() as cursor:
+                return apply_plan(cursor, plan_sync(cursor, directory))
+
+        def clear():
+            with connection.cursor() as cursor:
+                for table in (MISSIONS_TABLE,) + CHILD_TABLES:
+                    cursor.execute(f"DELETE FROM {table}")
+
+        with transaction.atomic():
+            clear()
+            with connection.cursor() as cursor:
+                _timed('per-object sync, empty catalog', _per_object_sync, cursor, directory)
+                _timed('per-object sync, nothing changed', _per_object_sync, cursor, directory)
+            clear()
+            _timed('diff sync, empty catalog', fresh_diff_sync)
+            _timed('diff sync, nothing changed', fresh_diff_sync)
+
+            # Touch 1% of the files
+            for path in sorted(Path(directory).glob('*.yaml'))[::100]:
+                with open(path, 'a') as f:
+                    f.write('\n# reviewed\n')
+            _timed(f'diff sync, {len(range(0, count, 100))} files changed', fresh_diff_sync)
+            transaction.set_rollback(True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=str(MISSION_HALL_DIR), help='Directory of mission YAML files')
+    parser.add_argument('--prune', action='store_true', help='Remove catalog missions whose file is gone')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would change and roll back')
+    parser.add_argument('--benchmark', type=int, metavar='MISSIONS', help='Compare per-object and diff sync')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark)
+        return 0
+
+    result = sync_catalog(args.dir, prune=args.prune, dry_run=args.dry_run)
+    verb = 'Would write' if args.dry_run else 'Wrote'
+    print(f"✅ {verb} {len(result['new'])} new, {len(result['changed'])} changed missions "
+          f"({len(result['unchanged'])} unchanged) in {result['seconds']:.2f}s")
+    if result['unbumped']:
+        print(f"   ⚠️ Changed without a version bump: {', '.join(result['unbumped'])}")
+    if result['stale']:
+        pruned = args.prune and not args.dry_run and not result['errors']
+        print(f"   🧹 {'Removed' if pruned else 'No file for'}: {', '.join(result['stale'])}")
+        if args.prune and result['errors']:
+            print("   ⚠️ Not pruning: fix the errors below first")
+    for error in result['errors']:
+        print(f"   ❌ {error}")
+    return 1 if result['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
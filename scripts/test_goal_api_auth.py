@@ -13,10 +13,16 @@ sys.path.insert(0, '/home/fidel-ochieng-ogola/FIDEL OGOLA PERSONAL FOLDER/Ongoza
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
 django.setup()
 
+from query_instrumentation import QueryBudgetExceeded, install_at_exit, query_budget
+install_at_exit()
+
 from rest_framework_simplejwt.tokens import RefreshToken
 
 User = get_user_model()
 
+# Max SQL queries the goals endpoint may issue per request before the check fails
+GOALS_QUERY_BUDGET = int(os.environ.get('GOALS_QUERY_BUDGET', '15'))
+
 def test_goal_api_with_auth():
     # Create a test client
     client = Client()
@@ -62,8 +68,10 @@ def test_goal_api_with_auth():
     }
 
     try:
-        response = client.post('/api/v1/coaching/goals', goal_data, **headers)
+        with query_budget(GOALS_QUERY_BUDGET, label='POST /api/v1/coaching/goals') as queries:
+            response = client.post('/api/v1/coaching/goals', goal_data, **headers)
         print(f"Response status: {response.status_code}")
+        print(f"   Queries: {queries.count} (budget {GOALS_QUERY_BUDGET})")
 
         if response.status_code == 201:
             response_data = response.json()
@@ -81,6 +89,9 @@ def test_goal_api_with_auth():
             print(f"❌ Goal creation failed with status {response.status_code}")
             print(f"Response content: {response.content.decode()}")
 
+    except QueryBudgetExceeded as e:
+        print(f"❌ Query budget exceeded: {e}")
+        sys.exit(1)
     except Exception as e:
         print(f"❌ Error: {e}")
 
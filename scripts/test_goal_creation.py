@@ -13,6 +13,9 @@ sys.path.insert(0, '/home/fidel-ochieng-ogola/FIDEL OGOLA PERSONAL FOLDER/Ongoza
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
 django.setup()
 
+from query_instrumentation import install_at_exit
+install_at_exit()
+
 from django.test import Client
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -0,0 +1,5 @@
+"""Embedding cache keyed by model id and normalized-text hash, with micro-batched inference."""
+from .cache import EmbeddingCache, MicroBatcher, cache_key, normalize_text
+from .store import MmapVectorStore
+
+__all__ = ["EmbeddingCache", "MicroBatcher", "MmapVectorStore", "cache_key", "normalize_text"]
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Embedding throughput: one model call per request vs. the cache + micro-batcher.
+
+A stand-in model costs `--call-ms` per call plus `--per-text-ms` per text (the
+shape of a sentence-transformer forward pass). `--requests` concurrent requests
+each embed `--texts-per-request` texts drawn with a Zipf skew from
+`--distinct` texts, the way popular profiler answers and content repeat.
+
+Usage:
+    python -m shared.embedding_cache.benchmark --requests 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from .cache import EmbeddingCache
+
+DIM = 384
+
+
+def make_model(call_ms: float, per_text_ms: float):
+    calls = {"n": 0}
+
+    def embed_batch(texts: List[str]) -> np.ndarray:
+        calls["n"] += 1
+        time.sleep((call_ms + per_text_ms * len(texts)) / 1000.0)
+        rng = np.random.default_rng(abs(hash(tuple(texts))) % 2**32)
+        return rng.standard_normal((len(texts), DIM)).astype(np.float32)
+
+    return embed_batch, calls
+
+
+def make_workload(requests: int, texts_per_request: int, distinct: int, seed: int = 0) -> List[List[str]]:
+    rng = np.random.default_rng(seed)
+    picks = np.minimum(rng.zipf(1.3, size=(requests, texts_per_request)), distinct) - 1
+    return [[f"profiler answer {i}" for i in row] for row in picks]
+
+
+async def _run_all(handler, workload, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(texts):
+        async with semaphore:
+            await handler(texts)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(texts) for texts in workload))
+    return time.perf_counter() - start
+
+
+def run(requests: int, concurrency: int, texts_per_request: int, distinct: int,
+        call_ms: float, per_text_ms: float) -> int:
+    workload = make_workload(requests, texts_per_request, distinct)
+    print(f"{requests} requests x {texts_per_request} texts, {concurrency} concurrent, "
+          f"model {call_ms} ms/call + {per_text_ms} ms/text")
+
+    embed_batch, calls = make_model(call_ms, per_text_ms)
+
+    async def uncached(texts):
+        await asyncio.get_running_loop().run_in_executor(None, embed_batch, texts)
+
+    baseline = asyncio.run(_run_all(uncached, workload, concurrency))
+    print(f"  {'uncached, call per request':<30} {baseline:7.2f} s  {requests / baseline:8.0f} req/s  "
+          f"{calls['n']} model calls")
+
+    embed_batch, calls = make_model(call_ms, per_text_ms)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache("benchmark-model", embed_batch, store_path=tmp, dim=DIM, capacity=distinct)
+        cold = asyncio.run(_run_all(cache.embed, workload, concurrency))
+        m = cache.metrics()
+        print(f"  {'cache + batching, cold':<30} {cold:7.2f} s  {requests / cold:8.0f} req/s  "
+              f"{m['model_calls']} model calls, avg batch {m['avg_batch_size']:.1f}, hit rate {m['hit_rate']:.1%}")
+        cache.flush()
+
+        # A restarted worker reopens the memory-mapped store warm
+        restarted = EmbeddingCache("benchmark-model", embed_batch, store_path=tmp, dim=DIM, capacity=distinct)
+        warm = asyncio.run(_run_all(restarted.embed, workload, concurrency))
+        m = restarted.metrics()
+        print(f"  {'after restart, warm store':<30} {warm:7.2f} s  {requests / warm:8.0f} req/s  "
+              f"{m['model_calls']} model calls, hit rate {m['hit_rate']:.1%}")
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--texts-per-request", type=int, default=8)
+    parser.add_argument("--distinct", type=int, default=5000)
+    parser.add_argument("--call-ms", type=float, default=15.0)
+    parser.add_argument("--per-text-ms", type=float, default=0.5)
+    args = parser.parse_args(argv)
+    return run(args.requests, args.concurrency, args.texts_per_request, args.distinct,
+               args.call_ms, args.per_text_ms)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
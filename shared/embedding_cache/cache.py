@@ -0,0 +1,172 @@
+"""
+Embedding cache with content hashing and micro-batched inference.
+
+Texts are normalized (Unicode NFC, whitespace collapsed, trimmed) and keyed by
+blake2b(model_id + text), so the same answer or content text is embedded once
+per model no matter who asks. Hits come from the memory-mapped store; misses
+go through a MicroBatcher that gathers concurrent requests for up to
+`max_wait_ms` (or `max_batch` texts) into one model call. Identical misses that
+are already in flight wait on the same result instead of being re-embedded.
+
+    cache = EmbeddingCache("all-MiniLM-L6-v2", model.encode, store_path="/var/cache/och/embeddings", dim=384)
+    vectors = await cache.embed(["I enjoy breaking things to see how they work", ...])
+    cache.metrics()  # hit rate, batch sizes, model calls
+"""
+import asyncio
+import hashlib
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .store import KEY_BYTES, MmapVectorStore
+
+MAX_BATCH = int(os.environ.get("EMBEDDING_MAX_BATCH", "64"))
+MAX_WAIT_MS = float(os.environ.get("EMBEDDING_MAX_WAIT_MS", "5"))
+STORE_CAPACITY = int(os.environ.get("EMBEDDING_CACHE_CAPACITY", "200000"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(model_id: str, text: str) -> bytes:
+    digest = hashlib.blake2b(digest_size=KEY_BYTES)
+    digest.update(model_id.encode())
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode())
+    return digest.digest()
+
+
+class MicroBatcher:
+    """
+    Groups concurrent submit() calls into batched calls of `embed_batch(texts)`.
+
+    The model call runs in the default executor so the event loop keeps
+    accepting requests while a batch is being embedded.
+    """
+
+    def __init__(self, embed_batch: Callable[[List[str]], Sequence], max_batch: int = MAX_BATCH,
+                 max_wait_ms: float = MAX_WAIT_MS):
+        self.embed_batch = embed_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batch_sizes: Counter = Counter()
+
+    async def submit(self, text: str) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop, self._queue = loop, asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            self.batch_sizes[len(texts)] += 1
+            try:
+                vectors = await loop.run_in_executor(None, self.embed_batch, texts)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"embed_batch returned {len(vectors)} vectors for {len(texts)} texts")
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(np.asarray(vector, dtype=np.float32))
+
+    def metrics(self) -> Dict[str, float]:
+        batches = sum(self.batch_sizes.values())
+        texts = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "model_calls": batches,
+            "texts_embedded": texts,
+            "avg_batch_size": texts / batches if batches else 0.0,
+            "max_batch_size": max(self.batch_sizes, default=0),
+        }
+
+
+class EmbeddingCache:
+    """Use from a single event loop; the store itself is thread-safe."""
+
+    def __init__(self, model_id: str, embed_batch: Callable[[List[str]], Sequence], store_path: str,
+                 dim: int, capacity: int = STORE_CAPACITY, max_batch: int = MAX_BATCH,
+                 max_wait_ms: float = MAX_WAIT_MS):
+        self.model_id = model_id
+        self.store = MmapVectorStore(store_path, dim, capacity)
+        self.batcher = MicroBatcher(embed_batch, max_batch, max_wait_ms)
+        self._in_flight: Dict[bytes, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embeddings for `texts` as a (len(texts), dim) float32 array, in order."""
+        keys = [cache_key(self.model_id, text) for text in texts]
+        found = self.store.get_many(set(keys))
+        # hits, misses and coalesced all count distinct texts per call
+        self.hits += len(found)
+
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in pending:
+                continue
+            if key in self._in_flight:
+                self.coalesced += 1
+                pending[key] = self._in_flight[key]
+            else:
+                self.misses += 1
+                pending[key] = self._in_flight[key] = asyncio.ensure_future(self._compute(key, text))
+        if pending:
+            results = await asyncio.gather(*pending.values())
+            found.update(zip(pending.keys(), results))
+        return np.stack([found[key] for key in keys]) if keys else np.zeros((0, self.store.dim), np.float32)
+
+    async def _compute(self, key: bytes, text: str) -> np.ndarray:
+        try:
+            vector = await self.batcher.submit(normalize_text(text))
+            self.store.put_many({key: vector})
+            return vector
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def embed_one(self, text: str) -> np.ndarray:
+        return (await self.embed([text]))[0]
+
+    def flush(self) -> None:
+        self.store.flush()
+
+    def metrics(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            **self.batcher.metrics(),
+            **{f"store_{name}": value for name, value in self.store.stats().items()},
+        }
@@ -0,0 +1,127 @@
+"""
+Fixed-capacity, memory-mapped vector store with LRU eviction.
+
+Vectors live in one float32 file of shape (capacity, dim) opened with
+np.memmap, so a restarted worker gets its warm cache back without re-embedding.
+The key -> slot map and LRU order are kept in memory and written to
+index.npz on flush(); when the store is full, the least recently used key
+gives up its slot to the new entry. Each slot also records its own key, so
+after a crash between a slot being reused and the next flush(), stale index
+entries are detected on load and dropped instead of serving the wrong vector.
+
+Layout of a store directory:
+    vectors.f32   (capacity, dim) float32 memmap
+    keys.u8       (capacity, 16) uint8 memmap, the key currently held by each slot
+    index.npz     keys ((n, 16) uint8 digests) and slots, least recently used first
+    meta.json     dim, capacity
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+KEY_BYTES = 16
+
+
+class MmapVectorStore:
+
+    def __init__(self, path: str, dim: int, capacity: int = 100_000):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if (meta["dim"], meta["capacity"]) != (dim, capacity):
+                # Different model dimension or size: start over rather than misread vectors
+                self._reset_files()
+        self.dim = dim
+        self.capacity = capacity
+        with open(meta_path, "w") as f:
+            json.dump({"dim": dim, "capacity": capacity}, f)
+
+        vectors_path = os.path.join(path, "vectors.f32")
+        keys_path = os.path.join(path, "keys.u8")
+        mode = "r+" if os.path.exists(vectors_path) and os.path.exists(keys_path) else "w+"
+        self.vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode, shape=(capacity, dim))
+        self.slot_keys = np.memmap(keys_path, dtype=np.uint8, mode=mode, shape=(capacity, KEY_BYTES))
+        self._slots: "OrderedDict[bytes, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._lock = threading.Lock()
+        self._load_index()
+        self.evictions = 0
+
+    def _reset_files(self) -> None:
+        for name in ("vectors.f32", "keys.u8", "index.npz"):
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+
+    def _load_index(self) -> None:
+        index_path = os.path.join(self.path, "index.npz")
+        used = set()
+        if os.path.exists(index_path):
+            with np.load(index_path) as data:
+                for key, slot in zip(data["keys"], data["slots"]):
+                    key, slot = key.tobytes(), int(slot)
+                    if self.slot_keys[slot].tobytes() == key:
+                        self._slots[key] = slot
+                        used.add(slot)
+        self._free = [slot for slot in range(self.capacity - 1, -1, -1) if slot not in used]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._slots
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, np.ndarray]:
+        """Vectors for the keys that are present (copies, safe to keep after eviction)."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                slot = self._slots.get(key)
+                if slot is not None:
+                    self._slots.move_to_end(key)
+                    found[key] = np.array(self.vectors[slot])
+        return found
+
+    def put_many(self, items: Dict[bytes, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                slot = self._slots.get(key)
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                    else:
+                        _, slot = self._slots.popitem(last=False)
+                        self.evictions += 1
+                    self._slots[key] = slot
+                else:
+                    self._slots.move_to_end(key)
+                self.vectors[slot] = vector
+                self.slot_keys[slot] = np.frombuffer(key, dtype=np.uint8)
+
+    def flush(self) -> None:
+        """Persist vectors and the key index; call periodically and on shutdown."""
+        with self._lock:
+            self.vectors.flush()
+            self.slot_keys.flush()
+            # uint8 rows, not an "S" dtype: numpy strips trailing NUL bytes from bytes_ values
+            keys = np.frombuffer(b"".join(self._slots), dtype=np.uint8).reshape(-1, KEY_BYTES)
+            slots = np.fromiter(self._slots.values(), dtype=np.int64, count=len(self._slots))
+        tmp = os.path.join(self.path, ".index.tmp.npz")
+        np.savez(tmp, keys=keys, slots=slots)
+        os.replace(tmp, os.path.join(self.path, "index.npz"))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slots.clear()
+            self._free = list(range(self.capacity - 1, -1, -1))
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        return {"size": len(self._slots), "capacity": self.capacity, "evictions": self.evictions}
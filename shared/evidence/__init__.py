@@ -0,0 +1,46 @@
+"""Processors for uploaded mission evidence (traffic captures, packet captures, logs)."""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .har import HarFormatError, analyze_entries, analyze_har, analyze_many, iter_har_entries
+    from .pcap import FlowIndex, PcapFile, PcapFormatError, index_many, write_pcap
+    from .sanitize import Sanitizer, byte_ranges, sanitize_file
+
+# Submodule -> the names it provides. They are imported on first access, so that
+# `python -m shared.evidence.<module>` does not find its module already imported
+# by the package (runpy warns and the CLI would run a second copy of it).
+_EXPORTS = {
+    "har": ("HarFormatError", "analyze_entries", "analyze_har", "analyze_many", "iter_har_entries"),
+    "pcap": ("FlowIndex", "PcapFile", "PcapFormatError", "index_many", "write_pcap"),
+    "sanitize": ("Sanitizer", "byte_ranges", "sanitize_file"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = [
+    "FlowIndex",
+    "HarFormatError",
+    "PcapFile",
+    "PcapFormatError",
+    "Sanitizer",
+    "analyze_entries",
+    "analyze_har",
+    "analyze_many",
+    "byte_ranges",
+    "index_many",
+    "iter_har_entries",
+    "sanitize_file",
+    "write_pcap",
+]
+
+
+def __getattr__(name):
+    if name not in _MODULE_OF:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_MODULE_OF[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Streaming HAR analysis for API-security deliverables (ACM-M02 traffic captures).
+
+iter_har_entries() walks log.entries one entry at a time with
+json.JSONDecoder.raw_decode over a sliding read buffer, so memory is bounded by
+the largest single entry rather than the capture size.
+
+analyze_har() builds a per-endpoint index (METHOD + path template with id
+segments replaced by {id}) of which principal requested which object ids and
+what came back, then derives:
+
+- findings: sequential id enumeration, successful reads of objects that do not
+  belong to the requesting principal, and objects fetched by several principals;
+- features for scoring.ai_evaluation:
+    Script Efficiency    requests_to_first_exploit, duplicate_request_ratio,
+                         requests_per_second
+    False Positive Rate  denied_manipulation_ratio: id-manipulation requests
+                         that were refused rather than exposing data
+
+The principal of a request is taken from the JWT `sub`/`user_id` claim in its
+Authorization header (decoded, not verified), else a digest of the token or
+session cookie. A principal owns its own user id and any object whose JSON
+response names it as user_id / owner_id / customer_id; requests for anything
+else are id manipulation. Principals without a user id in their token are
+indexed but not classified.
+
+Usage:
+    python -m shared.evidence.har capture.har --target-id 9999 --index
+    python -m shared.evidence.har submissions/*.har --workers 8 --output features.jsonl
+"""
+import argparse
+import base64
+import hashlib
+import json
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+READ_SIZE = 1024 * 1024
+# Id-manipulation runs at least this long count as enumeration
+SEQUENTIAL_RUN = 5
+# Response bodies larger than this are not inspected for owner ids
+MAX_INSPECTED_BODY = 256 * 1024
+
+_ENTRIES_KEY = re.compile(r'"entries"\s*:\s*\[')
+_SEPARATORS = re.compile(r"[\s,]*")
+_ID_SEGMENT = re.compile(
+    r"^(?:\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{24,})$", re.IGNORECASE
+)
+_ID_PARAM = re.compile(r"(?:^id$|_id$|Id$|^user$|^account$|^uid$)")
+_OWNER_KEYS = ("user_id", "userId", "owner_id", "ownerId", "customer_id")
+_PRINCIPAL_CLAIMS = ("sub", "user_id", "userId", "uid", "id")
+
+
+class HarFormatError(ValueError):
+    pass
+
+
+def iter_har_entries(path: str, read_size: int = READ_SIZE) -> Iterator[Dict]:
+    """Yield log.entries of a HAR file one at a time."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        buffer = ""
+        while True:
+            chunk = f.read(read_size)
+            if not chunk:
+                raise HarFormatError(f"{path}: no log.entries array")
+            buffer += chunk
+            match = _ENTRIES_KEY.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            # Keep a tail in case the key straddles two reads
+            buffer = buffer[-32:]
+
+        pos, eof, want = 0, False, read_size
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            if pos < len(buffer):
+                try:
+                    entry, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise HarFormatError(f"{path}: malformed entry near character {pos}")
+                    # Entry continues past the buffer; read more, growing the read for huge entries
+                    want = max(want, len(buffer) - pos)
+                else:
+                    want = read_size
+                    yield entry
+                    continue
+            elif eof:
+                raise HarFormatError(f"{path}: truncated entries array")
+            chunk = f.read(want)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+def _b64url_json(segment: str) -> Dict:
+    try:
+        value = json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+    except ValueError:
+        return {}
+    # A payload of "1" or [..] decodes fine but carries no claims
+    return value if isinstance(value, dict) else {}
+
+
+def _number(value, cast=int, default=0):
+    """Capture fields are sometimes strings, null or garbage; never let one abort the file."""
+    try:
+        return cast(value or default)
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+
+def _digest(value: str) -> str:
+    return hashlib.blake2b(value.encode(), digest_size=6).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _token_principal(authorization: str) -> Tuple[str, Optional[str]]:
+    token = authorization.split()[-1]
+    parts = token.split(".")
+    if len(parts) == 3:
+        claims = _b64url_json(parts[1])
+        for claim in _PRINCIPAL_CLAIMS:
+            if claims.get(claim) not in (None, ""):
+                return f"user:{claims[claim]}", str(claims[claim])
+    return f"token:{_digest(token)}", None
+
+
+def principal_of(request: Dict) -> Tuple[str, Optional[str]]:
+    """(principal key, the principal's own user id if the token states it)."""
+    for header in request.get("headers") or []:
+        if header.get("name", "").lower() == "authorization" and header.get("value"):
+            # Captures reuse a handful of tokens; decode each once
+            return _token_principal(header["value"])
+    for cookie in request.get("cookies") or []:
+        if "session" in cookie.get("name", "").lower():
+            return f"session:{_digest(cookie.get('value', ''))}", None
+    return "anonymous", None
+
+
+@lru_cache(maxsize=65536)
+def endpoint_of(method: str, url: str) -> Tuple[str, List[str]]:
+    """("GET /api/v1/accounts/{id}/transactions", [object ids in the path and id-like query params])."""
+    parts = urlsplit(url)
+    segments, ids = [], []
+    for segment in parts.path.split("/"):
+        if _ID_SEGMENT.match(segment):
+            segments.append("{id}")
+            ids.append(segment)
+        else:
+            segments.append(segment)
+    template = "/".join(segments) or "/"
+    params = []
+    for name, value in parse_qsl(parts.query, keep_blank_values=True):
+        if _ID_PARAM.search(name) and _ID_SEGMENT.match(value):
+            params.append(f"{name}={{id}}")
+            ids.append(value)
+    if params:
+        template += "?" + "&".join(sorted(params))
+    return f"{method.upper()} {template}", ids
+
+
+def _owner_in_body(response: Dict) -> Optional[str]:
+    content = response.get("content") or {}
+    text = content.get("text")
+    if not text or "json" not in (content.get("mimeType") or "") or len(text) > MAX_INSPECTED_BODY:
+        return None
+    if content.get("encoding") == "base64":
+        try:
+            text = base64.b64decode(text).decode("utf-8", "replace")
+        except ValueError:
+            return None
+    try:
+        body = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(body, dict):
+        for key in _OWNER_KEYS:
+            if body.get(key) not in (None, ""):
+                return str(body[key])
+    return None
+
+
+@dataclass
+class EndpointIndex:
+    endpoint: str
+    requests: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    total_ms: float = 0.0
+    response_bytes: int = 0
+    # principal -> [(entry ordinal, object id, status, owner id from the response)] in capture order
+    accesses: Dict[str, List[Tuple[int, str, int, Optional[str]]]] = field(default_factory=lambda: defaultdict(list))
+
+    def summary(self) -> Dict:
+        return {
+            "endpoint": self.endpoint,
+            "requests": self.requests,
+            "statuses": dict(self.statuses),
+            "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+            "response_bytes": self.response_bytes,
+            "principals": len(self.accesses),
+            "object_ids": len({row[1] for rows in self.accesses.values() for row in rows}),
+        }
+
+
+def _longest_sequential_run(ids: Iterable[str]) -> Tuple[int, Optional[int]]:
+    numbers = sorted({int(i) for i in ids if i.isdigit()})
+    best, best_start, run, start = 0, None, 0, None
+    previous = None
+    for n in numbers:
+        if previous is not None and n == previous + 1:
+            run += 1
+        else:
+            run, start = 1, n
+        if run > best:
+            best, best_start = run, start
+        previous = n
+    return best, best_start
+
+
+def _is_manipulation(object_id: str, owner: Optional[str], own_id: Optional[str], own_objects: set) -> bool:
+    if owner is not None and own_id is not None:
+        return owner != own_id
+    return own_id is not None and object_id not in own_objects
+
+
+def analyze_har(path: str, target_ids: Sequence[str] = ()) -> Dict:
+    """One streaming pass over a HAR file: {'features': {...}, 'findings': [...], 'endpoints': [...]}."""
+    return analyze_entries(iter_har_entries(path), target_ids, path)
+
+
+def analyze_entries(entries_iter: Iterable[Dict], target_ids: Sequence[str] = (), path: str = "") -> Dict:
+    started = time.perf_counter()
+    index: Dict[str, EndpointIndex] = {}
+    own_ids: Dict[str, Optional[str]] = {}
+    seen_requests = set()
+    duplicates = 0
+    first_ts = last_ts = None
+    entries = 0
+
+    for ordinal, entry in enumerate(entries_iter):
+        entries += 1
+        request = entry.get("request") or {}
+        response = entry.get("response") or {}
+        method, url = request.get("method", "GET"), request.get("url", "")
+        status = _number(response.get("status"))
+        started_at = entry.get("startedDateTime") or ""
+        first_ts = first_ts or started_at
+        last_ts = started_at or last_ts
+
+        body = (request.get("postData") or {}).get("text") or ""
+        key = hashlib.blake2b(f"{method} {url}\0{body}".encode(), digest_size=8).digest()
+        if key in seen_requests:
+            duplicates += 1
+        else:
+            seen_requests.add(key)
+
+        endpoint, ids = endpoint_of(method, url)
+        stats = index.get(endpoint)
+        if stats is None:
+            stats = index[endpoint] = EndpointIndex(endpoint)
+        stats.requests += 1
+        stats.statuses[status] += 1
+        stats.total_ms += _number(entry.get("time"), float, 0.0)
+        stats.response_bytes += max(_number((response.get("content") or {}).get("size")), 0)
+        if ids:
+            principal, own_id = principal_of(request)
+            own_ids.setdefault(principal, own_id)
+            owner = _owner_in_body(response) if 200 <= status < 300 else None
+            stats.accesses[principal].append((ordinal, ids[-1], status, owner))
+
+    # A principal's own objects: its user id plus anything a response says it owns
+    own_objects = defaultdict(set)
+    for principal, own_id in own_ids.items():
+        if own_id is not None:
+            own_objects[principal].add(own_id)
+    for stats in index.values():
+        for principal, rows in stats.accesses.items():
+            own_id = own_ids[principal]
+            own_objects[principal].update(object_id for _, object_id, _, owner in rows
+                                          if owner is not None and owner == own_id)
+
+    findings = []
+    manipulated = successful = denied = 0
+    first_exploit = None
+    target_ids = {str(t) for t in target_ids}
+    target_hit = False
+    for stats in index.values():
+        principals_by_object = defaultdict(set)
+        for principal, rows in stats.accesses.items():
+            own_id = own_ids[principal]
+            foreign = []
+            for ordinal, object_id, status, owner in rows:
+                ok = 200 <= status < 300
+                if ok:
+                    principals_by_object[object_id].add(principal)
+                if not _is_manipulation(object_id, owner, own_id, own_objects[principal]):
+                    continue
+                manipulated += 1
+                if ok:
+                    successful += 1
+                    foreign.append(object_id)
+                    first_exploit = ordinal if first_exploit is None else min(first_exploit, ordinal)
+                    target_hit = target_hit or object_id in target_ids or owner in target_ids
+                elif status in (401, 403, 404):
+                    denied += 1
+            if foreign:
+                findings.append({"type": "cross_user_access", "endpoint": stats.endpoint, "principal": principal,
+                                 "own_id": own_id, "foreign_objects": foreign[:20], "count": len(foreign)})
+
+            run, start = _longest_sequential_run(object_id for _, object_id, _, _ in rows)
+            if run >= SEQUENTIAL_RUN:
+                findings.append({"type": "sequential_enumeration", "endpoint": stats.endpoint,
+                                 "principal": principal, "run": run, "first_id": start,
+                                 "successful_responses": sum(1 for row in rows if 200 <= row[2] < 300)})
+        shared = sorted(object_id for object_id, principals in principals_by_object.items() if len(principals) > 1)
+        if shared:
+            findings.append({"type": "object_shared_across_principals", "endpoint": stats.endpoint,
+                             "object_ids": shared[:20], "count": len(shared)})
+
+    duration = _seconds_between(first_ts, last_ts)
+    features = {
+        "entries": entries,
+        "endpoints": len(index),
+        "id_endpoints": sum(1 for stats in index.values() if stats.accesses),
+        "principals": len(own_ids),
+        "capture_seconds": duration,
+        "requests_per_second": round(entries / duration, 2) if duration else None,
+        "duplicate_request_ratio": round(duplicates / entries, 4) if entries else 0.0,
+        "manipulated_requests": manipulated,
+        "successful_manipulations": successful,
+        "denied_manipulations": denied,
+        "denied_manipulation_ratio": round(denied / manipulated, 4) if manipulated else None,
+        "requests_to_first_exploit": first_exploit + 1 if first_exploit is not None else None,
+        "target_object_retrieved": target_hit,
+        "findings": dict(Counter(finding["type"] for finding in findings)),
+        "analysis_seconds": round(time.perf_counter() - started, 3),
+    }
+    return {
+        "path": path,
+        "features": features,
+        "findings": findings,
+        "endpoints": sorted((stats.summary() for stats in index.values()), key=lambda s: -s["requests"]),
+    }
+
+
+def _seconds_between(first: Optional[str], last: Optional[str]) -> Optional[float]:
+    from datetime import datetime
+
+    try:
+        start = datetime.fromisoformat(first.replace("Z", "+00:00"))
+        end = datetime.fromisoformat(last.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return round((end - start).total_seconds(), 3)
+
+
+def _analyze_safely(args: Tuple[str, Tuple[str, ...]]) -> Dict:
+    path, target_ids = args
+    try:
+        return analyze_har(path, target_ids)
+    except (OSError, HarFormatError) as e:
+        return {"path": path, "error": str(e)}
+    except Exception as e:
+        # One malformed capture must not take down the rest of the cohort (or the pool)
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+
+
+def analyze_many(paths: Sequence[str], target_ids: Sequence[str] = (), workers: Optional[int] = None) -> Iterator[Dict]:
+    """Analyze a cohort's captures across processes; yields results as they finish, in input order."""
+    jobs = [(path, tuple(target_ids)) for path in paths]
+    if workers == 1 or len(jobs) <= 1:
+        yield from map(_analyze_safely, jobs)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(_analyze_safely, jobs)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--target-id", action="append", default=[], help="Object id the mission asks for")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--output", help="Write one JSON result per line here instead of stdout")
+    parser.add_argument("--index", action="store_true", help="Print the per-endpoint index")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    failed = 0
+    try:
+        for result in analyze_many(args.paths, args.target_id, args.workers):
+            failed += "error" in result
+            if not args.index:
+                result.pop("endpoints", None)
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if args.output:
+            out.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
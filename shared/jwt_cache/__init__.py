@@ -0,0 +1,20 @@
+"""Cached JWT verification shared by Django and FastAPI."""
+from .verifier import (
+    InvalidToken,
+    RevocationStore,
+    RevokedToken,
+    TokenVerifier,
+    VerifiedToken,
+    decode_hs256,
+    token_digest,
+)
+
+__all__ = [
+    "InvalidToken",
+    "RevocationStore",
+    "RevokedToken",
+    "TokenVerifier",
+    "VerifiedToken",
+    "decode_hs256",
+    "token_digest",
+]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Per-request auth overhead: verifying every token vs. the cached verifier.
+
+Simulates `--users` users each making `--requests-per-token` requests with one
+access token, in shuffled order. "uncached" decodes the HS256 token and looks
+the user up on every request; "cached" goes through TokenVerifier, which caches
+the decoded claims only, and still looks the user up on every request (as
+CachedJWTAuthentication does). The user lookup is simulated with a
+`--lookup-us` busy wait (roughly one indexed SELECT).
+
+Usage:
+    python -m shared.jwt_cache.benchmark --users 500 --requests-per-token 20
+    python -m shared.jwt_cache.benchmark --redis     # include the revocation check on misses
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from typing import Optional
+
+import jwt
+
+from .verifier import RevocationStore, TokenVerifier
+
+SECRET = "benchmark-secret-0123456789abcdef0123"
+
+
+def _issue(user_id: str, lifetime: int = 3600) -> str:
+    now = int(time.time())
+    return jwt.encode(
+        {"token_type": "access", "user_id": user_id, "jti": uuid.uuid4().hex, "iat": now, "exp": now + lifetime},
+        SECRET, algorithm="HS256",
+    )
+
+
+def _decode(token: str):
+    return jwt.decode(token, SECRET, algorithms=["HS256"])
+
+
+def _make_lookup(lookup_us: float):
+    def load_user(claims):
+        deadline = time.perf_counter() + lookup_us / 1e6
+        while time.perf_counter() < deadline:
+            pass
+        return {"id": claims["user_id"], "is_active": True}
+    return load_user
+
+
+def run(users: int, requests_per_token: int, lookup_us: float, use_redis: bool) -> int:
+    tokens = [_issue(str(uuid.uuid4())) for _ in range(users)]
+    stream = tokens * requests_per_token
+    random.Random(0).shuffle(stream)
+    load_user = _make_lookup(lookup_us)
+
+    start = time.perf_counter()
+    for token in stream:
+        load_user(_decode(token))
+    uncached = (time.perf_counter() - start) / len(stream)
+
+    verifier = TokenVerifier(decode=_decode, revocations=RevocationStore() if use_redis else None)
+    start = time.perf_counter()
+    for token in stream:
+        load_user(verifier.verify(token).claims)
+    cached = (time.perf_counter() - start) / len(stream)
+
+    # Steady state: every token already cached
+    start = time.perf_counter()
+    for token in stream:
+        load_user(verifier.verify(token).claims)
+    warm = (time.perf_counter() - start) / len(stream)
+
+    stats = verifier.stats()
+    print(f"Auth overhead, {users} tokens x {requests_per_token} requests, "
+          f"{lookup_us:.0f} us simulated user lookup, revocation check: {'redis' if use_redis else 'off'}")
+    print(f"  {'uncached (decode + lookup)':<30} {uncached * 1e6:>8.1f} us/request")
+    print(f"  {'cached, cold start':<30} {cached * 1e6:>8.1f} us/request   {uncached / cached:>5.1f}x")
+    print(f"  {'cached, warm':<30} {warm * 1e6:>8.1f} us/request   {uncached / warm:>5.1f}x")
+    print(f"  hit rate {stats['hit_rate']:.1%} over {stats['hits'] + stats['misses']} verifications")
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--requests-per-token", type=int, default=20)
+    parser.add_argument("--lookup-us", type=float, default=300.0)
+    parser.add_argument("--redis", action="store_true")
+    args = parser.parse_args(argv)
+    return run(args.users, args.requests_per_token, args.lookup_us, args.redis)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
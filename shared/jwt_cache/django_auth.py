@@ -0,0 +1,68 @@
+"""
+Drop-in replacement for rest_framework_simplejwt's JWTAuthentication.
+
+    REST_FRAMEWORK = {
+        "DEFAULT_AUTHENTICATION_CLASSES": [
+            "shared.jwt_cache.django_auth.CachedJWTAuthentication",
+        ],
+    }
+
+The first request with a token runs simplejwt's own validation; later requests
+with the same token reuse the validated claims from the process-wide verifier.
+The user is still loaded per request (simplejwt's get_user: one primary-key
+SELECT, which also rejects inactive users), so every request gets its own
+instance and deactivation takes effect immediately.
+Call revoke_user() when a user changes password, and revoke_token() on logout.
+"""
+from functools import lru_cache
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken as SimpleJWTInvalidToken
+
+from .verifier import InvalidToken, RevocationStore, TokenVerifier
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        try:
+            verified = verifier().verify(raw_token)
+        except InvalidToken as e:
+            raise SimpleJWTInvalidToken({"detail": str(e)})
+        return self.get_user(verified.claims), verified.claims
+
+
+@lru_cache(maxsize=1)
+def _revocations() -> RevocationStore:
+    return RevocationStore()
+
+
+@lru_cache(maxsize=1)
+def verifier() -> TokenVerifier:
+    """Process-wide verifier; DRF builds a new authenticator per request, so it cannot hold the cache."""
+    from rest_framework_simplejwt.settings import api_settings
+
+    authenticator = JWTAuthentication()
+    return TokenVerifier(
+        decode=lambda raw: authenticator.get_validated_token(raw.encode()),
+        revocations=_revocations(),
+        user_claim=api_settings.USER_ID_CLAIM,
+    )
+
+
+def revoke_token(access_token) -> None:
+    """Revoke one simplejwt access token (e.g. on logout)."""
+    _revocations().revoke_token(access_token["jti"], access_token["exp"])
+
+
+def revoke_user(user) -> None:
+    """Revoke every token issued to `user` so far."""
+    from rest_framework_simplejwt.settings import api_settings
+
+    _revocations().revoke_user(getattr(user, api_settings.USER_ID_FIELD))
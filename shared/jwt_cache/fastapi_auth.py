@@ -0,0 +1,53 @@
+"""
+FastAPI dependencies backed by the cached verifier.
+
+    from shared.jwt_cache.fastapi_auth import verify_token
+
+    @router.get("/recommendations")
+    async def recommendations(user_id: UUID = Depends(verify_token)):
+        ...
+"""
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from .verifier import InvalidToken, RevocationStore, RevokedToken, TokenVerifier, decode_hs256
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+@lru_cache(maxsize=1)
+def verifier() -> TokenVerifier:
+    return TokenVerifier(decode=decode_hs256, revocations=RevocationStore())
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+# Plain def: a cache miss does a blocking Redis MGET, so FastAPI runs this in its threadpool
+def current_claims(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> Mapping[str, Any]:
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    try:
+        return verifier().verify(credentials.credentials).claims
+    except RevokedToken:
+        raise _unauthorized("Token has been revoked")
+    except InvalidToken:
+        raise _unauthorized("Invalid or expired token")
+
+
+async def verify_token(claims: Mapping[str, Any] = Depends(current_claims)) -> UUID:
+    try:
+        return UUID(str(claims["user_id"]))
+    except (KeyError, ValueError):
+        raise _unauthorized("Token has no valid user_id")
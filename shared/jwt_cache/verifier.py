@@ -0,0 +1,233 @@
+"""
+Cached JWT verification shared by Django and FastAPI.
+
+Both services verify the same HS256 access tokens. TokenVerifier keeps the
+decoded claims and the token's user id in a bounded per-process LRU keyed by
+the token's SHA-256 digest, so a token's signature is checked once per process
+instead of on every request. Entries live until the token expires, capped at
+JWT_CACHE_LOCAL_TTL seconds. User objects are deliberately not cached: a
+shared instance would be mutated across requests and threads, and is_active
+or permission changes must apply on the next request, not at the next
+revocation.
+
+Revocations go through Redis (RevocationStore):
+- revoke_token(jti, exp) blocks one token until it expires;
+- revoke_user(user_id) blocks every token for that user issued up to now.
+Both are checked in one round trip when a token is first seen, and published
+on a pub/sub channel so every process evicts matching cache entries at once.
+The check is repeated once the entry is cached, so a revocation whose message
+arrived between the first check and the insert is not missed. The local TTL
+bounds how long a missed message can keep a revoked token alive.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "")
+JWT_ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
+LOCAL_MAXSIZE = int(os.environ.get("JWT_CACHE_MAXSIZE", "10000"))
+LOCAL_TTL = float(os.environ.get("JWT_CACHE_LOCAL_TTL", "300"))
+# How long a user-wide revocation is kept; must cover the longest access token lifetime
+USER_REVOCATION_TTL = int(os.environ.get("JWT_USER_REVOCATION_TTL", "86400"))
+
+REVOKED_JTI_PREFIX = "jwt:revoked:jti:"
+REVOKED_USER_PREFIX = "jwt:revoked:user:"
+REVOCATION_CHANNEL = "jwt:revocations"
+ACCESS_TOKEN_TYPE = "access"
+
+
+class InvalidToken(Exception):
+    """The token is malformed, has a bad signature, or has expired."""
+
+
+class RevokedToken(InvalidToken):
+    """The token, or every token for its user, has been revoked."""
+
+
+@dataclass(frozen=True)
+class VerifiedToken:
+    claims: Mapping[str, Any]
+    user_id: Any = None
+
+
+def token_digest(token) -> bytes:
+    if isinstance(token, str):
+        token = token.encode()
+    return hashlib.sha256(token).digest()
+
+
+def _default_redis():
+    import redis
+
+    return redis.Redis(
+        host=os.environ.get("REDIS_HOST", "localhost"),
+        port=int(os.environ.get("REDIS_PORT", "6379")),
+        db=int(os.environ.get("REDIS_DB", "0")),
+        socket_timeout=float(os.environ.get("REDIS_SOCKET_TIMEOUT", "2")),
+    )
+
+
+class RevocationStore:
+    """Redis-backed token/user revocation list with pub/sub fan-out."""
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn if redis_conn is not None else _default_redis()
+
+    def revoke_token(self, jti: str, exp: Optional[float] = None) -> None:
+        ttl = max(int((exp or time.time() + USER_REVOCATION_TTL) - time.time()), 1)
+        self.redis.set(REVOKED_JTI_PREFIX + jti, 1, ex=ttl)
+        self.redis.publish(REVOCATION_CHANNEL, f"jti:{jti}")
+
+    def revoke_user(self, user_id) -> None:
+        revoked_at = int(time.time())
+        self.redis.set(REVOKED_USER_PREFIX + str(user_id), revoked_at, ex=USER_REVOCATION_TTL)
+        self.redis.publish(REVOCATION_CHANNEL, f"user:{user_id}:{revoked_at}")
+
+    def is_revoked(self, jti: Optional[str], user_id, issued_at: Optional[float]) -> bool:
+        """One MGET for both the token and the user-wide revocation."""
+        jti_flag, user_cutoff = self.redis.mget(
+            REVOKED_JTI_PREFIX + (jti or ""), REVOKED_USER_PREFIX + str(user_id)
+        )
+        if jti and jti_flag is not None:
+            return True
+        return user_cutoff is not None and (issued_at is None or issued_at <= int(user_cutoff))
+
+    def listen(self, on_message: Callable[[str], None]) -> None:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(REVOCATION_CHANNEL)
+        for message in pubsub.listen():
+            on_message(message["data"].decode())
+
+
+def decode_hs256(token: str) -> Dict[str, Any]:
+    """Default decoder: verify signature, expiry and that it is an access (not refresh) token."""
+    try:
+        claims = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except jwt.PyJWTError as e:
+        raise InvalidToken(str(e)) from e
+    if claims.get("token_type") != ACCESS_TOKEN_TYPE:
+        raise InvalidToken("token is not an access token")
+    return claims
+
+
+class TokenVerifier:
+    """
+    Verify tokens through a bounded LRU of decoded claims.
+
+    `decode(token)` must verify the token and return its claims (any mapping
+    with .get), raising InvalidToken or the framework's own error otherwise.
+    Callers resolve `user_id` to a user themselves, per request.
+    """
+
+    def __init__(self, decode: Callable[[str], Mapping[str, Any]] = decode_hs256,
+                 revocations: Optional[RevocationStore] = None, user_claim: str = "user_id",
+                 maxsize: int = LOCAL_MAXSIZE, local_ttl: float = LOCAL_TTL):
+        self.decode = decode
+        self.revocations = revocations
+        self.user_claim = user_claim
+        self.maxsize = maxsize
+        self.local_ttl = local_ttl
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._listener_started = False
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token) -> VerifiedToken:
+        key = token_digest(token)
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                entry, expires = item
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                del self._entries[key]
+            self.misses += 1
+
+        self._ensure_listener()
+        claims = self.decode(token.decode() if isinstance(token, bytes) else token)
+        if self._is_revoked(claims):
+            raise RevokedToken("token has been revoked")
+        entry = VerifiedToken(claims, claims.get(self.user_claim))
+
+        exp = claims.get("exp")
+        expires = min(float(exp), now + self.local_ttl) if exp is not None else now + self.local_ttl
+        with self._lock:
+            self._entries[key] = (entry, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        # A revocation published after the first check may have tried to evict
+        # this entry before it was inserted; check again now that it is visible.
+        if self._is_revoked(claims):
+            with self._lock:
+                self._entries.pop(key, None)
+            raise RevokedToken("token has been revoked")
+        return entry
+
+    def _is_revoked(self, claims) -> bool:
+        if self.revocations is None:
+            return False
+        try:
+            return self.revocations.is_revoked(claims.get("jti"), claims.get(self.user_claim), claims.get("iat"))
+        except Exception as e:
+            # Signature and expiry are already verified; prefer availability over a Redis outage
+            logger.warning("JWT revocation check failed, accepting token: %s", e)
+            return False
+
+    def _ensure_listener(self) -> None:
+        if self.revocations is None or self._listener_started:
+            return
+        with self._lock:
+            if self._listener_started:
+                return
+            self._listener_started = True
+        threading.Thread(target=self._listen, name="jwt-revocations", daemon=True).start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                self.revocations.listen(self.handle_revocation)
+            except Exception as e:
+                logger.warning("JWT revocation listener disconnected, clearing cache: %s", e)
+                # Messages may have been missed while disconnected
+                self.clear()
+                time.sleep(1)
+
+    def handle_revocation(self, message: str) -> None:
+        """Evict cached entries matching a 'jti:<jti>' or 'user:<id>:<revoked_at>' message."""
+        kind, _, rest = message.partition(":")
+        if kind == "jti":
+            self._evict(lambda claims: claims.get("jti") == rest)
+        elif kind == "user":
+            user_id, _, revoked_at = rest.rpartition(":")
+            cutoff = int(revoked_at)
+            self._evict(lambda claims: str(claims.get(self.user_claim)) == user_id
+                        and (claims.get("iat") is None or claims.get("iat") <= cutoff))
+
+    def _evict(self, predicate: Callable[[Mapping[str, Any]], bool]) -> None:
+        # Revocations are rare, so a scan is cheaper than maintaining secondary indexes
+        with self._lock:
+            for key in [k for k, (entry, _) in self._entries.items() if predicate(entry.claims)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,50 @@
+"""Mission catalog (mission_hall/*.yaml) and mission recommendations."""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .catalog import (
+        IMPACT_WEIGHTS,
+        Mission,
+        iter_missions,
+        load_catalog,
+        load_mission,
+        loads_mission,
+        normalize_skill,
+        parse_mission,
+    )
+    from .recommender import MissionIndex
+
+# Submodule -> the names it provides. They are imported on first access, so that
+# `python -m shared.missions.<module>` does not find its module already imported
+# by the package (runpy warns and the CLI would run a second copy of it).
+_EXPORTS = {
+    "catalog": ("IMPACT_WEIGHTS", "Mission", "iter_missions", "load_catalog", "load_mission", "loads_mission",
+                "normalize_skill", "parse_mission"),
+    "recommender": ("MissionIndex",),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = [
+    "IMPACT_WEIGHTS",
+    "Mission",
+    "MissionIndex",
+    "iter_missions",
+    "load_catalog",
+    "load_mission",
+    "loads_mission",
+    "normalize_skill",
+    "parse_mission",
+]
+
+
+def __getattr__(name):
+    if name not in _MODULE_OF:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_MODULE_OF[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Recommendation latency over a synthetic catalog the size mission_hall is heading for.
+
+Missions get 1-4 skills from a `--skills` vocabulary, 0-3 framework codes and a
+random tier; each query is a learner with 20 weighted skills and a tier.
+
+Usage:
+    python -m shared.missions.benchmark --missions 5000 --queries 1000
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from .catalog import IMPACT_WEIGHTS, Mission
+from .recommender import MissionIndex
+
+def synthetic_missions(n: int, skills: int = 300, seed: int = 0) -> List[Mission]:
+    rng = np.random.default_rng(seed)
+    tracks = ["defender", "offensive", "grc", "innovation", "leader"]
+    frameworks = [("mitre_attack", f"T{1000 + i}") for i in range(200)] + [("nist_csf", f"PR.{i}") for i in range(50)]
+    impacts = list(IMPACT_WEIGHTS)
+    return [
+        Mission(
+            id=f"SYN-{i:05d}", version="1.0.0", title=f"Synthetic {i}",
+            track=tracks[rng.integers(len(tracks))], tier=int(rng.integers(1, 4)), difficulty="",
+            skills=[(f"skill {s}", impacts[rng.integers(3)]) for s in rng.choice(skills, rng.integers(1, 5), replace=False)],
+            frameworks=[frameworks[f] for f in rng.choice(len(frameworks), rng.integers(0, 4), replace=False)],
+        )
+        for i in range(n)
+    ]
+
+
+def run(missions: int, queries: int, skills: int) -> int:
+    start = time.perf_counter()
+    index = MissionIndex(synthetic_missions(missions, skills))
+    built = time.perf_counter() - start
+    rng = np.random.default_rng(1)
+    learners = [
+        index.learner_vector({f"skill {s}": float(rng.random()) for s in rng.choice(skills, 20, replace=False)},
+                             tier=int(rng.integers(1, 4)))
+        for _ in range(queries)
+    ]
+    for label, track in (("all missions", None), ("one track", "defender")):
+        latencies = []
+        for learner in learners:
+            start = time.perf_counter()
+            index.recommend(learner, k=10, track=track)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"  {label:<14} p50 {p50:7.0f} us   p99 {p99:7.0f} us")
+    start = time.perf_counter()
+    for _ in range(queries):
+        index.recommend(None, k=10, track="defender")
+    cached = (time.perf_counter() - start) / queries * 1e6
+    print(f"  {'cached default':<14} {cached:7.1f} us/request")
+    print(f"  ({missions} missions, {len(index.features)} features, {len(index.data)} non-zeros, "
+          f"built in {built * 1000:.0f} ms)")
+    return 0
+
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--missions", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--skills", type=int, default=300)
+    args = parser.parse_args(argv)
+    return run(args.missions, args.queries, args.skills)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Loader for mission definitions in mission_hall/*.yaml.
+
+Each file holds one mission: mission_meta (id, version), header (track, tier,
+difficulty), framework_mappings ({framework: [{code, name}]}) and
+scoring.skills_update ([{skill, impact}]). Empty placeholders left by the
+authoring tool (skill: "", code: "") are dropped here so callers never see them.
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+BASE_DIR = Path(__file__).parent.parent.parent
+MISSION_HALL_DIR = BASE_DIR / "mission_hall"
+
+# libyaml's loader when PyYAML was built with it; several times faster on large catalogs
+SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# skills_update impact level -> weight / skill-profile delta
+IMPACT_WEIGHTS = {"low": 1.0, "medium": 2.0, "high": 3.0}
+
+
+def normalize_skill(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+@dataclass
+class Mission:
+    id: str
+    version: str
+    title: str
+    track: str
+    tier: Optional[int]
+    difficulty: str
+    skills: List[Tuple[str, str]] = field(default_factory=list)          # (normalized skill, impact)
+    frameworks: List[Tuple[str, str]] = field(default_factory=list)      # (framework, code)
+    path: Optional[Path] = None
+    raw: Dict = field(default_factory=dict, repr=False)
+
+
+def parse_mission(data: Dict, path: Optional[Path] = None) -> Mission:
+    meta = data.get("mission_meta") or {}
+    header = data.get("header") or {}
+    skills = [
+        (normalize_skill(entry["skill"]), str(entry.get("impact") or "medium").lower())
+        for entry in (data.get("scoring") or {}).get("skills_update") or []
+        if entry and (entry.get("skill") or "").strip()
+    ]
+    frameworks = [
+        (framework, str(entry["code"]).strip())
+        for framework, entries in (data.get("framework_mappings") or {}).items()
+        for entry in entries or []
+        if entry and str(entry.get("code") or "").strip()
+    ]
+    tier = header.get("tier")
+    return Mission(
+        id=str(meta.get("id") or (path.stem.upper() if path else "")),
+        version=str(meta.get("version") or ""),
+        title=header.get("title") or "",
+        track=str(header.get("track") or "").lower(),
+        tier=int(tier) if tier not in (None, "") else None,
+        difficulty=header.get("difficulty") or "",
+        skills=skills,
+        frameworks=frameworks,
+        path=path,
+        raw=data,
+    )
+
+
+def loads_mission(source: bytes, path: Optional[Path] = None) -> Mission:
+    return parse_mission(yaml.load(source, Loader=SAFE_LOADER) or {}, path)
+
+
+def load_mission(path: Path) -> Mission:
+    with open(path, "rb") as f:
+        return loads_mission(f.read(), Path(path))
+
+
+def iter_missions(directory: Path = MISSION_HALL_DIR) -> Iterator[Mission]:
+    for path in sorted(Path(directory).glob("*.y*ml")):
+        yield load_mission(path)
+
+
+def load_catalog(directory: Path = MISSION_HALL_DIR) -> Dict[str, Mission]:
+    """All missions keyed by mission id."""
+    return {mission.id: mission for mission in iter_missions(directory)}
@@ -0,0 +1,48 @@
+"""OpenAPI schema tooling: merging, validation, compiled request/response validators, payloads, mocks and shards."""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .mockserver import LatencyModel, MockService
+    from .payloads import PayloadSynthesizer
+    from .shards import ShardedSpec, build_shards, write_shards
+    from .validators import CompiledSpec, ValidationError, audit, generate_source, load_validators, spec_hash
+
+# Submodule -> the names it provides. They are imported on first access, so that
+# `python -m shared.openapi.<module>` does not find its module already imported
+# by the package (runpy warns and the CLI would run a second copy of it).
+_EXPORTS = {
+    "mockserver": ("LatencyModel", "MockService"),
+    "payloads": ("PayloadSynthesizer",),
+    "shards": ("ShardedSpec", "build_shards", "write_shards"),
+    "validators": ("CompiledSpec", "ValidationError", "audit", "generate_source", "load_validators",
+                   "spec_hash"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = [
+    "CompiledSpec",
+    "LatencyModel",
+    "MockService",
+    "PayloadSynthesizer",
+    "ShardedSpec",
+    "ValidationError",
+    "audit",
+    "build_shards",
+    "generate_source",
+    "load_validators",
+    "spec_hash",
+    "write_shards",
+]
+
+
+def __getattr__(name):
+    if name not in _MODULE_OF:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_MODULE_OF[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
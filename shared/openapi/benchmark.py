@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Compiled OpenAPI validators vs. a generic JSON-schema validator.
+
+A synthetic DRF-style spec (missions, submissions with polymorphic evidence,
+paginated lists, nullable nested objects, enums and formats, plus --extra
+filler schemas) is compiled once cold and once from the on-disk cache. Valid
+payloads are generated from each schema and mutated (wrong type, missing
+required property, value outside an enum or range) to make invalid ones.
+Both sets are checked by the compiled validators and by jsonschema's
+Draft4Validator on the same schemas (nullable translated into type lists);
+the two must agree on every payload. Last, requests are routed and validated
+through CompiledSpec.validate_request, as middleware would.
+
+jsonschema is optional; without it only the compiled timings are printed.
+
+Usage:
+    python -m shared.openapi.benchmark --payloads 20000 --extra 200
+"""
+import argparse
+import copy
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from . import validators
+from .payloads import PayloadSynthesizer
+
+try:
+    import jsonschema
+except ImportError:  # pragma: no cover - optional comparison
+    jsonschema = None
+
+
+def _ref(name: str) -> Dict:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def synthetic_spec(extra: int = 0) -> Dict:
+    schemas = {
+        "TrackEnum": {"type": "string", "enum": ["defender", "offensive", "grc", "innovation", "leader"]},
+        "StatusEnum": {"type": "string", "enum": ["draft", "submitted", "in_review", "approved", "rejected"]},
+        "FrameworkMapping": {
+            "type": "object",
+            "properties": {"framework": {"type": "string", "maxLength": 32}, "code": {"type": "string", "minLength": 1},
+                           "name": {"type": "string"}},
+            "required": ["framework", "code"],
+        },
+        "Subtask": {
+            "type": "object",
+            "properties": {"id": {"type": "integer", "readOnly": True}, "title": {"type": "string", "maxLength": 200},
+                           "description": {"type": "string"}, "order": {"type": "integer", "minimum": 1},
+                           "type": {"type": "string", "enum": ["technical", "analysis", "communication"]}},
+            "required": ["id", "title", "order"],
+        },
+        "Mission": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "string", "pattern": r"^ACM-M\d+$"},
+                "version": {"type": "string"},
+                "title": {"type": "string", "maxLength": 200},
+                "track": _ref("TrackEnum"),
+                "tier": {"type": "integer", "minimum": 1, "maximum": 5},
+                "difficulty": {"type": "string", "nullable": True},
+                "estimated_minutes": {"type": "number", "minimum": 0, "exclusiveMinimum": True},
+                "subtasks": {"type": "array", "items": _ref("Subtask"), "minItems": 1},
+                "frameworks": {"type": "array", "items": _ref("FrameworkMapping")},
+                "tags": {"type": "array", "items": {"type": "string"}, "uniqueItems": True},
+                "last_updated": {"type": "string", "format": "date-time"},
+                "mentor": {"allOf": [_ref("MentorSummary")], "nullable": True},
+            },
+            "required": ["id", "version", "title", "track", "tier", "subtasks"],
+        },
+        "MentorSummary": {
+            "type": "object",
+            "properties": {"id": {"type": "string", "format": "uuid"}, "email": {"type": "string", "format": "email"},
+                           "display_name": {"type": "string"}},
+            "required": ["id", "email"],
+            "additionalProperties": False,
+        },
+        "HarEvidence": {
+            "type": "object",
+            "properties": {"kind": {"type": "string", "enum": ["har"]}, "entries": {"type": "integer", "minimum": 0},
+                           "findings": {"type": "array", "items": {"type": "object", "properties": {
+                               "endpoint": {"type": "string"}, "severity": {"type": "string",
+                                                                            "enum": ["low", "medium", "high"]}},
+                               "required": ["endpoint", "severity"]}}},
+            "required": ["kind", "entries"],
+        },
+        "PcapEvidence": {
+            "type": "object",
+            "properties": {"kind": {"type": "string", "enum": ["pcap"]}, "packets": {"type": "integer", "minimum": 0},
+                           "flows": {"type": "integer", "minimum": 0},
+                           "hosts": {"type": "array", "items": {"type": "string", "format": "ipv4"}}},
+            "required": ["kind", "packets", "flows"],
+        },
+        "LogEvidence": {
+            "type": "object",
+            "properties": {"kind": {"type": "string", "enum": ["log"]}, "lines": {"type": "integer", "minimum": 0},
+                           "redactions": {"type": "object", "additionalProperties": {"type": "integer", "minimum": 0}}},
+            "required": ["kind", "lines"],
+        },
+        "Evidence": {
+            "oneOf": [_ref("HarEvidence"), _ref("PcapEvidence"), _ref("LogEvidence")],
+            "discriminator": {"propertyName": "kind", "mapping": {
+                "har": "#/components/schemas/HarEvidence", "pcap": "#/components/schemas/PcapEvidence",
+                "log": "#/components/schemas/LogEvidence"}},
+        },
+        "MissionSubmission": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer", "readOnly": True},
+                "mission_id": {"type": "string", "pattern": r"^ACM-M\d+$"},
+                "status": _ref("StatusEnum"),
+                "score": {"type": "number", "minimum": 0, "maximum": 100, "nullable": True},
+                "notes": {"type": "string", "maxLength": 5000},
+                "evidence": {"type": "array", "items": _ref("Evidence"), "maxItems": 20},
+                "submitted_at": {"type": "string", "format": "date-time", "nullable": True},
+            },
+            "required": ["mission_id", "status", "evidence"],
+        },
+        "PaginatedMissionList": {
+            "type": "object",
+            "properties": {"count": {"type": "integer", "minimum": 0},
+                           "next": {"type": "string", "format": "uri", "nullable": True},
+                           "previous": {"type": "string", "format": "uri", "nullable": True},
+                           "results": {"type": "array", "items": _ref("Mission")}},
+            "required": ["count", "results"],
+        },
+    }
+    for i in range(extra):
+        schemas[f"Filler{i}"] = {
+            "type": "object",
+            "properties": {"id": {"type": "integer"}, "name": {"type": "string", "maxLength": 64},
+                           "kind": {"type": "string", "enum": [f"k{j}" for j in range(5)]},
+                           "parent": {"allOf": [_ref(f"Filler{i - 1}" if i else "Subtask")], "nullable": True},
+                           "values": {"type": "array", "items": {"type": "number"}}},
+            "required": ["id", "name"],
+        }
+
+    def json_body(name):
+        return {"content": {"application/json": {"schema": _ref(name)}}}
+
+    paths = {
+        "/api/v1/missions/": {"get": {
+            "operationId": "missions_list",
+            "parameters": [{"name": "page", "in": "query", "schema": {"type": "integer", "minimum": 1}},
+                           {"name": "track", "in": "query", "schema": _ref("TrackEnum")}],
+            "responses": {"200": json_body("PaginatedMissionList")}}},
+        "/api/v1/missions/{id}/": {"get": {
+            "operationId": "missions_retrieve",
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+            "responses": {"200": json_body("Mission")}}},
+        "/api/v1/missions/{id}/submissions/": {"post": {
+            "operationId": "missions_submissions_create",
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+            "requestBody": {"required": True, **json_body("MissionSubmission")},
+            "responses": {"201": json_body("MissionSubmission")}}},
+        "/api/v1/submissions/{id}/": {"patch": {
+            "operationId": "submissions_partial_update",
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+            "requestBody": json_body("MissionSubmission"),
+            "responses": {"200": json_body("MissionSubmission")}}},
+    }
+    return {"openapi": "3.0.3", "info": {"title": "bench", "version": "1"}, "paths": paths,
+            "components": {"schemas": schemas}}
+
+
+# ---------------------------------------------------------------------------
+# Payloads
+# ---------------------------------------------------------------------------
+
+class PayloadFactory(PayloadSynthesizer):
+    """Valid instances of a spec's schemas, and single-point mutations of them."""
+
+    def __init__(self, spec: Dict, seed: int = 0):
+        super().__init__(spec, seed, request=False)
+
+    def mutate(self, name: str, payload: Any) -> Any:
+        """Break one constrained value of a valid payload (wrong type, missing key, out of enum/range)."""
+        payload = copy.deepcopy(payload)
+        targets = []
+
+        def walk(schema, value, parent, key):
+            schema = self._resolve(schema)
+            if value is None:
+                return
+            if "allOf" in schema:
+                return walk(schema["allOf"][0], value, parent, key)
+            if "oneOf" in schema:
+                branch = next(b for b in schema["oneOf"] if self._resolve(b)["properties"]["kind"]["enum"] == [value["kind"]])
+                return walk(branch, value, parent, key)
+            if parent is not None:
+                targets.append((schema, parent, key))
+            if schema.get("type") == "object" and isinstance(value, dict):
+                for prop, sub in (schema.get("properties") or {}).items():
+                    if prop in value:
+                        walk(sub, value[prop], value, prop)
+                for prop in schema.get("required") or []:
+                    targets.append(({"__required__": True}, value, prop))
+            elif schema.get("type") == "array" and isinstance(value, list):
+                for i, item in enumerate(value):
+                    walk(schema.get("items") or {}, item, value, i)
+
+        walk(_ref(name), payload, None, None)
+        schema, parent, key = self.rng.choice(targets)
+        if schema.get("__required__"):
+            del parent[key]
+        elif "enum" in schema:
+            parent[key] = "not-an-option"
+        elif schema.get("type") in ("integer", "number") and "minimum" in schema:
+            parent[key] = schema["minimum"] - 1
+        elif schema.get("type") == "string":
+            parent[key] = 12345
+        else:
+            parent[key] = "wrong-type"
+        return payload
+
+
+def to_json_schema(schema: Any) -> Any:
+    """OpenAPI 3.0 schema -> draft 4 JSON schema (nullable becomes a type list / null enum member)."""
+    if isinstance(schema, list):
+        return [to_json_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    result = {key: to_json_schema(value) for key, value in schema.items()
+              if key not in ("nullable", "discriminator", "readOnly", "writeOnly")}
+    if schema.get("nullable"):
+        if "type" in result:
+            result["type"] = [result["type"], "null"]
+        if "enum" in result:
+            result["enum"] = result["enum"] + [None]
+        if "type" not in result and "enum" not in result:
+            result = {"anyOf": [{"type": "null"}, result]}
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+def _rate(label: str, seconds: float, count: int) -> None:
+    print(f"  {label:<40} {seconds * 1e6 / count:8.1f} µs/payload  {count / seconds:10.0f} payloads/s")
+
+
+def run(payloads: int, extra: int) -> int:
+    spec = synthetic_spec(extra)
+    names = ["Mission", "MissionSubmission", "PaginatedMissionList", "Evidence"]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        compiled = validators.load_validators(spec, cache_dir)
+        cold = time.perf_counter() - start
+        validators._loaded.clear()
+        start = time.perf_counter()
+        compiled = validators.load_validators(spec, cache_dir)
+        warm = time.perf_counter() - start
+    print(f"{len(spec['components']['schemas'])} schemas, {len(compiled.operations)} operations")
+    print(f"  compile + write + import {cold * 1000:.0f} ms, import from cache {warm * 1000:.0f} ms")
+
+    factory = PayloadFactory(spec)
+    valid = [(name, factory.sample(_ref(name))) for name in names for _ in range(payloads // len(names))]
+    invalid = [(name, factory.mutate(name, payload)) for name, payload in valid]
+
+    def compiled_verdicts(cases):
+        results = []
+        for name, payload in cases:
+            try:
+                compiled.schemas[name](payload)
+                results.append(True)
+            except validators.ValidationError:
+                results.append(False)
+        return results
+
+    for label, cases in (("valid", valid), ("invalid", invalid)):
+        start = time.perf_counter()
+        verdicts = compiled_verdicts(cases)
+        _rate(f"compiled, {label} payloads", time.perf_counter() - start, len(cases))
+        expected = label == "valid"
+        wrong = sum(verdict != expected for verdict in verdicts)
+        if wrong:
+            print(f"  ❌ compiled validators misjudged {wrong} {label} payloads")
+            return 1
+
+    disagreements = 0
+    if jsonschema is not None:
+        components = to_json_schema(spec["components"])
+        generic = {name: jsonschema.Draft4Validator({**_ref(name), "components": components}) for name in names}
+        for label, cases in (("valid", valid), ("invalid", invalid)):
+            start = time.perf_counter()
+            verdicts = [generic[name].is_valid(payload) for name, payload in cases]
+            _rate(f"jsonschema Draft4Validator, {label}", time.perf_counter() - start, len(cases))
+            disagreements += sum(verdict != (label == "valid") for verdict in verdicts)
+        print(f"  verdicts {'agree' if not disagreements else f'DIFFER on {disagreements}'} "
+              f"on {len(valid) + len(invalid)} payloads")
+    else:
+        print("  (jsonschema not installed; generic comparison skipped)")
+
+    requests = [("POST", f"/api/v1/missions/ACM-M{i % 5 + 1:02d}/submissions/", payload)
+                for i, (name, payload) in enumerate(valid) if name == "MissionSubmission"]
+    start = time.perf_counter()
+    for method, path, body in requests:
+        compiled.validate_request(method, path, body=body)
+    _rate("route + validate_request (middleware)", time.perf_counter() - start, len(requests))
+    return 1 if disagreements else 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", type=int, default=20_000)
+    parser.add_argument("--extra", type=int, default=200, help="Filler schemas added to the spec")
+    args = parser.parse_args(argv)
+    return run(args.payloads, args.extra)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Load scenarios generated from merged_openapi.json.
+
+Every operation in the spec becomes a request template: path and query
+parameters and JSON bodies are synthesized from their schemas (honouring
+example/default, enum, formats, ranges, lengths and simple patterns), and
+each synthesized request is checked with the compiled validators before it is
+used, so the load is made of requests the API should accept. Operations whose
+body cannot be synthesized validly are listed and left out.
+
+Scenarios weight operations by kind:
+    read-heavy    90% GET, 10% POST/PUT/PATCH
+    write-heavy   30% GET, 70% POST/PUT/PATCH
+    balanced      50% / 50%
+    smoke         every operation once, one at a time
+DELETE operations are only included with --include-deletes. A JSON file can
+set weights per operation instead: {"GET /api/v1/missions/": 5, ...}.
+
+The runner is asyncio with one pooled keep-alive httpx.AsyncClient per
+service (Django on :8000, FastAPI on :8001 for /ai/ paths). It runs
+--concurrency workers as a closed loop, or paces arrivals with --rate, in
+which case latency is measured from each request's scheduled start so a slow
+server is not hidden by fewer requests being sent. The report has count,
+error counts (4xx, 5xx, transport), throughput and p50/p90/p99/max latency
+per operation; --validate-responses also counts responses that break the
+documented schema.
+
+Usage:
+    python -m shared.openapi.loadgen --scenario smoke --token "$TOKEN"
+    python -m shared.openapi.loadgen --scenario read-heavy --duration 60 --concurrency 50
+    python -m shared.openapi.loadgen --scenario write-heavy --rate 200 --duration 30 --json report.json
+    python -m shared.openapi.loadgen --weights weights.json --param id=42 --path-prefix /api/v1/coaching/
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .payloads import PayloadSynthesizer
+from .validators import HTTP_METHODS, MERGED_SCHEMA_PATH, ValidationError, load_validators
+
+DJANGO_BASE_URL = os.environ.get("LOADGEN_BASE_URL", "http://localhost:8000")
+FASTAPI_BASE_URL = os.environ.get("LOADGEN_AI_BASE_URL", "http://localhost:8001")
+AI_PREFIX = "/ai"
+
+SCENARIOS = {
+    "read-heavy": {"read": 0.9, "write": 0.1},
+    "write-heavy": {"read": 0.3, "write": 0.7},
+    "balanced": {"read": 0.5, "write": 0.5},
+    "smoke": {"read": 1.0, "write": 1.0},
+}
+READ_METHODS = ("get", "head", "options")
+WRITE_METHODS = ("post", "put", "patch")
+
+# Synthesized variants kept per operation; requests cycle through them
+VARIANTS = 16
+ATTEMPTS = 10
+
+
+# ---------------------------------------------------------------------------
+# Operations and scenarios
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Operation:
+    method: str
+    template: str
+    operation_id: str
+    tags: List[str]
+    parameters: List[Dict]
+    body_schema: Optional[Dict]
+    body_required: bool
+    variants: List[Tuple[str, Dict[str, Any], Any]] = field(default_factory=list)   # (path, query, body)
+
+    @property
+    def key(self) -> str:
+        return f"{self.method.upper()} {self.template}"
+
+    @property
+    def kind(self) -> str:
+        if self.method in READ_METHODS:
+            return "read"
+        return "write" if self.method in WRITE_METHODS else self.method
+
+
+def _resolve(spec: Dict, item: Dict, section: str) -> Dict:
+    ref = item.get("$ref") if isinstance(item, dict) else None
+    if ref:
+        return ((spec.get("components") or {}).get(section) or {}).get(ref.rsplit("/", 1)[-1]) or {}
+    return item or {}
+
+
+def iter_operations(spec: Dict):
+    for template, item in sorted((spec.get("paths") or {}).items()):
+        for method in HTTP_METHODS:
+            operation = item.get(method)
+            if not isinstance(operation, dict):
+                continue
+            params = {}
+            for raw in (item.get("parameters") or []) + (operation.get("parameters") or []):
+                param = _resolve(spec, raw, "parameters")
+                if param.get("name"):
+                    params[(param.get("in"), param["name"])] = param
+            body = _resolve(spec, operation.get("requestBody") or {}, "requestBodies")
+            schema = next((entry.get("schema") for media_type, entry in (body.get("content") or {}).items()
+                           if media_type.split(";")[0].strip().endswith("json") and isinstance(entry, dict)), None)
+            yield Operation(method, template, operation.get("operationId") or f"{method} {template}",
+                            list(operation.get("tags") or []), list(params.values()), schema,
+                            bool(body.get("required")))
+
+
+def _format_path(template: str, values: Dict[str, Any]) -> str:
+    path = template
+    for name, value in values.items():
+        path = path.replace("{" + name + "}", str(value))
+    return path
+
+
+def prepare_operations(spec: Dict, overrides: Optional[Dict[str, str]] = None, seed: int = 0,
+                       variants: int = VARIANTS) -> Tuple[List[Operation], Dict[str, str]]:
+    """Operations with synthesized, validated request variants, and {operation: reason} for skipped ones."""
+    overrides = overrides or {}
+    compiled = load_validators(spec)
+    synthesizer = PayloadSynthesizer(spec, seed)
+    ready, skipped = [], {}
+    for operation in iter_operations(spec):
+        problem = None
+        for _ in range(variants * ATTEMPTS):
+            if len(operation.variants) >= variants:
+                break
+            path_values, query = {}, {}
+            for param in operation.parameters:
+                location, name = param.get("in"), param["name"]
+                if location not in ("path", "query"):
+                    continue
+                if name in overrides:
+                    value = overrides[name]
+                elif location == "path" or param.get("required") or synthesizer.rng.random() < 0.3:
+                    value = synthesizer.sample(param.get("schema") or {"type": "string"})
+                else:
+                    continue
+                if isinstance(value, bool):
+                    value = str(value).lower()
+                if location == "path":
+                    path_values[name] = value
+                else:
+                    query[name] = ",".join(map(str, value)) if isinstance(value, list) else value
+            path = _format_path(operation.template, path_values)
+            body = synthesizer.sample(operation.body_schema) if operation.body_schema is not None else None
+            try:
+                if operation.body_schema is not None:
+                    compiled.validate_request(operation.method, path, body, {k: str(v) for k, v in query.items()})
+                else:
+                    compiled.validate_request(operation.method, path, query={k: str(v) for k, v in query.items()})
+            except ValidationError as e:
+                problem = str(e)
+                continue
+            operation.variants.append((path, query, body))
+        if operation.variants:
+            ready.append(operation)
+        else:
+            skipped[operation.key] = problem or "no valid request could be synthesized"
+    return ready, skipped
+
+
+@dataclass
+class Scenario:
+    name: str
+    operations: List[Operation]
+    weights: List[float]
+
+    def pick(self, rng: random.Random) -> Operation:
+        return rng.choices(self.operations, self.weights)[0]
+
+
+def build_scenario(operations: List[Operation], name: str = "read-heavy", include_deletes: bool = False,
+                   weights: Optional[Dict[str, float]] = None, path_prefix: str = "",
+                   tags: Optional[List[str]] = None) -> Scenario:
+    chosen = [op for op in operations
+              if op.template.startswith(path_prefix)
+              and (not tags or set(tags) & set(op.tags))
+              and (op.kind != "delete" or include_deletes)]
+    if weights:
+        chosen = [op for op in chosen if weights.get(op.key, 0) > 0]
+        return Scenario("custom", chosen, [float(weights[op.key]) for op in chosen])
+    mix = dict(SCENARIOS[name])
+    mix.setdefault("delete", 0.05 if include_deletes else 0.0)
+    by_kind = Counter(op.kind for op in chosen)
+    chosen = [op for op in chosen if mix.get(op.kind, 0) > 0]
+    return Scenario(name, chosen, [mix[op.kind] / by_kind[op.kind] for op in chosen])
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+class LatencyReport:
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.outcomes: Dict[str, Counter] = defaultdict(Counter)
+        self.examples: Dict[str, str] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, key: str, seconds: float, outcome: str, detail: Optional[str] = None) -> None:
+        self.latencies[key].append(seconds)
+        self.outcomes[key][outcome] += 1
+        if detail and outcome != "ok":
+            self.examples.setdefault(f"{key} {outcome}", detail[:200])
+
+    @staticmethod
+    def _percentile(values: List[float], fraction: float) -> float:
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    def rows(self) -> List[Dict]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        rows = []
+        for key in sorted(self.latencies, key=lambda k: -len(self.latencies[k])):
+            values = sorted(self.latencies[key])
+            outcomes = self.outcomes[key]
+            rows.append({
+                "operation": key, "requests": len(values), "rps": round(len(values) / elapsed, 1),
+                "errors": sum(n for outcome, n in outcomes.items() if outcome != "ok"),
+                **{outcome: n for outcome, n in sorted(outcomes.items())},
+                "p50_ms": round(self._percentile(values, 0.50) * 1000, 1),
+                "p90_ms": round(self._percentile(values, 0.90) * 1000, 1),
+                "p99_ms": round(self._percentile(values, 0.99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+            })
+        return rows
+
+    def print(self) -> None:
+        rows = self.rows()
+        total = sum(row["requests"] for row in rows)
+        errors = sum(row["errors"] for row in rows)
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        print("=" * 118)
+        print(f"📊 {total} requests in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} req/s), {errors} errors")
+        print("=" * 118)
+        print(f"{'requests':>8} {'rps':>7} {'4xx':>5} {'5xx':>5} {'exc':>5} {'schema':>6} "
+              f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}  operation")
+        print("-" * 118)
+        for row in rows:
+            print(f"{row['requests']:>8} {row['rps']:>7} {row.get('4xx', 0):>5} {row.get('5xx', 0):>5} "
+                  f"{row.get('transport', 0):>5} {row.get('schema', 0):>6} {row['p50_ms']:>8} {row['p90_ms']:>8} "
+                  f"{row['p99_ms']:>8} {row['max_ms']:>8}  {row['operation']}")
+        if self.examples:
+            print("-" * 118)
+            for key, detail in sorted(self.examples.items()):
+                print(f"  ⚠️  {key}: {detail}")
+
+
+class LoadRunner:
+
+    def __init__(self, scenario: Scenario, base_url: str = DJANGO_BASE_URL, ai_base_url: str = FASTAPI_BASE_URL,
+                 headers: Optional[Dict[str, str]] = None, concurrency: int = 20, timeout: float = 30.0,
+                 strip_ai_prefix: bool = True, response_validators=None, seed: int = 0):
+        self.scenario = scenario
+        self.base_url = base_url.rstrip("/")
+        self.ai_base_url = ai_base_url.rstrip("/")
+        self.headers = headers or {}
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.strip_ai_prefix = strip_ai_prefix
+        self.response_validators = response_validators
+        self.rng = random.Random(seed)
+        self.report = LatencyReport()
+        self._cursor: Dict[str, int] = defaultdict(int)
+
+    def _target(self, path: str) -> Tuple[str, str]:
+        if path == AI_PREFIX or path.startswith(AI_PREFIX + "/"):
+            return "ai", path[len(AI_PREFIX):] if self.strip_ai_prefix else path
+        return "api", path
+
+    async def _send(self, clients, operation: Operation, scheduled: Optional[float] = None) -> None:
+        index = self._cursor[operation.key] % len(operation.variants)
+        self._cursor[operation.key] += 1
+        path, query, body = operation.variants[index]
+        service, url = self._target(path)
+        start = time.perf_counter() if scheduled is None else scheduled
+        outcome, detail = "ok", None
+        try:
+            kwargs = {"params": query or None}
+            if body is not None or operation.body_required:
+                kwargs["json"] = body
+            response = await clients[service].request(operation.method.upper(), url, **kwargs)
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 500:
+                outcome, detail = "5xx", f"{response.status_code} {response.text[:200]}"
+            elif response.status_code >= 400:
+                outcome, detail = "4xx", f"{response.status_code} {response.text[:200]}"
+            elif self.response_validators is not None and response.content:
+                try:
+                    self.response_validators.validate_response(operation.method, operation.template,
+                                                               response.status_code, response.json())
+                except (ValidationError, ValueError) as e:
+                    outcome, detail = "schema", str(e)
+        except Exception as e:  # transport errors are results here, not failures of the run
+            elapsed = time.perf_counter() - start
+            outcome, detail = "transport", f"{type(e).__name__}: {e}"
+        self.report.record(operation.key, elapsed, outcome, detail)
+
+    async def run(self, duration: Optional[float] = None, total: Optional[int] = None,
+                  rate: Optional[float] = None) -> LatencyReport:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        timeout = httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0))
+        async with httpx.AsyncClient(base_url=self.base_url, headers=self.headers, limits=limits,
+                                     timeout=timeout) as api, \
+                httpx.AsyncClient(base_url=self.ai_base_url, headers=self.headers, limits=limits,
+                                  timeout=timeout) as ai:
+            clients = {"api": api, "ai": ai}
+            self.report = LatencyReport()
+            if self.scenario.name == "smoke":
+                for operation in self.scenario.operations:
+                    await self._send(clients, operation)
+                self.report.finished = time.perf_counter()
+                return self.report
+
+            deadline = time.perf_counter() + duration if duration else None
+            issued = 0
+            started = time.perf_counter()
+
+            async def worker():
+                nonlocal issued
+                while True:
+                    if (total is not None and issued >= total) or (deadline and time.perf_counter() >= deadline):
+                        return
+                    sequence = issued
+                    issued += 1
+                    scheduled = None
+                    if rate:
+                        scheduled = started + sequence / rate
+                        delay = scheduled - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    await self._send(clients, self.scenario.pick(self.rng), scheduled)
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        self.report.finished = time.perf_counter()
+        return self.report
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spec", default=str(MERGED_SCHEMA_PATH))
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="read-heavy")
+    parser.add_argument("--weights", metavar="JSON", help='Per-operation weights, {"GET /api/v1/x/": 5, ...}')
+    parser.add_argument("--base-url", default=DJANGO_BASE_URL)
+    parser.add_argument("--ai-base-url", default=FASTAPI_BASE_URL)
+    parser.add_argument("--keep-ai-prefix", action="store_true", help="Send /ai/... paths to FastAPI unchanged")
+    parser.add_argument("--token", default=os.environ.get("LOADGEN_TOKEN"), help="Bearer token for every request")
+    parser.add_argument("--header", action="append", default=[], metavar="NAME:VALUE")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Fixed value for a path/query parameter, e.g. id=42")
+    parser.add_argument("--path-prefix", default="")
+    parser.add_argument("--tag", action="append", default=[])
+    parser.add_argument("--include-deletes", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, help="Seconds to run (default 30 unless --requests; ignored by smoke)")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--rate", type=float, help="Open-loop arrivals per second instead of a closed loop")
+    parser.add_argument("--validate-responses", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dry-run", action="store_true", help="Print one synthesized request per operation")
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not Path(args.spec).exists():
+        print(f"Error: {args.spec} not found (run shared/openapi/merge_openapi.py first)")
+        return 1
+    with open(args.spec) as f:
+        spec = json.load(f)
+    overrides = dict(item.split("=", 1) for item in args.param)
+    operations, skipped = prepare_operations(spec, overrides, args.seed)
+    weights = None
+    if args.weights:
+        with open(args.weights) as f:
+            weights = json.load(f)
+    scenario = build_scenario(operations, args.scenario, args.include_deletes, weights, args.path_prefix, args.tag)
+    print(f"🧪 {scenario.name}: {len(scenario.operations)} operations "
+          f"({len(operations)} synthesized, {len(skipped)} skipped)")
+    for key, reason in sorted(skipped.items()):
+        print(f"   ⏭️  {key}: {reason}")
+    if args.dry_run:
+        for operation, weight in zip(scenario.operations, scenario.weights):
+            path, query, body = operation.variants[0]
+            print(f"  {weight:6.3f}  {operation.method.upper():6} {path}  {json.dumps(query) if query else ''}")
+            if body is not None:
+                print(f"          {json.dumps(body)[:300]}")
+        return 0
+    if not scenario.operations:
+        print("Error: no operations to run")
+        return 1
+
+    headers = dict(item.split(":", 1) for item in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    if args.token:
+        headers.setdefault("Authorization", f"Bearer {args.token}")
+    runner = LoadRunner(scenario, args.base_url, args.ai_base_url, headers, args.concurrency,
+                        strip_ai_prefix=not args.keep_ai_prefix,
+                        response_validators=load_validators(spec) if args.validate_responses else None,
+                        seed=args.seed)
+    duration = args.duration or (None if args.requests else 30.0)
+    report = asyncio.run(runner.run(duration, args.requests, args.rate))
+    report.print()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"scenario": scenario.name, "skipped": skipped, "operations": report.rows(),
+                       "errors": report.examples}, f, indent=2)
+    return 1 if any(row["errors"] for row in report.rows()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
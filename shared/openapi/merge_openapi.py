@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """
 Merge Django and FastAPI OpenAPI schemas into a single combined schema.
+
+With --shards DIR, also write the merged schema as per-tag shards plus a small
+index (see shared/openapi/shards.py) for docs and clients that load lazily.
 """
+import argparse
 import json
 import sys
 from pathlib import Path
@@ -123,6 +127,10 @@ def merge_openapi_schemas(django_schema: Dict, fastapi_schema: Dict) -> Dict[str
 
 def main():
     """Main function to merge OpenAPI schemas."""
+    parser = argparse.ArgumentParser(description="Merge Django and FastAPI OpenAPI schemas.")
+    parser.add_argument("--shards", metavar="DIR", help="Also write per-tag shards and an index to DIR")
+    args = parser.parse_args()
+
     print("Loading OpenAPI schemas...")
     
     django_schema = load_json_file(DJANGO_SCHEMA_PATH)
@@ -148,6 +156,13 @@ def main():
     print(f"  - Total paths: {len(merged_schema.get('paths', {}))}")
     print(f"  - Total schemas: {len(merged_schema.get('components', {}).get('schemas', {}))}")
     
+    if args.shards:
+        sys.path.insert(0, str(BASE_DIR))
+        from shared.openapi.shards import report, write_shards
+
+        index = write_shards(merged_schema, args.shards)
+        report(index, MERGED_SCHEMA_PATH.stat().st_size, Path(args.shards))
+    
     return 0
 
 
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the FastAPI AI service, generated from openapi_fastapi.json.
+
+Every operation in the spec answers with its documented success status and a
+JSON body synthesized from the response schema; each body is checked with the
+compiled validators, so Django sees responses the real service could send.
+Responses recorded from the real service (JSONL, the same records
+`validators --audit` reads: method, path, status, response, and optionally
+latency_ms) replace the synthesized ones for their operations.
+
+Latency is injected per operation from a distribution:
+    0 | fixed:MS              constant delay
+    uniform:LOW,HIGH          uniform between LOW and HIGH ms
+    normal:MEAN,STDDEV        clipped at 0
+    lognormal:MEDIAN,P99      long-tailed, the usual shape of model inference
+    exp:MEAN                  exponential
+    empirical:MS,MS,...       drawn from the listed samples
+Recorded latency_ms values become an empirical distribution for their
+operation. Each operation draws from its own generator seeded from --seed and
+the operation, and cycles through its responses in order, so the n-th call to
+an operation always gets the same body after the same delay.
+
+The server is a plain asyncio protocol speaking HTTP/1.1 keep-alive: the
+response bytes are built once at start-up and delays are timer callbacks, not
+coroutines, so the stand-in adds next to nothing to what is being measured.
+Pipelined requests are answered in order. GET /__mock__/stats returns request
+counts per operation.
+
+Usage:
+    python -m shared.openapi.mockserver --latency lognormal:180,1500
+    python -m shared.openapi.mockserver --spec shared/openapi/merged_openapi.json --prefix /ai
+    python -m shared.openapi.mockserver --recorded ai_traffic.jsonl --latency-file latency.json --port 8001
+Then start Django with FASTAPI_BASE_URL=http://localhost:8001.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+from collections import deque
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from .merge_openapi import FASTAPI_SCHEMA_PATH
+from .payloads import PayloadSynthesizer
+from .validators import HTTP_METHODS, ValidationError, load_validators
+
+try:
+    import uvloop
+except ImportError:  # optional: the stdlib loop is fast enough for a single Django instance
+    uvloop = None
+
+VARIANTS = 8
+ATTEMPTS = 10
+MAX_HEADER_BYTES = 64 * 1024
+_NORMAL_P99 = 2.3263478740408408     # z-score of the 99th percentile
+
+
+class LatencyModel:
+    """Delays in seconds drawn from one distribution with a deterministic generator."""
+
+    def __init__(self, spec: str = "0", seed: Any = 0):
+        self.spec = spec
+        self.rng = random.Random(str(seed))
+        kind, _, raw = spec.partition(":")
+        try:
+            values = [float(value) / 1000 for value in raw.split(",") if value.strip()]
+        except ValueError:
+            raise ValueError(f"bad latency {spec!r}") from None
+        if kind in ("0", "none"):
+            self._draw = lambda: 0.0
+        elif kind == "fixed" and len(values) == 1:
+            self._draw = lambda: values[0]
+        elif kind == "uniform" and len(values) == 2:
+            self._draw = lambda: self.rng.uniform(values[0], values[1])
+        elif kind == "normal" and len(values) == 2:
+            self._draw = lambda: max(0.0, self.rng.gauss(values[0], values[1]))
+        elif kind == "lognormal" and len(values) == 2 and 0 < values[0] <= values[1]:
+            mu, sigma = math.log(values[0]), math.log(values[1] / values[0]) / _NORMAL_P99
+            self._draw = lambda: self.rng.lognormvariate(mu, sigma)
+        elif kind == "exp" and len(values) == 1 and values[0] > 0:
+            self._draw = lambda: self.rng.expovariate(1 / values[0])
+        elif kind == "empirical" and values:
+            self._draw = lambda: self.rng.choice(values)
+        else:
+            raise ValueError(f"bad latency {spec!r}")
+
+    def draw(self) -> float:
+        return self._draw()
+
+
+def _http_response(status: int, body: bytes, content_type: Optional[str] = "application/json") -> bytes:
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    head = [f"HTTP/1.1 {status} {reason}", "server: och-mock"]
+    if content_type and status not in (204, 304):
+        head.append(f"content-type: {content_type}")
+    head.append(f"content-length: {len(body)}")
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _json_response(status: int, data: Any) -> bytes:
+    return _http_response(status, json.dumps(data, separators=(",", ":")).encode())
+
+
+class _MockOperation:
+    __slots__ = ("key", "method", "template", "responses", "latency", "index", "calls")
+
+    def __init__(self, method: str, template: str, latency: LatencyModel):
+        self.key = f"{method.upper()} {template}"
+        self.method = method
+        self.template = template
+        self.responses: List[bytes] = []
+        self.latency = latency
+        self.index = 0
+        self.calls = 0
+
+    def next(self) -> Tuple[bytes, float]:
+        self.calls += 1
+        response = self.responses[self.index]
+        self.index = (self.index + 1) % len(self.responses)
+        return response, self.latency.draw()
+
+
+def _success_status(responses: Dict) -> Tuple[int, Optional[str]]:
+    """The documented status to answer with: the lowest 2xx, else 200 via "default"."""
+    for status in sorted(str(status) for status in responses):
+        if status.isdigit() and status.startswith("2"):
+            return int(status), status
+    return 200, "default" if "default" in responses else None
+
+
+def _json_schema(content: Dict) -> Optional[Dict]:
+    for media_type, entry in (content or {}).items():
+        if media_type.split(";")[0].strip().endswith("json") and isinstance(entry, dict) and "schema" in entry:
+            return entry["schema"]
+    return None
+
+
+def strip_prefix(spec: Dict, prefix: str) -> Dict:
+    """`spec` with only the paths under `prefix`, which is removed (merged spec -> one service's view)."""
+    prefix = prefix.rstrip("/")
+    paths = {path[len(prefix):] or "/": item for path, item in (spec.get("paths") or {}).items()
+             if path == prefix or path.startswith(prefix + "/")}
+    return dict(spec, paths=paths)
+
+
+class MockService:
+    """Canned, schema-valid responses and latency models for every operation in a spec."""
+
+    def __init__(self, spec: Dict, default_latency: str = "0", latencies: Optional[Dict[str, str]] = None,
+                 recorded: Optional[List[Dict]] = None, seed: int = 0, variants: int = VARIANTS,
+                 validate_requests: bool = False):
+        self.compiled = load_validators(spec)
+        self.validate_requests = validate_requests
+        self.shared_responses = (spec.get("components") or {}).get("responses") or {}
+        self.operations: Dict[Tuple[str, str], _MockOperation] = {}
+        self.unanswerable: Dict[str, str] = {}
+        self.recorded_invalid = 0
+        self.requests = 0
+        latencies = latencies or {}
+        synthesizer = PayloadSynthesizer(spec, seed, request=False)
+        samples: Dict[Tuple[str, str], List[bytes]] = {}
+        recorded_latency: Dict[Tuple[str, str], List[str]] = {}
+        for record in recorded or ():
+            method = record["method"].lower()
+            matched = self.compiled.match(method, record["path"].split("?", 1)[0])
+            if matched is None:
+                continue
+            key = (method, matched[0])
+            status, body = int(record.get("status", 200)), record.get("response")
+            try:
+                self.compiled.validate_response(method, matched[0], status, body)
+            except ValidationError:
+                self.recorded_invalid += 1        # still served: it is what the real service sent
+            samples.setdefault(key, []).append(_json_response(status, body) if body is not None
+                                               else _http_response(status, b"", None))
+            if record.get("latency_ms") is not None:
+                recorded_latency.setdefault(key, []).append(str(record["latency_ms"]))
+
+        for template, item in sorted((spec.get("paths") or {}).items()):
+            for method in HTTP_METHODS:
+                operation = item.get(method)
+                if not isinstance(operation, dict):
+                    continue
+                key = (method, template)
+                label = f"{method.upper()} {template}"
+                latency_spec = (latencies.get(label) or latencies.get(operation.get("operationId") or "")
+                                or ("empirical:" + ",".join(recorded_latency[key]) if key in recorded_latency
+                                    else latencies.get("*", default_latency)))
+                mock = _MockOperation(method, template, LatencyModel(latency_spec, f"{seed}:{label}"))
+                if key in samples:
+                    mock.responses = samples[key]
+                else:
+                    mock.responses = self._synthesize(synthesizer, operation, method, template, variants)
+                    if not mock.responses:
+                        self.unanswerable[label] = "no schema-valid response could be synthesized"
+                        mock.responses = [_json_response(501, {"detail": f"mock cannot answer {label}"})]
+                self.operations[key] = mock
+
+    def _synthesize(self, synthesizer: PayloadSynthesizer, operation: Dict, method: str, template: str,
+                    variants: int) -> List[bytes]:
+        responses = operation.get("responses") or {}
+        status, documented = _success_status(responses)
+        response = responses.get(documented) or {}
+        if "$ref" in response:
+            response = self.shared_responses.get(response["$ref"].rsplit("/", 1)[-1]) or {}
+        schema = _json_schema(response.get("content"))
+        if schema is None:
+            return [_http_response(status, b"", None) if status == 204 else _json_response(status, None)]
+        bodies = []
+        for _ in range(variants * ATTEMPTS):
+            if len(bodies) >= variants:
+                break
+            body = synthesizer.sample(schema)
+            try:
+                self.compiled.validate_response(method, template, status, body)
+            except ValidationError:
+                continue
+            bodies.append(_json_response(status, body))
+        return bodies
+
+    def respond(self, method: str, target: str, body: bytes) -> Tuple[bytes, float]:
+        """
+        (response bytes, delay in seconds) for one request.
+
+        HEAD is answered like GET (unless the spec has its own HEAD operation), with the
+        same headers, including GET's content-length, and no body. That holds for 404/405
+        too: a body the client does not expect would be read as the next response.
+        """
+        self.requests += 1
+        method = method.lower()
+        if method != "head":
+            return self._respond(method, target, body)
+        if self.compiled.match("head", target.partition("?")[0]) is None:
+            method = "get"
+        response, delay = self._respond(method, target, body)
+        return response[:response.index(b"\r\n\r\n") + 4], delay
+
+    def _respond(self, method: str, target: str, body: bytes) -> Tuple[bytes, float]:
+        path, _, query = target.partition("?")
+        matched = self.compiled.match(method, path)
+        if matched is None:
+            if any(self.compiled.match(other, path) for other in HTTP_METHODS if other != method):
+                return _json_response(405, {"detail": "Method Not Allowed"}), 0.0
+            if method == "get" and path == "/__mock__/stats":
+                return _json_response(200, self.stats()), 0.0
+            if method == "get" and path == "/health":
+                return _json_response(200, {"status": "ok", "mock": True}), 0.0
+            return _json_response(404, {"detail": "Not Found"}), 0.0
+        if self.validate_requests:
+            try:
+                params = {name: values if len(values) > 1 else values[0]
+                          for name, values in parse_qs(query).items()}
+                if body:
+                    self.compiled.validate_request(method, path, json.loads(body), params)
+                else:
+                    self.compiled.validate_request(method, path, query=params)
+            except (ValidationError, ValueError) as e:
+                location = ["request"] + (e.path if isinstance(e, ValidationError) else [])
+                return _json_response(422, {"detail": [{"loc": location, "msg": str(e),
+                                                        "type": "value_error"}]}), 0.0
+        return self.operations[(method, matched[0])].next()
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "by_operation": {mock.key: mock.calls for mock in self.operations.values() if mock.calls},
+        }
+
+
+class _HTTPProtocol(asyncio.Protocol):
+    """Minimal HTTP/1.1 server side: Content-Length bodies, keep-alive, in-order pipelining."""
+
+    def __init__(self, service: MockService):
+        self.service = service
+        self.loop = asyncio.get_event_loop()
+        self.transport = None
+        self.buffer = bytearray()
+        self.pending: deque = deque()       # [response or None, close after] per request, in arrival order
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def connection_lost(self, exc) -> None:
+        self.transport = None
+        self.pending.clear()
+
+    def data_received(self, data: bytes) -> None:
+        self.buffer += data
+        while self.transport is not None:
+            end = self.buffer.find(b"\r\n\r\n")
+            if end < 0:
+                if len(self.buffer) > MAX_HEADER_BYTES:
+                    self._reject(431)
+                return
+            lines = bytes(self.buffer[:end]).decode("latin-1").split("\r\n")
+            request_line = lines[0].split(" ")
+            if len(request_line) != 3:
+                self._reject(400)
+                return
+            method, target, version = request_line
+            length, close = 0, version == "HTTP/1.0"
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                name = name.strip().lower()
+                if name == "content-length":
+                    length = int(value) if value.strip().isdigit() else -1
+                elif name == "connection":
+                    close = value.strip().lower() == "close" or (close and value.strip().lower() != "keep-alive")
+                elif name == "transfer-encoding":
+                    length = -1
+            if length < 0:
+                self._reject(411)
+                return
+            if len(self.buffer) < end + 4 + length:
+                return
+            body = bytes(self.buffer[end + 4:end + 4 + length])
+            del self.buffer[:end + 4 + length]
+            response, delay = self.service.respond(method, target, body)
+            slot = [None, close]
+            self.pending.append(slot)
+            if delay > 0:
+                self.loop.call_later(delay, self._ready, slot, response)
+            else:
+                self._ready(slot, response)
+            if close:
+                return
+
+    def _ready(self, slot: list, response: bytes) -> None:
+        slot[0] = response
+        while self.pending and self.pending[0][0] is not None and self.transport is not None:
+            response, close = self.pending.popleft()
+            self.transport.write(response)
+            if close:
+                self.transport.close()
+                self.transport = None
+
+    def _reject(self, status: int) -> None:
+        self.transport.write(_json_response(status, {"detail": HTTPStatus(status).phrase}))
+        self.transport.close()
+        self.transport = None
+
+
+async def serve(service: MockService, host: str = "127.0.0.1", port: int = 8001) -> None:
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: _HTTPProtocol(service), host, port, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spec", default=str(FASTAPI_SCHEMA_PATH))
+    parser.add_argument("--prefix", help="Serve only paths under this prefix, without it (e.g. /ai with the merged spec)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="0", help="Default latency distribution (see above)")
+    parser.add_argument("--latency-file", metavar="JSON",
+                        help='Per-operation distributions, {"POST /recommendations": "lognormal:200,1200", "*": ...}')
+    parser.add_argument("--recorded", metavar="JSONL", help="Recorded responses to serve instead of synthesized ones")
+    parser.add_argument("--variants", type=int, default=VARIANTS, help="Synthesized responses per operation")
+    parser.add_argument("--validate-requests", action="store_true", help="Answer 422 to requests the spec rejects")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if not Path(args.spec).exists():
+        print(f"Error: {args.spec} not found (fetch it from the FastAPI service's /docs/openapi.json)")
+        return 1
+    with open(args.spec) as f:
+        spec = json.load(f)
+    if args.prefix:
+        spec = strip_prefix(spec, args.prefix)
+    latencies = {}
+    if args.latency_file:
+        with open(args.latency_file) as f:
+            latencies = json.load(f)
+    recorded = []
+    if args.recorded:
+        with open(args.recorded) as f:
+            recorded = [json.loads(line) for line in f if line.strip()]
+    try:
+        service = MockService(spec, args.latency, latencies, recorded, args.seed, args.variants,
+                              args.validate_requests)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"🤖 mock AI service on http://{args.host}:{args.port}: {len(service.operations)} operations, "
+          f"{len(recorded)} recorded responses, latency {args.latency}")
+    if service.recorded_invalid:
+        print(f"   ⚠️  {service.recorded_invalid} recorded responses do not match the spec (served anyway)")
+    for key, reason in sorted(service.unanswerable.items()):
+        print(f"   ⏭️  {key}: {reason} (answers 501)")
+    if uvloop is not None:
+        uvloop.install()
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
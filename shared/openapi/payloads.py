@@ -0,0 +1,195 @@
+"""
+Random payloads for OpenAPI schemas, for load scenarios and validator benchmarks.
+
+Values honour example/default, const, enum, allOf/oneOf/anyOf, formats,
+numeric ranges and multipleOf, lengths, item counts and simple patterns
+(generated from the regex parse tree). Nothing here guarantees validity for
+every schema; callers check samples with the compiled validators.
+"""
+import random
+import string
+from typing import Any, Dict
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+
+class PayloadSynthesizer:
+    """Random instances of OpenAPI schemas that their validators accept."""
+
+    def __init__(self, spec: Dict, seed: int = 0, request: bool = True):
+        self.schemas = (spec.get("components") or {}).get("schemas") or {}
+        self.rng = random.Random(seed)
+        self.request = request          # leave out readOnly properties
+
+    def _resolve(self, schema: Dict) -> Dict:
+        seen = 0
+        while isinstance(schema, dict) and "$ref" in schema and seen < 50:
+            schema = self.schemas.get(schema["$ref"].rsplit("/", 1)[-1], {})
+            seen += 1
+        return schema if isinstance(schema, dict) else {}
+
+    def sample(self, schema: Any, depth: int = 0) -> Any:
+        rng = self.rng
+        schema = self._resolve(schema)
+        for key in ("example", "default"):
+            if key in schema and rng.random() < 0.5:
+                return schema[key]
+        if "const" in schema:
+            return schema["const"]
+        if "enum" in schema:
+            options = [value for value in schema["enum"] if value is not None] or schema["enum"]
+            return rng.choice(options)
+        if schema.get("allOf"):
+            merged: Dict = {}
+            for part in schema["allOf"]:
+                part = self._resolve(part)
+                for key, value in part.items():
+                    if key == "properties":
+                        merged.setdefault("properties", {}).update(value)
+                    elif key == "required":
+                        merged["required"] = list(merged.get("required", [])) + list(value)
+                    else:
+                        merged.setdefault(key, value)
+            merged.update({key: value for key, value in schema.items() if key not in ("allOf", "nullable")})
+            return self.sample(merged, depth + 1)
+        for key in ("oneOf", "anyOf"):
+            if schema.get(key):
+                return self.sample(rng.choice(schema[key]), depth + 1)
+
+        kind = schema.get("type")
+        if isinstance(kind, list):
+            kind = next((t for t in kind if t != "null"), "null")
+        if kind is None:
+            kind = "object" if "properties" in schema else "string"
+        if kind == "object":
+            return self._object(schema, depth)
+        if kind == "array":
+            low = int(schema.get("minItems", 0))
+            high = max(low, min(int(schema.get("maxItems", low + 3)), low + (3 if depth < 3 else 0)))
+            items = [self.sample(schema.get("items") or {}, depth + 1) for _ in range(rng.randint(low, high))]
+            if schema.get("uniqueItems"):
+                unique = []
+                for item in items:
+                    if item not in unique:
+                        unique.append(item)
+                items = unique
+            return items
+        if kind in ("integer", "number"):
+            return self._number(schema, kind)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        if kind == "null":
+            return None
+        return self._string(schema)
+
+    def _object(self, schema: Dict, depth: int) -> Dict:
+        required = set(schema.get("required") or [])
+        result = {}
+        for name, sub in (schema.get("properties") or {}).items():
+            resolved = self._resolve(sub)
+            if self.request and resolved.get("readOnly") and name not in required:
+                continue
+            if name in required or (depth < 4 and self.rng.random() < 0.6):
+                result[name] = self.sample(sub, depth + 1)
+        minimum = int(schema.get("minProperties", 0))
+        extra = schema.get("additionalProperties")
+        index = 0
+        while len(result) < minimum or (isinstance(extra, dict) and index < 1):
+            result[f"key_{index}"] = self.sample(extra, depth + 1) if isinstance(extra, dict) else index
+            index += 1
+        return result
+
+    def _number(self, schema: Dict, kind: str):
+        low = schema.get("minimum", 0 if "maximum" not in schema else schema["maximum"] - 100)
+        high = schema.get("maximum", low + 1000)
+        if schema.get("exclusiveMinimum") is True or type(schema.get("exclusiveMinimum")) in (int, float):
+            low = (schema["exclusiveMinimum"] if type(schema["exclusiveMinimum"]) in (int, float) else low) + 1
+        if schema.get("exclusiveMaximum") is True or type(schema.get("exclusiveMaximum")) in (int, float):
+            high = (schema["exclusiveMaximum"] if type(schema["exclusiveMaximum"]) in (int, float) else high) - 1
+        step = schema.get("multipleOf")
+        if kind == "integer":
+            value = self.rng.randint(int(low), max(int(low), int(high)))
+            if isinstance(step, int) and step > 0:
+                value = max(int(low) + (-int(low)) % step, value - value % step)
+            return value
+        if step:
+            return round(self.rng.randint(int(low / step) + 1, max(int(low / step) + 1, int(high / step))) * step, 9)
+        return round(self.rng.uniform(low, high), 2)
+
+    def _string(self, schema: Dict) -> str:
+        rng = self.rng
+        fmt = schema.get("format")
+        if fmt == "date-time":
+            return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z"
+        if fmt == "date":
+            return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        if fmt == "time":
+            return f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"
+        if fmt == "uuid":
+            return "%08x-%04x-4%03x-a%03x-%012x" % tuple(rng.getrandbits(b) for b in (32, 16, 12, 12, 48))
+        if fmt == "email":
+            return f"loadtest+{rng.randint(1, 10**6)}@example.com"
+        if fmt in ("uri", "url"):
+            return f"https://example.com/load/{rng.randint(1, 10**6)}"
+        if fmt == "ipv4":
+            return f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+        if fmt == "ipv6":
+            return f"fd00::{rng.randint(1, 0xFFFF):x}"
+        if "pattern" in schema:
+            try:
+                return self._from_pattern(schema["pattern"], schema)
+            except (TypeError, ValueError, KeyError, RecursionError):
+                pass
+        low = int(schema.get("minLength", 1))
+        high = max(low, min(int(schema.get("maxLength", 24)), low + 24))
+        return "".join(rng.choice(string.ascii_letters) for _ in range(rng.randint(low, high)))
+
+    def _from_pattern(self, pattern: str, schema: Dict) -> str:
+        """A string matching a simple regex, generated from its parse tree."""
+        rng = self.rng
+        categories = {
+            sre_parse.CATEGORY_DIGIT: string.digits,
+            sre_parse.CATEGORY_WORD: string.ascii_letters + string.digits + "_",
+            sre_parse.CATEGORY_SPACE: " ",
+        }
+
+        def charset(items) -> str:
+            chars = ""
+            for op, value in items:
+                if op is sre_parse.LITERAL:
+                    chars += chr(value)
+                elif op is sre_parse.RANGE:
+                    chars += "".join(chr(c) for c in range(value[0], min(value[1], value[0] + 95) + 1))
+                elif op is sre_parse.CATEGORY and value in categories:
+                    chars += categories[value]
+                elif op is sre_parse.NEGATE:
+                    raise ValueError("negated class")
+            return chars or "x"
+
+        def emit(tokens) -> str:
+            out = []
+            for op, value in tokens:
+                if op is sre_parse.LITERAL:
+                    out.append(chr(value))
+                elif op is sre_parse.IN:
+                    out.append(rng.choice(charset(value)))
+                elif op is sre_parse.ANY:
+                    out.append(rng.choice(string.ascii_letters))
+                elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+                    low, high, sub = value
+                    high = low + 3 if high is sre_parse.MAXREPEAT else high
+                    out.extend(emit(sub) for _ in range(rng.randint(low, min(high, low + 8))))
+                elif op is sre_parse.SUBPATTERN:
+                    out.append(emit(value[-1]))
+                elif op is sre_parse.BRANCH:
+                    out.append(emit(rng.choice(value[1])))
+                elif op is sre_parse.AT:
+                    continue
+                else:
+                    raise ValueError(f"unsupported regex construct {op}")
+            return "".join(out)
+
+        return emit(sre_parse.parse(pattern))
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Per-tag sharded output of the merged OpenAPI schema, and a loader that fetches shards on demand.
+
+merged_openapi.json is one document; showing a single endpoint means
+downloading and parsing all of it. Sharding writes:
+
+    index.json                  a valid OpenAPI document with no paths: info,
+                                servers, tags, security schemes, and an
+                                "x-shards" map of tag -> shard file
+    <tag>.<hash>.json           one self-contained OpenAPI document per tag:
+                                that tag's operations plus only the components
+                                they reference, transitively
+    operations.<hash>.json      "METHOD /path" -> tags, for lookups by route
+    unreferenced.<hash>.json    components no operation references (only
+                                needed to rebuild the full schema)
+
+An operation listed under several tags appears in each of their shards, the
+way docs UIs list it. Shard names carry a content hash, so everything except
+index.json can be cached forever. Rewriting a directory removes the shards
+the previous index.json listed and no longer needed; other files are left alone.
+
+Usage:
+    python -m shared.openapi.shards                     # merged_openapi.json -> shared/openapi/shards/
+    python -m shared.openapi.shards spec.json -o public/api-docs
+    python shared/openapi/merge_openapi.py --shards shared/openapi/shards
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .validators import HTTP_METHODS, MERGED_SCHEMA_PATH
+
+SHARDS_DIR = Path(__file__).parent / "shards"
+INDEX_NAME = "index.json"
+SHARD_FORMAT = 1
+DEFAULT_TAG = "default"
+_COMPONENT_REF = re.compile(r"^#/components/([^/]+)/(.+)$")
+_SHARD_FILE = re.compile(r"^[a-z0-9-]+\.[0-9a-f]{12}\.json$")
+
+
+def _slug(tag: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-") or "tag"
+
+
+def _dumps(document: Dict) -> bytes:
+    return json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _iter_refs(value: Any) -> Iterator[Tuple[str, str]]:
+    """(section, name) of every #/components/... reference inside `value`, including discriminator mappings."""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            for key, child in item.items():
+                if key == "$ref" and isinstance(child, str):
+                    match = _COMPONENT_REF.match(child)
+                    if match:
+                        yield match.group(1), match.group(2).replace("~1", "/").replace("~0", "~")
+                elif key == "mapping" and isinstance(child, dict):
+                    stack.extend({"$ref": ref} for ref in child.values() if isinstance(ref, str))
+                else:
+                    stack.append(child)
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+class _ComponentGraph:
+    """Transitive closure of component references, with each component's direct references computed once."""
+
+    def __init__(self, components: Dict):
+        self.components = components
+        self._direct: Dict[Tuple[str, str], Set[Tuple[str, str]]] = {}
+
+    def direct(self, key: Tuple[str, str]) -> Set[Tuple[str, str]]:
+        if key not in self._direct:
+            section, name = key
+            self._direct[key] = set(_iter_refs((self.components.get(section) or {}).get(name)))
+        return self._direct[key]
+
+    def closure(self, roots: Set[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        seen: Set[Tuple[str, str]] = set()
+        stack = list(roots)
+        while stack:
+            key = stack.pop()
+            if key in seen:
+                continue
+            seen.add(key)
+            stack.extend(self.direct(key) - seen)
+        return seen
+
+
+def _select(components: Dict, keys: Set[Tuple[str, str]]) -> Dict:
+    selected: Dict[str, Dict] = {}
+    for section, name in sorted(keys):
+        value = (components.get(section) or {}).get(name)
+        if value is not None:
+            selected.setdefault(section, {})[name] = value
+    return selected
+
+
+def build_shards(spec: Dict) -> Tuple[Dict, Dict[str, bytes]]:
+    """(index document, {file name: shard bytes}) for `spec`."""
+    components = spec.get("components") or {}
+    security_schemes = components.get("securitySchemes") or {}
+    graph = _ComponentGraph(components)
+    header = {key: spec[key] for key in ("openapi", "info", "servers", "security") if key in spec}
+
+    by_tag: Dict[str, Dict[str, Dict]] = {}
+    roots: Dict[str, Set[Tuple[str, str]]] = {}
+    routes: Dict[str, List[str]] = {}
+    for path, item in (spec.get("paths") or {}).items():
+        shared = {key: value for key, value in item.items() if key not in HTTP_METHODS}
+        for method in HTTP_METHODS:
+            operation = item.get(method)
+            if not isinstance(operation, dict):
+                continue
+            tags = list(operation.get("tags") or [DEFAULT_TAG])
+            routes[f"{method.upper()} {path}"] = tags
+            refs = set(_iter_refs(operation)) | set(_iter_refs(shared))
+            for tag in tags:
+                by_tag.setdefault(tag, {}).setdefault(path, dict(shared))[method] = operation
+                roots.setdefault(tag, set()).update(refs)
+
+    files: Dict[str, bytes] = {}
+
+    def add(stem: str, document: Dict) -> Tuple[str, int]:
+        data = _dumps(document)
+        name = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.json"
+        files[name] = data
+        return name, len(data)
+
+    declared = {tag.get("name"): tag for tag in spec.get("tags") or [] if tag.get("name")}
+    shard_map: Dict[str, Dict] = {}
+    used_stems: Set[str] = set()
+    referenced: Set[Tuple[str, str]] = set()
+    for tag in sorted(by_tag):
+        stem = _slug(tag)
+        while stem in used_stems:
+            stem += "-x"
+        used_stems.add(stem)
+        keys = graph.closure(roots[tag])
+        referenced |= keys
+        shard_components = _select(components, keys)
+        if security_schemes:
+            shard_components["securitySchemes"] = security_schemes
+        document = dict(header, tags=[declared.get(tag, {"name": tag})], paths=by_tag[tag])
+        if shard_components:
+            document["components"] = shard_components
+        name, size = add(stem, document)
+        operations = sum(1 for item in by_tag[tag].values() for method in item if method in HTTP_METHODS)
+        shard_map[tag] = {"file": name, "operations": operations, "bytes": size}
+
+    operations_file, _ = add("operations", routes)
+    unreferenced = {(section, name) for section, entries in components.items() if section != "securitySchemes"
+                    for name in entries} - referenced
+    unreferenced_file = add("unreferenced", {"components": _select(components, unreferenced)})[0] if unreferenced else None
+
+    tags = [declared.get(tag, {"name": tag}) for tag in declared if tag in by_tag]
+    tags += [{"name": tag} for tag in sorted(by_tag) if tag not in declared]
+    index = dict(header, paths={}, tags=tags)
+    if security_schemes:
+        index["components"] = {"securitySchemes": security_schemes}
+    index["x-shards"] = {"format": SHARD_FORMAT, "tags": shard_map, "operations": operations_file,
+                         "unreferenced": unreferenced_file}
+    return index, files
+
+
+def _index_files(index: Dict) -> Set[str]:
+    """Shard file names an index lists (only plain names, whatever the index says)."""
+    shards = index.get("x-shards") or {}
+    names = [entry.get("file") for entry in (shards.get("tags") or {}).values() if isinstance(entry, dict)]
+    names += [shards.get("operations"), shards.get("unreferenced")]
+    return {name for name in names if isinstance(name, str) and _SHARD_FILE.match(name)}
+
+
+def write_shards(spec: Dict, directory: Union[str, Path] = SHARDS_DIR) -> Dict:
+    """Write index.json and the shards of `spec` into `directory`, removing the previous index's unused shards."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    try:
+        previous = _index_files(json.loads((directory / INDEX_NAME).read_text()))
+    except (OSError, ValueError, AttributeError):
+        previous = set()
+    index, files = build_shards(spec)
+    for name, data in files.items():
+        path = directory / name
+        if not path.exists():
+            path.write_bytes(data)
+    (directory / INDEX_NAME).write_text(json.dumps(index, indent=2, ensure_ascii=False))
+    for name in previous - set(files):
+        (directory / name).unlink(missing_ok=True)
+    return index
+
+
+class ShardedSpec:
+    """
+    Reads a sharded schema from a directory or a base URL, fetching each shard the first time it is needed.
+
+        spec = ShardedSpec("https://api.ongoza.cyberhub/api-docs/")
+        spec.tags()                                  # only index.json fetched so far
+        spec.operation("get", "/api/v1/missions/{id}/")
+    """
+
+    def __init__(self, location: Union[str, Path] = SHARDS_DIR, fetch: Optional[Callable[[str], bytes]] = None):
+        self.location = str(location)
+        self._fetch = fetch or self._default_fetch
+        self.bytes_loaded = 0
+        self._shards: Dict[str, Dict] = {}
+        self._routes: Optional[Dict[str, List[str]]] = None
+        self._templates: Optional[List[Tuple[str, re.Pattern, str]]] = None
+        self.index = self._load(INDEX_NAME)
+        shards = self.index.get("x-shards") or {}
+        if shards.get("format") != SHARD_FORMAT:
+            raise ValueError(f"{self.location} is not a sharded schema (format {shards.get('format')!r})")
+        self.shard_map: Dict[str, Dict] = shards["tags"]
+
+    def _default_fetch(self, name: str) -> bytes:
+        if self.location.startswith(("http://", "https://")):
+            with urllib.request.urlopen(self.location.rstrip("/") + "/" + name) as response:
+                return response.read()
+        return (Path(self.location) / name).read_bytes()
+
+    def _load(self, name: str) -> Dict:
+        data = self._fetch(name)
+        self.bytes_loaded += len(data)
+        return json.loads(data)
+
+    def tags(self) -> List[str]:
+        return list(self.shard_map)
+
+    def shard(self, tag: str) -> Dict:
+        """The OpenAPI document for one tag."""
+        if tag not in self._shards:
+            if tag not in self.shard_map:
+                raise KeyError(f"no shard for tag {tag!r}")
+            self._shards[tag] = self._load(self.shard_map[tag]["file"])
+        return self._shards[tag]
+
+    def _route_tags(self, method: str, path: str) -> Tuple[Optional[str], List[str]]:
+        if self._routes is None:
+            self._routes = self._load(self.index["x-shards"]["operations"])
+            self._templates = []
+            for key in self._routes:
+                route_method, template = key.split(" ", 1)
+                if "{" in template:
+                    parts = re.split(r"\{[^}/]+\}", template)
+                    regex = re.compile("[^/]+".join(re.escape(part) for part in parts) + "$")
+                    self._templates.append((route_method, regex, template))
+        key = f"{method.upper()} {path}"
+        if key in self._routes:
+            return path, self._routes[key]
+        for route_method, regex, template in self._templates:
+            if route_method == method.upper() and regex.match(path):
+                return template, self._routes[f"{route_method} {template}"]
+        return None, []
+
+    def operation(self, method: str, path: str) -> Optional[Dict]:
+        """The operation for a path template or concrete path, loading only the shard that holds it."""
+        template, tags = self._route_tags(method, path)
+        if template is None:
+            return None
+        return self.shard(tags[0])["paths"][template][method.lower()]
+
+    def full(self) -> Dict:
+        """The whole schema reassembled from every shard."""
+        spec = {key: value for key, value in self.index.items() if key != "x-shards"}
+        paths: Dict[str, Dict] = {}
+        components: Dict[str, Dict] = {}
+        for tag in self.shard_map:
+            shard = self.shard(tag)
+            for path, item in shard["paths"].items():
+                paths.setdefault(path, {}).update(item)
+            for section, entries in (shard.get("components") or {}).items():
+                components.setdefault(section, {}).update(entries)
+        if self.index["x-shards"].get("unreferenced"):
+            for section, entries in self._load(self.index["x-shards"]["unreferenced"])["components"].items():
+                components.setdefault(section, {}).update(entries)
+        spec["paths"] = paths
+        spec["components"] = components
+        return spec
+
+
+def report(index: Dict, full_bytes: int, directory: Path) -> None:
+    shards = index["x-shards"]["tags"]
+    index_bytes = (directory / INDEX_NAME).stat().st_size
+    largest = max((entry["bytes"] for entry in shards.values()), default=0)
+    print(f"✓ {len(shards)} tag shards written to: {directory}")
+    print(f"  - index.json: {index_bytes / 1024:.1f} KiB (full schema {full_bytes / 1024:.1f} KiB)")
+    print(f"  - largest shard: {largest / 1024:.1f} KiB")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("spec", nargs="?", default=str(MERGED_SCHEMA_PATH))
+    parser.add_argument("-o", "--output", default=str(SHARDS_DIR))
+    args = parser.parse_args(argv)
+
+    if not Path(args.spec).exists():
+        print(f"Error: {args.spec} not found (run shared/openapi/merge_openapi.py first)")
+        return 1
+    with open(args.spec) as f:
+        spec = json.load(f)
+    index = write_shards(spec, args.output)
+    report(index, Path(args.spec).stat().st_size, Path(args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,785 @@
+#!/usr/bin/env python3
+"""
+Compiled request/response validators for merged_openapi.json.
+
+Every components.schemas entry becomes a specialized Python function, and so
+does every operation's JSON request body, path/query parameters and JSON
+responses. Checks are unrolled for each schema, so a call does no schema
+walking and no keyword dispatch; $ref becomes a function call (recursive
+schemas work), required becomes one set comparison, and oneOf with a
+discriminator dispatches straight to the matching branch. Request bodies and
+parameters are checked against a variant of each schema without its readOnly
+properties, responses against one without its writeOnly properties (schemas
+that use neither share one function). The generated module is executed once
+before it is moved into the cache directory under the hash of the spec (and
+of the generator version), then imported from there, so recompiling only
+happens when the spec changes.
+
+Covered: type (OpenAPI 3.0 nullable and 3.1 type lists), enum, const,
+properties, required, additionalProperties, min/maxProperties, items,
+min/maxItems, uniqueItems, min/maxLength, pattern, format (date-time, date,
+time, uuid, email, ipv4, ipv6, uri), minimum/maximum and both exclusive
+forms, multipleOf, allOf, anyOf, oneOf, not and $ref. Other keywords are
+ignored, as they are by documentation tooling. Values are decoded JSON
+(dict, list, str, int, float, bool, None); validators raise ValidationError
+at the first problem.
+
+Usage:
+    from shared.openapi.validators import load_validators
+    spec = load_validators()                                 # merged_openapi.json
+    template, params = spec.validate_request("POST", "/api/v1/coaching/goals/", body=payload)
+    spec.validate_response("POST", template, 201, response_payload)
+    spec.validate("MissionSubmission", data)
+
+    python -m shared.openapi.validators                       # compile into the cache
+    python -m shared.openapi.validators --audit payloads.jsonl
+"""
+import argparse
+import hashlib
+import importlib.util
+import ipaddress
+import json
+import math
+import os
+import re
+import sys
+import types
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+BASE_DIR = Path(__file__).parent.parent.parent
+MERGED_SCHEMA_PATH = BASE_DIR / "shared" / "openapi" / "merged_openapi.json"
+CACHE_DIR = Path(os.environ.get("OPENAPI_VALIDATOR_CACHE", BASE_DIR / "shared" / "openapi" / "compiled"))
+
+# Bump when the generated code changes, so cached modules are rebuilt
+COMPILER_VERSION = "2"
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+_REF_PREFIX = "#/components/schemas/"
+# Properties left out of a schema's request / response variant
+_HIDDEN_IN = {"request": "readOnly", "response": "writeOnly"}
+_FUNCTION_PREFIX = {None: "s", "request": "q", "response": "r"}
+
+FORMAT_PATTERNS = {
+    "date-time": r"^\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:[Zz]|[+-]\d{2}:?\d{2})?$",
+    "date": r"^\d{4}-\d{2}-\d{2}$",
+    "time": r"^\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:[Zz]|[+-]\d{2}:?\d{2})?$",
+    "uuid": r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$",
+    "email": r"^[^@\s]+@[^@\s]+\.[^@\s]+$",
+    "uri": r"^[A-Za-z][A-Za-z0-9+.-]*:\S*$",
+}
+
+
+class ValidationError(ValueError):
+    """A payload does not match its schema. `path` locates the offending value."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+        self._segments: List[Union[str, int]] = []    # innermost first; added while unwinding
+
+    @property
+    def path(self) -> List[Union[str, int]]:
+        return self._segments[::-1]
+
+    @property
+    def location(self) -> str:
+        return "$" + "".join(f"[{s}]" if isinstance(s, int) else f".{s}" for s in self.path)
+
+    def __str__(self) -> str:
+        return f"{self.location}: {self.message}"
+
+
+# ---------------------------------------------------------------------------
+# Helpers available to generated code
+# ---------------------------------------------------------------------------
+
+def _json_equal(a: Any, b: Any) -> bool:
+    if type(a) is bool or type(b) is bool or a is None or b is None:
+        return type(a) is type(b) and a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    if type(a) is not type(b):
+        return False
+    if type(a) is list:
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    if type(a) is dict:
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    return a == b
+
+
+def _in_enum(value: Any, options: tuple) -> bool:
+    return any(_json_equal(value, option) for option in options)
+
+
+def _unique(items: list) -> bool:
+    return all(not _json_equal(items[i], items[j]) for i in range(len(items)) for j in range(i))
+
+
+def _multiple(value, divisor) -> bool:
+    if type(value) is int and type(divisor) is int:
+        return value % divisor == 0
+    quotient = value / divisor
+    return math.isfinite(quotient) and abs(quotient - round(quotient)) < 1e-9
+
+
+def _ip(value: str, version: int) -> bool:
+    try:
+        return ipaddress.ip_address(value).version == version
+    except ValueError:
+        return False
+
+
+def _type_name(value: Any) -> str:
+    return {dict: "object", list: "array", str: "string", bool: "boolean", int: "integer",
+            float: "number", type(None): "null"}.get(type(value), type(value).__name__)
+
+
+_RUNTIME = {
+    "_E": ValidationError, "_in_enum": _in_enum, "_unique": _unique, "_multiple": _multiple, "_ip": _ip,
+    "_tn": _type_name, "_M": object(),
+}
+
+
+# ---------------------------------------------------------------------------
+# Code generation
+# ---------------------------------------------------------------------------
+
+_TYPE_CHECKS = {
+    "object": "type({v}) is dict",
+    "array": "type({v}) is list",
+    "string": "type({v}) is str",
+    "boolean": "type({v}) is bool",
+    "integer": "(type({v}) is int or type({v}) is float and {v}.is_integer())",
+    "number": "(type({v}) is int or type({v}) is float)",
+    "null": "{v} is None",
+}
+_STRING_KEYWORDS = ("minLength", "maxLength", "pattern", "format")
+_NUMBER_KEYWORDS = ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "multipleOf")
+_ARRAY_KEYWORDS = ("items", "minItems", "maxItems", "uniqueItems")
+_OBJECT_KEYWORDS = ("properties", "required", "additionalProperties", "minProperties", "maxProperties")
+
+
+def _identifier(name: str) -> str:
+    return re.sub(r"\W", "_", name)
+
+
+class _Generator:
+
+    def __init__(self, spec: Dict):
+        self.spec = spec
+        self.schemas = (spec.get("components") or {}).get("schemas") or {}
+        self.lines: List[str] = []
+        self.tail: List[str] = []         # definitions that refer to generated functions
+        self.constants: Dict[str, str] = {}
+        self.functions: Dict[Tuple[str, Optional[str]], str] = {}
+        self.pending: List[Tuple[str, Dict, Optional[str]]] = []
+        self.counter = 0
+        self.mode: Optional[str] = None     # None, "request" or "response"; see _HIDDEN_IN
+        self._marked: Dict[Tuple[str, str], bool] = {}
+
+    def _name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, source: str) -> str:
+        if source not in self.constants:
+            self.constants[source] = f"_c{len(self.constants)}"
+        return self.constants[source]
+
+    def _schema_name(self, ref: str) -> str:
+        if not ref.startswith(_REF_PREFIX):
+            raise ValueError(f"Unsupported $ref {ref!r} (only {_REF_PREFIX}* is resolved)")
+        name = ref[len(_REF_PREFIX):].replace("~1", "/").replace("~0", "~")
+        if name not in self.schemas:
+            raise ValueError(f"$ref to unknown schema {name!r}")
+        return name
+
+    def _uses(self, value: Any, keyword: str, seen: set) -> bool:
+        """True if `keyword` is set anywhere in `value`, following $refs."""
+        if isinstance(value, list):
+            return any(self._uses(item, keyword, seen) for item in value)
+        if not isinstance(value, dict):
+            return False
+        if value.get(keyword) is True:
+            return True
+        ref = value.get("$ref")
+        if isinstance(ref, str) and ref.startswith(_REF_PREFIX) and ref not in seen:
+            seen.add(ref)
+            if self._uses(self.schemas.get(self._schema_name(ref)), keyword, seen):
+                return True
+        return any(self._uses(item, keyword, seen) for key, item in value.items() if key != "enum")
+
+    def _variant(self, name: str) -> Optional[str]:
+        """The current mode, or None when schema `name` has nothing that mode would hide."""
+        if self.mode is None:
+            return None
+        key = (name, _HIDDEN_IN[self.mode])
+        if key not in self._marked:
+            self._marked[key] = self._uses(self.schemas[name], key[1], set())
+        return self.mode if self._marked[key] else None
+
+    def _hidden(self, schema: Any) -> bool:
+        """True if `schema`, a property, is left out in the current mode."""
+        if self.mode is None or not isinstance(schema, dict):
+            return False
+        keyword = _HIDDEN_IN[self.mode]
+        if set(schema) == {"$ref"}:
+            schema = self.schemas.get(self._schema_name(schema["$ref"])) or {}
+        return schema.get(keyword) is True
+
+    def ref_function(self, ref: str) -> str:
+        name = self._schema_name(ref)
+        mode = self._variant(name)
+        if (name, mode) not in self.functions:
+            prefix = _FUNCTION_PREFIX[mode]
+            self.functions[(name, mode)] = f"{prefix}_{_identifier(name)}_{len(self.functions)}"
+            self.pending.append((self.functions[(name, mode)], self.schemas[name], mode))
+        return self.functions[(name, mode)]
+
+    def function(self, schema: Dict) -> str:
+        """Name of a function validating `schema` (the $ref target itself when it is a bare $ref)."""
+        if set(schema) == {"$ref"}:
+            return self.ref_function(schema["$ref"])
+        name = self._name("a_")
+        self.pending.append((name, schema, self.mode))
+        return name
+
+    def drain(self) -> None:
+        while self.pending:
+            name, schema, self.mode = self.pending.pop(0)
+            body: List[str] = []
+            self.emit(schema, "d", body, 1)
+            self.lines.append(f"def {name}(d):")
+            self.lines.extend(body or ["    pass"])
+            self.lines.append("")
+
+    # -- schema -> statements ------------------------------------------------
+
+    def emit(self, schema: Any, v: str, out: List[str], depth: int) -> None:
+        pad = "    " * depth
+        if schema is False:
+            out.append(f"{pad}raise _E('no value is allowed here')")
+            return
+        if not isinstance(schema, dict) or not schema:
+            return
+        types = schema.get("type")
+        types = [types] if isinstance(types, str) else list(types or [])
+        nullable = schema.get("nullable") is True or "null" in types
+        types = [t for t in types if t != "null"]
+        if not nullable:
+            self._emit_checks(schema, types, v, out, depth)
+            return
+        body: List[str] = []
+        self._emit_checks(schema, types, v, body, depth + 1)
+        if body:
+            out.append(f"{pad}if {v} is not None:")
+            out.extend(body)
+
+    def _emit_checks(self, schema: Dict, types: List[str], v: str, out: List[str], depth: int) -> None:
+        pad = "    " * depth
+        if "$ref" in schema:
+            out.append(f"{pad}{self.ref_function(schema['$ref'])}({v})")
+        if types:
+            test = " or ".join(_TYPE_CHECKS[t].format(v=v) for t in types if t in _TYPE_CHECKS)
+            if test:
+                expected = " or ".join(map(str, types))
+                out.append(f"{pad}if not ({test}):")
+                out.append(f"{pad}    raise _E({'expected ' + expected + ', got '!r} + _tn({v}))")
+
+        if "enum" in schema:
+            values = schema["enum"]
+            strings = [value for value in values if value is not None]
+            if all(type(value) is str for value in strings):
+                options = self.constant(f"frozenset({sorted(strings)!r})")
+                test = f"{v} not in {options}" if types == ["string"] else f"type({v}) is not str or {v} not in {options}"
+                out.append(f"{pad}if {v} is not None and ({test}):" if None in values else f"{pad}if {test}:")
+            else:
+                options = self.constant(repr(tuple(values)))
+                out.append(f"{pad}if not _in_enum({v}, {options}):")
+            out.append(f"{pad}    raise _E('not one of the allowed values')")
+        if "const" in schema:
+            out.append(f"{pad}if not _in_enum({v}, {self.constant(repr((schema['const'],)))}):")
+            out.append(f"{pad}    raise _E('not the allowed constant')")
+
+        for keywords, kind, emitter in ((_STRING_KEYWORDS, "string", self._emit_string),
+                                        (_NUMBER_KEYWORDS, "number", self._emit_number),
+                                        (_ARRAY_KEYWORDS, "array", self._emit_array),
+                                        (_OBJECT_KEYWORDS, "object", self._emit_object)):
+            if not any(keyword in schema for keyword in keywords):
+                continue
+            block: List[str] = []
+            known = types == [kind] or kind == "number" and types == ["integer"]
+            emitter(schema, v, block, depth if known else depth + 1)
+            if block and not known:
+                out.append(f"{pad}if {_TYPE_CHECKS[kind].format(v=v)}:")
+            out.extend(block)
+
+        for sub in schema.get("allOf") or []:
+            self.emit(sub, v, out, depth)
+        if schema.get("anyOf"):
+            branches = ", ".join(self.function(sub) for sub in schema["anyOf"])
+            out.append(f"{pad}for _f in ({branches},):")
+            out.append(f"{pad}    try:")
+            out.append(f"{pad}        _f({v})")
+            out.append(f"{pad}        break")
+            out.append(f"{pad}    except _E:")
+            out.append(f"{pad}        pass")
+            out.append(f"{pad}else:")
+            out.append(f"{pad}    raise _E('does not match any anyOf schema')")
+        if schema.get("oneOf"):
+            self._emit_one_of(schema, v, out, depth)
+        if "not" in schema:
+            function = self.function(schema["not"])
+            out.append(f"{pad}try:")
+            out.append(f"{pad}    {function}({v})")
+            out.append(f"{pad}except _E:")
+            out.append(f"{pad}    pass")
+            out.append(f"{pad}else:")
+            out.append(f"{pad}    raise _E('matches a schema it must not match')")
+
+    def _emit_one_of(self, schema: Dict, v: str, out: List[str], depth: int) -> None:
+        pad = "    " * depth
+        branches = schema["oneOf"]
+        discriminator = schema.get("discriminator") or {}
+        prop = discriminator.get("propertyName")
+        if prop and all(set(branch) == {"$ref"} for branch in branches):
+            mapping = {ref.rsplit("/", 1)[-1]: ref for ref in (branch["$ref"] for branch in branches)}
+            mapping.update(discriminator.get("mapping") or {})
+            table = self._name("_dispatch")
+            entries = ", ".join(f"{key!r}: {self.ref_function(ref)}" for key, ref in mapping.items())
+            self.tail.append(f"{table} = {{{entries}}}")
+            out.append(f"{pad}_f = {table}.get({v}.get({prop!r})) if type({v}) is dict else None")
+            out.append(f"{pad}if _f is None:")
+            out.append(f"{pad}    raise _E({'unknown or missing discriminator ' + str(prop)!r})")
+            out.append(f"{pad}_f({v})")
+            return
+        functions = ", ".join(self.function(branch) for branch in branches)
+        out.append(f"{pad}_n = 0")
+        out.append(f"{pad}for _f in ({functions},):")
+        out.append(f"{pad}    try:")
+        out.append(f"{pad}        _f({v})")
+        out.append(f"{pad}        _n += 1")
+        out.append(f"{pad}    except _E:")
+        out.append(f"{pad}        pass")
+        out.append(f"{pad}if _n != 1:")
+        out.append(f"{pad}    raise _E('matches ' + str(_n) + ' oneOf schemas, expected exactly 1')")
+
+    def _emit_string(self, schema: Dict, v: str, out: List[str], depth: int) -> None:
+        pad = "    " * depth
+        if "minLength" in schema:
+            out.append(f"{pad}if len({v}) < {int(schema['minLength'])}:")
+            out.append(f"{pad}    raise _E('shorter than {int(schema['minLength'])} characters')")
+        if "maxLength" in schema:
+            out.append(f"{pad}if len({v}) > {int(schema['maxLength'])}:")
+            out.append(f"{pad}    raise _E('longer than {int(schema['maxLength'])} characters')")
+        if "pattern" in schema:
+            regex = self.constant(f"re.compile({schema['pattern']!r})")
+            out.append(f"{pad}if {regex}.search({v}) is None:")
+            out.append(f"{pad}    raise _E({'does not match ' + schema['pattern']!r})")
+        fmt = schema.get("format")
+        if fmt in FORMAT_PATTERNS:
+            regex = self.constant(f"re.compile({FORMAT_PATTERNS[fmt]!r})")
+            out.append(f"{pad}if {regex}.match({v}) is None:")
+            out.append(f"{pad}    raise _E('not a valid {fmt}')")
+        elif fmt in ("ipv4", "ipv6"):
+            out.append(f"{pad}if not _ip({v}, {fmt[-1]}):")
+            out.append(f"{pad}    raise _E('not a valid {fmt}')")
+
+    def _emit_number(self, schema: Dict, v: str, out: List[str], depth: int) -> None:
+        pad = "    " * depth
+        for keyword, exclusive, op, words in (("minimum", "exclusiveMinimum", "<", "less than"),
+                                              ("maximum", "exclusiveMaximum", ">", "greater than")):
+            bound, flag = schema.get(keyword), schema.get(exclusive)
+            if bound is not None and flag is True:       # OpenAPI 3.0: boolean modifier
+                out.append(f"{pad}if {v} {op}= {bound!r}:")
+                out.append(f"{pad}    raise _E({words + ' or equal to ' + repr(bound)!r})")
+            elif bound is not None:
+                out.append(f"{pad}if {v} {op} {bound!r}:")
+                out.append(f"{pad}    raise _E({words + ' ' + repr(bound)!r})")
+            if isinstance(flag, (int, float)) and not isinstance(flag, bool):    # 3.1: the bound itself
+                out.append(f"{pad}if {v} {op}= {flag!r}:")
+                out.append(f"{pad}    raise _E({words + ' or equal to ' + repr(flag)!r})")
+        if "multipleOf" in schema:
+            out.append(f"{pad}if not _multiple({v}, {schema['multipleOf']!r}):")
+            out.append(f"{pad}    raise _E({'not a multiple of ' + repr(schema['multipleOf'])!r})")
+
+    def _emit_array(self, schema: Dict, v: str, out: List[str], depth: int) -> None:
+        pad = "    " * depth
+        if "minItems" in schema:
+            out.append(f"{pad}if len({v}) < {int(schema['minItems'])}:")
+            out.append(f"{pad}    raise _E('fewer than {int(schema['minItems'])} items')")
+        if "maxItems" in schema:
+            out.append(f"{pad}if len({v}) > {int(schema['maxItems'])}:")
+            out.append(f"{pad}    raise _E('more than {int(schema['maxItems'])} items')")
+        if schema.get("uniqueItems"):
+            out.append(f"{pad}if not _unique({v}):")
+            out.append(f"{pad}    raise _E('items are not unique')")
+        items = schema.get("items")
+        if isinstance(items, dict) and items:
+            i, x = self._name("_i"), self._name("_x")
+            body: List[str] = []
+            self.emit(items, x, body, depth + 2)
+            if body:
+                out.append(f"{pad}for {i}, {x} in enumerate({v}):")
+                out.append(f"{pad}    try:")
+                out.extend(body)
+                out.append(f"{pad}    except _E as _e:")
+                out.append(f"{pad}        _e._segments.append({i})")
+                out.append(f"{pad}        raise")
+
+    def _emit_object(self, schema: Dict, v: str, out: List[str], depth: int) -> None:
+        pad = "    " * depth
+        properties = {name: sub for name, sub in (schema.get("properties") or {}).items() if not self._hidden(sub)}
+        hidden = set(schema.get("properties") or {}) - set(properties)
+        required = [name for name in schema.get("required") or [] if name not in hidden]
+        if required:
+            names = self.constant(f"frozenset({sorted(set(required))!r})")
+            out.append(f"{pad}if not {names} <= {v}.keys():")
+            out.append(f"{pad}    raise _E('missing required properties: ' + ', '.join(sorted({names} - {v}.keys())))")
+        if "minProperties" in schema:
+            out.append(f"{pad}if len({v}) < {int(schema['minProperties'])}:")
+            out.append(f"{pad}    raise _E('fewer than {int(schema['minProperties'])} properties')")
+        if "maxProperties" in schema:
+            out.append(f"{pad}if len({v}) > {int(schema['maxProperties'])}:")
+            out.append(f"{pad}    raise _E('more than {int(schema['maxProperties'])} properties')")
+
+        for name, sub in properties.items():
+            x = self._name("_p")
+            try_depth = depth if name in required else depth + 1
+            body: List[str] = []
+            self.emit(sub, x, body, try_depth + 1)
+            if not body:
+                continue
+            if name in required:
+                out.append(f"{pad}{x} = {v}[{name!r}]")
+            else:
+                out.append(f"{pad}{x} = {v}.get({name!r}, _M)")
+                out.append(f"{pad}if {x} is not _M:")
+            block = "    " * try_depth
+            out.append(f"{block}try:")
+            out.extend(body)
+            out.append(f"{block}except _E as _e:")
+            out.append(f"{block}    _e._segments.append({name!r})")
+            out.append(f"{block}    raise")
+
+        additional = schema.get("additionalProperties", True)
+        if additional is False:
+            allowed = self.constant(f"frozenset({sorted(properties)!r})")
+            out.append(f"{pad}if not {v}.keys() <= {allowed}:")
+            out.append(f"{pad}    raise _E('unexpected properties: ' + ', '.join(sorted({v}.keys() - {allowed})))")
+        elif isinstance(additional, dict) and additional:
+            k, x = self._name("_k"), self._name("_x")
+            allowed = self.constant(f"frozenset({sorted(properties)!r})")
+            body = []
+            self.emit(additional, x, body, depth + 2)
+            if body:
+                out.append(f"{pad}for {k}, {x} in {v}.items():")
+                out.append(f"{pad}    if {k} in {allowed}:")
+                out.append(f"{pad}        continue")
+                out.append(f"{pad}    try:")
+                out.extend(body)
+                out.append(f"{pad}    except _E as _e:")
+                out.append(f"{pad}        _e._segments.append({k})")
+                out.append(f"{pad}        raise")
+
+    # -- operations ----------------------------------------------------------
+
+    def _resolve(self, item: Dict, section: str) -> Dict:
+        ref = item.get("$ref") if isinstance(item, dict) else None
+        if ref and ref.startswith(f"#/components/{section}/"):
+            return ((self.spec.get("components") or {}).get(section) or {}).get(ref.rsplit("/", 1)[-1]) or {}
+        return item or {}
+
+    @staticmethod
+    def _json_schema(content: Dict) -> Optional[Dict]:
+        for media_type, entry in (content or {}).items():
+            if media_type.split(";")[0].strip().endswith("json") and isinstance(entry, dict) and "schema" in entry:
+                return entry["schema"]
+        return None
+
+    def operations(self) -> str:
+        entries = []
+        for template, item in sorted((self.spec.get("paths") or {}).items()):
+            shared_params = item.get("parameters") or []
+            for method in HTTP_METHODS:
+                operation = item.get(method)
+                if not isinstance(operation, dict):
+                    continue
+                params = {}
+                for raw in shared_params + (operation.get("parameters") or []):
+                    param = self._resolve(raw, "parameters")
+                    if param.get("in") in ("path", "query") and param.get("name"):
+                        params[(param["in"], param["name"])] = param
+                entry = {"body": None, "body_required": False, "path": None, "query": None,
+                         "types": {}, "responses": {}}
+                self.mode = "request"
+                for location in ("path", "query"):
+                    group = {name: param for (where, name), param in params.items() if where == location}
+                    if group:
+                        entry[location] = self.function({
+                            "type": "object",
+                            "properties": {name: param.get("schema") or {} for name, param in group.items()},
+                            "required": [name for name, param in group.items()
+                                         if param.get("required") or location == "path"],
+                        })
+                        for name, param in group.items():
+                            entry["types"][name] = self._param_type(param.get("schema") or {})
+                body = self._resolve(operation.get("requestBody") or {}, "requestBodies")
+                schema = self._json_schema(body.get("content"))
+                if schema is not None:
+                    entry["body"] = self.function(schema)
+                    entry["body_required"] = bool(body.get("required"))
+                self.mode = "response"
+                for status, response in (operation.get("responses") or {}).items():
+                    schema = self._json_schema(self._resolve(response, "responses").get("content"))
+                    if schema is not None:
+                        entry["responses"][str(status).upper()] = self.function(schema)
+                responses = ", ".join(f"{status!r}: {fn}" for status, fn in entry["responses"].items())
+                entries.append(
+                    f"    ({method!r}, {template!r}): {{'body': {entry['body']}, "
+                    f"'body_required': {entry['body_required']}, 'path': {entry['path']}, "
+                    f"'query': {entry['query']}, 'types': {entry['types']!r}, 'responses': {{{responses}}}}},"
+                )
+        self.mode = None
+        return "OPERATIONS = {\n" + "\n".join(entries) + "\n}"
+
+    def _param_type(self, schema: Dict) -> str:
+        if "$ref" in schema and schema["$ref"].startswith(_REF_PREFIX):
+            schema = self.schemas.get(schema["$ref"][len(_REF_PREFIX):]) or {}
+        kind = schema.get("type")
+        if isinstance(kind, list):
+            kind = next((t for t in kind if t != "null"), "string")
+        if kind == "array":
+            return "array:" + self._param_type(schema.get("items") or {})
+        return kind or "string"
+
+    def source(self, spec_hash: str) -> str:
+        for name in self.schemas:
+            self.ref_function(_REF_PREFIX + name.replace("~", "~0").replace("/", "~1"))
+        self.drain()
+        operations = self.operations()
+        self.drain()
+        schemas = ", ".join(f"{name!r}: {fn}" for (name, mode), fn in self.functions.items() if mode is None)
+        header = [
+            f"# Generated by shared/openapi/validators.py (compiler {COMPILER_VERSION}) from spec {spec_hash}.",
+            "# Do not edit; delete the file to force a rebuild.",
+            "import re",
+            "",
+        ]
+        constants = [f"{name} = {source}" for source, name in self.constants.items()]
+        return "\n".join(header + constants + [""] + self.lines + self.tail +
+                         ["", f"SCHEMAS = {{{schemas}}}", "", operations, ""])
+
+
+# ---------------------------------------------------------------------------
+# Compiled spec
+# ---------------------------------------------------------------------------
+
+def spec_hash(spec: Dict) -> str:
+    canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{COMPILER_VERSION}\0{canonical}".encode()).hexdigest()
+
+
+def generate_source(spec: Dict) -> str:
+    """Python source of the validator module for `spec`."""
+    return _Generator(spec).source(spec_hash(spec)[:16])
+
+
+def _coerce(value: Any, kind: str) -> Any:
+    """Query and path values arrive as strings; convert the ones whose schema says otherwise."""
+    if kind.startswith("array:"):
+        values = value if isinstance(value, list) else str(value).split(",")
+        return [_coerce(item, kind[6:]) for item in values]
+    if isinstance(value, list):
+        value = value[-1] if value else ""
+    if kind == "integer":
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    if kind == "number":
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    if kind == "boolean":
+        return {"true": True, "false": False, "1": True, "0": False}.get(str(value).lower(), value)
+    return value
+
+
+class CompiledSpec:
+    """Validators for one spec, plus routing of concrete request paths to operations."""
+
+    def __init__(self, module, digest: str):
+        self.hash = digest
+        self.source_path = getattr(module, "__file__", None)
+        self.schemas: Dict[str, Callable] = module.SCHEMAS
+        self.operations: Dict[Tuple[str, str], Dict] = module.OPERATIONS
+        self._static: Dict[Tuple[str, str], str] = {}
+        self._dynamic: Dict[str, List[Tuple[re.Pattern, str, List[str]]]] = {}
+        for method, template in self.operations:
+            if "{" not in template:
+                self._static[(method, template)] = template
+            else:
+                parts = re.split(r"\{([^}/]+)\}", template)
+                regex = "".join(re.escape(part) if i % 2 == 0 else "([^/]+)" for i, part in enumerate(parts))
+                self._dynamic.setdefault(method, []).append((re.compile(regex + "$"), template, parts[1::2]))
+
+    def validate(self, schema_name: str, data: Any) -> None:
+        self.schemas[schema_name](data)
+
+    def match(self, method: str, path: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """(path template, path parameters) of the operation serving `method path`, or None."""
+        method = method.lower()
+        template = self._static.get((method, path))
+        if template is not None:
+            return template, {}
+        for regex, template, names in self._dynamic.get(method, ()):
+            match = regex.match(path)
+            if match:
+                return template, dict(zip(names, match.groups()))
+        return None
+
+    _NO_BODY = object()
+
+    def validate_request(self, method: str, path: str, body: Any = _NO_BODY,
+                         query: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+        """Validate a request; returns (path template, coerced path + query parameters)."""
+        matched = self.match(method, path)
+        if matched is None:
+            raise ValidationError(f"no operation for {method.upper()} {path}")
+        template, path_params = matched
+        operation = self.operations[(method.lower(), template)]
+        types = operation["types"]
+        params = {name: _coerce(value, types.get(name, "string")) for name, value in path_params.items()}
+        if operation["path"]:
+            operation["path"](params)
+        if operation["query"]:
+            query_params = {name: _coerce(value, types.get(name, "string")) for name, value in (query or {}).items()}
+            operation["query"](query_params)
+            params.update(query_params)
+        if body is self._NO_BODY:
+            if operation["body_required"]:
+                raise ValidationError("request body is required")
+        elif operation["body"]:
+            operation["body"](body)
+        return template, params
+
+    def validate_response(self, method: str, template: str, status: int, body: Any) -> bool:
+        """Validate a response body; False when the operation documents no JSON body for `status`."""
+        operation = self.operations.get((method.lower(), template))
+        if operation is None:
+            matched = self.match(method, template)
+            if matched is None:
+                raise ValidationError(f"no operation for {method.upper()} {template}")
+            operation = self.operations[(method.lower(), matched[0])]
+        responses = operation["responses"]
+        validator = responses.get(str(status)) or responses.get(f"{str(status)[0]}XX") or responses.get("DEFAULT")
+        if validator is None:
+            return False
+        validator(body)
+        return True
+
+
+_loaded: Dict[str, CompiledSpec] = {}
+
+
+def load_validators(spec: Union[Dict, str, Path] = MERGED_SCHEMA_PATH,
+                    cache_dir: Union[str, Path] = CACHE_DIR) -> CompiledSpec:
+    """Compiled validators for `spec` (a dict or a JSON file), generated once per spec hash."""
+    if not isinstance(spec, dict):
+        with open(spec) as f:
+            spec = json.load(f)
+    digest = spec_hash(spec)
+    if digest in _loaded:
+        return _loaded[digest]
+    cache_dir = Path(cache_dir)
+    module_name = f"_openapi_validators_{digest[:16]}"
+    module_path = cache_dir / f"validators_{digest[:16]}.py"
+    module = None
+    if module_path.exists():
+        try:
+            module_spec = importlib.util.spec_from_file_location(module_name, module_path)
+            module = importlib.util.module_from_spec(module_spec)
+            module.__dict__.update(_RUNTIME)
+            module_spec.loader.exec_module(module)
+        except Exception:
+            # Left by an older generator or cut short; rebuild it
+            module = None
+            module_path.unlink(missing_ok=True)
+    if module is None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        source = generate_source(spec)
+        tmp_path = module_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(source)
+        try:
+            # Only a module that compiles and runs goes into the cache
+            module = types.ModuleType(module_name)
+            module.__file__ = str(module_path)
+            module.__dict__.update(_RUNTIME)
+            exec(compile(source, str(module_path), "exec"), module.__dict__)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, module_path)
+    _loaded[digest] = CompiledSpec(module, digest)
+    return _loaded[digest]
+
+
+# ---------------------------------------------------------------------------
+# Bulk audit
+# ---------------------------------------------------------------------------
+
+def audit(spec: CompiledSpec, records) -> Dict:
+    """
+    Check recorded traffic against the spec. Each record is a dict with method and path,
+    plus optional query, body (request) and status + response (response body).
+    """
+    checked = failed = 0
+    by_operation: Counter = Counter()
+    samples: Dict[str, str] = {}
+    for record in records:
+        checked += 1
+        method, path = record["method"], record["path"]
+        try:
+            if "body" in record:
+                template, _ = spec.validate_request(method, path, record["body"], record.get("query"))
+            else:
+                template, _ = spec.validate_request(method, path, query=record.get("query"))
+            if "response" in record and "status" in record:
+                spec.validate_response(method, template, record["status"], record["response"])
+        except ValidationError as e:
+            failed += 1
+            matched = spec.match(method, path)
+            key = f"{method.upper()} {matched[0] if matched else path}"
+            by_operation[key] += 1
+            samples.setdefault(key, str(e))
+    return {"checked": checked, "failed": failed,
+            "by_operation": [{"operation": key, "failures": n, "example": samples[key]}
+                             for key, n in by_operation.most_common()]}
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("spec", nargs="?", default=str(MERGED_SCHEMA_PATH))
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR))
+    parser.add_argument("--audit", metavar="JSONL", help="Validate recorded requests/responses, one JSON per line")
+    args = parser.parse_args(argv)
+
+    if not Path(args.spec).exists():
+        print(f"Error: {args.spec} not found (run shared/openapi/merge_openapi.py first)")
+        return 1
+    spec = load_validators(args.spec, args.cache_dir)
+    print(f"✓ {len(spec.schemas)} schemas, {len(spec.operations)} operations compiled -> {spec.source_path}")
+    if args.audit:
+        with open(args.audit) as f:
+            result = audit(spec, (json.loads(line) for line in f if line.strip()))
+        print(json.dumps(result, indent=2))
+        return 1 if result["failed"] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
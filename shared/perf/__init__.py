@@ -0,0 +1 @@
+"""Benchmark suite for the repository's Python tooling, with a committed baseline (see suite.py)."""
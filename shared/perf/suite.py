@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the repository's Python tooling, with a committed baseline.
+
+Cases, each at three scales (small / medium / large):
+    openapi.merge      merge_openapi.py: load both specs, merge, write      100 / 1000 / 10000 paths+schemas
+    openapi.validate   validate_schemas.py checks on the same specs         100 / 1000 / 10000 paths+schemas
+    missions.parse     load_catalog over mission YAML files                 10 / 500 / 5000 files
+    seed.users         create_user() from                                   1k / 10k / 100k students
+                       scripts/create_comprehensive_test_environment.py,
+                       rolled back, with a fast password hasher standing
+                       in; needs a configured Django project (about 5 ms
+                       per student, so the large scale runs for minutes)
+
+Inputs are generated before a case starts and each case runs in its own
+subprocess, so the numbers cover only the tool's work and the peak RSS is the
+case's own. Recorded per case:
+    seconds         median wall time over --repeat runs
+    min_seconds     fastest of those runs
+    peak_rss_mib    growth of the process's peak RSS while the case runs
+    alloc_peak_mib  peak traced Python heap (tracemalloc, in a separate run)
+Wall times are also divided by a fixed calibration loop timed on the same
+box, so a baseline recorded on one machine can be compared on another; the
+memory figures do not depend on the machine.
+
+`compare` flags a case when a metric grows past --threshold (and past a small
+absolute floor, so sub-millisecond noise never fails a build) and exits 1.
+Time is compared on min_seconds against the fastest calibration round, which
+is steadier than the median, but on a small shared box identical runs still
+came out between 0.8x and 1.7x of each other even with --repeat 9. The memory
+figures repeat exactly, so `--gate memory` (what CI uses) fails only on them
+and reports time regressions as warnings.
+
+Usage:
+    python -m shared.perf.suite run --scale small --scale medium
+    python -m shared.perf.suite record                      # rewrite shared/perf/baseline.json
+    python -m shared.perf.suite compare --threshold 0.25
+    python -m shared.perf.suite compare --gate memory --repeat 9
+    python -m shared.perf.suite compare --case missions.parse --scale large --repeat 3
+"""
+import argparse
+import contextlib
+import copy
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).parent.parent.parent
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+SCALES = ("small", "medium", "large")
+DEFAULT_SCALES = ("small", "medium")
+DEFAULT_THRESHOLD = 0.25
+# Differences below these never count as regressions
+MIN_SECONDS = 0.005
+MIN_MIB = 1.0
+TIME_METRICS = ("min_seconds",)
+MEMORY_METRICS = ("peak_rss_mib", "alloc_peak_mib")
+GATES = {"all": TIME_METRICS + MEMORY_METRICS, "memory": MEMORY_METRICS}
+# Stands in for the project's (deliberately slow) hasher so seed.users measures the script, not PBKDF2
+SEED_PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+class Skip(Exception):
+    """A case that cannot run in this environment."""
+
+
+@dataclass
+class Case:
+    name: str
+    sizes: Tuple[int, int, int]
+    prepare: Callable[[Path, int], None]
+    load: Callable[[Path, int], Callable[[], None]]     # runs in the child; returns the measured callable
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+def _component(index: int, count: int) -> Dict:
+    """A serializer-shaped schema with a few references to its neighbours."""
+    properties = {
+        "id": {"type": "integer", "readOnly": True},
+        "uuid": {"type": "string", "format": "uuid"},
+        "name": {"type": "string", "maxLength": 200},
+        "status": {"type": "string", "enum": ["draft", "active", "archived"]},
+        "score": {"type": "number", "minimum": 0, "maximum": 100, "nullable": True},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "created_at": {"type": "string", "format": "date-time", "readOnly": True},
+    }
+    if count > 1:
+        properties["parent"] = {"$ref": f"#/components/schemas/Model{(index + 1) % count}"}
+        properties["children"] = {"type": "array", "items": {"$ref": f"#/components/schemas/Model{(index * 7 + 3) % count}"}}
+    return {"type": "object", "properties": properties, "required": ["id", "name", "status"]}
+
+
+def synthetic_service_spec(size: int, service: str) -> Dict:
+    """An OpenAPI document with `size` paths and `size` component schemas, shaped like the service's own."""
+    prefix = "/api/v1" if service == "django" else ""
+    schemas = {f"Model{i}": _component(i, size) for i in range(size)}
+    paths = {}
+    for i in range(size):
+        ref = {"$ref": f"#/components/schemas/Model{i}"}
+        body = {"content": {"application/json": {"schema": ref}}, "required": True}
+        ok = {"description": "", "content": {"application/json": {"schema": ref}}}
+        resource_path = f"{prefix}/{service}-resource-{i // 4}/"
+        if i % 4 == 0:
+            paths[resource_path] = {
+                "get": {"operationId": f"{service}_list_{i}", "tags": [f"tag{i % 40}"],
+                        "parameters": [{"name": "page", "in": "query", "schema": {"type": "integer"}}],
+                        "responses": {"200": {"description": "", "content": {"application/json": {
+                            "schema": {"type": "array", "items": ref}}}}}},
+                "post": {"operationId": f"{service}_create_{i}", "tags": [f"tag{i % 40}"],
+                         "requestBody": body, "responses": {"201": ok}},
+            }
+        else:
+            paths[f"{resource_path}{{id}}/{'x' * (i % 4)}"] = {
+                "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+                "get": {"operationId": f"{service}_retrieve_{i}", "tags": [f"tag{i % 40}"], "responses": {"200": ok}},
+                "patch": {"operationId": f"{service}_update_{i}", "tags": [f"tag{i % 40}"],
+                          "requestBody": body, "responses": {"200": ok}},
+            }
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": f"{service} API", "version": "1.0.0"},
+        "servers": [{"url": "http://localhost:8000" if service == "django" else "http://localhost:8001"}],
+        "paths": paths,
+        "components": {"schemas": schemas,
+                       "securitySchemes": {"jwtAuth": {"type": "http", "scheme": "bearer", "bearerFormat": "JWT"}}},
+        "tags": [{"name": f"tag{i}"} for i in range(min(size, 40))],
+    }
+
+
+def _prepare_openapi(directory: Path, size: int) -> None:
+    for service in ("django", "fastapi"):
+        with open(directory / f"openapi_{service}.json", "w") as f:
+            json.dump(synthetic_service_spec(size, service), f)
+
+
+def _prepare_missions(directory: Path, size: int) -> None:
+    """`size` mission files cloned from mission_hall with new ids."""
+    import yaml
+
+    from ..missions.catalog import MISSION_HALL_DIR
+
+    templates = [yaml.safe_load(path.read_text()) for path in sorted(MISSION_HALL_DIR.glob("*.y*ml"))]
+    if not templates:
+        raise Skip(f"no mission files in {MISSION_HALL_DIR} to clone")
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    for i in range(size):
+        data = copy.deepcopy(templates[i % len(templates)])
+        data.setdefault("mission_meta", {})["id"] = f"PERF-M{i:05d}"
+        with open(directory / f"perf-m{i:05d}.yaml", "w") as f:
+            yaml.dump(data, f, Dumper=dumper, sort_keys=False)
+
+
+def _prepare_nothing(directory: Path, size: int) -> None:
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Measured work (child process)
+# ---------------------------------------------------------------------------
+
+def _load_merge(directory: Path, size: int) -> Callable[[], None]:
+    from ..openapi import merge_openapi
+
+    def run() -> None:
+        merged = merge_openapi.merge_openapi_schemas(
+            merge_openapi.load_json_file(directory / "openapi_django.json"),
+            merge_openapi.load_json_file(directory / "openapi_fastapi.json"),
+        )
+        with open(directory / "merged_openapi.json", "w") as f:
+            json.dump(merged, f, indent=2)
+    return run
+
+
+def _load_validate(directory: Path, size: int) -> Callable[[], None]:
+    from ..openapi import validate_schemas
+
+    def run() -> None:
+        django_schema = validate_schemas.load_json_file(directory / "openapi_django.json")
+        fastapi_schema = validate_schemas.load_json_file(directory / "openapi_fastapi.json")
+        validate_schemas.validate_openapi_schema(django_schema, "Django")
+        validate_schemas.validate_openapi_schema(fastapi_schema, "FastAPI")
+        validate_schemas.check_schema_consistency(django_schema, fastapi_schema)
+    return run
+
+
+def _load_missions(directory: Path, size: int) -> Callable[[], None]:
+    from ..missions.catalog import load_catalog
+
+    def run() -> None:
+        load_catalog(directory)
+    return run
+
+
+def _load_seed_users(directory: Path, size: int) -> Callable[[], None]:
+    """The seeding script's own create_user(), once per synthetic student."""
+    try:
+        import django
+    except ImportError:
+        raise Skip("Django is not installed") from None
+    sys.path.insert(0, str(BASE_DIR / "backend" / "django_app"))
+    sys.path.insert(0, str(BASE_DIR / "scripts"))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.development")
+    os.environ["QUERY_STATS"] = "0"     # the script's at-exit SQL table would follow our JSON line
+    try:
+        django.setup()
+        from django.db import connection, transaction
+        from django.test import override_settings
+        connection.ensure_connection()
+        import create_comprehensive_test_environment as seeding
+    except Exception as e:  # no settings module, no database, no project apps, ...
+        raise Skip(f"Django is not configured here ({type(e).__name__}: {e})") from None
+    if not seeding.Role.objects.filter(name="student").exists():
+        raise Skip("no 'student' role in the database to seed with")
+    override_settings(PASSWORD_HASHERS=SEED_PASSWORD_HASHERS).enable()
+    template = seeding.TEST_DATA["students_cohort_a"][0]
+    students = [dict(template, email=f"perf_seed_{i}@och.test", username=f"perf_seed_{i}", handle=f"perf_seed_{i}")
+                for i in range(size)]
+
+    def run() -> None:
+        with transaction.atomic(), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for student in students:
+                seeding.create_user(student, "student")
+            transaction.set_rollback(True)
+    return run
+
+
+CASES = {case.name: case for case in (
+    Case("openapi.merge", (100, 1000, 10000), _prepare_openapi, _load_merge),
+    Case("openapi.validate", (100, 1000, 10000), _prepare_openapi, _load_validate),
+    Case("missions.parse", (10, 500, 5000), _prepare_missions, _load_missions),
+    Case("seed.users", (1000, 10000, 100000), _prepare_nothing, _load_seed_users),
+)}
+
+
+def _status_mib(field: str) -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _rss_mib() -> float:
+    current = _status_mib("VmRSS")
+    return _peak_rss_mib() if current is None else current
+
+
+def _peak_rss_mib() -> float:
+    # VmHWM starts afresh at exec; ru_maxrss can carry over the parent's peak
+    peak = _status_mib("VmHWM")
+    if peak is not None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _child(name: str, size: int, directory: str, repeat: int) -> Dict:
+    try:
+        run = CASES[name].load(Path(directory), size)
+    except Skip as e:
+        return {"skipped": str(e)}
+    before = _rss_mib()
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - started)
+    peak = _peak_rss_mib()
+    tracemalloc.start()
+    run()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(statistics.median(seconds), 5),
+        "min_seconds": round(min(seconds), 5),
+        "peak_rss_mib": round(max(0.0, peak - before), 2),
+        "alloc_peak_mib": round(alloc_peak / 2**20, 2),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Suite
+# ---------------------------------------------------------------------------
+
+def calibrate(rounds: int = 5) -> float:
+    """Fastest of `rounds` runs of a fixed pure-Python workload; divides wall times into machine-independent units."""
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        table = {}
+        for i in range(200_000):
+            table[f"k{i}"] = i * i
+        json.loads(json.dumps(sorted(table.items())))
+        timings.append(time.perf_counter() - started)
+    return round(min(timings), 5)
+
+
+def machine() -> Dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def result_key(name: str, size: int) -> str:
+    return f"{name}[{size}]"
+
+
+def _sort_key(key: str) -> Tuple[str, int]:
+    name, _, size = key.partition("[")
+    return name, int(size.rstrip("]") or 0)
+
+
+def run_suite(cases: List[str], scales: List[str], repeat: int = 5) -> Dict:
+    """Run the selected cases at the selected scales; returns {"machine", "calibration_seconds", "results"}."""
+    report = {"machine": machine(), "calibration_seconds": calibrate(), "results": {}, "skipped": {}}
+    for name in cases:
+        case = CASES[name]
+        for scale in scales:
+            size = case.sizes[SCALES.index(scale)]
+            key = result_key(name, size)
+            with tempfile.TemporaryDirectory(prefix="och-perf-") as directory:
+                try:
+                    case.prepare(Path(directory), size)
+                except Skip as e:
+                    report["skipped"][key] = str(e)
+                    print(f"   ⏭️  {key}: {e}")
+                    continue
+                completed = subprocess.run(
+                    [sys.executable, "-m", "shared.perf.suite", "--child", name, str(size), directory, str(repeat)],
+                    cwd=BASE_DIR, capture_output=True, text=True,
+                )
+            if completed.returncode != 0:
+                raise RuntimeError(f"{key} failed:\n{completed.stderr}")
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            if "skipped" in result:
+                report["skipped"][key] = result["skipped"]
+                print(f"   ⏭️  {key}: {result['skipped']}")
+                continue
+            result["units"] = round(result["min_seconds"] / report["calibration_seconds"], 3)
+            report["results"][key] = result
+            print(f"   {key:28} {result['seconds'] * 1000:10.1f} ms  {result['peak_rss_mib']:8.1f} MiB RSS  "
+                  f"{result['alloc_peak_mib']:8.1f} MiB heap")
+    return report
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD,
+            normalize: bool = True) -> List[Dict]:
+    """One row per case present in both; `regressed` lists the metrics past the threshold."""
+    rows = []
+    for key, now in current["results"].items():
+        before = baseline.get("results", {}).get(key)
+        if before is None:
+            continue
+        row = {"case": key, "regressed": [], "improved": []}
+        for metric, floor in (("min_seconds", MIN_SECONDS), ("peak_rss_mib", MIN_MIB), ("alloc_peak_mib", MIN_MIB)):
+            old, new = before[metric], now[metric]
+            if metric == "min_seconds" and normalize:
+                # Compare in calibration units, reported back in this machine's seconds
+                old = before[metric] / baseline["calibration_seconds"] * current["calibration_seconds"]
+            ratio = new / old if old else (1.0 if not new else float("inf"))
+            row[metric] = {"baseline": round(old, 5), "current": new, "ratio": round(ratio, 3)}
+            if ratio > 1 + threshold and new - old > floor:
+                row["regressed"].append(metric)
+            elif ratio < 1 - threshold and old - new > floor:
+                row["improved"].append(metric)
+        rows.append(row)
+    return rows
+
+
+def failing(rows: List[Dict], gate: str = "all") -> List[str]:
+    """Cases with a regression in one of the metrics `gate` fails on."""
+    return [row["case"] for row in rows if set(row["regressed"]) & set(GATES[gate])]
+
+
+def print_comparison(rows: List[Dict], threshold: float, gate: str = "all") -> None:
+    print(f"{'case':30} {'time':>16} {'peak RSS':>16} {'heap':>16}")
+    for row in rows:
+        cells = []
+        for metric in TIME_METRICS + MEMORY_METRICS:
+            ratio = row[metric]["ratio"]
+            if metric in row["regressed"]:
+                mark = "❌" if metric in GATES[gate] else "⚠️"
+            else:
+                mark = "✅" if metric in row["improved"] else "  "
+            cells.append(f"{mark} {ratio:6.2f}x".rjust(15))
+        print(f"{row['case']:30} {' '.join(cells)}")
+    regressed = failing(rows, gate)
+    warned = [row["case"] for row in rows if row["regressed"] and row["case"] not in regressed]
+    if warned:
+        print(f"\n⚠️  Slower beyond {threshold:.0%}, not gated: {', '.join(warned)}")
+    if regressed:
+        print(f"\n❌ {len(regressed)} regressions beyond {threshold:.0%}: {', '.join(regressed)}")
+    elif any(row["improved"] for row in rows):
+        print("\n✅ No regressions; some cases improved, consider `record` to update the baseline")
+    else:
+        print(f"\n✅ No regressions beyond {threshold:.0%}")
+
+
+def load_report(path: Path) -> Dict:
+    if not path.exists():
+        return {"results": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: Optional[list] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--child"]:
+        name, size, directory, repeat = argv[1:5]
+        print(json.dumps(_child(name, int(size), directory, int(repeat))))
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("run", "record", "compare"))
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="Default: every case")
+    parser.add_argument("--scale", action="append", choices=SCALES, help="Default: small and medium")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--results", help="compare: read results from this file instead of running the suite")
+    parser.add_argument("--json", metavar="PATH", help="Write this run's results as JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative growth that counts as a regression (default 0.25)")
+    parser.add_argument("--gate", choices=sorted(GATES), default="all",
+                        help="compare: metrics that fail the run; 'memory' only warns about time (default all)")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="Compare raw seconds instead of calibration units (same machine as the baseline)")
+    args = parser.parse_args(argv)
+
+    cases = args.case or list(CASES)
+    scales = args.scale or list(DEFAULT_SCALES)
+    if args.results:
+        current = load_report(Path(args.results))
+    else:
+        print(f"⏱️  {', '.join(cases)} at {', '.join(scales)} scale, {args.repeat} runs each")
+        current = run_suite(cases, scales, args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.command == "record":
+        baseline = load_report(Path(args.baseline))
+        if baseline.get("calibration_seconds") and baseline["results"]:
+            # Keep entries that were not re-run, in the new calibration's units
+            scale = current["calibration_seconds"] / baseline["calibration_seconds"]
+            for key, result in baseline["results"].items():
+                if key not in current["results"]:
+                    current["results"][key] = dict(result, seconds=round(result["seconds"] * scale, 5),
+                                                   min_seconds=round(result["min_seconds"] * scale, 5))
+        current["results"] = dict(sorted(current["results"].items(), key=lambda item: _sort_key(item[0])))
+        current.pop("skipped", None)
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"✅ Baseline with {len(current['results'])} cases written to {args.baseline}")
+    elif args.command == "compare":
+        baseline = load_report(Path(args.baseline))
+        rows = compare(baseline, current, args.threshold, normalize=not args.no_normalize)
+        missing = sorted(set(current["results"]) - set(baseline["results"]))
+        if missing:
+            print(f"⚠️  Not in the baseline (run `record`): {', '.join(missing)}")
+        print_comparison(rows, args.threshold, args.gate)
+        return 1 if failing(rows, args.gate) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
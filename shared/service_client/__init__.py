@@ -0,0 +1,22 @@
+"""Shared internal HTTP client for Django <-> FastAPI calls."""
+from .client import (
+    AsyncServiceClient,
+    CircuitBreaker,
+    ServiceClient,
+    ServiceClientError,
+    ServiceResponseError,
+    ServiceUnavailable,
+    django_client,
+    fastapi_client,
+)
+
+__all__ = [
+    "AsyncServiceClient",
+    "CircuitBreaker",
+    "ServiceClient",
+    "ServiceClientError",
+    "ServiceResponseError",
+    "ServiceUnavailable",
+    "django_client",
+    "fastapi_client",
+]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the internal service client against the local stub.
+
+Compares:
+  - a fresh connection per call: ad-hoc httpx.get (new client and SSL context
+    each call) and a bare http.client connection (TCP setup only)
+  - one kept-alive http.client connection: the transport floor
+  - the pooled keep-alive ServiceClient, sequential and from a thread pool
+  - AsyncServiceClient with bursts of identical in-flight requests (coalescing)
+
+Savings are reported against the bare new-connection case, not httpx.get:
+most of httpx.get's time is building a client, which no caller has to pay.
+The stub runs in its own process so its threads do not share the GIL with
+the client being measured.
+
+Why the pooled client does not beat a bare connection on loopback: a local
+TCP handshake costs ~0.5 ms on a small VM, while httpx's own work per request
+(URL parsing and merging, headers, the h11 state machine) costs ~0.9 ms of
+CPU against ~0.3 ms for http.client; passing pre-built absolute URLs trims
+only ~15% of that. Measured on one CPU with 1 ms server latency: bare new
+connection 2.2 ms, one kept-alive http.client connection 1.6 ms, pooled
+ServiceClient 2.5 ms sequentially and 1.5 ms vs 0.8 ms with 16 threads (CPU
+bound). Pooling pays off where the handshake is expensive, i.e. real network
+round trips and TLS, and in the connection and file-descriptor counts under
+load; coalescing is what cuts calls on loopback.
+
+Usage:
+    python -m shared.service_client.benchmark --calls 1000 --threads 16 --latency-ms 1
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .client import AsyncServiceClient, ServiceClient
+from .stub_server import start_stub_process
+
+
+def _timed(func: Callable[[], None], calls: int) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) / calls
+
+
+def _report(label: str, per_call: float, baseline: Optional[float] = None) -> None:
+    line = f"  {label:<42} {per_call * 1e6:>9.0f} us/call {1 / per_call:>9.0f} calls/s"
+    if baseline:
+        change = 1 - per_call / baseline
+        line += f"   {abs(change) * 100:>5.1f}% {'less' if change >= 0 else 'more'} per-call time"
+    print(line)
+
+
+def _bare_connection_get(host: str, port: int, path: str) -> bytes:
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        conn.request("GET", path)
+        return conn.getresponse().read()
+    finally:
+        conn.close()
+
+
+def _server_hits(host: str, port: int) -> int:
+    return json.loads(_bare_connection_get(host, port, "/hits"))["hits"]
+
+
+def run(calls: int, threads: int, latency_ms: float, burst: int) -> int:
+    process, base_url = start_stub_process(latency_ms=latency_ms)
+    url = f"{base_url}/echo"
+    host, port = urlsplit(base_url).hostname, urlsplit(base_url).port
+    print(f"Stub at {base_url}, {latency_ms} ms server latency, {calls} calls")
+
+    # Warm up both paths so import/first-connection costs are excluded
+    httpx.get(url)
+    pooled = ServiceClient(base_url)
+    pooled.get("/echo")
+    kept = http.client.HTTPConnection(host, port, timeout=10)
+
+    def kept_alive_get(i: int) -> bytes:
+        kept.request("GET", f"/echo?i={i}")
+        return kept.getresponse().read()
+
+    print("\nSequential (savings against a new bare connection per call)")
+    fresh = _timed(lambda: [httpx.get(url, params={"i": i}) for i in range(calls)], calls)
+    _report("httpx.get, new client per call", fresh)
+    bare = _timed(lambda: [_bare_connection_get(host, port, f"/echo?i={i}") for i in range(calls)], calls)
+    _report("http.client, new connection per call", bare)
+    floor = _timed(lambda: [kept_alive_get(i) for i in range(calls)], calls)
+    _report("http.client, one kept-alive connection", floor, bare)
+    kept.close()
+    reused = _timed(lambda: [pooled.get("/echo", params={"i": i}) for i in range(calls)], calls)
+    _report("pooled keep-alive ServiceClient", reused, bare)
+
+    print(f"\n{threads} threads")
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        fresh_mt = _timed(lambda: list(pool.map(lambda i: httpx.get(url, params={"i": i}), range(calls))), calls)
+        _report("httpx.get, new client per call", fresh_mt)
+        bare_mt = _timed(lambda: list(pool.map(lambda i: _bare_connection_get(host, port, f"/echo?i={i}"),
+                                               range(calls))), calls)
+        _report("http.client, new connection per call", bare_mt)
+        reused_mt = _timed(lambda: list(pool.map(lambda i: pooled.get("/echo", params={"i": i}), range(calls))), calls)
+        _report("pooled keep-alive ServiceClient", reused_mt, bare_mt)
+    pooled.close()
+
+    print(f"\nasyncio, bursts of {burst} identical GETs")
+
+    async def bursts(coalesce: bool) -> float:
+        client = AsyncServiceClient(base_url)
+        await client.get("/health")
+        rounds = max(calls // burst, 1)
+        before = _server_hits(host, port)
+        start = time.perf_counter()
+        for r in range(rounds):
+            if coalesce:
+                await asyncio.gather(*(client.get("/echo", params={"round": r}) for _ in range(burst)))
+            else:
+                # distinct params defeat coalescing, so every call reaches the server
+                await asyncio.gather(*(client.get("/echo", params={"round": r, "i": i}) for i in range(burst)))
+        elapsed = (time.perf_counter() - start) / (rounds * burst)
+        server_calls = _server_hits(host, port) - before - 1
+        await client.aclose()
+        print(f"    ({'coalesced' if coalesce else 'uncoalesced'}: {server_calls} server requests "
+              f"for {rounds * burst} calls)")
+        return elapsed
+
+    uncoalesced = asyncio.run(bursts(False))
+    _report("pooled, no coalescing", uncoalesced)
+    coalesced = asyncio.run(bursts(True))
+    _report("pooled + coalescing", coalesced, uncoalesced)
+
+    process.terminate()
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--burst", type=int, default=50)
+    args = parser.parse_args(argv)
+    return run(args.calls, args.threads, args.latency_ms, args.burst)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
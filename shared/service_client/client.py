@@ -0,0 +1,298 @@
+"""
+Pooled, keep-alive HTTP clients for internal Django <-> FastAPI calls.
+
+- One long-lived httpx client per process and direction, so TCP connections are
+  pooled and reused (HTTP keep-alive) instead of re-established per call.
+- Identical in-flight idempotent requests (same method, URL, params and auth)
+  are coalesced: followers wait for the leader's response instead of sending
+  their own.
+- Every call has connect/read timeouts, and a per-client circuit breaker fails
+  fast with ServiceUnavailable after repeated failures until the peer recovers.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Optional
+
+import httpx
+
+COALESCED_METHODS = frozenset({"GET", "HEAD"})
+
+DEFAULT_TIMEOUT = httpx.Timeout(
+    float(os.environ.get("SERVICE_CLIENT_TIMEOUT", "10")),
+    connect=float(os.environ.get("SERVICE_CLIENT_CONNECT_TIMEOUT", "2")),
+)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=int(os.environ.get("SERVICE_CLIENT_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.environ.get("SERVICE_CLIENT_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.environ.get("SERVICE_CLIENT_KEEPALIVE_EXPIRY", "30")),
+)
+
+
+class ServiceClientError(Exception):
+    """Base error for internal service calls."""
+
+
+class ServiceUnavailable(ServiceClientError):
+    """The peer could not be reached, timed out, returned 5xx, or the circuit is open."""
+
+
+class ServiceResponseError(ServiceClientError):
+    """The peer answered with a 4xx status."""
+
+    def __init__(self, status_code: int, body: Any):
+        super().__init__(f"HTTP {status_code}: {body}")
+        self.status_code = status_code
+        self.body = body
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open -> half-open
+    after `reset_timeout` seconds, letting one trial call through; a success closes
+    the circuit again, a failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Admit a call or raise ServiceUnavailable. Returns True if the call is the half-open trial."""
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._trial_in_flight):
+                raise ServiceUnavailable("circuit open")
+            if state == "half-open":
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def end_trial(self) -> None:
+        """Free the trial slot; a trial that ended without a verdict (cancelled, unexpected error) leaves it taken."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def _coalesce_key(method: str, url: str, params: Any, headers: Optional[Dict[str, str]]) -> Hashable:
+    auth = (headers or {}).get("Authorization", "")
+    return (method, url, json.dumps(params, sort_keys=True, default=str), auth)
+
+
+def _leader_error(error: BaseException) -> BaseException:
+    # Cancellation (or an interrupt) belongs to the leader alone; followers see an ordinary failure
+    if isinstance(error, Exception):
+        return error
+    return ServiceUnavailable(f"coalesced request aborted ({type(error).__name__})")
+
+
+def _decode(response: httpx.Response) -> Any:
+    if response.status_code >= 500:
+        raise ServiceUnavailable(f"HTTP {response.status_code} from {response.request.url}")
+    try:
+        body = response.json() if response.content else None
+    except ValueError:
+        body = response.text
+    if response.status_code >= 400:
+        raise ServiceResponseError(response.status_code, body)
+    return body
+
+
+class ServiceClient:
+    """Thread-safe synchronous client (Django -> FastAPI)."""
+
+    def __init__(self, base_url: str, timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+                 limits: httpx.Limits = DEFAULT_LIMITS, breaker: Optional[CircuitBreaker] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        self.base_url = base_url.rstrip("/")
+        self.breaker = breaker or CircuitBreaker()
+        self._client = httpx.Client(base_url=self.base_url, timeout=timeout, limits=limits, headers=headers)
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def request(self, method: str, path: str, *, params: Any = None, json_body: Any = None,
+                headers: Optional[Dict[str, str]] = None) -> Any:
+        method = method.upper()
+        if method not in COALESCED_METHODS:
+            return self._send(method, path, params, json_body, headers)
+
+        key = _coalesce_key(method, path, params, headers)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._send(method, path, params, None, headers)
+        except BaseException as e:
+            future.set_exception(_leader_error(e))
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _send(self, method, path, params, json_body, headers) -> Any:
+        trial = self.breaker.before_call()
+        try:
+            try:
+                response = self._client.request(method, path, params=params, json=json_body, headers=headers)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                raise ServiceUnavailable(f"{type(e).__name__} calling {self.base_url}{path}") from e
+            try:
+                body = _decode(response)
+            except ServiceUnavailable:
+                self.breaker.record_failure()
+                raise
+            except ServiceResponseError:
+                # A 4xx still proves the peer is healthy
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            return body
+        finally:
+            if trial:
+                self.breaker.end_trial()
+
+    def get(self, path: str, **kwargs) -> Any:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, json_body: Any = None, **kwargs) -> Any:
+        return self.request("POST", path, json_body=json_body, **kwargs)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class AsyncServiceClient:
+    """asyncio client (FastAPI -> Django). Create and use it on a single event loop."""
+
+    def __init__(self, base_url: str, timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+                 limits: httpx.Limits = DEFAULT_LIMITS, breaker: Optional[CircuitBreaker] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        self.base_url = base_url.rstrip("/")
+        self.breaker = breaker or CircuitBreaker()
+        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=timeout, limits=limits, headers=headers)
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def request(self, method: str, path: str, *, params: Any = None, json_body: Any = None,
+                      headers: Optional[Dict[str, str]] = None) -> Any:
+        method = method.upper()
+        if method not in COALESCED_METHODS:
+            return await self._send(method, path, params, json_body, headers)
+
+        key = _coalesce_key(method, path, params, headers)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: one cancelled follower must not cancel the shared request
+            return await asyncio.shield(future)
+
+        future = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._send(method, path, params, None, headers)
+        except BaseException as e:
+            future.set_exception(_leader_error(e))
+            # Mark retrieved so an exception with no followers is not logged as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _send(self, method, path, params, json_body, headers) -> Any:
+        trial = self.breaker.before_call()
+        try:
+            try:
+                response = await self._client.request(method, path, params=params, json=json_body, headers=headers)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                raise ServiceUnavailable(f"{type(e).__name__} calling {self.base_url}{path}") from e
+            try:
+                body = _decode(response)
+            except ServiceUnavailable:
+                self.breaker.record_failure()
+                raise
+            except ServiceResponseError:
+                # A 4xx still proves the peer is healthy
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            return body
+        finally:
+            if trial:
+                self.breaker.end_trial()
+
+    async def get(self, path: str, **kwargs) -> Any:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, json_body: Any = None, **kwargs) -> Any:
+        return await self.request("POST", path, json_body=json_body, **kwargs)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+@lru_cache(maxsize=None)
+def fastapi_client() -> ServiceClient:
+    """Process-wide client for Django -> FastAPI calls (FASTAPI_BASE_URL)."""
+    return ServiceClient(os.environ.get("FASTAPI_BASE_URL", "http://localhost:8001"))
+
+
+# Keyed on the loop itself: an id() can be reused by a later loop after the first is collected
+_django_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncServiceClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def django_client() -> AsyncServiceClient:
+    """Per-event-loop client for FastAPI -> Django calls (DJANGO_API_URL)."""
+    loop = asyncio.get_running_loop()
+    client = _django_clients.get(loop)
+    if client is None:
+        client = _django_clients[loop] = AsyncServiceClient(
+            os.environ.get("DJANGO_API_URL", "http://localhost:8000")
+        )
+    return client
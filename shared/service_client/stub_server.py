@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Local HTTP/1.1 keep-alive stub standing in for the Django or FastAPI service.
+
+Routes:
+    GET  /health          -> {"status": "ok"}
+    GET  /hits            -> {"hits": n}, requests served so far (this one included)
+    GET  /echo?...        -> {"path": ..., "query": {...}, "hits": n}
+    POST /echo            -> {"path": ..., "body": <json>, "hits": n}
+    *    /status/<code>   -> empty JSON body with that status
+
+Usage:
+    python -m shared.service_client.stub_server --port 8101 --latency-ms 5
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    latency = 0.0
+    hits = 0
+    hits_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        with StubHandler.hits_lock:
+            StubHandler.hits += 1
+            hits = StubHandler.hits
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            return self._respond(200, {"status": "ok"})
+        if url.path == "/hits":
+            return self._respond(200, {"hits": hits})
+        if url.path.startswith("/status/"):
+            return self._respond(int(url.path.rsplit("/", 1)[1]), {})
+        if url.path == "/echo":
+            payload = {"path": url.path, "query": dict(parse_qsl(url.query)), "hits": hits}
+            if raw:
+                payload["body"] = json.loads(raw)
+            return self._respond(200, payload)
+        return self._respond(404, {"detail": "Not found"})
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # bursts of concurrent connects would overflow the default backlog of 5
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0,
+                      latency_ms: float = 0.0) -> Tuple[StubServer, str]:
+    """Start the stub in a daemon thread; returns (server, base_url). Port 0 picks a free port."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"latency": latency_ms / 1000.0})
+    server = StubServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def _serve_in_child(conn, host: str, latency_ms: float) -> None:
+    _, url = start_stub_server(host, 0, latency_ms)
+    conn.send(url)
+    conn.close()
+    while True:
+        time.sleep(3600)
+
+
+def start_stub_process(host: str = "127.0.0.1", latency_ms: float = 0.0) -> Tuple[multiprocessing.Process, str]:
+    """
+    Start the stub in a child process; returns (process, base_url). Unlike
+    start_stub_server(), the server threads do not compete with the caller for
+    the GIL, so client-side timings are the client's own.
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve_in_child, args=(child, host, latency_ms), daemon=True)
+    process.start()
+    return process, parent.recv()
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local stub for internal service calls")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    server, url = start_stub_server(args.host, args.port, args.latency_ms)
+    print(f"✓ Stub server listening on {url} (latency {args.latency_ms} ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
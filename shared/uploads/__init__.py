@@ -0,0 +1,22 @@
+"""Chunked, resumable deliverable uploads with content-hash deduplication."""
+from .store import (
+    Artifact,
+    ContentHasher,
+    OffsetMismatch,
+    UploadError,
+    UploadNotFound,
+    UploadStore,
+    content_hash_of,
+    redis_handoff,
+)
+
+__all__ = [
+    "Artifact",
+    "ContentHasher",
+    "OffsetMismatch",
+    "UploadError",
+    "UploadNotFound",
+    "UploadStore",
+    "content_hash_of",
+    "redis_handoff",
+]
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Server memory for parallel deliverable uploads: whole-body requests vs. streamed chunks.
+
+A local threaded HTTP server exposes both paths:
+    PUT   /whole/<name>      reads the full body into memory, hashes it, writes it out
+    POST  /uploads           creates a resumable upload (UploadStore)
+    HEAD  /uploads/<id>      current offset
+    PATCH /uploads/<id>      streams one chunk into the store
+`--parallel` clients upload `--size-mb` each through both paths, and the
+server's peak Python allocation (tracemalloc) is reported for each. A second
+round re-uploads the same files to show deduplication, and one upload is cut
+off mid-chunk and resumed from its reported offset.
+
+Usage:
+    python -m shared.uploads.benchmark --parallel 20 --size-mb 20 --chunk-mb 5
+"""
+import argparse
+import http.client
+import json
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+
+from .store import READ_SIZE, ContentHasher, OffsetMismatch, UploadError, UploadStore
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    store: UploadStore = None
+    whole_dir: str = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status: int, payload=None, offset: Optional[int] = None) -> None:
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        if offset is not None:
+            self.send_header("Upload-Offset", str(offset))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        hasher = ContentHasher()
+        hasher.update(body)
+        with open(f"{self.whole_dir}/{self.path.rsplit('/', 1)[1]}", "wb") as f:
+            f.write(body)
+        self._respond(200, {"content_hash": hasher.hexdigest()})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = self.store.create(request["length"], {"filename": request.get("filename")},
+                                   request.get("content_hash"))
+        self._respond(201, status, status["offset"])
+
+    def do_HEAD(self):
+        status = self.store.status(self.path.rsplit("/", 1)[1])
+        self._respond(200, None, status["offset"])
+
+    def do_PATCH(self):
+        size = int(self.headers["Content-Length"])
+        try:
+            status = self.store.append(self.path.rsplit("/", 1)[1], int(self.headers["Upload-Offset"]),
+                                       self.rfile, size)
+        except OffsetMismatch as e:
+            return self._respond(409, {"offset": e.expected}, e.expected)
+        except UploadError as e:
+            return self._respond(400, {"detail": str(e)})
+        self._respond(200, status, status["offset"])
+
+
+def file_pieces(seed: int, size: int, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """Bytes [start, end) of a deterministic `size`-byte file, generated READ_SIZE at a time."""
+    pattern = random.Random(seed).randbytes(READ_SIZE)
+    end = size if end is None else end
+    position = start
+    while position < end:
+        offset = position % READ_SIZE
+        piece = pattern[offset:offset + min(READ_SIZE - offset, end - position)]
+        yield piece
+        position += len(piece)
+
+
+def upload_whole(port: int, seed: int, size: int) -> str:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    conn.request("PUT", f"/whole/file-{seed}", body=file_pieces(seed, size),
+                 headers={"Content-Length": str(size)})
+    result = json.loads(conn.getresponse().read())
+    conn.close()
+    return result["content_hash"]
+
+
+def upload_chunked(port: int, seed: int, size: int, chunk: int) -> dict:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    conn.request("POST", "/uploads", body=json.dumps({"length": size, "filename": f"file-{seed}"}))
+    status = json.loads(conn.getresponse().read())
+    upload_id, offset = status["upload_id"], status["offset"]
+    while offset < size:
+        end = min(offset + chunk, size)
+        conn.request("PATCH", f"/uploads/{upload_id}", body=file_pieces(seed, size, offset, end),
+                     headers={"Content-Length": str(end - offset), "Upload-Offset": str(offset)})
+        status = json.loads(conn.getresponse().read())
+        offset = status["offset"]
+    conn.close()
+    return status
+
+
+def interrupted_upload(port: int, seed: int, size: int, chunk: int) -> dict:
+    """Send half of the first chunk, drop the connection, then resume from HEAD's offset."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    conn.request("POST", "/uploads", body=json.dumps({"length": size, "filename": f"file-{seed}"}))
+    upload_id = json.loads(conn.getresponse().read())["upload_id"]
+    conn.close()
+
+    sent = min(chunk, size) // 2
+    with socket.create_connection(("127.0.0.1", port)) as raw:
+        raw.sendall(
+            f"PATCH /uploads/{upload_id} HTTP/1.1\r\nHost: bench\r\nUpload-Offset: 0\r\n"
+            f"Content-Length: {min(chunk, size)}\r\n\r\n".encode()
+        )
+        for piece in file_pieces(seed, size, 0, sent):
+            raw.sendall(piece)
+        raw.shutdown(socket.SHUT_WR)
+        raw.recv(65536)
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    conn.request("HEAD", f"/uploads/{upload_id}")
+    response = conn.getresponse()
+    response.read()
+    offset = int(response.getheader("Upload-Offset"))
+    while offset < size:
+        end = min(offset + chunk, size)
+        conn.request("PATCH", f"/uploads/{upload_id}", body=file_pieces(seed, size, offset, end),
+                     headers={"Content-Length": str(end - offset), "Upload-Offset": str(offset)})
+        status = json.loads(conn.getresponse().read())
+        offset = status["offset"]
+    conn.close()
+    return {"resumed_from": sent, **status}
+
+
+def _measure(label: str, fn, jobs, parallel: int, total_bytes: int):
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(parallel) as pool:
+        results = list(pool.map(fn, jobs))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    print(f"  {label:<28} {elapsed:6.2f} s  {total_bytes / elapsed / 2**20:7.0f} MiB/s  "
+          f"peak {peak / 2**20:8.1f} MiB")
+    return results
+
+
+def run(parallel: int, size_mb: int, chunk_mb: int) -> int:
+    size, chunk = size_mb * 2**20, chunk_mb * 2**20
+    total = parallel * size
+    with tempfile.TemporaryDirectory() as tmp:
+        UploadHandler.store = UploadStore(f"{tmp}/store")
+        UploadHandler.whole_dir = tmp
+        server = ThreadingHTTPServer(("127.0.0.1", 0), UploadHandler)
+        server.daemon_threads = True
+        port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        print(f"{parallel} parallel uploads x {size_mb} MiB, {chunk_mb} MiB chunks")
+        tracemalloc.start()
+        whole = _measure("whole body per request", lambda seed: upload_whole(port, seed, size),
+                         range(parallel), parallel, total)
+        chunked = _measure("streamed chunks", lambda seed: upload_chunked(port, seed, size, chunk),
+                           range(parallel), parallel, total)
+        assert [status["artifact"]["content_hash"] for status in chunked] == whole, "content hash mismatch"
+
+        again = _measure("same files again (dedup)", lambda seed: upload_chunked(port, seed, size, chunk),
+                         range(parallel), parallel, total)
+        tracemalloc.stop()
+        print(f"  deduplicated: {sum(status['artifact']['deduplicated'] for status in again)}/{parallel}")
+
+        resumed = interrupted_upload(port, parallel, size, chunk)
+        expected = ContentHasher()
+        for piece in file_pieces(parallel, size):
+            expected.update(piece)
+        ok = resumed["artifact"]["content_hash"] == expected.hexdigest()
+        print(f"  interrupted after {resumed['resumed_from'] / 2**20:.1f} MiB, resumed: "
+              f"{'hash ok' if ok else 'HASH MISMATCH'}")
+        server.shutdown()
+    return 0 if ok else 1
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parallel", type=int, default=20)
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--chunk-mb", type=int, default=5)
+    args = parser.parse_args(argv)
+    return run(args.parallel, args.size_mb, args.chunk_mb)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
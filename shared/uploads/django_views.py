@@ -0,0 +1,124 @@
+"""
+DRF endpoints for resumable deliverable uploads.
+
+    # core/urls.py
+    path("api/v1/", include("shared.uploads.django_views")),
+
+Protocol (offsets in bytes, chunks sent in order):
+    POST  /api/v1/uploads/        {"length", "filename", "mission_id", "deliverable_id", "content_hash"?}
+                                  -> 201 status (200 if content_hash matched a blob this
+                                     user has already uploaded)
+    HEAD  /api/v1/uploads/<id>/   -> Upload-Offset header: where to resume
+    GET   /api/v1/uploads/<id>/   -> status JSON
+    PATCH /api/v1/uploads/<id>/   Upload-Offset: <n>, raw chunk body (application/offset+octet-stream)
+                                  -> status JSON; 409 with the current offset if <n> is stale;
+                                     411 without Content-Length (chunked bodies are refused)
+
+The chunk body is read straight from the WSGI input into the store, so it is
+never held in memory; nginx must not buffer it either (see
+nginx/conf.d/default.conf, location /api/v1/uploads/).
+"""
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.urls import path
+from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .store import OffsetMismatch, UploadError, UploadNotFound, UploadStore, redis_handoff
+
+UPLOAD_OFFSET_HEADER = "Upload-Offset"
+
+
+@lru_cache(maxsize=1)
+def upload_store() -> UploadStore:
+    root = getattr(settings, "UPLOADS_ROOT", None) or os.path.join(settings.MEDIA_ROOT, "uploads")
+    return UploadStore(root, handoff=redis_handoff())
+
+
+def _status_response(upload_status, code=status.HTTP_200_OK) -> Response:
+    response = Response(upload_status, status=code)
+    response[UPLOAD_OFFSET_HEADER] = str(upload_status["offset"])
+    return response
+
+
+class UploadCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser]
+
+    def post(self, request):
+        try:
+            length = int(request.data["length"])
+        except (KeyError, TypeError, ValueError):
+            return Response({"detail": "length is required"}, status=status.HTTP_400_BAD_REQUEST)
+        metadata = {
+            "user_id": str(request.user.pk),
+            "filename": os.path.basename(str(request.data.get("filename") or "")),
+            "mission_id": request.data.get("mission_id"),
+            "deliverable_id": request.data.get("deliverable_id"),
+        }
+        try:
+            upload_status = upload_store().create(length, metadata, request.data.get("content_hash"),
+                                                  owner=metadata["user_id"])
+        except UploadError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        code = status.HTTP_200_OK if upload_status["artifact"] else status.HTTP_201_CREATED
+        return _status_response(upload_status, code)
+
+
+class UploadChunkView(APIView):
+    permission_classes = [IsAuthenticated]
+    # The body is consumed as a stream in patch(); no parser may read it first
+    parser_classes = []
+
+    def _owned_status(self, request, upload_id):
+        upload_status = upload_store().status(upload_id)
+        if upload_status["metadata"].get("user_id") != str(request.user.pk):
+            raise UploadNotFound(upload_id)
+        return upload_status
+
+    def head(self, request, upload_id):
+        try:
+            return _status_response(self._owned_status(request, upload_id))
+        except UploadNotFound:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+    def get(self, request, upload_id):
+        return self.head(request, upload_id)
+
+    def patch(self, request, upload_id):
+        try:
+            offset = int(request.headers[UPLOAD_OFFSET_HEADER])
+        except (KeyError, ValueError):
+            return Response({"detail": f"{UPLOAD_OFFSET_HEADER} header is required"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Without a length (e.g. Transfer-Encoding: chunked) the chunk would be read as empty
+        try:
+            size = int(request.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return Response({"detail": "Content-Length header is required"},
+                            status=status.HTTP_411_LENGTH_REQUIRED)
+        if size < 0:
+            return Response({"detail": "invalid Content-Length"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            self._owned_status(request, upload_id)
+            upload_status = upload_store().append(upload_id, offset, request._request, size)
+        except UploadNotFound:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        except OffsetMismatch as e:
+            response = Response({"detail": str(e), "offset": e.expected}, status=status.HTTP_409_CONFLICT)
+            response[UPLOAD_OFFSET_HEADER] = str(e.expected)
+            return response
+        except UploadError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return _status_response(upload_status)
+
+
+urlpatterns = [
+    path("uploads/", UploadCreateView.as_view(), name="upload-create"),
+    path("uploads/<str:upload_id>/", UploadChunkView.as_view(), name="upload-chunk"),
+]
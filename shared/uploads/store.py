@@ -0,0 +1,319 @@
+"""
+Chunked, resumable uploads streamed to disk with an incremental content hash.
+
+An upload is created with its total length, then receives bytes in order with
+append(upload_id, offset, stream); the client asks status() for the offset to
+resume from after a dropped connection. Bytes are copied from the request
+stream in READ_SIZE pieces, so memory per upload stays constant whatever the
+file or chunk size.
+
+The content hash is computed as the bytes arrive, without ever re-reading the
+file: SHA-256 of each BLOCK_SIZE block is recorded in the upload's state as the
+block fills, and the final hash is SHA-256 over the concatenated block digests
+(the same scheme as Dropbox's content_hash). Because the state is on disk, the
+chunks of one upload can land on different worker processes. Only a partially
+filled trailing block is re-read when the next chunk arrives.
+
+Completed uploads are stored once per content hash under blobs/; uploading an
+identical artifact again reuses the existing blob. A client may also skip the
+upload by creating it with a known content_hash, but only if the same owner
+has already uploaded those bytes: a bare hash proves nothing about possessing
+the file. Whoever streams the bytes is recorded as an owner of the blob. Every
+completion is passed to `handoff`, e.g. redis_handoff(), so post-processing
+runs outside the request.
+
+Layout:
+    incoming/<upload_id>/data.part   bytes received so far
+    incoming/<upload_id>/state.json  length, received, block digests, metadata
+    blobs/<hash[:2]>/<hash>          completed artifacts, one per content hash
+    blobs/<hash[:2]>/<hash>.owners/  one empty file per owner (sha256 of the owner id)
+"""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import BinaryIO, Callable, Dict, Iterator, Optional
+
+BLOCK_SIZE = 4 * 1024 * 1024
+READ_SIZE = 64 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(2 * 1024 ** 3)))
+STALE_UPLOAD_SECONDS = int(os.environ.get("UPLOAD_STALE_SECONDS", str(24 * 3600)))
+
+_CONTENT_HASH = re.compile(r"[0-9a-f]{64}")
+
+
+class UploadError(Exception):
+    pass
+
+
+class UploadNotFound(UploadError):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    """The client's offset is not where the upload left off; it should resume from `expected`."""
+
+    def __init__(self, expected: int, got: int):
+        super().__init__(f"upload is at offset {expected}, chunk starts at {got}")
+        self.expected = expected
+
+
+@dataclass
+class Artifact:
+    content_hash: str
+    size: int
+    path: str
+    deduplicated: bool
+    upload_id: Optional[str] = None
+    metadata: Dict = field(default_factory=dict)
+
+
+class ContentHasher:
+    """Block-wise content hash: sha256(sha256(block_0) + sha256(block_1) + ...)."""
+
+    def __init__(self):
+        self.block_digests = []
+        self._block = hashlib.sha256()
+        self._block_len = 0
+
+    def update(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            take = min(len(view), BLOCK_SIZE - self._block_len)
+            self._block.update(view[:take])
+            self._block_len += take
+            view = view[take:]
+            if self._block_len == BLOCK_SIZE:
+                self.block_digests.append(self._block.hexdigest())
+                self._block = hashlib.sha256()
+                self._block_len = 0
+
+    def hexdigest(self) -> str:
+        digests = self.block_digests + ([self._block.hexdigest()] if self._block_len else [])
+        return hashlib.sha256(b"".join(bytes.fromhex(d) for d in digests)).hexdigest()
+
+
+def content_hash_of(stream: BinaryIO) -> str:
+    """Content hash of a whole file, for clients that want to check for an existing blob first."""
+    hasher = ContentHasher()
+    for data in iter(lambda: stream.read(READ_SIZE), b""):
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+class UploadStore:
+
+    def __init__(self, root: str, handoff: Optional[Callable[[Artifact], None]] = None,
+                 max_bytes: int = MAX_UPLOAD_BYTES):
+        self.root = root
+        self.handoff = handoff
+        self.max_bytes = max_bytes
+        self.incoming_dir = os.path.join(root, "incoming")
+        self.blobs_dir = os.path.join(root, "blobs")
+        os.makedirs(self.incoming_dir, exist_ok=True)
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+    # -- paths / state -------------------------------------------------------
+
+    def _dir(self, upload_id: str) -> str:
+        if not upload_id or not all(c in "0123456789abcdef" for c in upload_id):
+            raise UploadNotFound(upload_id)
+        return os.path.join(self.incoming_dir, upload_id)
+
+    def blob_path(self, content_hash: str) -> str:
+        # Client-supplied hashes end up in a path; anything but 64 hex digits could escape blobs/
+        if not isinstance(content_hash, str) or not _CONTENT_HASH.fullmatch(content_hash):
+            raise UploadError("content_hash must be 64 lowercase hex characters")
+        return os.path.join(self.blobs_dir, content_hash[:2], content_hash)
+
+    def _owner_marker(self, content_hash: str, owner: str) -> str:
+        return os.path.join(self.blob_path(content_hash) + ".owners", hashlib.sha256(owner.encode()).hexdigest())
+
+    def _add_owner(self, content_hash: str, owner: Optional[str]) -> None:
+        if owner is None:
+            return
+        marker = self._owner_marker(content_hash, owner)
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        open(marker, "a").close()
+
+    def owns(self, content_hash: str, owner: Optional[str]) -> bool:
+        """Whether `owner` has uploaded the bytes of this blob before."""
+        return owner is not None and os.path.exists(self._owner_marker(content_hash, owner))
+
+    def _read_state(self, upload_id: str) -> Dict:
+        try:
+            with open(os.path.join(self._dir(upload_id), "state.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadNotFound(upload_id)
+
+    def _write_state(self, upload_id: str, state: Dict) -> None:
+        path = os.path.join(self._dir(upload_id), "state.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+
+    @contextmanager
+    def _locked(self, upload_id: str) -> Iterator[Dict]:
+        # One writer per upload across threads and worker processes
+        directory = self._dir(upload_id)
+        try:
+            lock = open(os.path.join(directory, "lock"), "a")
+        except FileNotFoundError:
+            raise UploadNotFound(upload_id)
+        with lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield self._read_state(upload_id)
+
+    # -- API -----------------------------------------------------------------
+
+    def create(self, length: int, metadata: Optional[Dict] = None,
+               content_hash: Optional[str] = None, owner: Optional[str] = None) -> Dict:
+        """
+        Start an upload of `length` bytes for `owner` (e.g. the user id). Returns its status.
+
+        If `content_hash` is given, that blob exists with the same size, and
+        `owner` has uploaded it before, no bytes need to be sent: the returned
+        status is already complete. Otherwise the bytes must be streamed (and
+        are still deduplicated on completion).
+        """
+        if length < 0 or length > self.max_bytes:
+            raise UploadError(f"length must be between 0 and {self.max_bytes} bytes")
+        metadata = metadata or {}
+        owner = None if owner is None else str(owner)
+        if content_hash is not None:
+            blob_path = self.blob_path(content_hash)
+            known = self.owns(content_hash, owner) and os.path.isfile(blob_path)
+            if known and os.path.getsize(blob_path) == length:
+                artifact = Artifact(content_hash, length, blob_path, True, None, metadata)
+                self._hand_off(artifact)
+                return {"upload_id": None, "length": length, "offset": length, "metadata": metadata,
+                        "artifact": asdict(artifact)}
+
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._dir(upload_id))
+        open(os.path.join(self._dir(upload_id), "data.part"), "wb").close()
+        self._write_state(upload_id, {
+            "length": length, "received": 0, "block_digests": [],
+            "metadata": metadata, "owner": owner, "created_at": time.time(), "artifact": None,
+        })
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict:
+        state = self._read_state(upload_id)
+        return {"upload_id": upload_id, "length": state["length"], "offset": state["received"],
+                "metadata": state["metadata"], "artifact": state["artifact"]}
+
+    def append(self, upload_id: str, offset: int, stream: BinaryIO, size: Optional[int] = None) -> Dict:
+        """
+        Stream bytes from `stream` into the upload starting at `offset`.
+
+        Reads until EOF, `size` bytes, or the declared length. Whatever arrived
+        before a dropped connection is kept, so the client can resume from
+        status()["offset"]. Completes the upload when the last byte is in.
+        """
+        with self._locked(upload_id) as state:
+            if state["artifact"] is not None:
+                return self.status(upload_id)
+            received = state["received"]
+            if offset != received:
+                raise OffsetMismatch(received, offset)
+            remaining = state["length"] - received
+            if size is not None:
+                if size > remaining:
+                    raise UploadError(f"chunk of {size} bytes exceeds the remaining {remaining}")
+                remaining = size
+
+            part_path = os.path.join(self._dir(upload_id), "data.part")
+            hasher = ContentHasher()
+            hasher.block_digests = list(state["block_digests"])
+            with open(part_path, "r+b") as part:
+                # Drop bytes past the recorded offset (a crash mid-write), then
+                # re-read the partially filled trailing block into the hasher
+                part.truncate(received)
+                part.seek(len(hasher.block_digests) * BLOCK_SIZE)
+                for data in iter(lambda: part.read(READ_SIZE), b""):
+                    hasher.update(data)
+                part.seek(received)
+                try:
+                    while remaining > 0:
+                        data = stream.read(min(READ_SIZE, remaining))
+                        if not data:
+                            break
+                        part.write(data)
+                        hasher.update(data)
+                        received += len(data)
+                        remaining -= len(data)
+                finally:
+                    part.flush()
+                    state["received"] = received
+                    state["block_digests"] = hasher.block_digests
+                    self._write_state(upload_id, state)
+
+            if received == state["length"]:
+                state["artifact"] = asdict(self._complete(upload_id, state, hasher.hexdigest()))
+                self._write_state(upload_id, state)
+        return self.status(upload_id)
+
+    def _complete(self, upload_id: str, state: Dict, content_hash: str) -> Artifact:
+        part_path = os.path.join(self._dir(upload_id), "data.part")
+        blob_path = self.blob_path(content_hash)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        deduplicated = os.path.exists(blob_path)
+        if deduplicated:
+            os.remove(part_path)
+        else:
+            os.replace(part_path, blob_path)
+        # The hash was computed from the streamed bytes, so this owner provably has them
+        self._add_owner(content_hash, state.get("owner"))
+        artifact = Artifact(content_hash, state["length"], blob_path, deduplicated, upload_id, state["metadata"])
+        self._hand_off(artifact)
+        return artifact
+
+    def _hand_off(self, artifact: Artifact) -> None:
+        if self.handoff is not None:
+            self.handoff(artifact)
+
+    def purge_stale(self, max_age: float = STALE_UPLOAD_SECONDS) -> int:
+        """Remove uploads (finished or abandoned) created more than `max_age` seconds ago."""
+        removed = 0
+        cutoff = time.time() - max_age
+        for upload_id in os.listdir(self.incoming_dir):
+            try:
+                created = self._read_state(upload_id)["created_at"]
+            except (UploadError, ValueError):
+                created = 0
+            if created < cutoff:
+                shutil.rmtree(os.path.join(self.incoming_dir, upload_id), ignore_errors=True)
+                removed += 1
+        return removed
+
+
+def redis_handoff(stream: str = "uploads:completed", redis_client=None) -> Callable[[Artifact], None]:
+    """Handoff that appends completed artifacts to a Redis stream for post-processing workers."""
+    if redis_client is None:
+        import redis
+
+        redis_client = redis.Redis(
+            host=os.environ.get("REDIS_HOST", "localhost"),
+            port=int(os.environ.get("REDIS_PORT", "6379")),
+            db=int(os.environ.get("REDIS_DB", "0")),
+        )
+
+    def handoff(artifact: Artifact) -> None:
+        redis_client.xadd(stream, {
+            "content_hash": artifact.content_hash,
+            "size": str(artifact.size),
+            "path": artifact.path,
+            "deduplicated": "1" if artifact.deduplicated else "0",
+            "upload_id": artifact.upload_id or "",
+            "metadata": json.dumps(artifact.metadata),
+        })
+
+    return handoff
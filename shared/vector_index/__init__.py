@@ -0,0 +1,4 @@
+"""In-process approximate nearest-neighbour index for similar-user search."""
+from .ivf import IVFIndex, default_nlist, normalize
+
+__all__ = ["IVFIndex", "default_nlist", "normalize"]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Latency and recall of the IVF index against exact search on synthetic embeddings.
+
+Embeddings are drawn around `--clusters` random centres (users with similar
+profiles land near each other), normalized like sentence-transformer output.
+
+Usage:
+    python -m shared.vector_index.benchmark --users 50000 --dim 384
+"""
+import argparse
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from .ivf import IVFIndex, normalize
+
+
+def synthetic_embeddings(users: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    members = rng.integers(0, clusters, size=users)
+    return normalize(centres[members] + 0.6 * rng.standard_normal((users, dim)).astype(np.float32))
+
+
+def _latencies(search: Callable[[np.ndarray], object], queries: np.ndarray) -> List[float]:
+    out = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        out.append((time.perf_counter() - start) * 1000)
+    return out
+
+
+def _report(label: str, latencies: List[float]) -> None:
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"  {label:<28} p50 {p50:7.2f} ms   p95 {p95:7.2f} ms   p99 {p99:7.2f} ms")
+
+
+def run(users: int, dim: int, clusters: int, queries: int, k: int, nprobes: List[int]) -> int:
+    vectors = synthetic_embeddings(users, dim, clusters)
+    ids = [f"user-{i}" for i in range(users)]
+    query_vectors = synthetic_embeddings(queries, dim, clusters, seed=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/index"
+        start = time.perf_counter()
+        IVFIndex.build(path, ids, vectors)
+        built = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = IVFIndex.open(path)
+        opened = time.perf_counter() - start
+        print(f"{users} users x {dim} dims, {len(index.centroids)} lists: "
+              f"build {built:.1f}s, open (mmap) {opened * 1000:.1f} ms")
+
+        _report("exact (full scan)", _latencies(lambda q: index.exact_search(q, k), query_vectors))
+        for nprobe in nprobes:
+            recall = index.recall_at_k(query_vectors, k, nprobe)
+            _report(f"IVF nprobe={nprobe:<3} recall@{k} {recall:.3f}",
+                    _latencies(lambda q: index.search(q, k, nprobe), query_vectors))
+
+        new_users = max(users // 50, 1)
+        start = time.perf_counter()
+        index.add([f"new-{i}" for i in range(new_users)], synthetic_embeddings(new_users, dim, clusters, seed=2))
+        added = time.perf_counter() - start
+        _report(f"IVF after +{new_users} delta rows", _latencies(lambda q: index.search(q, k), query_vectors))
+        print(f"  incremental add of {new_users} rows: {added * 1000:.0f} ms; "
+              f"recall@{k} {index.recall_at_k(query_vectors, k):.3f}")
+        start = time.perf_counter()
+        index.compact()
+        print(f"  compaction: {(time.perf_counter() - start) * 1000:.0f} ms; "
+              f"recall@{k} {index.recall_at_k(query_vectors, k):.3f} (centroids kept)")
+        start = time.perf_counter()
+        index.compact(retrain=True)
+        print(f"  compaction + retrain: {(time.perf_counter() - start) * 1000:.0f} ms; "
+              f"recall@{k} {index.recall_at_k(query_vectors, k):.3f}")
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 32])
+    args = parser.parse_args(argv)
+    return run(args.users, args.dim, args.clusters, args.queries, args.k, args.nprobe)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
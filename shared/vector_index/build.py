@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Build or refresh the similar-user IVF index from profiling_embeddings.
+
+Connects with the FastAPI service's VECTOR_DB_* settings and streams rows with a
+server-side cursor. A full build trains new centroids; --refresh only pulls
+rows updated since the last sync and adds them incrementally.
+
+Usage:
+    python -m shared.vector_index.build --path /var/lib/och/similar_users
+    python -m shared.vector_index.build --path /var/lib/och/similar_users --refresh
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+from .ivf import IVFIndex
+
+TABLE = os.environ.get("VECTOR_INDEX_TABLE", "profiling_embeddings")
+UPDATED_COLUMN = os.environ.get("VECTOR_INDEX_UPDATED_COLUMN", "updated_at")
+FETCH_SIZE = 5000
+
+
+def connect():
+    import psycopg2
+
+    return psycopg2.connect(
+        host=os.environ.get("VECTOR_DB_HOST", "localhost"),
+        port=int(os.environ.get("VECTOR_DB_PORT", "5433")),
+        dbname=os.environ.get("VECTOR_DB_NAME", "ongozacyberhub_vector"),
+        user=os.environ.get("VECTOR_DB_USER", "postgres"),
+        password=os.environ.get("VECTOR_DB_PASSWORD", "postgres"),
+    )
+
+
+def load_embeddings(conn, since: Optional[datetime] = None):
+    """
+    Returns (user_ids, vectors, max_updated_at) for rows updated at or after `since` (all if None).
+    `>=` re-reads rows sharing the last synced timestamp; add() replaces them, so that is harmless.
+    """
+    where, params = ("", []) if since is None else (f"WHERE {UPDATED_COLUMN} >= %s", [since])
+    ids, rows, latest = [], [], since
+    with conn.cursor(name="vector_index_load") as cursor:
+        cursor.itersize = FETCH_SIZE
+        cursor.execute(f"SELECT user_id, embedding::real[], {UPDATED_COLUMN} FROM {TABLE} {where}", params)
+        for user_id, embedding, updated_at in cursor:
+            ids.append(str(user_id))
+            rows.append(embedding)
+            if updated_at is not None and (latest is None or updated_at > latest):
+                latest = updated_at
+    vectors = np.asarray(rows, dtype=np.float32) if rows else np.zeros((0, 0), dtype=np.float32)
+    return ids, vectors, latest
+
+
+def _sync_path(path: str) -> str:
+    # Next to the index, not inside it, so it survives the index directory being rebuilt
+    return os.path.normpath(path) + ".sync.json"
+
+
+def _read_sync(path: str) -> Optional[datetime]:
+    try:
+        with open(_sync_path(path)) as f:
+            return datetime.fromisoformat(json.load(f)["updated_at"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _write_sync(path: str, updated_at: Optional[datetime]) -> None:
+    if updated_at is None:
+        return
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    with open(_sync_path(path), "w") as f:
+        json.dump({"updated_at": updated_at.isoformat()}, f)
+
+
+def build(path: str, nlist: Optional[int] = None) -> int:
+    start = time.perf_counter()
+    with connect() as conn:
+        ids, vectors, latest = load_embeddings(conn)
+    if not ids:
+        print(f"❌ No rows in {TABLE}")
+        return 1
+    loaded = time.perf_counter()
+    index = IVFIndex.build(path, ids, vectors, nlist=nlist)
+    _write_sync(path, latest)
+    print(f"✅ Indexed {len(index)} embeddings (dim {index.dim}, {len(index.centroids)} lists) "
+          f"in {time.perf_counter() - start:.1f}s (load {loaded - start:.1f}s)")
+    return 0
+
+
+def refresh(path: str) -> int:
+    index = IVFIndex.open(path)
+    with connect() as conn:
+        ids, vectors, latest = load_embeddings(conn, since=_read_sync(path))
+    if ids:
+        index.add(ids, vectors)
+        _write_sync(path, latest)
+    print(f"✅ Added/updated {len(ids)} embeddings; index holds {len(index)} "
+          f"({len(index.delta_ids)} in the delta segment)")
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", required=True, help="Index directory")
+    parser.add_argument("--refresh", action="store_true", help="Add rows updated since the last sync")
+    parser.add_argument("--nlist", type=int, help="Number of IVF lists (default ~4 * sqrt(n))")
+    args = parser.parse_args(argv)
+    if args.refresh and os.path.exists(os.path.join(args.path, "meta.json")):
+        return refresh(args.path)
+    return build(args.path, args.nlist)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""
+In-process IVF (inverted file) index for cosine similarity over user embeddings.
+
+Vectors are L2-normalized and clustered with spherical k-means into `nlist`
+lists. The main segment is stored sorted by list, so scanning a list is one
+contiguous slice; a query scores the centroids, then scans only the `nprobe`
+closest lists. Files are plain .npy arrays opened with mmap_mode="r", so a
+worker starts without loading the index into memory.
+
+Updates are incremental: add() appends new vectors to a small delta segment
+that every query scans exhaustively, and replaced or removed rows in the main segment are tombstoned. compact() folds
+the delta back into the sorted main segment; it runs automatically once the
+delta grows past `compact_ratio` of the main segment.
+
+Every array a query reads lives on one immutable _Segment; updates build a new
+one and publish it with a single attribute assignment, so a search always sees
+one consistent version. compact() writes the merged segment into a new
+seg-* directory and switches the CURRENT pointer file to it; files backing
+live memory maps are never rewritten.
+
+Recall after compaction: compaction keeps the trained centroids, so rows added
+since training are filed under lists that may fit them poorly, and recall can
+drop (the benchmark adds 2% of rows from unseen clusters: recall@10 at nprobe
+32 goes 0.947 -> 0.906, and back to 0.929 with retraining). Rows the delta held
+were scanned exactly until then. compact(retrain=True) re-runs k-means on the
+merged rows (build-time cost), and compaction does so by itself once the rows
+added since the last training exceed `retrain_ratio`
+(VECTOR_INDEX_RETRAIN_RATIO) of the rows trained on.
+
+Drop-in for pgvector_client.find_similar_users:
+
+    index = IVFIndex.open(settings.SIMILAR_USERS_INDEX)
+    matches = index.search(embedding, k=limit, exclude=[current_user_id])  # [(user_id, similarity)]
+
+Layout of an index directory:
+    CURRENT             name of the live segment directory
+    seg-*/              one segment:
+      meta.json         dim, nlist, nprobe, counts, training bookkeeping
+      centroids.npy     (nlist, dim) float32
+      offsets.npy       (nlist + 1,) int64; list i is rows offsets[i]:offsets[i + 1]
+      vectors.npy       (n, dim) float32, sorted by list
+      ids.npy           (n,) str
+      deleted.npy       (n,) bool tombstones
+      delta_vectors.npy / delta_ids.npy   rows added since the last compaction
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_NPROBE = int(os.environ.get("VECTOR_INDEX_NPROBE", "32"))
+COMPACT_RATIO = float(os.environ.get("VECTOR_INDEX_COMPACT_RATIO", "0.1"))
+RETRAIN_RATIO = float(os.environ.get("VECTOR_INDEX_RETRAIN_RATIO", "0.5"))
+CURRENT_FILE = "CURRENT"
+SEGMENT_PREFIX = "seg-"
+KMEANS_ITERATIONS = 12
+KMEANS_MAX_TRAIN = 100_000
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def default_nlist(n: int) -> int:
+    return max(1, min(int(4 * np.sqrt(n)), n // 8 or 1))
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, seed: int = 0,
+                    iterations: int = KMEANS_ITERATIONS) -> np.ndarray:
+    """Spherical k-means on (a sample of) normalized vectors."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > KMEANS_MAX_TRAIN:
+        vectors = vectors[rng.choice(len(vectors), KMEANS_MAX_TRAIN, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _nearest(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists from random points so no list stays unused
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = normalize(sums)
+    return centroids
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray, batch: int = 8192) -> np.ndarray:
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), batch):
+        out[start:start + batch] = (vectors[start:start + batch] @ centroids.T).argmax(axis=1)
+    return out
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if len(scores) <= k:
+        return np.argsort(-scores)
+    idx = np.argpartition(-scores, k)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+def _save(path: str, name: str, array: np.ndarray) -> None:
+    tmp = os.path.join(path, f".{name}.tmp.npy")
+    np.save(tmp, array)
+    os.replace(tmp, os.path.join(path, f"{name}.npy"))
+
+
+def _segment_dir(path: str) -> str:
+    """Directory of the live segment; indexes written before segments were versioned keep it in `path`."""
+    try:
+        with open(os.path.join(path, CURRENT_FILE)) as f:
+            return os.path.join(path, f.read().strip())
+    except FileNotFoundError:
+        return path
+
+
+def _publish(path: str, name: str) -> None:
+    """Point CURRENT at segment `name` atomically, then drop the segments it replaced."""
+    tmp = os.path.join(path, f".{CURRENT_FILE}.tmp")
+    with open(tmp, "w") as f:
+        f.write(name)
+    os.replace(tmp, os.path.join(path, CURRENT_FILE))
+    for entry in os.listdir(path):
+        if entry.startswith(SEGMENT_PREFIX) and entry != name:
+            # Unlinking keeps existing memory maps valid on POSIX
+            shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+
+
+@dataclass(frozen=True)
+class _Segment:
+    """One consistent version of the index. Never mutated; updates publish a replacement."""
+
+    directory: str
+    meta: Dict
+    centroids: np.ndarray
+    offsets: np.ndarray
+    vectors: np.ndarray
+    ids: np.ndarray
+    deleted: np.ndarray
+    delta_vectors: np.ndarray
+    delta_ids: np.ndarray
+
+
+class IVFIndex:
+    """Open with IVFIndex.open(path); create with IVFIndex.build(path, ids, vectors)."""
+
+    def __init__(self, path: str, segment: _Segment):
+        self.path = path
+        self.dim = segment.meta["dim"]
+        self.nprobe = segment.meta.get("nprobe", DEFAULT_NPROBE)
+        self.compact_ratio = segment.meta.get("compact_ratio", COMPACT_RATIO)
+        self.retrain_ratio = segment.meta.get("retrain_ratio", RETRAIN_RATIO)
+        self._segment = segment
+        self._row_of: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    # Read-only views of the live segment
+    centroids = property(lambda self: self._segment.centroids)
+    offsets = property(lambda self: self._segment.offsets)
+    vectors = property(lambda self: self._segment.vectors)
+    ids = property(lambda self: self._segment.ids)
+    deleted = property(lambda self: self._segment.deleted)
+    delta_vectors = property(lambda self: self._segment.delta_vectors)
+    delta_ids = property(lambda self: self._segment.delta_ids)
+
+    # -- construction -------------------------------------------------------
+
+    @classmethod
+    def build(cls, path: str, ids: Sequence, vectors: np.ndarray, nlist: Optional[int] = None,
+              nprobe: int = DEFAULT_NPROBE, seed: int = 0) -> "IVFIndex":
+        vectors = normalize(vectors)
+        ids = np.asarray([str(i) for i in ids])
+        nlist = nlist or default_nlist(len(vectors))
+        centroids = train_centroids(vectors, nlist, seed)
+        meta = {"dim": int(vectors.shape[1]), "nlist": nlist, "nprobe": nprobe, "compact_ratio": COMPACT_RATIO,
+                "retrain_ratio": RETRAIN_RATIO, "seed": seed, "trained_count": int(len(ids)),
+                "added_since_training": 0}
+        os.makedirs(path, exist_ok=True)
+        _publish(path, cls._write(path, meta, centroids, vectors, ids))
+        return cls.open(path)
+
+    @staticmethod
+    def _write(path: str, meta: Dict, centroids: np.ndarray, vectors: np.ndarray, ids: np.ndarray) -> str:
+        """Write a main segment into a new seg-* directory under `path` and return its name (not yet live)."""
+        assignment = _nearest(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=len(centroids)), out=offsets[1:])
+
+        directory = tempfile.mkdtemp(prefix=SEGMENT_PREFIX, dir=path)
+        np.save(os.path.join(directory, "centroids.npy"), centroids.astype(np.float32))
+        np.save(os.path.join(directory, "offsets.npy"), offsets)
+        np.save(os.path.join(directory, "vectors.npy"), vectors[order])
+        np.save(os.path.join(directory, "ids.npy"), ids[order])
+        np.save(os.path.join(directory, "deleted.npy"), np.zeros(len(ids), dtype=bool))
+        np.save(os.path.join(directory, "delta_vectors.npy"), np.zeros((0, meta["dim"]), dtype=np.float32))
+        np.save(os.path.join(directory, "delta_ids.npy"), np.zeros(0, dtype=ids.dtype))
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({**meta, "count": int(len(ids))}, f)
+        return os.path.basename(directory)
+
+    @staticmethod
+    def _load(directory: str) -> _Segment:
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+
+        def load(name, mmap=True):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+
+        return _Segment(
+            directory, meta,
+            centroids=load("centroids", mmap=False),
+            offsets=load("offsets", mmap=False),
+            vectors=load("vectors"),
+            ids=load("ids"),
+            deleted=load("deleted", mmap=False),
+            delta_vectors=load("delta_vectors", mmap=False),
+            delta_ids=load("delta_ids", mmap=False),
+        )
+
+    @classmethod
+    def open(cls, path: str) -> "IVFIndex":
+        return cls(path, cls._load(_segment_dir(path)))
+
+    def __len__(self) -> int:
+        segment = self._segment
+        return int(len(segment.ids) - segment.deleted.sum() + len(segment.delta_ids))
+
+    # -- incremental updates -----------------------------------------------
+
+    def _rows(self) -> Dict[str, int]:
+        if self._row_of is None:
+            self._row_of = {str(user_id): row for row, user_id in enumerate(self._segment.ids)}
+        return self._row_of
+
+    def add(self, ids: Sequence, vectors: np.ndarray) -> None:
+        """Insert or replace embeddings; replaced main-segment rows are tombstoned."""
+        ids = np.asarray([str(i) for i in ids])
+        vectors = normalize(np.atleast_2d(vectors))
+        with self._lock:
+            segment = self._segment
+            keep = ~np.isin(segment.delta_ids, ids)
+            self._update(
+                segment,
+                deleted=self._tombstoned(segment, ids),
+                delta_ids=np.concatenate([segment.delta_ids[keep], ids]),
+                delta_vectors=np.concatenate([segment.delta_vectors[keep], vectors]),
+            )
+        segment = self._segment
+        if len(segment.delta_ids) > self.compact_ratio * max(len(segment.ids), 1):
+            self.compact()
+
+    def remove(self, ids: Iterable) -> None:
+        ids = np.asarray([str(i) for i in ids])
+        with self._lock:
+            segment = self._segment
+            keep = ~np.isin(segment.delta_ids, ids)
+            self._update(
+                segment,
+                deleted=self._tombstoned(segment, ids),
+                delta_ids=segment.delta_ids[keep],
+                delta_vectors=segment.delta_vectors[keep],
+            )
+
+    def _tombstoned(self, segment: _Segment, ids: np.ndarray) -> np.ndarray:
+        rows = [self._rows()[i] for i in ids if i in self._rows()]
+        if not rows:
+            return segment.deleted
+        deleted = segment.deleted.copy()
+        deleted[rows] = True
+        return deleted
+
+    def _update(self, segment: _Segment, **changes) -> None:
+        """Persist the small mutable arrays (not memory-mapped) and publish the new version."""
+        updated = replace(segment, **changes)
+        _save(updated.directory, "deleted", updated.deleted)
+        _save(updated.directory, "delta_vectors", updated.delta_vectors)
+        _save(updated.directory, "delta_ids", updated.delta_ids)
+        self._segment = updated
+
+    def compact(self, retrain: bool = False) -> None:
+        """
+        Merge the delta into a new sorted main segment, dropping tombstoned rows.
+
+        Centroids are kept unless `retrain` is set or the rows added since the
+        last training exceed retrain_ratio of the rows trained on.
+        """
+        with self._lock:
+            segment = self._segment
+            live = ~segment.deleted
+            vectors = np.concatenate([np.asarray(segment.vectors)[live], segment.delta_vectors])
+            ids = np.concatenate([np.asarray(segment.ids)[live].astype(str), segment.delta_ids.astype(str)])
+            meta = dict(segment.meta)
+            meta.pop("count", None)
+            added = meta.get("added_since_training", 0) + len(segment.delta_ids)
+            trained = meta.get("trained_count", len(segment.ids))
+            centroids = segment.centroids
+            if retrain or added > self.retrain_ratio * max(trained, 1):
+                nlist = min(meta.get("nlist", len(centroids)), len(vectors))
+                centroids = train_centroids(vectors, nlist, meta.get("seed", 0))
+                meta.update(nlist=nlist, trained_count=int(len(ids)), added_since_training=0)
+            else:
+                meta["added_since_training"] = int(added)
+            name = self._write(self.path, meta, centroids, vectors, ids)
+            fresh = self._load(os.path.join(self.path, name))
+            _publish(self.path, name)
+            self._segment = fresh
+            self._row_of = None
+
+    # -- search -------------------------------------------------------------
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None,
+               exclude: Iterable = ()) -> List[Tuple[str, float]]:
+        """Approximate top-k by cosine similarity: [(id, similarity), ...], best first."""
+        segment = self._segment
+        query = normalize(query)
+        nprobe = min(nprobe or self.nprobe, len(segment.centroids))
+        lists = _top_k(segment.centroids @ query, nprobe)
+        offsets = segment.offsets
+        rows = np.concatenate([np.arange(offsets[i], offsets[i + 1]) for i in lists])
+        rows = rows[~segment.deleted[rows]]
+        return self._rank(segment, rows, segment.vectors[rows] @ query, query, k, exclude)
+
+    def exact_search(self, query: np.ndarray, k: int = 10, exclude: Iterable = ()) -> List[Tuple[str, float]]:
+        """Exhaustive top-k over every live vector (the ORDER BY embedding <=> $1 equivalent)."""
+        segment = self._segment
+        query = normalize(query)
+        rows = np.flatnonzero(~segment.deleted)
+        return self._rank(segment, rows, np.asarray(segment.vectors @ query)[rows], query, k, exclude)
+
+    @staticmethod
+    def _rank(segment: _Segment, rows, scores, query, k, exclude) -> List[Tuple[str, float]]:
+        exclude = {str(e) for e in exclude}
+        delta_ids, delta_vectors = segment.delta_ids, segment.delta_vectors
+        candidates_ids = np.concatenate([np.asarray(segment.ids[rows]).astype(str), delta_ids.astype(str)])
+        candidates_scores = np.concatenate([scores, delta_vectors @ query]) if len(delta_ids) else scores
+        # Over-fetch by the number of excluded ids so exclusions never shrink the result
+        top = _top_k(candidates_scores, k + len(exclude))
+        results = [(candidates_ids[i], float(candidates_scores[i])) for i in top if candidates_ids[i] not in exclude]
+        return results[:k]
+
+    def recall_at_k(self, queries: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> float:
+        """Mean fraction of the exact top-k that the approximate search also returns."""
+        hits = 0
+        for query in np.atleast_2d(queries):
+            exact = {user_id for user_id, _ in self.exact_search(query, k)}
+            approx = {user_id for user_id, _ in self.search(query, k, nprobe)}
+            hits += len(exact & approx)
+        return hits / (len(np.atleast_2d(queries)) * k)
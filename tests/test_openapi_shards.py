@@ -0,0 +1,55 @@
+import json
+
+from shared.openapi.shards import INDEX_NAME, ShardedSpec, write_shards
+
+
+def make_spec(title):
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": title, "version": "1"},
+        "paths": {
+            "/goals/": {"get": {"tags": ["coaching"], "responses": {"200": {"description": "", "content": {
+                "application/json": {"schema": {"$ref": "#/components/schemas/Goal"}}}}}}},
+            "/missions/": {"get": {"tags": ["missions"], "responses": {"200": {"description": ""}}}},
+        },
+        "components": {"schemas": {"Goal": {"type": "object", "properties": {"title": {"type": "string"}}},
+                                   "Unused": {"type": "string"}}},
+    }
+
+
+def listed(directory):
+    return set(path.name for path in directory.iterdir())
+
+
+def test_rewrite_removes_only_files_the_previous_index_listed(tmp_path):
+    first = write_shards(make_spec("first"), tmp_path)
+    first_files = listed(tmp_path) - {INDEX_NAME}
+    unrelated = {"notes.0123456789ab.json", "logo.png", "README.md"}
+    for name in unrelated:
+        (tmp_path / name).write_text("keep me")
+
+    second = write_shards(make_spec("second"), tmp_path)
+
+    second_files = {entry["file"] for entry in second["x-shards"]["tags"].values()}
+    second_files |= {second["x-shards"]["operations"], second["x-shards"]["unreferenced"]}
+    assert listed(tmp_path) == second_files | unrelated | {INDEX_NAME}
+    assert first_files - second_files
+    assert first["x-shards"]["operations"] in second_files     # unchanged content, same name, kept
+
+
+def test_index_outside_the_directory_is_never_followed(tmp_path):
+    victim = tmp_path / "victim.0123456789ab.json"
+    victim.write_text("{}")
+    shards = tmp_path / "shards"
+    shards.mkdir()
+    (shards / INDEX_NAME).write_text(json.dumps({"x-shards": {"tags": {"a": {"file": "../victim.0123456789ab.json"}},
+                                                              "operations": "../victim.0123456789ab.json"}}))
+    write_shards(make_spec("first"), shards)
+    assert victim.exists()
+
+
+def test_written_shards_load_on_demand(tmp_path):
+    write_shards(make_spec("first"), tmp_path)
+    spec = ShardedSpec(tmp_path)
+    assert sorted(spec.tags()) == ["coaching", "missions"]
+    assert "Goal" in spec.shard("coaching")["components"]["schemas"]
@@ -0,0 +1,141 @@
+import pytest
+
+from shared.openapi import validators
+from shared.openapi.validators import ValidationError, generate_source, load_validators
+
+
+def make_spec(schemas, paths=None):
+    return {"openapi": "3.0.3", "info": {"title": "t", "version": "1"}, "paths": paths or {},
+            "components": {"schemas": schemas}}
+
+
+def json_body(ref):
+    return {"content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{ref}"}}}}
+
+
+GOAL_SPEC = make_spec(
+    {
+        "Goal": {
+            "type": "object",
+            "required": ["id", "title", "owner_token"],
+            "additionalProperties": False,
+            "properties": {
+                "id": {"type": "integer", "readOnly": True},
+                "title": {"type": "string", "minLength": 1},
+                "owner_token": {"type": "string", "writeOnly": True},
+                "steps": {"type": "array", "items": {"$ref": "#/components/schemas/Step"}},
+                "tag": {"$ref": "#/components/schemas/Tag"},
+            },
+        },
+        "Step": {
+            "type": "object",
+            "required": ["uuid", "name"],
+            "properties": {"uuid": {"type": "string", "format": "uuid", "readOnly": True},
+                           "name": {"type": "string"}},
+        },
+        "Tag": {"type": "string", "enum": ["a", "b"]},
+    },
+    {
+        "/goals/": {"post": {"requestBody": {"required": True, **json_body("Goal")},
+                             "responses": {"201": json_body("Goal")}}},
+        "/goals/{id}/": {"get": {"parameters": [{"name": "id", "in": "path", "schema": {"type": "integer"}}],
+                                 "responses": {"200": json_body("Goal")}}},
+    },
+)
+
+
+@pytest.fixture
+def goals(tmp_path):
+    return load_validators(GOAL_SPEC, tmp_path)
+
+
+def test_request_body_may_omit_read_only_properties(goals):
+    assert goals.validate_request("POST", "/goals/", body={"title": "x", "owner_token": "t"}) == ("/goals/", {})
+    goals.validate_request("POST", "/goals/", body={"title": "x", "owner_token": "t", "steps": [{"name": "s"}]})
+
+
+def test_request_body_must_not_send_read_only_properties_when_closed(goals):
+    with pytest.raises(ValidationError, match="unexpected properties: id"):
+        goals.validate_request("POST", "/goals/", body={"id": 1, "title": "x", "owner_token": "t"})
+
+
+def test_request_body_still_requires_write_only_properties(goals):
+    with pytest.raises(ValidationError, match="missing required properties: owner_token"):
+        goals.validate_request("POST", "/goals/", body={"title": "x"})
+
+
+def test_response_may_omit_write_only_and_must_have_read_only(goals):
+    assert goals.validate_response("POST", "/goals/", 201, {"id": 1, "title": "x"})
+    with pytest.raises(ValidationError, match="missing required properties: id"):
+        goals.validate_response("POST", "/goals/", 201, {"title": "x"})
+    with pytest.raises(ValidationError) as info:
+        goals.validate_response("GET", "/goals/{id}/", 200, {"id": 1, "title": "x", "steps": [{"name": "s"}]})
+    assert info.value.path == ["steps", 0]
+
+
+def test_named_schema_validation_keeps_every_property(goals):
+    with pytest.raises(ValidationError, match="missing required properties: id, owner_token"):
+        goals.validate("Goal", {"title": "x"})
+
+
+def test_schemas_without_read_or_write_only_get_one_function():
+    source = generate_source(GOAL_SPEC)
+    assert "q_Goal_" in source and "r_Goal_" in source and "q_Step_" in source
+    assert "q_Tag_" not in source and "r_Tag_" not in source and "r_Step_" not in source
+
+
+def test_path_parameters_are_coerced_and_checked(goals):
+    assert goals.validate_request("GET", "/goals/7/") == ("/goals/{id}/", {"id": 7})
+    with pytest.raises(ValidationError, match="expected integer"):
+        goals.validate_request("GET", "/goals/seven/")
+
+
+QUOTED_SPEC = make_spec(
+    {
+        "Pet": {
+            "oneOf": [{"$ref": "#/components/schemas/Cat"}, {"$ref": "#/components/schemas/Dog's"}],
+            "discriminator": {"propertyName": "it's", "mapping": {"o'cat": "#/components/schemas/Cat"}},
+        },
+        "Cat": {
+            "type": "object",
+            "required": ["it's", 'say "hi"'],
+            "properties": {"it's": {"type": "string"}, 'say "hi"': {"type": "string", "pattern": "^[\"']\\w+'$"}},
+        },
+        "Dog's": {"type": "object", "properties": {"n": {"type": "number", "multipleOf": 0.5},
+                                                   "kind": {"enum": ["it's", 'a "b"', None]}}},
+        "Odd": {"type": ["string", "it's"]},
+    },
+    {"/pets/{pet's id}/": {"put": {"parameters": [{"name": "pet's id", "in": "path", "schema": {"type": "string"}}],
+                                   "requestBody": json_body("Pet"), "responses": {}}}},
+)
+
+
+def test_spec_strings_are_escaped_in_generated_code(tmp_path):
+    spec = load_validators(QUOTED_SPEC, tmp_path)
+    spec.validate("Pet", {"it's": "o'cat", 'say "hi"': "'meow'"})
+    spec.validate("Pet", {"it's": "Dog's", "n": 1.5, "kind": 'a "b"'})
+    with pytest.raises(ValidationError, match="unknown or missing discriminator it's"):
+        spec.validate("Pet", {"it's": "fish"})
+    with pytest.raises(ValidationError, match="does not match"):
+        spec.validate("Pet", {"it's": "o'cat", 'say "hi"': "meow"})
+    with pytest.raises(ValidationError, match="not a multiple of 0.5"):
+        spec.validate("Dog's", {"n": 0.7})
+    with pytest.raises(ValidationError, match="expected string or it's"):
+        spec.validate("Odd", 1)
+    assert spec.validate_request("PUT", "/pets/7/", body={"it's": "Dog's"}) == ("/pets/{pet's id}/", {"pet's id": "7"})
+
+
+def test_broken_generated_module_is_not_cached(tmp_path, monkeypatch):
+    spec = make_spec({"Broken": {"type": "string"}})
+    monkeypatch.setattr(validators, "generate_source", lambda spec: "def broken(:\n")
+    with pytest.raises(SyntaxError):
+        load_validators(spec, tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unloadable_cached_module_is_rebuilt(tmp_path):
+    spec = make_spec({"Rebuilt": {"type": "string"}})
+    cached = tmp_path / f"validators_{validators.spec_hash(spec)[:16]}.py"
+    cached.write_text("this is not python\n")
+    load_validators(spec, tmp_path).validate("Rebuilt", "ok")
+    assert "def s_Rebuilt_" in cached.read_text()
@@ -0,0 +1,97 @@
+import re
+
+import pytest
+
+from shared.evidence.sanitize import Sanitizer
+
+
+@pytest.fixture
+def sanitizer():
+    return Sanitizer("test-salt")
+
+
+def pseudonym(sanitizer, kind, value):
+    return sanitizer._make_pseudonym(kind, value)
+
+
+@pytest.mark.parametrize("line, address", [
+    ("src ip10.1.2.3 blocked", "10.1.2.3"),
+    ("peer=x_10.1.2.4", "10.1.2.4"),
+    ("from 192.168.7.20:443", "192.168.7.20"),
+])
+def test_ipv4_glued_to_other_text_is_redacted(sanitizer, line, address):
+    out = sanitizer.line(line)
+    assert address not in out
+    assert pseudonym(sanitizer, "IP", address) in out
+
+
+def test_ipv4_mapped_ipv6_is_one_address(sanitizer):
+    out = sanitizer.line("client ::ffff:10.0.0.1 connected")
+    assert out == f"client {pseudonym(sanitizer, 'IP', '::ffff:10.0.0.1')} connected"
+
+
+def test_ipv6_is_redacted(sanitizer):
+    out = sanitizer.line("ipv6=fe80::1ff:fe23:4567")
+    assert "fe80" not in out
+    assert sanitizer.counts["IP"] == 1
+
+
+@pytest.mark.parametrize("line", [
+    "2025-12-21T10:30:45.123Z job done",
+    "elapsed 12:30:45",
+    "at 01:02:03:04 frames",
+])
+def test_timestamps_are_not_read_as_addresses(sanitizer, line):
+    assert sanitizer.line(line) == line
+    assert not sanitizer.counts
+
+
+@pytest.mark.parametrize("line", ["listening on 127.0.0.1:8000", "bind ::1 and 0.0.0.0"])
+def test_loopback_and_unspecified_addresses_are_kept(sanitizer, line):
+    assert sanitizer.line(line) == line
+
+
+@pytest.mark.parametrize("line, prefix, value", [
+    ("login pwd=xyz ok", "pwd=", "xyz"),
+    ("db_password=hunter2", "password=", "hunter2"),
+    ('"api_key": "abcd1234"', 'api_key": "', "abcd1234"),
+    ("Authorization: Bearer abcdef123456", "Authorization: Bearer ", "abcdef123456"),
+])
+def test_secret_values_are_redacted_and_keys_kept(sanitizer, line, prefix, value):
+    out = sanitizer.line(line)
+    assert value not in out
+    assert prefix + pseudonym(sanitizer, "SECRET", value) in out
+
+
+def test_words_containing_keywords_are_not_secrets(sanitizer):
+    line = "sshd: Failed password for admin from console"
+    assert sanitizer.line(line) == line
+
+
+def test_email_mac_and_host(sanitizer):
+    out = sanitizer.line("user=ana@corp.example.com mac=00:1a:2b:3c:4d:5e host=WS-FIN-023")
+    assert "ana@" not in out and "00:1a" not in out and "WS-FIN-023" not in out
+    assert out.startswith("user=<EMAIL-") and "host=<HOST-" in out
+    assert sanitizer.counts == {"EMAIL": 1, "MAC": 1, "HOST": 1}
+
+
+def test_file_names_are_evidence(sanitizer):
+    line = "Image=C:\\Windows\\System32\\vssadmin.exe ParentImage=payload.ps1"
+    assert sanitizer.line(line) == line
+
+
+def test_extra_host_names(sanitizer):
+    out = Sanitizer("test-salt", hostnames=["DC01"]).line("logon to dc01 from DC01X")
+    assert out.startswith("logon to <NAME-") and out.endswith(" from DC01X")
+
+
+def test_pseudonyms_are_stable_per_salt_and_differ_across_salts():
+    first, second, other = Sanitizer("a"), Sanitizer("a"), Sanitizer("b")
+    line = "from 10.9.8.7"
+    assert first.line(line) == second.line(line) != other.line(line)
+
+
+def test_without_a_salt_a_random_key_is_generated():
+    one, two = Sanitizer(), Sanitizer()
+    assert one.salt_generated and re.fullmatch(r"[0-9a-f]{32}", one.salt)
+    assert one.line("from 10.9.8.7") != two.line("from 10.9.8.7")